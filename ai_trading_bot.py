@@ -4,6 +4,7 @@ import joblib
 import pandas as pd
 from datetime import datetime
 import websockets
+from bot_data_journal import load_bot_data
 
 print('='*80)
 print('AI TRADING BOT - TRADING AUTOMATIQUE AVEC IA')
@@ -386,8 +387,7 @@ class AITradingBot:
 
         # Charger bot_data.json
         try:
-            with open('bot_data.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_bot_data('bot_data.json')
 
             runners = data.get('runners', [])[:5]  # Limiter a 5 pour le test
 
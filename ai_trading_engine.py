@@ -6,7 +6,6 @@ Compatible avec le mode simulation du site web
 import asyncio
 import json
 import joblib
-import pandas as pd
 from datetime import datetime
 import websockets
 from typing import Dict, Callable
@@ -15,22 +14,33 @@ from typing import Dict, Callable
 from learning_engine import learning_engine
 from adaptive_config import adaptive_config
 from console_logger import get_console_logger
+from snapshot_accumulator import SnapshotAccumulator
+from trade_store import TradeBuffer
+from timer_wheel import TimerWheel
+from signal_bus import SignalBus, POLICY_COALESCE
+from inference_service import BatchInferenceService
+from sol_price_fetcher import get_sol_price_usd
+from mark_price_cache import get_mark_price_cache
+from ws_capture import get_ws_capture
 
 # PRIX EN TEMPS RÉEL (stockés depuis le WebSocket)
-_last_known_prices = {}  # {mint: {'mc_usd': X, 'timestamp': Y}}
+def set_last_known_price(mint, mc_usd, timestamp=None):
+    """Mémorise le dernier prix vu sur le WebSocket (notifie les bots abonnés)"""
+    get_mark_price_cache().update(mint, mc_usd, timestamp)
 
 def get_last_known_price(mint):
     """
     Récupère le dernier prix connu d'un token depuis le WebSocket
     Alternative à get_token_price_live() qui utilise l'API REST bloquée
     """
-    if mint in _last_known_prices:
-        data = _last_known_prices[mint]
+    mark = get_mark_price_cache().get(mint)
+    if mark is not None:
+        mc_usd, _, source = mark
         return {
-            'mc_usd': data['mc_usd'],
-            'mc_sol': data['mc_usd'] / Config.get_sol_price(),
+            'mc_usd': mc_usd,
+            'mc_sol': mc_usd / Config.get_sol_price(),
             'success': True,
-            'source': 'websocket'
+            'source': source
         }
 
     # Token pas encore vu dans le WebSocket
@@ -46,12 +56,10 @@ class Config:
     # WebSocket PumpFun
     PUMPFUN_WS = "wss://pumpportal.fun/api/data"
 
-    # Prix SOL (approximation)
-    SOL_PRICE = 200.0
-
+    # Prix SOL: oracle partagé du process (rafraîchi en arrière-plan)
     @staticmethod
     def get_sol_price():
-        return Config.SOL_PRICE
+        return get_sol_price_usd()
 
     # IA - SEUILS DE CONFIANCE
     THRESHOLD_8S = 0.50
@@ -126,17 +134,33 @@ except Exception as e:
     model_15s = None
 
 
+# Ordre des colonnes du modèle @ 8s (features d'entraînement)
+FEATURES_8S = ['txn', 'traders', 'buy_ratio', 'mc', 'velocity', 'whale_count']
+
+
 class AITradingEngine:
     """
     Moteur de trading avec IA complet
     Réplique exacte de live_trading_bot.py
     """
 
+    # Délais depuis la création du token
+    SNAPSHOT_8S_DELAY = 8
+    CLEANUP_DELAY = 600  # 10 minutes
+    BOT_QUEUE_SIZE = 256  # Signaux en attente max par bot (1 par mint)
+
     def __init__(self):
         self.ws = None
         self.tokens: Dict[str, dict] = {}  # {mint: token_data}
+        self.scheduler = TimerWheel()  # Deadlines de tous les tokens (pas de tâche par mint)
+        self.inference = BatchInferenceService()  # predict_proba par micro-batch
+        if model_10s:
+            self.inference.register_classifier(
+                'model_10s', model_10s, getattr(model_10s, 'feature_names_in_', FEATURES_8S))
         self.signal_callbacks: list[Callable] = []
         self.registered_bots: Dict[int, dict] = {}  # {user_id: bot_instance}
+        self.signal_bus = SignalBus('ai_signals')  # 1 file bornée par bot
+        self.capture = get_ws_capture('ai_engine')  # Messages bruts (None si désactivé)
         self.is_running = False
 
         # Stats
@@ -144,14 +168,23 @@ class AITradingEngine:
         self.signals_generated = 0
 
     def register_bot(self, user_id: int, config: dict, bot_instance=None):
-        """Enregistrer un bot pour recevoir des signaux"""
+        """
+        Enregistrer un bot pour recevoir des signaux
+
+        Returns:
+            Subscription du bot sur le bus de signaux (coalescée par mint)
+        """
+        subscription = self.signal_bus.subscribe(f'bot_{user_id}', maxlen=self.BOT_QUEUE_SIZE,
+                                                 policy=POLICY_COALESCE)
         self.registered_bots[user_id] = bot_instance
         print(f"[ENGINE] Bot registered: User {user_id} | Total: {len(self.registered_bots)}")
+        return subscription
 
     def unregister_bot(self, user_id: int):
         """Désinscrire un bot"""
         if user_id in self.registered_bots:
             del self.registered_bots[user_id]
+            self.signal_bus.unsubscribe(f'bot_{user_id}')
             print(f"[ENGINE] Bot unregistered: User {user_id}")
 
     def subscribe_signals(self, callback: Callable):
@@ -163,14 +196,9 @@ class AITradingEngine:
         """Envoyer un signal à tous les bots enregistrés"""
         self.signals_generated += 1
 
-        # Envoyer aux bots enregistrés (thread-safe via queue)
-        for user_id, bot_instance in self.registered_bots.items():
-            if bot_instance and hasattr(bot_instance, 'on_signal'):
-                try:
-                    # on_signal() met le signal dans une queue thread-safe
-                    bot_instance.on_signal(signal)
-                except Exception as e:
-                    print(f"[AI ENGINE] Error sending to bot {user_id}: {e}")
+        # Envoyer aux bots enregistrés: 1 push dans la file bornée de chaque bot
+        # (thread-safe, chaque bot consomme par batch dans sa propre boucle)
+        self.signal_bus.publish(signal)
 
         # Envoyer aux callbacks (legacy)
         for callback in self.signal_callbacks:
@@ -181,65 +209,35 @@ class AITradingEngine:
 
     def calculate_snapshot(self, token, max_age):
         """Calcule les features pour une période (EXACT copie de live_trading_bot.py)"""
-        created_at = token['created_at']
-        trades_in_period = [t for t in token['trades'] if (t['time'] - created_at) <= max_age]
+        # Lecture O(1) depuis l'accumulateur mis à jour dans handle_trade
+        acc = token['accumulator'].snapshot(max_age)
 
-        if not trades_in_period:
+        if not acc:
             return None
 
-        buys = [t for t in trades_in_period if t['type'] == 'buy']
-        sells = [t for t in trades_in_period if t['type'] == 'sell']
-        unique_traders = len(set(t['trader'] for t in trades_in_period))
+        txn = acc['txn']
+        buys = acc['buys']
 
         # Calculer la vélocité (croissance MC)
-        mc_current = trades_in_period[-1]['mc'] if trades_in_period else 0
+        mc_current = acc['mc']
         mc_initial = token.get('mc_initial', 0)
         velocity = (mc_current - mc_initial) / max_age if max_age > 0 else 0
 
-        # Compter les baleines
-        whale_count = len(set(t['trader'] for t in buys if t.get('amount_usd', 0) >= Config.WHALE_THRESHOLD))
-
-        # Compter les WALLETS ELITE
-        elite_wallet_count = len(set(t['trader'] for t in buys if t['trader'] in Config.ELITE_WALLETS))
-        elite_wallets_found = [t['trader'][:8] for t in buys if t['trader'] in Config.ELITE_WALLETS]
-
-        # DETECTER 2 BALEINES CONSECUTIVES
-        consecutive_whales = False
-        if len(buys) >= 2:
-            recent_buys = buys[-5:]
-            whale_buys = [b for b in recent_buys if b.get('amount_usd', 0) >= Config.WHALE_THRESHOLD]
-
-            if len(whale_buys) >= 2:
-                last_whale_idx = None
-                second_last_whale_idx = None
-
-                for i in range(len(recent_buys) - 1, -1, -1):
-                    if recent_buys[i].get('amount_usd', 0) >= Config.WHALE_THRESHOLD:
-                        if last_whale_idx is None:
-                            last_whale_idx = i
-                        elif second_last_whale_idx is None:
-                            second_last_whale_idx = i
-                            break
-
-                if last_whale_idx is not None and second_last_whale_idx is not None:
-                    if last_whale_idx - second_last_whale_idx == 1:
-                        consecutive_whales = True
-
         return {
-            'txn': len(trades_in_period),
-            'buys': len(buys),
-            'sells': len(sells),
-            'buy_ratio': len(buys)/len(trades_in_period) if trades_in_period else 0,
-            'traders': unique_traders,
+            'txn': txn,
+            'buys': buys,
+            'sells': acc['sells'],
+            'buy_ratio': buys/txn if txn else 0,
+            'traders': acc['traders'],
             'mc': mc_current,
             'velocity': velocity,
-            'whale_count': whale_count,
-            'elite_wallet_count': elite_wallet_count,
-            'elite_wallets': elite_wallets_found,
-            'consecutive_whales': consecutive_whales
+            'whale_count': acc['whale_count'],
+            'elite_wallet_count': acc['elite_wallet_count'],
+            'elite_wallets': acc['elite_wallets'],
+            'consecutive_whales': acc['consecutive_whales']
         }
 
-    def predict_8s(self, snapshot_8s, mint=None):
+    async def predict_8s(self, snapshot_8s, mint=None):
         """Prédiction @ 8 secondes (EXACT copie de live_trading_bot.py)"""
         if not snapshot_8s:
             return None
@@ -348,18 +346,17 @@ class AITradingEngine:
             }
 
         # Prédiction avec modèle IA (EXACT comme live_trading_bot.py)
-        if model_10s:
+        if 'model_10s' in self.inference:
             try:
-                features = pd.DataFrame([{
+                # Regroupée avec les autres tokens qui atteignent 8s dans le même tick
+                prob = await self.inference.predict('model_10s', {
                     'txn': txn,
                     'traders': traders,
                     'buy_ratio': buy_ratio,
                     'mc': mc,
                     'velocity': snapshot_8s.get('velocity', 0),
                     'whale_count': whale_count  # ← Features exactes du modèle!
-                }])
-
-                prob = model_10s.predict_proba(features)[0][1]
+                })
 
                 if prob >= Config.THRESHOLD_8S:
                     return {
@@ -381,6 +378,18 @@ class AITradingEngine:
     async def handle_new_token(self, data, ws):
         """Nouveau token détecté"""
         mint = data.get('mint')
+
+        self.add_token(data)
+
+        # S'abonner aux trades de ce token
+        await ws.send(json.dumps({
+            "method": "subscribeTokenTrade",
+            "keys": [mint]
+        }))
+
+    def add_token(self, data, created_at=None):
+        """Créer l'état d'un token et programmer ses analyses"""
+        mint = data.get('mint')
         symbol = data.get('symbol', 'UNKNOWN')
         name = data.get('name', 'Unknown')
         mc_usd = data.get('usd_market_cap', 0)
@@ -388,31 +397,45 @@ class AITradingEngine:
         print(f"[AI ENGINE] NEW TOKEN: {symbol} @ ${mc_usd:,.0f}")
 
         # Créer le token tracking
+        created_at = created_at or datetime.now().timestamp()
         self.tokens[mint] = {
             'mint': mint,
             'symbol': symbol,
             'name': name,
-            'created_at': datetime.now().timestamp(),
+            'created_at': created_at,
             'mc_initial': mc_usd,
-            'trades': [],
+            'trades': TradeBuffer(),
+            'accumulator': SnapshotAccumulator(
+                created_at,
+                horizons=(8, 15),
+                whale_threshold=Config.WHALE_THRESHOLD,
+                elite_wallets=Config.ELITE_WALLETS
+            ),
             'snapshot_8s': None,
             'snapshot_15s': None
         }
 
         self.tokens_tracked += 1
 
-        # S'abonner aux trades de ce token
-        await ws.send(json.dumps({
-            "method": "subscribeTokenTrade",
-            "keys": [mint]
-        }))
-
         # Programmer l'analyse à 8s et 15s
-        asyncio.create_task(self.track_token(mint))
+        self.track_token(mint)
 
-    async def handle_trade(self, data):
+    async def handle_trade(self, data, trade_time=None):
         """Trade détecté"""
+        self.record_trade(data, trade_time)
+
+    def record_trade(self, data, trade_time=None):
+        """Intègre un trade dans l'état du token (synchrone)"""
         mint = data.get('mint')
+        sol_price = Config.get_sol_price()
+        mc_sol = data.get('marketCapSol', 0)
+        mc_usd = mc_sol * sol_price
+
+        # STOCKER LE PRIX EN TEMPS RÉEL (pour get_last_known_price)
+        # Avant le test d'analyse: les positions ouvertes survivent au cleanup du token
+        trade_time = trade_time or datetime.now().timestamp()
+        set_last_known_price(mint, mc_usd, trade_time)
+
         if mint not in self.tokens:
             return
 
@@ -420,33 +443,33 @@ class AITradingEngine:
 
         # Ajouter le trade (EXACT comme live_trading_bot.py)
         sol_amount = data.get('solAmount', 0)
-        amount_usd = sol_amount * Config.get_sol_price()
-        mc_sol = data.get('marketCapSol', 0)
-        mc_usd = mc_sol * Config.get_sol_price()
+        amount_usd = sol_amount * sol_price
 
-        # STOCKER LE PRIX EN TEMPS RÉEL (pour get_last_known_price)
-        global _last_known_prices
-        _last_known_prices[mint] = {
-            'mc_usd': mc_usd,
-            'timestamp': datetime.now().timestamp()
-        }
+        tx_type = data.get('txType')  # 'buy' ou 'sell'
+        trader = data.get('traderPublicKey', 'unknown')
 
-        trade = {
-            'time': datetime.now().timestamp(),
-            'type': data.get('txType'),  # 'buy' ou 'sell'
-            'trader': data.get('traderPublicKey', 'unknown'),
-            'amount_sol': sol_amount,
-            'amount_usd': amount_usd,
-            'mc': mc_usd
-        }
+        token['trades'].append(
+            tx_type, trader, mc_usd, trade_time,
+            amount_sol=sol_amount,
+            amount_usd=amount_usd
+        )
+        token['accumulator'].add_trade(tx_type, trader, mc_usd, amount_usd, trade_time)
 
-        token['trades'].append(trade)
+    def track_token(self, mint):
+        """Programmer l'analyse @ 8s et le nettoyage dans la roue de timers"""
+        self.scheduler.schedule(self.SNAPSHOT_8S_DELAY, self.on_snapshot_8s, mint, label='snapshot_8s')
 
-    async def track_token(self, mint):
-        """Tracker un token et générer des signaux"""
-        # Attendre 8 secondes
-        await asyncio.sleep(8)
+        # TODO: Ajouter prédiction @ 15s si pas déjà acheté
+
+        # Nettoyer après 10 minutes
+        self.scheduler.schedule(self.CLEANUP_DELAY, self.cleanup_token, mint, label='cleanup', force=True)
+
+    def cleanup_token(self, mint):
+        """Deadline de nettoyage: libère la mémoire du token"""
+        self.tokens.pop(mint, None)
 
+    async def on_snapshot_8s(self, mint):
+        """Deadline @ 8s: snapshot, prédiction et signal"""
         if mint not in self.tokens:
             return
 
@@ -464,7 +487,7 @@ class AITradingEngine:
             console_logger.log(f"[NEW TOKEN] {token['symbol']} ({mint[:8]}...) @ ${mc:,.0f}", 'NEW_TOKEN')
 
             # Prédiction @ 8s
-            prediction = self.predict_8s(snapshot_8s, mint)
+            prediction = await self.predict_8s(snapshot_8s, mint)
 
             if prediction and prediction['should_buy']:
                 # SIGNAL BUY!
@@ -495,16 +518,6 @@ class AITradingEngine:
             # Pas assez de trades pour analyser
             console_logger.log(f"[NO DATA @ 8s] {token['symbol']}: Not enough trades to analyze", 'INFO')
 
-        # Attendre 7 secondes de plus (total 15s)
-        await asyncio.sleep(7)
-
-        # TODO: Ajouter prédiction @ 15s si pas déjà acheté
-
-        # Nettoyer après 10 minutes
-        await asyncio.sleep(585)
-        if mint in self.tokens:
-            del self.tokens[mint]
-
     async def connect_websocket(self):
         """Connexion au WebSocket PumpFun"""
         print("[AI ENGINE] Connexion au WebSocket PumpFun...")
@@ -528,6 +541,8 @@ class AITradingEngine:
 
                 # Écouter les messages
                 async for message in ws:
+                    if self.capture:
+                        self.capture.record(message)
                     try:
                         data = json.loads(message)
                         tx_type = data.get('txType')
@@ -555,11 +570,26 @@ class AITradingEngine:
 
         # Créer une task pour le WebSocket (ne pas bloquer)
         asyncio.create_task(self.connect_websocket())
+        asyncio.create_task(self.scheduler.run())
 
         # Garder l'engine en vie
         while self.is_running:
             await asyncio.sleep(1)
 
+    def get_stats(self):
+        """Stats du moteur (dont le lag de chaque bot sur le bus)"""
+        return {
+            'is_running': self.is_running,
+            'tokens_tracked': self.tokens_tracked,
+            'tokens_active': len(self.tokens),
+            'signals_generated': self.signals_generated,
+            'registered_bots': len(self.registered_bots),
+            'signal_bus': self.signal_bus.get_stats(),
+            'scheduler': self.scheduler.get_stats(),
+            'inference': self.inference.get_stats(),
+            'mark_prices': get_mark_price_cache().get_stats()
+        }
+
 
 # Instance globale
 _ai_engine = None
@@ -569,6 +599,12 @@ def get_ai_engine() -> AITradingEngine:
     global _ai_engine
 
     if _ai_engine is None:
-        _ai_engine = AITradingEngine()
+        from system_limits import ENGINE_SHARDS
+        if ENGINE_SHARDS > 1:
+            # Mode multi-processus: ce process ne fait que router et distribuer
+            from sharded_engine import ShardedAIEngine
+            _ai_engine = ShardedAIEngine(ENGINE_SHARDS)
+        else:
+            _ai_engine = AITradingEngine()
 
     return _ai_engine
@@ -2,6 +2,7 @@
 Analyse TOUS les tokens pour trouver ceux qui ont migré
 """
 import json
+from bot_data_journal import load_bot_data
 
 print('='*80)
 print('ANALYSE COMPLETE DES MIGRATIONS')
@@ -9,8 +10,7 @@ print('='*80)
 
 # Charger bot_data.json avec encodage UTF-8
 try:
-    with open('bot_data.json', 'r', encoding='utf-8', errors='ignore') as f:
-        bot_data = json.load(f)
+    bot_data = load_bot_data('bot_data.json')
 
     print(f'\nBot data charge avec succes')
 
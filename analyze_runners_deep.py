@@ -7,6 +7,7 @@ import requests
 import time
 from collections import defaultdict
 from datetime import datetime
+from bot_data_journal import load_bot_data
 
 SOL_PRICE = 200
 
@@ -231,8 +232,7 @@ def main():
 
     # Charger les données du bot
     try:
-        with open('bot_data.json', 'r') as f:
-            bot_data = json.load(f)
+        bot_data = load_bot_data('bot_data.json')
     except:
         print("\n❌ Impossible de charger bot_data.json")
         return
@@ -4,10 +4,10 @@ Analyse complète des tokens collectés:
 - Statistiques détaillées
 """
 import json
+from bot_data_journal import load_bot_data
 
 def analyze_tokens():
-    with open('bot_data.json', 'r') as f:
-        data = json.load(f)
+    data = load_bot_data('bot_data.json')
 
     completed = data.get('completed', [])
 
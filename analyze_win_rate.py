@@ -3,10 +3,10 @@ Analyse des données pour améliorer le win rate
 Compare les RUNNERS vs FLOPS pour trouver les patterns gagnants
 """
 import json
+from bot_data_journal import load_bot_data
 
 def analyze_data():
-    with open('bot_data.json', 'r') as f:
-        data = json.load(f)
+    data = load_bot_data('bot_data.json')
 
     completed = data.get('completed', [])
     runners = [t for t in completed if t.get('is_runner')]
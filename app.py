@@ -3,7 +3,7 @@ PREDICTION AI - Site Web de Prédiction ROI
 Système de prédiction du potentiel ROI pour tokens Pump.fun
 + Trading Bot Automatique
 """
-from flask import Flask, render_template, request, jsonify, make_response, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, make_response, session, redirect, url_for
 import joblib
 import json
 import asyncio
@@ -26,6 +26,7 @@ from system_limits import MAX_CONCURRENT_BOTS, get_capacity_status, ERROR_MESSAG
 from scanner_data_manager import scanner_manager
 from predict_runner import RunnerPredictor
 from console_logger import get_console_logger
+from dashboard_push import get_dashboard_hub, format_position, MAX_STREAMS as DASHBOARD_MAX_STREAMS
 
 app = Flask(__name__)
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
@@ -651,14 +652,15 @@ def manual_sell():
 
     try:
         # Récupérer la position depuis la DB
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM open_positions
-            WHERE user_id = ? AND token_address = ?
-        """, (user_id, token_address))
+        # Connexion rendue au pool avant la vente (pas gardée pendant la transaction on-chain)
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM open_positions
+                WHERE user_id = ? AND token_address = ?
+            """, (user_id, token_address))
 
-        position_row = cursor.fetchone()
+            position_row = cursor.fetchone()
 
         if not position_row:
             return jsonify({'success': False, 'error': 'Position non trouvée'}), 404
@@ -750,23 +752,25 @@ def manual_sell():
             )
 
         # Mettre à jour ou fermer la position
-        if percentage >= 100:
-            # Fermer complètement la position
-            cursor.execute("""
-                DELETE FROM open_positions
-                WHERE user_id = ? AND token_address = ?
-            """, (user_id, token_address))
-            print(f"[MANUAL SELL] Position fermée (100%)")
-        else:
-            # Mettre à jour le montant restant
-            cursor.execute("""
-                UPDATE open_positions
-                SET amount_sol = ?
-                WHERE user_id = ? AND token_address = ?
-            """, (remaining_amount, user_id, token_address))
-            print(f"[MANUAL SELL] Position mise à jour - Restant: {remaining_amount:.4f} SOL")
-
-        conn.commit()
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            if percentage >= 100:
+                # Fermer complètement la position
+                cursor.execute("""
+                    DELETE FROM open_positions
+                    WHERE user_id = ? AND token_address = ?
+                """, (user_id, token_address))
+                print(f"[MANUAL SELL] Position fermée (100%)")
+            else:
+                # Mettre à jour le montant restant
+                cursor.execute("""
+                    UPDATE open_positions
+                    SET amount_sol = ?
+                    WHERE user_id = ? AND token_address = ?
+                """, (remaining_amount, user_id, token_address))
+                print(f"[MANUAL SELL] Position mise à jour - Restant: {remaining_amount:.4f} SOL")
+
+            conn.commit()
 
         return jsonify({
             'success': True,
@@ -921,37 +925,18 @@ def bot_positions():
             print(f"[API] Reading positions from BOT MEMORY for user {user_id}")
             bot = active_bots[user_id]
 
-            for mint, position in bot.active_positions.items():
+            for mint, position in list(bot.active_positions.items()):
                 try:
-                    symbol = position.get('token_name', f'Token_{mint[:6]}')
-                    entry_mc = position.get('entry_mc', 0)
-
                     # Récupérer le prix LIVE depuis le WebSocket
                     live_price = get_last_known_price(mint)
 
                     if live_price['success'] and live_price['mc_usd'] > 0:
                         current_mc = live_price['mc_usd']
                     else:
-                        current_mc = entry_mc
-
-                    profit_ratio = current_mc / entry_mc if entry_mc > 0 else 1.0
-                    profit_pct = (profit_ratio - 1) * 100
+                        current_mc = position.get('entry_mc', 0)
 
-                    positions.append({
-                        'mint': mint,
-                        'token_address': mint,  # AJOUT: pour compatibilité avec boutons SELL
-                        'token_name': symbol,
-                        'entry_mc': entry_mc,
-                        'current_mc': current_mc,
-                        'amount_sol': position.get('amount', 0),
-                        'profit_percent': profit_pct,
-                        'profit_multiplier': profit_ratio,
-                        'partial_sold': position.get('partial_sold', False),  # Flag vente partielle
-                        'migration_reached': position.get('migration_reached', False),  # Flag migration
-                        'distance_to_migration': 53000 - current_mc,
-                        'migration_percent': (current_mc / 53000) * 100,
-                        'entry_time': position.get('entry_time').isoformat() if position.get('entry_time') else None
-                    })
+                    # Même format que les événements 'position' du flux /api/stream
+                    positions.append(format_position(mint, position, current_mc))
                 except Exception as e:
                     print(f"[ERROR] Failed to process position {mint[:8]}: {e}")
                     continue
@@ -1024,23 +1009,17 @@ def console_logs():
 
         logger = get_console_logger()
         limit = request.args.get('limit', 100, type=int)
+        since = request.args.get('since', 0, type=int)  # Curseur: seq du dernier log reçu
 
-        # Récupérer les logs GLOBAUX (user_id=0) + logs de l'utilisateur
-        global_logs = logger.get_logs(user_id=0, limit=limit)  # Logs globaux (NEW TOKEN, SKIP, etc.)
-        user_logs = logger.get_logs(user_id=user_id, limit=limit)  # Logs du bot de l'utilisateur
-
-        # Merger et trier par timestamp
-        all_logs = global_logs + user_logs
-        # Trier par timestamp (format HH:MM:SS)
-        all_logs.sort(key=lambda x: x['timestamp'])
-
-        # Limiter au nombre demandé
-        logs = all_logs[-limit:] if len(all_logs) > limit else all_logs
+        # Logs GLOBAUX (user_id=0: NEW TOKEN, SKIP, etc.) + logs du bot de l'utilisateur, fusionnés par seq
+        result = logger.merge_logs(user_id, limit=limit, since=since)
 
         return jsonify({
             'success': True,
-            'logs': logs,
-            'count': len(logs)
+            'logs': result['logs'],
+            'count': len(result['logs']),
+            'cursor': result['cursor'],
+            'truncated': result['truncated']
         })
     except Exception as e:
         return jsonify({
@@ -1049,6 +1028,29 @@ def console_logs():
         }), 500
 
 
+@app.route('/api/stream')
+@login_required
+def dashboard_stream():
+    """
+    Flux temps réel du dashboard (Server-Sent Events)
+    Événements: position (delta P&L), position_closed, log
+    Les endpoints de polling restent disponibles en fallback (flux refusé
+    au-delà de DASHBOARD_MAX_STREAMS: le dashboard reste alors en polling)
+    """
+    user_id = session['user_id']
+    hub = get_dashboard_hub()
+    if hub.active_streams() >= DASHBOARD_MAX_STREAMS:
+        return Response('Too many live streams', status=503, headers={'Retry-After': '60'})
+    return Response(
+        hub.stream(user_id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Pas de buffering côté nginx
+        }
+    )
+
+
 @app.route('/api/subscription/upgrade', methods=['POST'])
 @login_required
 def upgrade_subscription():
@@ -22,6 +22,7 @@ from rich.console import Console
 from rich.table import Table
 
 from performance_tracker import PerformanceTracker
+from model_registry import publish_model
 
 console = Console()
 
@@ -314,6 +315,13 @@ class AutoRetrainingSystem:
         with open(self.models_dir / "last_retrain.json", 'w') as f:
             json.dump(retrain_log, f, indent=2)
 
+        # Publication: les consommateurs du registre basculent sans redémarrage
+        publish_model('roi', {
+            'model': best_model,
+            'scaler': scaler,
+            'feature_names': feature_cols
+        }, retrain_log, models_dir=self.models_dir)
+
         console.print(f"\n[green]Model saved! New accuracy: {best_acc:.2f}%")
 
         # Display classification report
@@ -0,0 +1,455 @@
+"""
+BOT DATA JOURNAL - Journal append-only des tokens analysés (pattern_discovery_bot)
+Remplace la réécriture complète de bot_data.json (indent=2) toutes les 30s:
+- bot_data.journal.jsonl: un token complété par ligne, écrit une seule fois
+- bot_data.journal.idx: index (offset, taille, is_runner, snapshots résumés);
+  load_existing_data ne lit que l'index, jamais les enregistrements complets
+- bot_data.state.json: petit état (tokens actifs, alertes, stats) réécrit à chaque sauvegarde
+- bot_data.json: plus réécrit par le bot (chaque record n'est écrit qu'une fois)
+Lecture en flux: open_completed() / iter_completed() (fallback sur un bot_data.json legacy)
+Vue complète au format legacy: load_bot_data() (scripts d'analyse, dashboard)
+Instantané bot_data.json pour des outils externes, à la demande:
+  python bot_data_journal.py export [bot_data.json]  (lecture seule, bot en marche OK)
+Sans journal (ouverture impossible), le bot retombe sur write_legacy(): réécriture
+complète de bot_data.json comme avant le journal
+"""
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+SUMMARY_SNAPSHOTS = ('10s', '15s', '20s', '30s', '1min')  # Snapshots lus par display_formula
+CHECKPOINT_INTERVAL = 600  # Secondes entre deux fsync du journal et de l'index
+
+
+def journal_paths(data_file: str) -> Dict[str, str]:
+    """Fichiers du journal associés à un fichier de données (bot_data.json -> bot_data.*)"""
+    base, _ = os.path.splitext(data_file)
+    return {
+        'journal': base + '.journal.jsonl',
+        'index': base + '.journal.idx',
+        'state': base + '.state.json'
+    }
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def summarize(record: dict) -> dict:
+    """Résumé d'un token complété (entrée d'index): assez pour display_formula et les compteurs"""
+    summary = {
+        'mint': record.get('mint'),
+        'symbol': record.get('symbol'),
+        'is_runner': bool(record.get('is_runner', False))
+    }
+    for key in SUMMARY_SNAPSHOTS:
+        snapshot = record.get(key)
+        if isinstance(snapshot, dict):
+            summary[key] = {'txn': snapshot.get('txn', 0), 'buy_ratio': snapshot.get('buy_ratio', 0)}
+        else:
+            summary[key] = None
+    return summary
+
+
+def compute_stats(entries: List[dict]) -> dict:
+    total = len(entries)
+    runners = sum(1 for entry in entries if entry.get('is_runner', False))
+    return {
+        'total_tokens': total,
+        'total_runners': runners,
+        'total_flops': total - runners,
+        'win_rate': (runners / total * 100) if total > 0 else 0
+    }
+
+
+def read_index(index_file: str, journal_size: int = None) -> List[dict]:
+    """
+    Entrées valides de l'index, dans l'ordre du journal
+
+    S'arrête à la première ligne tronquée/incohérente (crash pendant une écriture)
+    et ignore les entrées qui dépassent la taille du journal
+    """
+    entries = []
+    if not os.path.exists(index_file):
+        return entries
+
+    expected_offset = 0
+    with open(index_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if entry.get('offset') != expected_offset:
+                break
+            end = expected_offset + entry['length']
+            if journal_size is not None and end > journal_size:
+                break
+            entries.append(entry)
+            expected_offset = end
+    return entries
+
+
+def read_state(data_file: str) -> dict:
+    """État courant (tokens actifs, alertes, stats), {} si absent"""
+    state_file = journal_paths(data_file)['state']
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(data_file: str, state: dict):
+    """Réécriture atomique du petit fichier d'état"""
+    state_file = journal_paths(data_file)['state']
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_file, state_file)
+
+
+def _write_legacy_file(data_file: str, state: dict, stats: dict, subsets, write_record):
+    """bot_data.json au format legacy, remplacé atomiquement; write_record(out, item) écrit un record"""
+    tmp_file = data_file + '.tmp'
+    with open(tmp_file, 'wb') as out:
+        out.write(b'{"tokens":' + _dumps(state.get('tokens', [])).encode('utf-8'))
+        for key, subset in subsets:
+            out.write(f',"{key}":['.encode('utf-8'))
+            for i, item in enumerate(subset):
+                if i:
+                    out.write(b',')
+                write_record(out, item)
+            out.write(b']')
+        out.write(b',"alerts":' + _dumps(state.get('alerts', [])).encode('utf-8'))
+        out.write(b',"stats":' + _dumps(stats).encode('utf-8') + b'}')
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_file, data_file)
+
+
+def write_legacy(data_file: str, state: dict, completed: List[dict]):
+    """Réécriture complète de bot_data.json (mode dégradé du bot quand le journal est indisponible)"""
+    runners = [record for record in completed if record.get('is_runner', False)]
+    flops = [record for record in completed if not record.get('is_runner', False)]
+    _write_legacy_file(
+        data_file, state, compute_stats(completed),
+        (('completed', completed), ('runners', runners), ('flops', flops)),
+        lambda out, record: out.write(_dumps(record).encode('utf-8'))
+    )
+
+
+def export_legacy(data_file: str = 'bot_data.json') -> dict:
+    """
+    Instantané legacy bot_data.json depuis le journal, à la demande
+
+    Les records sont recopiés octet par octet (pas de désérialisation).
+    Lecture seule du journal: peut tourner pendant que le bot écrit
+    """
+    paths = journal_paths(data_file)
+    entries = read_index(paths['index'], os.path.getsize(paths['journal']))
+    runners = [entry for entry in entries if entry['is_runner']]
+    flops = [entry for entry in entries if not entry['is_runner']]
+    stats = compute_stats(entries)
+
+    with open(paths['journal'], 'rb') as src:
+        def copy_record(out, entry):
+            src.seek(entry['offset'])
+            out.write(src.read(entry['length'] - 1))  # Sans le '\n'
+
+        _write_legacy_file(
+            data_file, read_state(data_file), stats,
+            (('completed', entries), ('runners', runners), ('flops', flops)),
+            copy_record
+        )
+    return stats
+
+
+class BotDataJournal:
+    """
+    Écrivain du journal (un seul processus: pattern_discovery_bot)
+
+    - append(record): une ligne JSONL + une entrée d'index, O(taille du record)
+    - entries: résumés de tous les tokens complétés (chargés depuis l'index au démarrage)
+    - checkpoint(): fsync du journal et de l'index, à lancer hors de la boucle
+      asyncio (asyncio.to_thread); les append continuent pendant le fsync
+    Au démarrage, une fin de journal non indexée (crash entre les deux écritures)
+    est réindexée et une ligne tronquée est coupée
+    """
+
+    def __init__(self, data_file: str = 'bot_data.json'):
+        self.data_file = data_file
+        paths = journal_paths(data_file)
+        self.journal_file = paths['journal']
+        self.index_file = paths['index']
+
+        self._lock = threading.Lock()
+        self.entries: List[dict] = []
+        self._size = 0  # Octets valides (indexés) du journal
+
+        # Stats
+        self.appended = 0
+        self.checkpoints = 0
+        self.last_checkpoint = 0.0
+        self.last_checkpoint_ms = 0.0
+
+        self._recover()
+        self._journal = open(self.journal_file, 'ab')
+        self._index = open(self.index_file, 'a', encoding='utf-8')
+
+    # ------------------------------------------------------------------
+    # Ouverture / reprise après crash
+    # ------------------------------------------------------------------
+    def _recover(self):
+        journal_size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        entries = read_index(self.index_file, journal_size)
+        size = entries[-1]['offset'] + entries[-1]['length'] if entries else 0
+        index_dirty = not os.path.exists(self.index_file) or len(entries) != self._count_index_lines()
+
+        if journal_size > size:
+            # Enregistrements écrits mais pas indexés: on les réindexe, la ligne tronquée est coupée
+            with open(self.journal_file, 'rb') as f:
+                f.seek(size)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    entry = summarize(record)
+                    entry['offset'] = size
+                    entry['length'] = len(line)
+                    entries.append(entry)
+                    size += len(line)
+            if journal_size > size:
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(size)
+            index_dirty = True
+
+        if index_dirty:
+            tmp_file = self.index_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(_dumps(entry) + '\n')
+            os.replace(tmp_file, self.index_file)
+
+        self.entries = entries
+        self._size = size
+
+    def _count_index_lines(self) -> int:
+        if not os.path.exists(self.index_file):
+            return 0
+        with open(self.index_file, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def import_legacy(self) -> dict:
+        """
+        Migration unique d'un bot_data.json legacy vers un journal vide
+
+        Returns:
+            Le contenu legacy sans 'completed'/'runners'/'flops' (alertes, tokens, stats)
+        """
+        if self.entries or not os.path.exists(self.data_file):
+            return {}
+
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            return {}
+
+        for record in data.pop('completed', None) or []:
+            self.append(record)
+        data.pop('runners', None)
+        data.pop('flops', None)
+        return data
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def append(self, record: dict) -> dict:
+        """Ajoute un token complété (écrit une seule fois), retourne son entrée d'index"""
+        data = (_dumps(record) + '\n').encode('utf-8')
+        entry = summarize(record)
+
+        entry['ts'] = round(time.time(), 3)  # Date de complétion (partitions des datasets)
+
+        with self._lock:
+            entry['offset'] = self._size
+            entry['length'] = len(data)
+            # Journal d'abord: une entrée d'index pointe toujours vers un record complet
+            self._journal.write(data)
+            self._journal.flush()
+            self._index.write(_dumps(entry) + '\n')
+            self._index.flush()
+            self._size += len(data)
+            self.entries.append(entry)
+
+        self.appended += 1
+        return entry
+
+    def stats(self) -> dict:
+        return compute_stats(self.entries)
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def _snapshot(self):
+        with self._lock:
+            return self.entries[:]
+
+    def iter_records(self, runners: Optional[bool] = None) -> Iterator[dict]:
+        """Records complets en flux (runners=True/False pour filtrer via l'index)"""
+        entries = self._snapshot()
+        with open(self.journal_file, 'rb') as f:
+            for entry in entries:
+                if runners is not None and entry['is_runner'] != runners:
+                    continue
+                f.seek(entry['offset'])
+                yield json.loads(f.read(entry['length']))
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+    def checkpoint(self):
+        """Checkpoint durable (fsync). Bloquant: à appeler via asyncio.to_thread depuis le bot"""
+        start = time.time()
+        # Tout ce qui est dans `entries` est déjà écrit: fsync hors du verrou
+        os.fsync(self._journal.fileno())
+        os.fsync(self._index.fileno())
+
+        self.checkpoints += 1
+        self.last_checkpoint = time.time()
+        self.last_checkpoint_ms = (self.last_checkpoint - start) * 1000
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+            self._index.close()
+
+    def get_stats(self) -> dict:
+        return {
+            'records': len(self.entries),
+            'journal_bytes': self._size,
+            'appended': self.appended,
+            'checkpoints': self.checkpoints,
+            'last_checkpoint_ms': round(self.last_checkpoint_ms, 1)
+        }
+
+
+class CompletedReader:
+    """
+    Lecture seule des tokens complétés, sans tout charger en mémoire
+
+    - journal présent: compteurs depuis l'index, records lus un par un (seek)
+    - sinon: bot_data.json legacy (chargé en entier, comme avant)
+    Ne modifie jamais les fichiers: utilisable pendant que le bot tourne
+    """
+
+    def __init__(self, data_file: str = 'bot_data.json'):
+        self.data_file = data_file
+        paths = journal_paths(data_file)
+        self.journal_file = paths['journal']
+        self._legacy: Optional[dict] = None
+
+        if os.path.exists(self.journal_file):
+            self.source = 'journal'
+            self.entries = read_index(paths['index'], os.path.getsize(self.journal_file))
+        elif os.path.exists(data_file):
+            self.source = 'legacy'
+            with open(data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                data = {'completed': data}
+            self._legacy = data
+            completed = data.get('completed')
+            if completed is None:
+                completed = data.get('runners', []) + data.get('flops', [])
+            self.entries = [summarize(record) for record in completed if isinstance(record, dict)]
+        else:
+            raise FileNotFoundError(data_file)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return self.iter_records()
+
+    @property
+    def runners_count(self) -> int:
+        return sum(1 for entry in self.entries if entry['is_runner'])
+
+    @property
+    def flops_count(self) -> int:
+        return len(self.entries) - self.runners_count
+
+    def iter_records(self, runners: Optional[bool] = None) -> Iterator[dict]:
+        for entry, record in self.iter_indexed():
+            if runners is None or entry['is_runner'] == runners:
+                yield record
+
+    def iter_indexed(self, start: int = 0) -> Iterator[tuple]:
+        """(entrée d'index, record) à partir du start-ième token (lecture incrémentale)"""
+        if self._legacy is not None:
+            data = self._legacy
+            records = data.get('completed')
+            if records is None:
+                records = data.get('runners', []) + data.get('flops', [])
+            records = [record for record in records if isinstance(record, dict)]
+            for entry, record in zip(self.entries[start:], records[start:]):
+                yield entry, record
+            return
+
+        with open(self.journal_file, 'rb') as f:
+            for entry in self.entries[start:]:
+                f.seek(entry['offset'])
+                yield entry, json.loads(f.read(entry['length']))
+
+
+def open_completed(data_file: str = 'bot_data.json') -> CompletedReader:
+    """Lecteur des tokens complétés (journal si disponible, sinon bot_data.json legacy)"""
+    return CompletedReader(data_file)
+
+
+def iter_completed(data_file: str = 'bot_data.json', runners: Optional[bool] = None) -> Iterator[dict]:
+    """Raccourci: records complets en flux, filtrés par is_runner si demandé"""
+    return open_completed(data_file).iter_records(runners)
+
+
+def load_bot_data(data_file: str = 'bot_data.json') -> dict:
+    """
+    Vue complète au format legacy (tokens, completed, runners, flops, alerts, stats)
+
+    Charge tous les records: réservé aux consommateurs qui en ont besoin (dashboard)
+    """
+    state = read_state(data_file)
+    reader = open_completed(data_file)
+    if reader.source == 'legacy' and not state:
+        state = reader._legacy
+
+    completed = list(reader.iter_records())
+    return {
+        'tokens': state.get('tokens', []),
+        'completed': completed,
+        'runners': [r for r in completed if r.get('is_runner', False)],
+        'flops': [r for r in completed if not r.get('is_runner', False)],
+        'alerts': state.get('alerts', []),
+        'stats': compute_stats(reader.entries)
+    }
+
+
+if __name__ == '__main__':
+    # python bot_data_journal.py export [bot_data.json]
+    if len(sys.argv) < 2 or sys.argv[1] != 'export':
+        print("Usage: python bot_data_journal.py export [bot_data.json]")
+        sys.exit(1)
+    target = sys.argv[2] if len(sys.argv) > 2 else 'bot_data.json'
+    start = time.time()
+    exported = export_legacy(target)
+    print(f"[EXPORT] {exported['total_tokens']} tokens ({exported['total_runners']} runners) "
+          f"-> {target} en {time.time() - start:.1f}s")
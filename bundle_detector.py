@@ -5,10 +5,11 @@ A "bundle" is when multiple wallets buy in the same block or within seconds.
 This is a strong indicator of coordinated manipulation/insider activity.
 """
 
-import httpx
+import asyncio
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from collections import defaultdict
+from token_transactions import TokenTransactions
 
 
 @dataclass
@@ -29,27 +30,34 @@ class BundleDetector:
     def __init__(self, rpc_url: str = None):
         # Use provided RPC or default to public
         self.rpc_url = rpc_url or "https://api.mainnet-beta.solana.com"
-        self.client = httpx.Client(timeout=30.0)
 
         # Detection thresholds
         self.SAME_BLOCK_THRESHOLD = 0  # Same slot = bundle
         self.RAPID_BUY_THRESHOLD = 3  # Within 3 seconds = suspicious
         self.HEAVY_BUNDLE_THRESHOLD = 0.3  # >30% bundled = red flag
 
-    def analyze_bundles(self, token_mint: str, creation_timestamp: Optional[int] = None) -> BundleAnalysis:
+    async def analyze_bundles(
+        self,
+        token_mint: str,
+        creation_timestamp: Optional[int] = None,
+        transactions: Optional[TokenTransactions] = None
+    ) -> BundleAnalysis:
         """
         Analyze token for bundled transactions
 
         Args:
             token_mint: Token mint address
             creation_timestamp: Token creation time (to filter early buyers)
+            transactions: Shared per-token RPC fetches (created if not provided)
 
         Returns:
             BundleAnalysis with detection results
         """
         try:
+            source = transactions or TokenTransactions(token_mint, self.rpc_url)
+
             # Get early transactions (first 100)
-            transactions = self._get_early_transactions(token_mint, limit=100)
+            transactions = await self._get_early_transactions(source, limit=100)
 
             if not transactions or len(transactions) < 5:
                 return self._default_analysis()
@@ -69,66 +77,31 @@ class BundleDetector:
             print(f"Error analyzing bundles: {e}")
             return self._default_analysis()
 
-    def _get_early_transactions(self, token_mint: str, limit: int = 100) -> List[Dict]:
+    async def _get_early_transactions(self, source: TokenTransactions, limit: int = 100) -> List[Dict]:
         """
         Get early transactions for a token
 
         Returns list of transactions with: wallet, slot, timestamp, amount
         """
         try:
-            # Get token account transactions via Solana RPC
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSignaturesForAddress",
-                "params": [
-                    token_mint,
-                    {"limit": limit}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return []
-
-            data = response.json()
-            signatures = data.get("result", [])
-
-            # Get transaction details
-            transactions = []
-            for sig_info in signatures[:50]:  # Limit to first 50 to avoid rate limits
-                tx_details = self._get_transaction_details(sig_info["signature"])
+            signatures = await source.signatures(limit)
 
-                if tx_details:
-                    transactions.append(tx_details)
+            # Get transaction details (concurrent, throttled by the HTTP client)
+            details = await asyncio.gather(*[
+                self._get_transaction_details(source, sig_info["signature"])
+                for sig_info in signatures[:50]  # Limit to first 50 to avoid rate limits
+            ])
 
-            return transactions
+            return [tx_details for tx_details in details if tx_details]
 
         except Exception as e:
             print(f"Error fetching transactions: {e}")
             return []
 
-    def _get_transaction_details(self, signature: str) -> Optional[Dict]:
+    async def _get_transaction_details(self, source: TokenTransactions, signature: str) -> Optional[Dict]:
         """Get transaction details from signature"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTransaction",
-                "params": [
-                    signature,
-                    {"encoding": "json", "maxSupportedTransactionVersion": 0}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return None
-
-            data = response.json()
-            result = data.get("result")
+            result = await source.transaction(signature)
 
             if not result:
                 return None
@@ -246,8 +219,7 @@ class BundleDetector:
         )
 
     def close(self):
-        """Close HTTP client"""
-        self.client.close()
+        """Nothing to close: RPC calls go through the shared HTTP client"""
 
 
 # Test function
@@ -258,7 +230,7 @@ if __name__ == "__main__":
     test_token = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC for testing
 
     print(f"Analyzing bundles for: {test_token}")
-    analysis = detector.analyze_bundles(test_token)
+    analysis = asyncio.run(detector.analyze_bundles(test_token))
 
     print(f"\nBundle Analysis:")
     print(f"  Bundles detected: {analysis.bundle_count}")
@@ -10,9 +10,10 @@ Analyzes recent transactions to calculate:
 This is CRITICAL for detecting sell-offs and dumps.
 """
 
-import httpx
+import asyncio
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+from token_transactions import TokenTransactions
 
 
 @dataclass
@@ -36,26 +37,33 @@ class BuySellRatioAnalyzer:
     def __init__(self, rpc_url: str = None):
         # Use provided RPC or default to public
         self.rpc_url = rpc_url or "https://api.mainnet-beta.solana.com"
-        self.client = httpx.Client(timeout=30.0)
 
         # Detection thresholds
         self.HEAVY_SELLOFF_THRESHOLD = 0.7  # 70% sells = heavy selloff
         self.SAMPLE_SIZE = 100  # Number of recent transactions to analyze
 
-    def analyze_buysell_ratio(self, token_mint: str, dex_data: Optional[Dict] = None) -> BuySellAnalysis:
+    async def analyze_buysell_ratio(
+        self,
+        token_mint: str,
+        dex_data: Optional[Dict] = None,
+        transactions: Optional[TokenTransactions] = None
+    ) -> BuySellAnalysis:
         """
         Analyze buy/sell ratio for a token
 
         Args:
             token_mint: Token mint address
             dex_data: Optional DexScreener data for price context
+            transactions: Shared per-token RPC fetches (created if not provided)
 
         Returns:
             BuySellAnalysis with buy/sell metrics
         """
         try:
+            source = transactions or TokenTransactions(token_mint, self.rpc_url)
+
             # Get recent transactions
-            transactions = self._get_recent_transactions(token_mint, limit=self.SAMPLE_SIZE)
+            transactions = await self._get_recent_transactions(source, limit=self.SAMPLE_SIZE)
 
             if not transactions or len(transactions) < 5:
                 return self._default_analysis()
@@ -72,58 +80,26 @@ class BuySellRatioAnalyzer:
             print(f"Error analyzing buy/sell ratio: {e}")
             return self._default_analysis()
 
-    def _get_recent_transactions(self, token_mint: str, limit: int = 100) -> List[Dict]:
+    async def _get_recent_transactions(self, source: TokenTransactions, limit: int = 100) -> List[Dict]:
         """Get recent transactions for a token"""
         try:
-            # Get token account signatures
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSignaturesForAddress",
-                "params": [token_mint, {"limit": limit}]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return []
-
-            data = response.json()
-            signatures = data.get("result", [])
+            signatures = await source.signatures(limit)
 
             # Get transaction details (sample to avoid rate limits)
-            transactions = []
-            for sig_info in signatures[:50]:  # Limit to 50 to avoid rate limits
-                tx_details = self._get_transaction_details(sig_info["signature"])
+            details = await asyncio.gather(*[
+                self._get_transaction_details(source, sig_info["signature"])
+                for sig_info in signatures[:50]  # Limit to 50 to avoid rate limits
+            ])
 
-                if tx_details:
-                    transactions.append(tx_details)
-
-            return transactions
+            return [tx_details for tx_details in details if tx_details]
 
         except Exception as e:
             return []
 
-    def _get_transaction_details(self, signature: str) -> Optional[Dict]:
+    async def _get_transaction_details(self, source: TokenTransactions, signature: str) -> Optional[Dict]:
         """Get transaction details"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTransaction",
-                "params": [
-                    signature,
-                    {"encoding": "json", "maxSupportedTransactionVersion": 0}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return None
-
-            data = response.json()
-            result = data.get("result")
+            result = await source.transaction(signature)
 
             if not result:
                 return None
@@ -269,8 +245,7 @@ class BuySellRatioAnalyzer:
         )
 
     def close(self):
-        """Close HTTP client"""
-        self.client.close()
+        """Nothing to close: RPC calls go through the shared HTTP client"""
 
 
 # Test function
@@ -281,7 +256,7 @@ if __name__ == "__main__":
     test_token = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC for testing
 
     print(f"Analyzing buy/sell ratio for: {test_token}")
-    analysis = analyzer.analyze_buysell_ratio(test_token)
+    analysis = asyncio.run(analyzer.analyze_buysell_ratio(test_token))
 
     print(f"\nBuy/Sell Analysis:")
     print(f"  Buy %: {analysis.buy_percentage:.1f}%")
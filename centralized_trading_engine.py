@@ -9,13 +9,12 @@ import json
 from typing import Dict, List
 from datetime import datetime
 from shared_websocket_feed import get_shared_feed
+from signal_bus import SignalBus, POLICY_COALESCE
 from database_bot import db
 from scanner_data_manager import scanner_manager
 from runner_detector import get_runner_detector, RunnerPotential, RunnerPhase
 from console_logger import get_console_logger
-
-# Prix de SOL en USD (à ajuster selon le marché)
-SOL_PRICE_USD = 200
+from sol_price_fetcher import get_sol_price_usd
 
 
 class TradingEngine:
@@ -23,31 +22,43 @@ class TradingEngine:
     Moteur centralisé qui:
     1. Reçoit les tokens depuis le feed partagé
     2. Analyse UNIQUE fois (pas 200 fois!)
-    3. Distribue aux bots actifs
+    3. Distribue aux bots actifs (1 file bornée par bot via SignalBus)
     """
 
+    BOT_QUEUE_SIZE = 256  # Signaux en attente max par bot (1 par mint)
+
     def __init__(self):
         self.active_bots: Dict[int, dict] = {}  # {user_id: bot_config}
         self.feed = get_shared_feed()
+        self.signal_bus = SignalBus('trading_signals')
         self.tokens_analyzed = 0
         self.signals_sent = 0
         self.runner_detector = get_runner_detector()
         self.runners_detected = 0  # Count of potential runners found
 
     def register_bot(self, user_id: int, config: dict, bot_instance=None):
-        """Enregistre un bot actif"""
+        """
+        Enregistre un bot actif
+
+        Returns:
+            Subscription du bot sur le bus de signaux (coalescée par mint)
+        """
+        subscription = self.signal_bus.subscribe(f'bot_{user_id}', maxlen=self.BOT_QUEUE_SIZE,
+                                                 policy=POLICY_COALESCE)
         self.active_bots[user_id] = {
             'config': config,
             'registered_at': datetime.now(),
-            'signals_received': 0,
-            'bot_instance': bot_instance  # Référence au bot pour appeler on_signal()
+            'subscription': subscription,
+            'bot_instance': bot_instance
         }
         print(f"[ENGINE] Bot registered: User {user_id} | Total: {len(self.active_bots)}")
+        return subscription
 
     def unregister_bot(self, user_id: int):
         """Retire un bot"""
         if user_id in self.active_bots:
             del self.active_bots[user_id]
+            self.signal_bus.unsubscribe(f'bot_{user_id}')
             print(f"[ENGINE] Bot unregistered: User {user_id} | Total: {len(self.active_bots)}")
 
     async def analyze_token(self, token_data: dict) -> dict:
@@ -63,14 +74,15 @@ class TradingEngine:
             mint = token_data.get('mint')
             # Le WebSocket PumpFun envoie marketCapSol, on doit le convertir en USD
             mc_sol = token_data.get('marketCapSol', 0)
-            mc = mc_sol * SOL_PRICE_USD if mc_sol else 0
+            sol_price = get_sol_price_usd()
+            mc = mc_sol * sol_price if mc_sol else 0
             txns = token_data.get('txnCount', 0)
             volume = token_data.get('volume', 0)
             name = token_data.get('name', f'Token_{mint[:6] if mint else "Unknown"}')
 
             # DEBUG: Log MC calculation
             if mc > 0:
-                print(f"[ENGINE] DEBUG - Token: {name} | mc_sol: {mc_sol} | SOL_PRICE: {SOL_PRICE_USD} | mc_usd: {mc}")
+                print(f"[ENGINE] DEBUG - Token: {name} | mc_sol: {mc_sol} | SOL_PRICE: {sol_price} | mc_usd: {mc}")
             symbol = token_data.get('symbol', 'UNKNOWN')
 
             # Log nouveau token dans la console web (pour tous les utilisateurs connectés)
@@ -205,21 +217,10 @@ class TradingEngine:
         if signal['action'] == 'BUY':
             console_logger.log(f"BUY SIGNAL: {signal['name']} @ ${signal['mc']/1000:.1f}K | Confidence: {signal['confidence']:.0%}", 'INFO', user_id=0)
 
-        # Distribuer à chaque bot actif
-        for user_id, bot_info in self.active_bots.items():
-            try:
-                # Chaque bot va recevoir le signal et trader selon sa config
-                bot_info['signals_received'] += 1
-
-                # Envoyer le signal au bot
-                bot_instance = bot_info.get('bot_instance')
-                if bot_instance and signal['action'] == 'BUY':
-                    print(f"[ENGINE] Signal BUY → User {user_id} | {signal['mint'][:8]}... @ ${signal['mc']/1000:.1f}K")
-                    # Appeler on_signal() du bot (synchrone, met dans queue)
-                    bot_instance.on_signal(signal)
-
-            except Exception as e:
-                print(f"[ERROR] Failed to distribute to user {user_id}: {e}")
+        # Distribuer à chaque bot actif: 1 push par file, chaque bot consomme à son rythme
+        if signal['action'] == 'BUY':
+            delivered = self.signal_bus.publish(signal)
+            print(f"[ENGINE] Signal BUY → {delivered} bots | {signal['mint'][:8]}... @ ${signal['mc']/1000:.1f}K")
 
     async def process_token(self, token_data: dict):
         """Pipeline complet: analyse + distribution"""
@@ -255,7 +256,8 @@ class TradingEngine:
             'bots': [
                 {
                     'user_id': user_id,
-                    'signals_received': info['signals_received'],
+                    'signals_received': info['subscription'].published,
+                    'lag': info['subscription'].get_stats(),
                     'uptime': (datetime.now() - info['registered_at']).total_seconds()
                 }
                 for user_id, info in self.active_bots.items()
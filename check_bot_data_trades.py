@@ -3,12 +3,12 @@ Chercher les trades dans bot_data.json
 """
 import json
 import sys
+from bot_data_journal import load_bot_data
 
 print('Chargement de bot_data.json (92MB - patientez)...')
 
 try:
-    with open('bot_data.json', 'r', encoding='utf-8', errors='ignore') as f:
-        data = json.load(f)
+    data = load_bot_data('bot_data.json')
 
     print('Fichier charge avec succes!\n')
     print('='*80)
@@ -4,14 +4,14 @@ Filtre les tokens pour ne garder que ceux avec des donnees completes
 """
 import json
 import pandas as pd
+from bot_data_journal import load_bot_data
 
 print('='*80)
 print('ANALYSE DE LA QUALITE DES DONNEES @ 10 SECONDES')
 print('='*80)
 
 # Charger bot_data.json
-with open('bot_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_bot_data('bot_data.json')
 
 runners = data.get('runners', [])
 flops = data.get('flops', [])
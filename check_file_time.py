@@ -1,14 +1,19 @@
 import os
 import time
 
-file_path = 'bot_data.json'
+from bot_data_journal import journal_paths
+
+# Le bot réécrit l'état (bot_data.state.json) toutes les 30s, bot_data.json seulement sans journal
+file_path = journal_paths('bot_data.json')['state']
+if not os.path.exists(file_path):
+    file_path = 'bot_data.json'
 file_mtime = os.path.getmtime(file_path)
 now = time.time()
 age_seconds = int(now - file_mtime)
 age_minutes = age_seconds // 60
 
 print('='*80)
-print('DERNIERE MODIFICATION DE bot_data.json')
+print(f'DERNIERE MODIFICATION DE {file_path}')
 print('='*80)
 
 if age_minutes > 0:
@@ -1,8 +1,8 @@
 import json
 import time
+from bot_data_journal import load_bot_data
 
-with open('bot_data.json', 'r', encoding='utf-8') as f:
-    d = json.load(f)
+d = load_bot_data('bot_data.json')
 
 runners = d.get('runners', [])
 flops = d.get('flops', [])
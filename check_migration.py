@@ -1,9 +1,9 @@
 import json
+from bot_data_journal import load_bot_data
 
 MINT = "7dHrUD4RVi1rEs77e41xpsSm3HFp9nQXgPMnqbqbpump"
 
-with open('bot_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_bot_data('bot_data.json')
 
 # Chercher le token
 for token in data.get('completed', []):
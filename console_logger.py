@@ -3,22 +3,39 @@ CONSOLE LOGGER
 Système de logs centralisé pour le terminal web
 Collecte les logs de l'AI Engine et des bots
 """
-from datetime import datetime
+import heapq
 from collections import deque
+from datetime import datetime
+from itertools import count
 from threading import Lock
 
+from dashboard_push import get_dashboard_hub
+
 
 class ConsoleLogger:
     """
-    Logger centralisé avec buffer circulaire
-    Thread-safe pour multi-threading
-    Supporte l'isolation par user_id
+    Logger centralisé avec un buffer circulaire par utilisateur
+
+    - Chaque entrée reçoit un numéro de séquence global et monotone ('seq')
+    - Un seul verrou d'écriture pour tous les buffers (seq, ajout et push SSE
+      atomiques): quand last_seq vaut N, toutes les entrées <= N sont dans leur
+      buffer. Les lecteurs copient les deques sans verrou (le moteur ne bloque
+      jamais les lecteurs web) et ignorent les entrées > last_seq lu avant la
+      copie, un curseur ne dépasse donc jamais un seq pas encore ajouté
+    - Les seq sont partagés entre buffers (trous normaux): la perte de lignes se
+      détecte avec le seq de la dernière entrée évincée de chaque buffer
+    - Lecture par curseur: get_logs(since=N) ne renvoie que les entrées > N
+    - Les logs globaux (user_id=0) et ceux d'un utilisateur sont fusionnés
+      par seq en O(k) (merge_logs)
     """
 
     def __init__(self, max_logs=200):
         self.logs = {}  # {user_id: deque([...])}
+        self.lock = Lock()  # Partagé: les flux fusionnés sont ordonnés par seq
+        self.evicted = {}  # {user_id: seq de la dernière entrée sortie du buffer}
         self.max_logs = max_logs
-        self.lock = Lock()
+        self._seq = count(1)
+        self.last_seq = 0
 
     def log(self, message: str, log_type: str = 'INFO', user_id: int = None):
         """
@@ -29,44 +46,100 @@ class ConsoleLogger:
             log_type: Type de log (INFO, BUY, SKIP, NEW_TOKEN, SELL, ERROR)
             user_id: ID de l'utilisateur (None = log global partagé, utilise user_id=0)
         """
+        # Si pas de user_id, utiliser 0 pour les logs globaux (engine, etc.)
+        uid = user_id if user_id is not None else 0
+
+        entry = {
+            'timestamp': datetime.now().strftime('%H:%M:%S'),
+            'message': message,
+            'type': log_type
+        }
         with self.lock:
-            # Si pas de user_id, utiliser 0 pour les logs globaux (engine, etc.)
-            uid = user_id if user_id is not None else 0
-
             # Créer le deque pour cet utilisateur si nécessaire
-            if uid not in self.logs:
-                self.logs[uid] = deque(maxlen=self.max_logs)
-
-            timestamp = datetime.now().strftime('%H:%M:%S')
-            self.logs[uid].append({
-                'timestamp': timestamp,
-                'message': message,
-                'type': log_type
-            })
-
-    def get_logs(self, user_id: int = None, limit: int = None) -> list:
+            buffer = self.logs.get(uid)
+            if buffer is None:
+                buffer = self.logs[uid] = deque(maxlen=self.max_logs)
+
+            entry['seq'] = seq = next(self._seq)
+            if len(buffer) == buffer.maxlen:
+                self.evicted[uid] = buffer[0]['seq']
+            buffer.append(entry)
+            self.last_seq = seq
+
+            # Push vers les dashboards connectés (flux SSE), dans l'ordre des seq
+            get_dashboard_hub().publish_log(uid, entry)
+
+    def _snapshot(self, uid: int) -> list:
+        # list(deque) est une copie atomique sous le GIL (pas d'itération Python)
+        buffer = self.logs.get(uid)
+        return list(buffer) if buffer else []
+
+    @staticmethod
+    def _since(entries: list, since: int) -> list:
+        """Entrées de seq > since (entries est trié par seq), parcours depuis la fin: O(k)"""
+        if not since:
+            return entries
+        start = len(entries)
+        while start > 0 and entries[start - 1]['seq'] > since:
+            start -= 1
+        return entries[start:]
+
+    @staticmethod
+    def _until(entries: list, seq: int) -> list:
+        """Entrées de seq <= seq (écritures concurrentes à la copie), en général aucune à retirer"""
+        end = len(entries)
+        while end > 0 and entries[end - 1]['seq'] > seq:
+            end -= 1
+        return entries[:end] if end < len(entries) else entries
+
+    def get_logs(self, user_id: int = None, limit: int = None, since: int = 0) -> list:
         """
-        Récupère les N derniers logs d'un utilisateur
+        Récupère les derniers logs d'un utilisateur
 
         Args:
             user_id: ID de l'utilisateur (None = logs globaux avec user_id=0)
             limit: Nombre de logs à retourner (None = tous)
+            since: Ne renvoyer que les entrées de seq > since (curseur du lecteur)
 
         Returns:
-            Liste des logs
+            Liste des logs (ordre croissant de seq)
         """
-        with self.lock:
-            uid = user_id if user_id is not None else 0
+        uid = user_id if user_id is not None else 0
+        entries = self._since(self._snapshot(uid), since)
 
-            # Si l'utilisateur n'a pas de logs, retourner liste vide
-            if uid not in self.logs:
-                return []
+        if limit:
+            return entries[-limit:]
+        return entries
 
-            user_logs = list(self.logs[uid])
+    def merge_logs(self, user_id: int, limit: int = 100, since: int = 0) -> dict:
+        """
+        Logs globaux + logs de l'utilisateur fusionnés par seq
 
-            if limit:
-                return user_logs[-limit:]
-            return user_logs
+        Returns:
+            {'logs': [...], 'cursor': seq à repasser en `since`,
+             'truncated': True si des entrées > since manquent (sorties des
+                          buffers ou coupées par `limit`)}
+        """
+        uids = [0, user_id] if user_id else [0]
+        # Lu avant les copies: tous les seq <= horizon y sont (ajoutés sous self.lock)
+        horizon = self.last_seq
+        streams = [self._snapshot(uid) for uid in uids]
+        # Lu après la copie: au pire un faux positif, jamais une perte non signalée
+        evicted = max(self.evicted.get(uid, 0) for uid in uids)
+
+        tails = [self._since(self._until(entries, horizon), since) for entries in streams]
+
+        # Fusion des deux flux triés, seules les `limit` dernières entrées sont gardées
+        merged = list(heapq.merge(*tails, key=lambda entry: entry['seq']))
+        truncated = bool(since) and (evicted > since or bool(limit and len(merged) > limit))
+        if limit:
+            merged = merged[-limit:]
+
+        return {
+            'logs': merged,
+            'cursor': merged[-1]['seq'] if merged else since,
+            'truncated': truncated
+        }
 
     def clear(self, user_id: int = None):
         """
@@ -75,12 +148,16 @@ class ConsoleLogger:
         Args:
             user_id: ID de l'utilisateur (None = logs globaux avec user_id=0)
         """
-        with self.lock:
-            uid = user_id if user_id is not None else 0
-
-            if uid in self.logs:
-                self.logs[uid].clear()
-                self.log('Console cleared', 'INFO', user_id=uid)
+        uid = user_id if user_id is not None else 0
+
+        if uid in self.logs:
+            with self.lock:
+                buffer = self.logs[uid]
+                if buffer:
+                    # Les lecteurs dont le curseur est avant le clear repartent de zéro
+                    self.evicted[uid] = buffer[-1]['seq']
+                buffer.clear()
+            self.log('Console cleared', 'INFO', user_id=uid)
 
 
 # Instance globale
@@ -11,7 +11,6 @@ import asyncio
 import httpx
 import sqlite3
 import pandas as pd
-import joblib
 import json
 import sys
 from pathlib import Path
@@ -24,6 +23,7 @@ import time
 # Import feature extractor
 sys.path.insert(0, str(Path(__file__).parent))
 from feature_extractor import TokenFeatureExtractor
+from model_registry import get_model_registry
 
 console = Console()
 
@@ -85,6 +85,12 @@ class ContinuousLearningSystem:
             )
         ''')
 
+        # Version du modele qui a fait la prediction (precision par version)
+        try:
+            cursor.execute('ALTER TABLE monitored_tokens ADD COLUMN model_version TEXT')
+        except sqlite3.OperationalError:
+            pass  # Colonne deja presente
+
         # Table des reentrainements
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS retraining_history (
@@ -101,19 +107,34 @@ class ContinuousLearningSystem:
         conn.close()
 
     def load_current_model(self):
-        """Charge le modele actuel"""
+        """Charge le modele actuel (registre: mmap + bascule a chaud apres reentrainement)"""
         try:
-            self.model = joblib.load(self.models_dir / "roi_predictor_latest.pkl")
-            self.scaler = joblib.load(self.models_dir / "roi_scaler_latest.pkl")
-            with open(self.models_dir / "roi_feature_names.json", "r") as f:
-                self.feature_names = json.load(f)
-            console.print("[green]Modele charge avec succes!")
+            self.registry = get_model_registry(str(self.models_dir))
+            self.registry.refresh('roi')
+            self._bind_model(self.registry.get('roi'))
+            console.print(f"[green]Modele charge avec succes! (v{self.model_version.version})")
         except Exception as e:
             console.print(f"[red]Erreur chargement modele: {e}")
+            self.model_version = None
             self.model = None
             self.scaler = None
             self.feature_names = None
 
+    def _bind_model(self, version):
+        self.model_version = version
+        self.model = version['model']
+        self.scaler = version['scaler']
+        self.feature_names = version['feature_names']
+
+    def sync_model(self):
+        """Se rebranche si le registre a publie une nouvelle version"""
+        version = self.registry.get('roi')
+        if version is not self.model_version:
+            if self.model_version is not None:
+                console.print(f"[cyan]Modele roi: v{self.model_version.version} -> v{version.version}")
+            self._bind_model(version)
+        return version
+
     async def discover_new_tokens(self):
         """Decouvre les nouveaux tokens sur Pump.fun"""
         console.print("\n[cyan]Recherche de nouveaux tokens...")
@@ -145,6 +166,8 @@ class ContinuousLearningSystem:
             if not features:
                 return None
 
+            version = self.sync_model()
+
             # Preparer pour prediction
             feature_dict = {}
             for fname in self.feature_names:
@@ -154,8 +177,10 @@ class ContinuousLearningSystem:
             X = self.scaler.transform(df)
 
             # Prediction
+            start = time.perf_counter()
             prediction = self.model.predict(X)[0]
             probabilities = self.model.predict_proba(X)[0]
+            version.record_latency(time.perf_counter() - start)
             confidence = float(probabilities[prediction] * 100)
 
             # Sauvegarder dans la DB
@@ -166,8 +191,8 @@ class ContinuousLearningSystem:
                 INSERT OR REPLACE INTO monitored_tokens
                 (token_address, discovered_at, prediction_made_at, predicted_label,
                  predicted_confidence, initial_price, initial_market_cap,
-                 initial_liquidity, features_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 initial_liquidity, features_json, model_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 token_address,
                 datetime.now(),
@@ -177,7 +202,8 @@ class ContinuousLearningSystem:
                 features.get('price', 0),
                 features.get('market_cap_usd', 0),
                 features.get('liquidity_usd', 0),
-                json.dumps(feature_dict)
+                json.dumps(feature_dict),
+                version.version
             ))
 
             conn.commit()
@@ -246,7 +272,8 @@ class ContinuousLearningSystem:
 
         # Recuperer les tokens non labellises de plus de 24h
         cursor.execute('''
-            SELECT token_address, initial_price, initial_market_cap, prediction_made_at
+            SELECT token_address, initial_price, initial_market_cap, prediction_made_at,
+                   predicted_label, model_version
             FROM monitored_tokens
             WHERE label_confirmed = 0
             AND datetime(prediction_made_at) < datetime('now', '-24 hours')
@@ -257,7 +284,7 @@ class ContinuousLearningSystem:
 
         labeled_count = 0
 
-        for token_address, initial_price, initial_mcap, prediction_time in tokens_to_label:
+        for token_address, initial_price, initial_mcap, prediction_time, predicted_label, model_version in tokens_to_label:
             # Recuperer le prix max depuis la prediction
             cursor.execute('''
                 SELECT MAX(market_cap) as max_mcap
@@ -293,6 +320,10 @@ class ContinuousLearningSystem:
                 WHERE token_address = ?
             ''', (actual_label, roi, datetime.now(), token_address))
 
+            # Precision de la version qui a fait la prediction
+            if model_version and self.model_version is not None:
+                self.registry.record_outcome('roi', model_version, predicted_label == actual_label)
+
             labeled_count += 1
 
         conn.commit()
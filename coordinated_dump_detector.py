@@ -10,10 +10,11 @@ Analyzes if multiple large holders are selling at the same time:
 This is a CRITICAL indicator of rug pulls and coordinated dumps.
 """
 
-import httpx
+import asyncio
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
+from token_transactions import TokenTransactions
 
 
 @dataclass
@@ -34,7 +35,6 @@ class CoordinatedDumpDetector:
     def __init__(self, rpc_url: str = None):
         # Use provided RPC or default to public
         self.rpc_url = rpc_url or "https://api.mainnet-beta.solana.com"
-        self.client = httpx.Client(timeout=30.0)
 
         # Detection thresholds
         self.DUMP_TIMEFRAME = 300  # 5 minutes window
@@ -42,10 +42,11 @@ class CoordinatedDumpDetector:
         self.LARGE_SELL_THRESHOLD = 10000  # $10K+ = large sell
         self.COORDINATION_SCORE_THRESHOLD = 70  # Score 70+ = coordinated
 
-    def detect_coordinated_dumps(
+    async def detect_coordinated_dumps(
         self,
         token_mint: str,
-        recent_sells: Optional[List[Dict]] = None
+        recent_sells: Optional[List[Dict]] = None,
+        transactions: Optional[TokenTransactions] = None
     ) -> CoordinatedDumpAnalysis:
         """
         Detect coordinated dump patterns
@@ -53,6 +54,7 @@ class CoordinatedDumpDetector:
         Args:
             token_mint: Token mint address
             recent_sells: Optional list of recent sell transactions
+            transactions: Shared per-token RPC fetches (created if not provided)
 
         Returns:
             CoordinatedDumpAnalysis with dump detection results
@@ -60,7 +62,8 @@ class CoordinatedDumpDetector:
         try:
             # If no sell data provided, get recent sells
             if not recent_sells:
-                recent_sells = self._get_recent_sells(token_mint)
+                source = transactions or TokenTransactions(token_mint, self.rpc_url)
+                recent_sells = await self._get_recent_sells(source)
 
             if not recent_sells or len(recent_sells) < 3:
                 return self._default_analysis()
@@ -74,58 +77,26 @@ class CoordinatedDumpDetector:
             print(f"Error detecting coordinated dumps: {e}")
             return self._default_analysis()
 
-    def _get_recent_sells(self, token_mint: str, limit: int = 100) -> List[Dict]:
+    async def _get_recent_sells(self, source: TokenTransactions, limit: int = 100) -> List[Dict]:
         """Get recent sell transactions"""
         try:
-            # Get token account transactions
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSignaturesForAddress",
-                "params": [token_mint, {"limit": limit}]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return []
-
-            data = response.json()
-            signatures = data.get("result", [])
+            signatures = await source.signatures(limit)
 
             # Get transaction details and filter sells
-            sells = []
-            for sig_info in signatures[:30]:  # Limit to avoid rate limits
-                tx_details = self._get_transaction_details(sig_info["signature"])
-
-                if tx_details and self._is_sell(tx_details):
-                    sells.append(tx_details)
+            details = await asyncio.gather(*[
+                self._get_transaction_details(source, sig_info["signature"])
+                for sig_info in signatures[:30]  # Limit to avoid rate limits
+            ])
 
-            return sells
+            return [tx_details for tx_details in details if tx_details and self._is_sell(tx_details)]
 
         except:
             return []
 
-    def _get_transaction_details(self, signature: str) -> Optional[Dict]:
+    async def _get_transaction_details(self, source: TokenTransactions, signature: str) -> Optional[Dict]:
         """Get transaction details"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTransaction",
-                "params": [
-                    signature,
-                    {"encoding": "json", "maxSupportedTransactionVersion": 0}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return None
-
-            data = response.json()
-            result = data.get("result")
+            result = await source.transaction(signature)
 
             if not result:
                 return None
@@ -267,8 +238,7 @@ class CoordinatedDumpDetector:
         )
 
     def close(self):
-        """Close HTTP client"""
-        self.client.close()
+        """Nothing to close: RPC calls go through the shared HTTP client"""
 
 
 # Test function
@@ -287,7 +257,7 @@ if __name__ == "__main__":
     ]
 
     print("Analyzing coordinated dumps...")
-    analysis = detector.detect_coordinated_dumps("test_token", recent_sells=sample_sells)
+    analysis = asyncio.run(detector.detect_coordinated_dumps("test_token", recent_sells=sample_sells))
 
     print(f"\nCoordinated Dump Analysis:")
     print(f"  Dump events detected: {analysis.dump_events_detected}")
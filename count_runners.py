@@ -1,7 +1,7 @@
 import json
+from bot_data_journal import load_bot_data
 
-with open('bot_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_bot_data('bot_data.json')
 
 # Tous les tokens qui ont atteint >= $15K
 all_runners = [r for r in data['completed'] if r.get('final_mc', 0) >= 15000]
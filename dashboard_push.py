@@ -0,0 +1,203 @@
+"""
+DASHBOARD PUSH - Flux temps réel (SSE) des dashboards
+Remplace le polling de /api/bot/positions et /api/bot/console-logs:
+- les bots publient les deltas de P&L à chaque mouvement de prix
+- le ConsoleLogger publie chaque nouvelle ligne
+Chaque dashboard connecté a sa propre file bornée (Subscription coalescée):
+une position n'a jamais plus d'un état en attente, et un client lent perd
+les plus vieux logs au lieu de faire grossir la mémoire du serveur
+"""
+import json
+import os
+import time
+from itertools import count
+from threading import Lock
+from typing import Dict, Optional
+
+from signal_bus import Subscription, SubscriptionClosed, POLICY_COALESCE
+
+MIGRATION_MC = 53000  # Seuil affiché par le dashboard (distance à la migration)
+CLIENT_QUEUE_SIZE = 256  # Événements en attente max par dashboard
+HEARTBEAT_SECONDS = 15  # Commentaire SSE pour garder la connexion ouverte (proxies)
+# Un flux SSE occupe un thread gunicorn (gthread, voir gunicorn.conf.py): au-delà, polling
+MAX_STREAMS = int(os.environ.get('DASHBOARD_MAX_STREAMS', 32))
+
+
+def format_position(mint: str, position: dict, current_mc: float) -> dict:
+    """Position telle qu'affichée par le dashboard (même format que /api/bot/positions)"""
+    entry_mc = position.get('entry_mc', 0)
+    profit_ratio = current_mc / entry_mc if entry_mc > 0 else 1.0
+    entry_time = position.get('entry_time')
+
+    return {
+        'mint': mint,
+        'token_address': mint,  # Compatibilité avec les boutons SELL
+        'token_name': position.get('token_name', f'Token_{mint[:6]}'),
+        'entry_mc': entry_mc,
+        'current_mc': current_mc,
+        'amount_sol': position.get('amount', 0),
+        'profit_percent': (profit_ratio - 1) * 100,
+        'profit_multiplier': profit_ratio,
+        'partial_sold': position.get('partial_sold', False),
+        'migration_reached': position.get('migration_reached', False),
+        'distance_to_migration': MIGRATION_MC - current_mc,
+        'migration_percent': (current_mc / MIGRATION_MC) * 100,
+        'entry_time': entry_time.isoformat() if hasattr(entry_time, 'isoformat') else entry_time
+    }
+
+
+def _event_key(event: dict):
+    # Positions: seul le dernier état compte; logs: chaque événement est unique
+    if event['type'] in ('position', 'position_closed'):
+        return ('position', event['data']['mint'])
+    return ('event', event['id'])
+
+
+class DashboardHub:
+    """
+    Abonnements par utilisateur {user_id: {client_id: Subscription}}
+
+    - publish_user(user_id, ...): positions et logs du bot d'un utilisateur
+    - publish_global(...): logs du moteur (tous les dashboards)
+    Publier sans dashboard connecté ne coûte qu'une lecture de dict
+    """
+
+    def __init__(self, queue_size: int = CLIENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._clients: Dict[int, Dict[int, Subscription]] = {}
+        self._lock = Lock()
+        self._ids = count(1)
+        self._event_ids = count(1)
+
+        # Stats
+        self.published = 0
+        self.connections = 0
+
+    # ------------------------------------------------------------------
+    # Clients (endpoint SSE)
+    # ------------------------------------------------------------------
+    def subscribe(self, user_id: int) -> Subscription:
+        """Nouvelle file pour un dashboard connecté"""
+        client_id = next(self._ids)
+        subscription = Subscription(
+            f'dashboard-{user_id}-{client_id}',
+            maxlen=self.queue_size,
+            policy=POLICY_COALESCE,
+            key=_event_key
+        )
+        subscription.client_id = client_id
+        with self._lock:
+            clients = dict(self._clients.get(user_id, {}))
+            clients[client_id] = subscription
+            self._clients[user_id] = clients
+        self.connections += 1
+        return subscription
+
+    def unsubscribe(self, user_id: int, subscription: Subscription):
+        with self._lock:
+            clients = dict(self._clients.get(user_id, {}))
+            clients.pop(subscription.client_id, None)
+            if clients:
+                self._clients[user_id] = clients
+            else:
+                self._clients.pop(user_id, None)
+        subscription.close()
+
+    def active_streams(self) -> int:
+        """Flux SSE ouverts (tous utilisateurs)"""
+        return sum(len(clients) for clients in list(self._clients.values()))
+
+    def has_subscribers(self, user_id: int = None) -> bool:
+        """True si au moins un dashboard est connecté (pour cet utilisateur)"""
+        if user_id is None:
+            return bool(self._clients)
+        return user_id in self._clients
+
+    # ------------------------------------------------------------------
+    # Publication (bots, logger)
+    # ------------------------------------------------------------------
+    def _event(self, event_type: str, data: dict) -> dict:
+        self.published = event_id = next(self._event_ids)
+        return {'id': event_id, 'type': event_type, 'data': data, 'ts': time.time()}
+
+    def publish_user(self, user_id: int, event_type: str, data: dict):
+        clients = self._clients.get(user_id)
+        if not clients:
+            return
+        event = self._event(event_type, data)
+        for subscription in clients.values():
+            subscription.push(event)
+
+    def publish_global(self, event_type: str, data: dict):
+        all_clients = list(self._clients.values())
+        if not all_clients:
+            return
+        event = self._event(event_type, data)
+        for clients in all_clients:
+            for subscription in clients.values():
+                subscription.push(event)
+
+    def publish_position(self, user_id: int, mint: str, position: dict, current_mc: float):
+        """Delta de P&L d'une position (coalescé par mint dans la file du client)"""
+        if user_id in self._clients:
+            self.publish_user(user_id, 'position', format_position(mint, position, current_mc))
+
+    def publish_position_closed(self, user_id: int, mint: str):
+        if user_id in self._clients:
+            self.publish_user(user_id, 'position_closed', {'mint': mint})
+
+    def publish_log(self, user_id: int, entry: dict):
+        """Ligne de console: user_id=0 pour les logs globaux (moteur)"""
+        if user_id:
+            self.publish_user(user_id, 'log', entry)
+        else:
+            self.publish_global('log', entry)
+
+    # ------------------------------------------------------------------
+    # Flux SSE
+    # ------------------------------------------------------------------
+    def stream(self, user_id: int, heartbeat: float = HEARTBEAT_SECONDS):
+        """Générateur SSE (text/event-stream) d'un dashboard; se désabonne à la déconnexion"""
+        subscription = self.subscribe(user_id)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    batch = subscription.wait_batch(timeout=heartbeat)
+                except SubscriptionClosed:
+                    break
+                if not batch:
+                    yield ': heartbeat\n\n'
+                    continue
+                yield ''.join(
+                    f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+                    for event in batch
+                )
+        finally:
+            self.unsubscribe(user_id, subscription)
+
+    def get_stats(self):
+        with self._lock:
+            subscriptions = [s for clients in self._clients.values() for s in clients.values()]
+        return {
+            'users': len(self._clients),
+            'clients': len(subscriptions),
+            'connections': self.connections,
+            'published': self.published,
+            'dropped': sum(s.dropped for s in subscriptions),
+            'coalesced': sum(s.coalesced for s in subscriptions)
+        }
+
+
+# Instance globale
+_dashboard_hub: Optional[DashboardHub] = None
+
+
+def get_dashboard_hub() -> DashboardHub:
+    """Récupère le hub global des dashboards"""
+    global _dashboard_hub
+
+    if _dashboard_hub is None:
+        _dashboard_hub = DashboardHub()
+
+    return _dashboard_hub
@@ -5,8 +5,14 @@ Supporte SQLite (dev local) et PostgreSQL (production)
 """
 import sqlite3
 import hashlib
+import atexit
+import functools
+import queue
+import threading
+import time
 import secrets
 import json
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from cryptography.fernet import Fernet
@@ -34,38 +40,352 @@ cipher_suite = Fernet(ENCRYPTION_KEY)
 DATABASE_URL = os.environ.get('DATABASE_URL')
 DB_PATH = Path(__file__).parent / "trading_bot.db"
 
+# Pool de connexions / écritures groupées
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 2))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 50))
+DB_POOL_TIMEOUT = 10.0  # Secondes d'attente max d'une connexion PostgreSQL libre
+WRITE_BATCH_SIZE = 64  # Écritures max par commit groupé
+WRITE_BATCH_WINDOW = 0.02  # Secondes d'attente pour regrouper les écritures
+
 # Détecter si PostgreSQL ou SQLite
 USE_POSTGRES = DATABASE_URL is not None and DATABASE_URL.startswith('postgres')
 
 if USE_POSTGRES:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
+    from psycopg2 import pool as pg_pool
+    from psycopg2.extras import RealDictCursor, execute_batch
     print("[DATABASE] Using PostgreSQL (production mode)")
 else:
     print("[DATABASE] Using SQLite (local development mode)")
 
 
+class _ThreadConnection:
+    """
+    Connexion attachée à un thread HORS opération (scripts one-shot qui font
+    db.get_connection() directement), rendue au pool quand le thread se termine
+    """
+
+    def __init__(self, conn, release):
+        self.conn = conn
+        self._release = release
+
+    def __del__(self):
+        try:
+            self._release(self.conn)
+        except Exception:
+            pass
+
+
+class _SqlitePool:
+    """
+    Pool de connexions SQLite (même interface que le pool psycopg2)
+    Pas de limite de connexions simultanées (une connexion SQLite ne coûte
+    qu'un descripteur); seules `max_idle` connexions libres sont gardées
+    """
+
+    def __init__(self, connect, max_idle):
+        self._connect = connect
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def putconn(self, conn):
+        if conn.in_transaction:
+            conn.rollback()  # Lecture non terminée: ne pas rendre une transaction ouverte
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def closeall(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def _with_connection(method):
+    """Méthode exécutée avec UNE connexion empruntée au pool, rendue à la sortie"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.connection():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _Cursor:
+    """
+    Cursor lié à la connexion de l'opération en cours:
+    - convertit les placeholders PostgreSQL (%s) en SQLite (?) (conversion mise en cache)
+    - rollback automatique de CETTE connexion en cas d'erreur
+    """
+
+    def __init__(self, db, conn):
+        self._db = db
+        self._conn = conn
+        self._cursor = conn.cursor()
+
+    def execute(self, query, params=None):
+        try:
+            query = self._db.prepare(query)
+            return self._cursor.execute(query, params) if params else self._cursor.execute(query)
+        except Exception as e:
+            try:
+                self._conn.rollback()
+                print(f"[DATABASE] Auto-rollback after error: {str(e)[:100]}")
+            except:
+                pass
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class _WriteQueue:
+    """
+    Writer unique à commits groupés
+
+    Les écritures fréquentes des bots (trades, positions, compteurs de
+    simulation) sont mises en file et exécutées par un thread dédié: jusqu'à
+    WRITE_BATCH_SIZE écritures par transaction, un seul commit (un seul fsync)
+    par lot. Une écriture peut regrouper plusieurs requêtes (ex: trade + delta
+    des stats), toujours appliquées ensemble. Les requêtes identiques
+    consécutives sont envoyées en executemany, l'ordre d'arrivée est conservé.
+    """
+
+    def __init__(self, db, batch_size=WRITE_BATCH_SIZE, window=WRITE_BATCH_WINDOW):
+        self.db = db
+        self.batch_size = batch_size
+        self.window = window
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        # Stats
+        self.queued = 0
+        self.committed = 0
+        self.batches = 0
+        self.failed = 0
+        self.max_batch = 0
+
+    def put(self, statements):
+        """Met en file une écriture: [(query, params), ...] appliquées dans la même transaction"""
+        if self._thread is None:
+            self._start()
+        self.queued += 1
+        self._queue.put([(self.db.prepare(query), params) for query, params in statements])
+
+    def flush(self, timeout=10.0):
+        """Attend que toutes les écritures déjà en file soient commitées"""
+        if self._thread is None or threading.current_thread() is self._thread:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if not isinstance(item, threading.Event)]
+            if writes:
+                self._commit(writes)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _commit(self, writes):
+        with self.db.connection() as conn:
+            self._apply(conn, writes)
+
+    def _apply(self, conn, writes):
+        try:
+            cursor = conn.cursor()
+            for query, group in self._groups(writes):
+                if len(group) == 1:
+                    cursor.execute(query, group[0])
+                elif self.db.use_postgres:
+                    execute_batch(cursor, query, group)
+                else:
+                    cursor.executemany(query, group)
+            conn.commit()
+            self.batches += 1
+            self.committed += len(writes)
+            self.max_batch = max(self.max_batch, len(writes))
+        except Exception as e:
+            conn.rollback()
+            print(f"[DATABASE] Lot de {len(writes)} écritures rejeté ({str(e)[:100]}), reprise une par une")
+            # Une écriture invalide ne doit pas faire perdre les autres
+            for statements in writes:
+                try:
+                    cursor = conn.cursor()
+                    for query, params in statements:
+                        cursor.execute(query, params)
+                    conn.commit()
+                    self.committed += 1
+                except Exception as e:
+                    conn.rollback()
+                    self.failed += 1
+                    print(f"[DATABASE ERROR] Écriture groupée échouée: {str(e)[:100]}")
+
+    @staticmethod
+    def _groups(writes):
+        """Regroupe les requêtes identiques consécutives: [(query, [params, ...])]"""
+        groups = []
+        for query, params in (statement for statements in writes for statement in statements):
+            if groups and groups[-1][0] == query:
+                groups[-1][1].append(params)
+            else:
+                groups.append((query, [params]))
+        return groups
+
+    def get_stats(self):
+        return {
+            'pending': self._queue.qsize(),
+            'queued': self.queued,
+            'committed': self.committed,
+            'batches': self.batches,
+            'failed': self.failed,
+            'max_batch': self.max_batch,
+            'avg_batch': self.committed / self.batches if self.batches else 0
+        }
+
+
 class BotDatabase:
     def __init__(self):
-        self.conn = None
         self.use_postgres = USE_POSTGRES
         # Placeholder SQL selon la base de données
         self.ph = '%s' if USE_POSTGRES else '?'
+
+        self._local = threading.local()  # Connexion de l'opération en cours du thread
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._prepared = {}  # {requête source: requête convertie}
+        self.writer = _WriteQueue(self)
+        atexit.register(self.flush)
+
         self.init_database()
 
+    @property
+    def conn(self):
+        """Connexion courante (compatibilité avec db.conn)"""
+        return self.get_connection()
+
+    @contextmanager
+    def connection(self):
+        """
+        Emprunte une connexion au pool pour la durée du bloc (SQLite ou PostgreSQL)
+
+        Imbriqué: le bloc interne réutilise la connexion du bloc externe.
+        Les 200 bots d'un process ne gardent donc une connexion que pendant
+        une opération, jamais pour la vie de leur thread.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        pool = self._get_pool()
+        conn = self._get_pooled_connection() if self.use_postgres else pool.getconn()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release_pooled_connection(conn)
+
     def get_connection(self):
-        """Connexion à la base de données (SQLite ou PostgreSQL)"""
-        if self.conn is None:
-            if self.use_postgres:
-                # PostgreSQL connection
-                self.conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
-                # Auto-commit mode OFF pour gérer les transactions manuellement
-                self.conn.autocommit = False
-            else:
-                # SQLite connection
-                self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-                self.conn.row_factory = sqlite3.Row
-        return self.conn
+        """
+        Connexion de l'opération en cours (méthodes de BotDatabase, bloc db.connection())
+
+        Hors opération (scripts qui appellent db.get_connection() directement):
+        connexion attachée au thread, rendue quand le thread se termine.
+        Le code serveur doit utiliser `with db.connection() as conn:`.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            pool = self._get_pool()
+            conn = self._get_pooled_connection() if self.use_postgres else pool.getconn()
+            holder = _ThreadConnection(conn, self._release_pooled_connection)
+            self._local.holder = holder
+        return holder.conn
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                if self.use_postgres:
+                    self._pool = pg_pool.ThreadedConnectionPool(
+                        DB_POOL_MIN, DB_POOL_MAX, DATABASE_URL, cursor_factory=RealDictCursor
+                    )
+                else:
+                    self._pool = _SqlitePool(self._open_sqlite_connection, DB_POOL_MAX)
+        return self._pool
+
+    def _get_pooled_connection(self):
+        pool = self._get_pool()
+        deadline = time.monotonic() + DB_POOL_TIMEOUT
+        while True:
+            try:
+                conn = pool.getconn()
+                break
+            except pg_pool.PoolError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        # Auto-commit mode OFF pour gérer les transactions manuellement
+        conn.autocommit = False
+        return conn
+
+    def _release_pooled_connection(self, conn):
+        if self._pool is not None and not getattr(self._pool, 'closed', False):
+            self._pool.putconn(conn)
+        else:
+            conn.close()
+
+    def _open_sqlite_connection(self):
+        # check_same_thread=False: la connexion passe d'un thread à l'autre via le pool
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=30, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def prepare(self, query):
+        """Requête adaptée au backend (%s -> ? pour SQLite), conversion mise en cache"""
+        prepared = self._prepared.get(query)
+        if prepared is None:
+            prepared = query if self.use_postgres else query.replace('%s', '?')
+            self._prepared[query] = prepared
+        return prepared
 
     def safe_execute(self, cursor, query, params=None):
         """
@@ -79,54 +399,50 @@ class BotDatabase:
                 cursor.execute(query)
             return True
         except Exception as e:
-            # Rollback automatique en cas d'erreur
-            if self.conn:
-                self.conn.rollback()
+            # Rollback automatique en cas d'erreur (connexion de l'opération en cours uniquement)
+            self.get_connection().rollback()
             print(f"[DATABASE ERROR] Query failed: {e}")
             raise
 
     def safe_commit(self):
         """Commit avec gestion d'erreur et rollback automatique"""
+        conn = self.get_connection()
         try:
-            if self.conn:
-                self.conn.commit()
+            conn.commit()
             return True
         except Exception as e:
-            if self.conn:
-                self.conn.rollback()
+            conn.rollback()
             print(f"[DATABASE ERROR] Commit failed: {e}")
             raise
 
     def get_cursor(self):
         """
-        Retourne un cursor avec wrapper automatique pour:
-        - Convertir les placeholders PostgreSQL (%s) en SQLite (?) si nécessaire
-        - Gérer automatiquement les rollback en cas d'erreur
+        Retourne un cursor sur la connexion de l'opération en cours qui:
+        - Convertit les placeholders PostgreSQL (%s) en SQLite (?) si nécessaire
+        - Gère automatiquement les rollback en cas d'erreur
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()  # Utiliser conn.cursor() ici pour éviter la récursion
+        return _Cursor(self, self.get_connection())
 
-        original_execute = cursor.execute
+    # ====== ÉCRITURES GROUPÉES ======
 
-        def execute_wrapper(query, params=None):
-            try:
-                # Si SQLite, convertir %s en ?
-                if not self.use_postgres:
-                    query = query.replace('%s', '?')
+    def queue_write(self, query, params, *statements):
+        """
+        Met une écriture en file (commit groupé par le writer)
+        statements: requêtes (query, params) supplémentaires commitées avec la première
+        """
+        self.writer.put([(query, params), *statements])
 
-                return original_execute(query, params) if params else original_execute(query)
-            except Exception as e:
-                # Rollback automatique en cas d'erreur (SQLite et PostgreSQL)
-                try:
-                    conn.rollback()
-                    print(f"[DATABASE] Auto-rollback after error: {str(e)[:100]}")
-                except:
-                    pass
-                raise
+    def flush(self, timeout=10.0):
+        """Attend le commit des écritures en file (lecture de ses propres écritures)"""
+        return self.writer.flush(timeout)
 
-        cursor.execute = execute_wrapper
-        return cursor
+    def get_stats(self):
+        return {
+            'backend': 'postgres' if self.use_postgres else 'sqlite',
+            'writer': self.writer.get_stats()
+        }
 
+    @_with_connection
     def init_database(self):
         """Initialise les tables de la base de données"""
         conn = self.get_connection()
@@ -291,11 +607,54 @@ class BotDatabase:
             )
         """)
 
+        # Index des lectures par utilisateur (historique, positions, paiements, stats)
+        for index_sql in (
+            "CREATE INDEX IF NOT EXISTS idx_trades_user_created ON trades(user_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_trades_user_status ON trades(user_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_open_positions_user_token ON open_positions(user_id, token_address)",
+            "CREATE INDEX IF NOT EXISTS idx_payments_user_created ON payments(user_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status, expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_bot_stats_user ON bot_stats(user_id)",
+        ):
+            cursor.execute(index_sql)
+
+        # Migrations de données appliquées une seule fois par base
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name TEXT PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         conn.commit()
+        self._migrate()
         print("[OK] Base de données initialisée!")
 
+    @_with_connection
+    def _migrate(self):
+        """
+        Migrations de données (une fois par base)
+        - bot_stats_incremental: bot_stats n'est plus recalculé mais mis à jour par
+          delta à chaque trade; les deltas partent des valeurs stockées, qui sont
+          donc recalculées une fois depuis trades sur une base existante
+        """
+        conn = self.get_connection()
+        cursor = self.get_cursor()
+        cursor.execute("SELECT name FROM schema_migrations")
+        applied = {row['name'] for row in cursor.fetchall()}
+
+        if 'bot_stats_incremental' not in applied:
+            print("[DATABASE] Migration bot_stats_incremental: recalcul des bot_stats existants...")
+            self.reconcile_bot_stats()
+            # Plusieurs process peuvent migrer en même temps: le recalcul est idempotent
+            cursor.execute("""
+                INSERT INTO schema_migrations (name) VALUES (%s) ON CONFLICT (name) DO NOTHING
+            """, ('bot_stats_incremental',))
+            conn.commit()
+
     # ====== USER MANAGEMENT ======
 
+    @_with_connection
     def create_user(self, email, password):
         """Crée un nouvel utilisateur"""
         try:
@@ -334,6 +693,7 @@ class BotDatabase:
             # Sinon, relancer l'exception
             raise
 
+    @_with_connection
     def authenticate_user(self, email, password):
         """Authentifie un utilisateur"""
         conn = self.get_connection()
@@ -360,6 +720,7 @@ class BotDatabase:
             return dict(user)
         return None
 
+    @_with_connection
     def get_user(self, user_id):
         """Récupère les infos d'un utilisateur"""
         conn = self.get_connection()
@@ -376,6 +737,7 @@ class BotDatabase:
 
     # ====== WALLET MANAGEMENT ======
 
+    @_with_connection
     def create_wallet(self, user_id, address, private_key):
         """Crée un wallet pour un utilisateur"""
         try:
@@ -406,6 +768,7 @@ class BotDatabase:
             print(f"[ERROR] Création wallet: {e}")
             return None
 
+    @_with_connection
     def get_wallet(self, user_id):
         """Récupère le wallet d'un utilisateur"""
         conn = self.get_connection()
@@ -420,6 +783,7 @@ class BotDatabase:
         wallet = cursor.fetchone()
         return dict(wallet) if wallet else None
 
+    @_with_connection
     def get_wallet_private_key(self, user_id):
         """Récupère la clé privée déchiffrée (USE WITH CAUTION)"""
         conn = self.get_connection()
@@ -437,6 +801,7 @@ class BotDatabase:
             return cipher_suite.decrypt(encrypted_key.encode()).decode()
         return None
 
+    @_with_connection
     def update_wallet_balance(self, user_id, balance_sol, balance_usd):
         """Met à jour le solde du wallet"""
         conn = self.get_connection()
@@ -450,6 +815,7 @@ class BotDatabase:
 
         conn.commit()
 
+    @_with_connection
     def update_wallet(self, user_id, new_address, new_private_key):
         """
         Met à jour le wallet de l'utilisateur (génère nouveau wallet si perdu)
@@ -481,6 +847,7 @@ class BotDatabase:
 
     # ====== SUBSCRIPTION MANAGEMENT ======
 
+    @_with_connection
     def create_subscription(self, user_id, boost_level, price_paid, duration_days=30, payment_tx=None):
         """Crée une nouvelle subscription"""
         conn = self.get_connection()
@@ -505,6 +872,7 @@ class BotDatabase:
         conn.commit()
         return sub_id
 
+    @_with_connection
     def get_active_subscription(self, user_id):
         """Récupère la subscription active d'un utilisateur"""
         conn = self.get_connection()
@@ -522,6 +890,7 @@ class BotDatabase:
 
     # ====== BOT STATUS ======
 
+    @_with_connection
     def get_bot_status(self, user_id):
         """Récupère le statut du bot"""
         conn = self.get_connection()
@@ -542,6 +911,7 @@ class BotDatabase:
             conn.commit()
             return self.get_bot_status(user_id)
 
+    @_with_connection
     def start_bot(self, user_id, strategy='AI_PREDICTIONS', risk_level='MEDIUM'):
         """Démarre le bot"""
         conn = self.get_connection()
@@ -561,6 +931,7 @@ class BotDatabase:
 
         conn.commit()
 
+    @_with_connection
     def stop_bot(self, user_id):
         """Arrête le bot"""
         conn = self.get_connection()
@@ -577,61 +948,40 @@ class BotDatabase:
     # ====== TRADES ======
 
     def create_trade(self, user_id, token_address, trade_type, amount_sol, **kwargs):
-        """Enregistre un nouveau trade"""
-        conn = self.get_connection()
-        cursor = self.get_cursor()
-
-        if USE_POSTGRES:
-            cursor.execute("""
-                INSERT INTO trades
-                (user_id, token_address, token_name, trade_type, amount_sol,
-                 price_usd, tokens_bought, prediction_category, prediction_confidence, tx_signature, status, profit_loss, profit_loss_percentage)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                user_id,
-                token_address,
-                kwargs.get('token_name'),
-                trade_type,
-                amount_sol,
-                kwargs.get('price_usd'),
-                kwargs.get('tokens_bought'),
-                kwargs.get('prediction_category'),
-                kwargs.get('prediction_confidence'),
-                kwargs.get('tx_signature'),
-                kwargs.get('status', 'PENDING'),
-                kwargs.get('profit_loss', 0.0),
-                kwargs.get('profit_loss_percentage', 0.0)
-            ))
-            trade_id = cursor.fetchone()['id']
-        else:
-            cursor.execute("""
-                INSERT INTO trades
-                (user_id, token_address, token_name, trade_type, amount_sol,
-                 price_usd, tokens_bought, prediction_category, prediction_confidence, tx_signature, status, profit_loss, profit_loss_percentage)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                user_id,
-                token_address,
-                kwargs.get('token_name'),
-                trade_type,
-                amount_sol,
-                kwargs.get('price_usd'),
-                kwargs.get('tokens_bought'),
-                kwargs.get('prediction_category'),
-                kwargs.get('prediction_confidence'),
-                kwargs.get('tx_signature'),
-                kwargs.get('status', 'PENDING'),
-                kwargs.get('profit_loss', 0.0),
-                kwargs.get('profit_loss_percentage', 0.0)
-            ))
-            trade_id = cursor.lastrowid
-
-        conn.commit()
-        return trade_id
-
+        """
+        Enregistre un nouveau trade (écriture groupée, commit asynchrone)
+        L'id n'est pas retourné: appeler flush() avant de relire les trades
+        Un trade EXECUTED met à jour bot_stats dans la même transaction
+        """
+        statements = []
+        if kwargs.get('status', 'PENDING') == 'EXECUTED':
+            statements.append(self._bot_stats_delta(user_id, kwargs.get('profit_loss', 0.0)))
+
+        self.queue_write("""
+            INSERT INTO trades
+            (user_id, token_address, token_name, trade_type, amount_sol,
+             price_usd, tokens_bought, prediction_category, prediction_confidence, tx_signature, status, profit_loss, profit_loss_percentage)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            user_id,
+            token_address,
+            kwargs.get('token_name'),
+            trade_type,
+            amount_sol,
+            kwargs.get('price_usd'),
+            kwargs.get('tokens_bought'),
+            kwargs.get('prediction_category'),
+            kwargs.get('prediction_confidence'),
+            kwargs.get('tx_signature'),
+            kwargs.get('status', 'PENDING'),
+            kwargs.get('profit_loss', 0.0),
+            kwargs.get('profit_loss_percentage', 0.0)
+        ), *statements)
+
+    @_with_connection
     def get_user_trades(self, user_id, limit=50):
         """Récupère l'historique des trades"""
+        self.flush()
         conn = self.get_connection()
         cursor = self.get_cursor()
 
@@ -647,6 +997,7 @@ class BotDatabase:
 
     # ====== STATS ======
 
+    @_with_connection
     def _init_bot_stats(self, user_id):
         """Initialise les stats pour un utilisateur"""
         conn = self.get_connection()
@@ -658,8 +1009,10 @@ class BotDatabase:
 
         conn.commit()
 
+    @_with_connection
     def get_bot_stats(self, user_id):
-        """Récupère les statistiques du bot"""
+        """Récupère les statistiques du bot (après commit des trades en file)"""
+        self.flush()
         conn = self.get_connection()
         cursor = self.get_cursor()
 
@@ -670,8 +1023,43 @@ class BotDatabase:
         stats = cursor.fetchone()
         return dict(stats) if stats else None
 
+    def _bot_stats_delta(self, user_id, profit_loss):
+        """Requête de mise à jour O(1) de bot_stats pour un trade EXECUTED"""
+        profit_loss = profit_loss or 0.0
+        greatest, least = ('GREATEST', 'LEAST') if self.use_postgres else ('MAX', 'MIN')
+        is_win = 1 if profit_loss > 0 else 0
+        is_loss = 1 if profit_loss < 0 else 0
+
+        # Les valeurs à droite des SET sont celles d'avant l'UPDATE (SQLite et PostgreSQL)
+        return (f"""
+            UPDATE bot_stats
+            SET
+                total_trades = total_trades + 1,
+                winning_trades = winning_trades + %s,
+                losing_trades = losing_trades + %s,
+                total_profit_usd = total_profit_usd + %s,
+                win_rate = (winning_trades + %s) * 100.0 / (total_trades + 1),
+                best_trade_profit = CASE WHEN total_trades = 0 THEN %s ELSE {greatest}(best_trade_profit, %s) END,
+                worst_trade_loss = CASE WHEN total_trades = 0 THEN %s ELSE {least}(worst_trade_loss, %s) END,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = %s
+        """, (is_win, is_loss, profit_loss, is_win, profit_loss, profit_loss, profit_loss, profit_loss, user_id))
+
     def update_bot_stats(self, user_id):
-        """Recalcule les stats basées sur les trades"""
+        """
+        Stats à jour pour un utilisateur
+        bot_stats est maintenu incrémentalement par create_trade: il suffit
+        d'attendre le commit des trades en file (voir rebuild_bot_stats)
+        """
+        self.flush()
+
+    @_with_connection
+    def rebuild_bot_stats(self, user_id):
+        """
+        Recalcule les stats depuis les trades (agrégat complet) et les écrit
+        Retourne (stats recalculées, stats stockées avant recalcul)
+        """
+        self.flush()
         conn = self.get_connection()
         cursor = self.get_cursor()
 
@@ -695,6 +1083,27 @@ class BotDatabase:
         else:
             win_rate = 0.0
 
+        expected = {
+            'total_trades': result['total_trades'] or 0,
+            'winning_trades': result['winning_trades'] or 0,
+            'losing_trades': result['losing_trades'] or 0,
+            'total_profit_usd': result['total_profit'] or 0.0,
+            'win_rate': win_rate,
+            'best_trade_profit': result['best_trade'] or 0.0,
+            'worst_trade_loss': result['worst_trade'] or 0.0
+        }
+
+        cursor.execute("""
+            SELECT * FROM bot_stats WHERE user_id = %s
+        """, (user_id,))
+        stored = cursor.fetchone()
+        stored = dict(stored) if stored else None
+
+        if stored is None:
+            cursor.execute("""
+                INSERT INTO bot_stats (user_id) VALUES (%s)
+            """, (user_id,))
+
         # Update bot_stats
         cursor.execute("""
             UPDATE bot_stats
@@ -709,20 +1118,57 @@ class BotDatabase:
                 updated_at = CURRENT_TIMESTAMP
             WHERE user_id = %s
         """, (
-            result['total_trades'] or 0,
-            result['winning_trades'] or 0,
-            result['losing_trades'] or 0,
-            result['total_profit'] or 0.0,
-            win_rate,
-            result['best_trade'] or 0.0,
-            result['worst_trade'] or 0.0,
+            expected['total_trades'],
+            expected['winning_trades'],
+            expected['losing_trades'],
+            expected['total_profit_usd'],
+            expected['win_rate'],
+            expected['best_trade_profit'],
+            expected['worst_trade_loss'],
             user_id
         ))
 
         conn.commit()
+        return expected, stored
+
+    @_with_connection
+    def reconcile_bot_stats(self, tolerance=1e-6):
+        """
+        Job de réconciliation: recalcule les stats de tous les utilisateurs
+        et signale les écarts avec les valeurs maintenues incrémentalement
+        Retourne {user_id: {champ: (stocké, recalculé)}} pour les utilisateurs en dérive
+        """
+        conn = self.get_connection()
+        cursor = self.get_cursor()
+
+        cursor.execute("SELECT id FROM users")
+        user_ids = [row['id'] for row in cursor.fetchall()]
+
+        drift = {}
+        for user_id in user_ids:
+            expected, stored = self.rebuild_bot_stats(user_id)
+            if stored is None:
+                drift[user_id] = {'missing_row': (None, True)}
+                continue
+
+            fields = {
+                field: (stored.get(field), value)
+                for field, value in expected.items()
+                if abs((stored.get(field) or 0) - value) > tolerance
+            }
+            if fields:
+                drift[user_id] = fields
+
+        for user_id, fields in drift.items():
+            details = ', '.join(f"{field}: {old} -> {new}" for field, (old, new) in fields.items())
+            print(f"[DATABASE] Dérive bot_stats user {user_id} corrigée ({details})")
+        print(f"[DATABASE] Réconciliation bot_stats: {len(user_ids)} utilisateurs, {len(drift)} en dérive")
+
+        return drift
 
     # ====== PAYMENT METHODS ======
 
+    @_with_connection
     def create_payment_request(self, user_id, boost_level, amount_sol, payment_address, expires_at):
         """Crée une demande de paiement"""
         conn = self.get_connection()
@@ -746,6 +1192,7 @@ class BotDatabase:
 
         return payment_id
 
+    @_with_connection
     def get_pending_payment(self, payment_id):
         """Récupère un paiement en attente"""
         conn = self.get_connection()
@@ -774,6 +1221,7 @@ class BotDatabase:
             'tx_signature': row['tx_signature']
         }
 
+    @_with_connection
     def verify_payment(self, payment_id, tx_signature):
         """Marque un paiement comme vérifié et active l'abonnement"""
         conn = self.get_connection()
@@ -803,6 +1251,7 @@ class BotDatabase:
         conn.commit()
         return True
 
+    @_with_connection
     def expire_payment(self, payment_id):
         """Marque un paiement comme expiré"""
         conn = self.get_connection()
@@ -816,6 +1265,7 @@ class BotDatabase:
 
         conn.commit()
 
+    @_with_connection
     def get_user_payments(self, user_id, limit=20):
         """Récupère l'historique des paiements d'un utilisateur"""
         conn = self.get_connection()
@@ -845,6 +1295,7 @@ class BotDatabase:
 
     # ====== SIMULATION MODE ======
 
+    @_with_connection
     def start_simulation(self, user_id):
         """Démarre une session de simulation pour un utilisateur"""
         try:
@@ -889,8 +1340,10 @@ class BotDatabase:
             print(f"[ERROR] Erreur start_simulation: {e}")
             return None
 
+    @_with_connection
     def get_simulation_session(self, user_id):
         """Récupère la session de simulation active d'un utilisateur"""
+        self.flush()
         conn = self.get_connection()
         cursor = self.get_cursor()
 
@@ -920,52 +1373,29 @@ class BotDatabase:
         }
 
     def update_simulation_balance(self, session_id, new_balance):
-        """Met à jour le solde virtuel de la simulation"""
-        try:
-            conn = self.get_connection()
-            cursor = self.get_cursor()
-
-            cursor.execute("""
-                UPDATE simulation_sessions
-                SET final_balance_sol = %s
-                WHERE id = %s
-            """, (new_balance, session_id))
-
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"[ERROR] Erreur update_simulation_balance: {e}")
-            return False
+        """Met à jour le solde virtuel de la simulation (écriture groupée)"""
+        self.queue_write("""
+            UPDATE simulation_sessions
+            SET final_balance_sol = %s
+            WHERE id = %s
+        """, (new_balance, session_id))
+        return True
 
     def increment_simulation_trades(self, session_id, is_win=False):
-        """Incrémente le compteur de trades simulés"""
-        try:
-            conn = self.get_connection()
-            cursor = self.get_cursor()
-
-            if is_win:
-                cursor.execute("""
-                    UPDATE simulation_sessions
-                    SET total_trades = total_trades + 1,
-                        winning_trades = winning_trades + 1
-                    WHERE id = %s
-                """, (session_id,))
-            else:
-                cursor.execute("""
-                    UPDATE simulation_sessions
-                    SET total_trades = total_trades + 1
-                    WHERE id = %s
-                """, (session_id,))
-
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"[ERROR] Erreur increment_simulation_trades: {e}")
-            return False
+        """Incrémente le compteur de trades simulés (écriture groupée)"""
+        self.queue_write("""
+            UPDATE simulation_sessions
+            SET total_trades = total_trades + 1,
+                winning_trades = winning_trades + %s
+            WHERE id = %s
+        """, (1 if is_win else 0, session_id))
+        return True
 
+    @_with_connection
     def end_simulation(self, session_id):
         """Termine une session de simulation"""
         try:
+            self.flush()
             conn = self.get_connection()
             cursor = self.get_cursor()
 
@@ -984,34 +1414,17 @@ class BotDatabase:
     # ====== OPEN POSITIONS MANAGEMENT ======
 
     def create_open_position(self, user_id, token_address, token_name, entry_mc, entry_time, amount_sol, tokens, simulation_session_id=None):
-        """Crée une position ouverte en BDD"""
-        try:
-            conn = self.get_connection()
-            cursor = self.get_cursor()
-
-            if USE_POSTGRES:
-                cursor.execute("""
-                    INSERT INTO open_positions (user_id, token_address, token_name, entry_mc, entry_time, amount_sol, tokens, simulation_session_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (user_id, token_address, token_name, entry_mc, entry_time, amount_sol, tokens, simulation_session_id))
-                position_id = cursor.fetchone()['id']
-            else:
-                cursor.execute("""
-                    INSERT INTO open_positions (user_id, token_address, token_name, entry_mc, entry_time, amount_sol, tokens, simulation_session_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """, (user_id, token_address, token_name, entry_mc, entry_time, amount_sol, tokens, simulation_session_id))
-                position_id = cursor.lastrowid
-
-            conn.commit()
-            return position_id
-        except Exception as e:
-            print(f"[ERROR] Erreur create_open_position: {e}")
-            return None
+        """Crée une position ouverte en BDD (écriture groupée, l'id n'est pas retourné)"""
+        self.queue_write("""
+            INSERT INTO open_positions (user_id, token_address, token_name, entry_mc, entry_time, amount_sol, tokens, simulation_session_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (user_id, token_address, token_name, entry_mc, entry_time, amount_sol, tokens, simulation_session_id))
 
+    @_with_connection
     def get_open_positions(self, user_id):
         """Récupère toutes les positions ouvertes d'un utilisateur"""
         try:
+            self.flush()
             conn = self.get_connection()
             cursor = self.get_cursor()
 
@@ -1026,9 +1439,11 @@ class BotDatabase:
             print(f"[ERROR] Erreur get_open_positions: {e}")
             return []
 
+    @_with_connection
     def delete_open_position(self, user_id, token_address):
         """Supprime une position ouverte (quand elle est fermée)"""
         try:
+            self.flush()
             conn = self.get_connection()
             cursor = self.get_cursor()
 
@@ -1044,10 +1459,11 @@ class BotDatabase:
             return False
 
     def close(self):
-        """Ferme la connexion"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Commit les écritures en file et ferme les connexions"""
+        self.flush()
+        self._local.holder = None
+        if self._pool is not None:
+            self._pool.closeall()
 
 
 # Instance globale
@@ -1055,6 +1471,12 @@ db = BotDatabase()
 
 
 if __name__ == "__main__":
+    import sys
+
     print("Initialisation de la base de données...")
     db = BotDatabase()
     print("Base de données prête!")
+
+    # python database_bot.py reconcile: recalcul complet des bot_stats
+    if 'reconcile' in sys.argv[1:]:
+        db.reconcile_bot_stats()
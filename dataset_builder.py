@@ -0,0 +1,378 @@
+"""
+DATASET BUILDER - Datasets ML de tous les horizons en une seule passe
+Remplace create_dataset_5s/7s/10s/15s/30s.py (un json.load complet + un CSV chacun):
+- lit les tokens complétés en flux (journal de pattern_discovery_bot, cf. bot_data_journal)
+- extrait les features de chaque horizon pour chaque token, en une passe
+- écrit en colonnes (Parquet) partitionné par horizon et date de complétion:
+    datasets/horizon=10s/date=2025-01-31/part-00012000.parquet
+- incrémental: seuls les tokens ajoutés depuis le dernier run sont traités
+  (curseur par horizon dans datasets/_state.json)
+Usage:
+    python dataset_builder.py                  # incrémental, tous les horizons
+    python dataset_builder.py --full           # reconstruction complète
+    python dataset_builder.py --horizons 5s,7s --csv   # + export dataset_<h>_prediction.csv
+"""
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from bot_data_journal import open_completed
+
+try:
+    import pyarrow  # noqa: F401  (moteur Parquet de pandas)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    print("[WARNING] pyarrow non installe - partitions ecrites en CSV gzip (pip install pyarrow)")
+
+DATASET_DIR = 'datasets'
+FLUSH_RECORDS = 5000  # Tokens traités entre deux écritures de partitions
+META_COLUMNS = ('mint', 'ts')  # Colonnes ajoutées aux features (retirées de l'export CSV)
+SNAPSHOT_FIELDS = ('txn', 'traders', 'buy_ratio', 'mc', 'velocity')
+
+
+# ----------------------------------------------------------------------
+# Features par horizon (mêmes colonnes que les anciens scripts create_dataset_*)
+# ----------------------------------------------------------------------
+def _snapshot(token: dict, key: str) -> dict:
+    snapshot = token.get(key)
+    return snapshot if isinstance(snapshot, dict) else {}
+
+
+def _add_snapshot(features: dict, snapshot: dict, prefix: str = ''):
+    for field in SNAPSHOT_FIELDS:
+        features[prefix + field] = snapshot.get(field, 0)
+
+
+def _add_growth(features: dict, start: dict, end: dict, suffix: str):
+    if start.get('mc', 0) > 0:
+        features[f'mc_growth_{suffix}'] = (end.get('mc', 0) - start.get('mc', 0)) / start.get('mc', 1)
+        features[f'txn_growth_{suffix}'] = end.get('txn', 0) - start.get('txn', 0)
+        features[f'traders_growth_{suffix}'] = end.get('traders', 0) - start.get('traders', 0)
+    else:
+        features[f'mc_growth_{suffix}'] = 0
+        features[f'txn_growth_{suffix}'] = 0
+        features[f'traders_growth_{suffix}'] = 0
+
+
+def _label(token: dict) -> int:
+    # LABEL : Est-ce que le token a migre ?
+    return 1 if token.get('migration_detected', False) else 0
+
+
+def _single_snapshot(key: str) -> Callable[[dict], Optional[dict]]:
+    """Horizons ultra-précoces (5s, 7s): un seul snapshot"""
+    def extract(token: dict) -> Optional[dict]:
+        snapshot = _snapshot(token, key)
+        if not snapshot:
+            return None
+        features = {}
+        _add_snapshot(features, snapshot)
+        features['migrated'] = _label(token)
+        return features
+    return extract
+
+
+def extract_features_10s(token: dict) -> Optional[dict]:
+    snap_10s = _snapshot(token, '10s')
+    if not snap_10s:
+        return None
+    # Au moins 1 transaction et un MC valide
+    if snap_10s.get('txn', 0) < 1 or snap_10s.get('mc', 0) <= 0:
+        return None
+
+    features = {}
+    _add_snapshot(features, snap_10s)
+    features['whale_count'] = snap_10s.get('whale_count', token.get('whale_count', 0))
+    features['migrated'] = _label(token)
+    return features
+
+
+def extract_features_15s(token: dict) -> Optional[dict]:
+    snap_10s = _snapshot(token, '10s')
+    snap_15s = _snapshot(token, '15s')
+    if not snap_15s:
+        return None
+
+    features = {}
+    _add_snapshot(features, snap_10s, '10s_')
+    _add_snapshot(features, snap_15s, '15s_')
+    _add_growth(features, snap_10s, snap_15s, '10s_15s')
+    features['whale_count'] = token.get('whale_count', 0)
+    features['migrated'] = _label(token)
+    return features
+
+
+def extract_features_30s(token: dict) -> Optional[dict]:
+    snapshots = [_snapshot(token, key) for key in ('10s', '15s', '20s', '30s')]
+    snap_10s, _, _, snap_30s = snapshots
+    if not snap_30s:
+        return None
+
+    features = {}
+    for key, snapshot in zip(('10s', '15s', '20s', '30s'), snapshots):
+        _add_snapshot(features, snapshot, f'{key}_')
+    _add_growth(features, snap_10s, snap_30s, '10s_30s')
+
+    # Tendance: combien de fois le MC augmente entre deux snapshots (0-3)
+    mc_values = [snapshot.get('mc', 0) for snapshot in snapshots]
+    features['mc_trend_up_count'] = sum(1 for i in range(len(mc_values) - 1) if mc_values[i + 1] > mc_values[i])
+
+    features['whale_count'] = token.get('whale_count', 0)
+    features['migrated'] = _label(token)
+    return features
+
+
+HORIZONS: Dict[str, Callable[[dict], Optional[dict]]] = {
+    '5s': _single_snapshot('5s'),
+    '7s': _single_snapshot('7s'),
+    '10s': extract_features_10s,
+    '15s': extract_features_15s,
+    '30s': extract_features_30s,
+}
+
+# Colonnes affichées dans le résumé runners vs flops (comme les anciens scripts)
+SUMMARY_COLUMNS = {
+    '5s': ['txn', 'traders', 'buy_ratio', 'mc'],
+    '7s': ['txn', 'traders', 'buy_ratio', 'mc'],
+    '10s': ['txn', 'traders', 'buy_ratio', 'mc', 'velocity'],
+    '15s': ['15s_txn', '15s_traders', '15s_buy_ratio', '15s_mc', '15s_velocity'],
+    '30s': ['30s_txn', '30s_traders', '30s_buy_ratio', '30s_mc', '30s_velocity'],
+}
+
+
+def _partition_date(ts: Optional[float]) -> str:
+    if not ts:
+        return 'unknown'  # Lecture directe d'un bot_data.json legacy (pas de date de complétion)
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d')
+
+
+# ----------------------------------------------------------------------
+# Builder
+# ----------------------------------------------------------------------
+class DatasetBuilder:
+    """
+    Construction incrémentale des datasets partitionnés
+
+    - build(): une passe sur les tokens non encore traités, tous horizons confondus
+    - load(horizon): DataFrame d'un horizon (toutes dates ou une sélection)
+    - export_csv(horizon): CSV au format des anciens dataset_<h>_prediction.csv
+    Les parts sont nommées d'après l'index du premier token du bloc: relancer
+    après un crash réécrit les mêmes fichiers au lieu de dupliquer des lignes,
+    et un nouveau bloc ne peut pas écraser une part d'un run précédent
+    """
+
+    def __init__(self, data_file: str = 'bot_data.json', output_dir: str = DATASET_DIR,
+                 horizons: List[str] = None):
+        self.data_file = data_file
+        self.output_dir = output_dir
+        self.horizons = {h: HORIZONS[h] for h in (horizons or HORIZONS)}
+        self.state_file = os.path.join(output_dir, '_state.json')
+        self.extension = '.parquet' if PARQUET_AVAILABLE else '.csv.gz'
+
+    # ------------------------------------------------------------------
+    # État (curseur par horizon)
+    # ------------------------------------------------------------------
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'horizons': {}}
+
+    def _save_state(self, state: dict):
+        tmp_file = self.state_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def _horizon_dir(self, horizon: str) -> str:
+        return os.path.join(self.output_dir, f'horizon={horizon}')
+
+    def _reset(self, horizon: str, state: dict):
+        shutil.rmtree(self._horizon_dir(horizon), ignore_errors=True)
+        state['horizons'][horizon] = {'records': 0, 'rows': 0}
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+    def _write_part(self, horizon: str, date: str, rows: List[dict], part: int):
+        directory = os.path.join(self._horizon_dir(horizon), f'date={date}')
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'part-{part:08d}{self.extension}')
+
+        df = pd.DataFrame(rows)
+        tmp_file = path + '.tmp'
+        if PARQUET_AVAILABLE:
+            df.to_parquet(tmp_file, index=False)
+        else:
+            df.to_csv(tmp_file, index=False, compression='gzip')
+        os.replace(tmp_file, path)
+
+    def _flush(self, buffers: Dict[str, Dict[str, List[dict]]], part: int, position: int, state: dict,
+               cursors: Dict[str, int]):
+        for horizon, by_date in buffers.items():
+            horizon_state = state['horizons'][horizon]
+            # Premier token du bloc pour cet horizon: jamais le nom d'une part existante
+            name = max(part, cursors[horizon])
+            for date, rows in by_date.items():
+                self._write_part(horizon, date, rows, name)
+                horizon_state['rows'] += len(rows)
+            # Curseur avancé seulement après l'écriture des parts
+            horizon_state['records'] = max(horizon_state['records'], position)
+            by_date.clear()
+        self._save_state(state)
+
+    def build(self, full: bool = False) -> dict:
+        """
+        Traite les tokens ajoutés depuis le dernier run (ou tout si full=True)
+
+        Returns:
+            {horizon: lignes ajoutées}
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        start_time = time.time()
+        reader = open_completed(self.data_file)
+        state = self._load_state()
+        state.setdefault('horizons', {})
+
+        for horizon in self.horizons:
+            horizon_state = state['horizons'].get(horizon)
+            if full or horizon_state is None:
+                self._reset(horizon, state)
+            elif horizon_state['records'] > len(reader):
+                # Journal remplacé/raccourci: les curseurs ne correspondent plus
+                print(f"[DATASET] Source plus courte que le curseur {horizon} - reconstruction")
+                self._reset(horizon, state)
+
+        cursors = {h: state['horizons'][h]['records'] for h in self.horizons}
+        start = min(cursors.values())
+        added = {h: 0 for h in self.horizons}
+        buffers: Dict[str, Dict[str, List[dict]]] = {h: {} for h in self.horizons}
+
+        position = part = start
+        for position, (entry, record) in enumerate(reader.iter_indexed(start), start + 1):
+            ts = entry.get('ts')
+            date = _partition_date(ts)
+            index = position - 1
+
+            for horizon, extract in self.horizons.items():
+                if index < cursors[horizon]:
+                    continue  # Déjà dans le dataset de cet horizon
+                features = extract(record)
+                if features:
+                    features['mint'] = record.get('mint')
+                    features['ts'] = ts
+                    buffers[horizon].setdefault(date, []).append(features)
+                    added[horizon] += 1
+
+            if position - part >= FLUSH_RECORDS:
+                self._flush(buffers, part, position, state, cursors)
+                part = position
+
+        self._flush(buffers, part, position, state, cursors)
+
+        processed = position - start
+        print(f"[DATASET] {processed} tokens traites en {time.time() - start_time:.1f}s "
+              f"({', '.join(f'{h}: +{n}' for h, n in added.items())})")
+        return added
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def parts(self, horizon: str, dates: List[str] = None) -> List[str]:
+        pattern = os.path.join(self._horizon_dir(horizon), 'date=*', f'part-*{self.extension}')
+        files = sorted(glob.glob(pattern))
+        if dates is not None:
+            wanted = {f'date={date}' for date in dates}
+            files = [path for path in files if os.path.basename(os.path.dirname(path)) in wanted]
+        return files
+
+    def load(self, horizon: str, dates: List[str] = None) -> pd.DataFrame:
+        """Dataset d'un horizon (colonne 'date' = partition)"""
+        frames = []
+        for path in self.parts(horizon, dates):
+            df = pd.read_parquet(path) if PARQUET_AVAILABLE else pd.read_csv(path)
+            df['date'] = os.path.basename(os.path.dirname(path))[len('date='):]
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def export_csv(self, horizon: str, output_file: str = None) -> pd.DataFrame:
+        """CSV au format legacy (features + migrated) pour les scripts d'entrainement"""
+        output_file = output_file or f'dataset_{horizon}_prediction.csv'
+        df = self.load(horizon)
+        df = df.drop(columns=[c for c in (*META_COLUMNS, 'date') if c in df.columns])
+        df.to_csv(output_file, index=False)
+        return df
+
+
+def print_summary(horizon: str, df: pd.DataFrame, output_file: str):
+    """Résumé runners vs flops (même affichage que les anciens create_dataset_*)"""
+    print('\n' + '=' * 80)
+    print(f'DATASET CREE - PREDICTION @ {horizon}')
+    print('=' * 80)
+    print(f'\nFichier: {output_file}')
+    print(f'Total tokens: {len(df)}')
+    if len(df) == 0:
+        print(f'\n[ERREUR] Aucune donnee trouvee! Verifiez que les tokens contiennent des snapshots @ {horizon}')
+        return
+
+    migrated = int(df['migrated'].sum())
+    print(f'  - Runners (migrated=1): {migrated}')
+    print(f'  - Flops (migrated=0): {len(df) - migrated}')
+    print(f'  - Features: {len(df.columns)} colonnes')
+
+    columns = SUMMARY_COLUMNS[horizon]
+    print(f'\n[STATISTIQUES @ {horizon} - RUNNERS vs FLOPS]')
+    print('\nRUNNERS:')
+    print(df[df['migrated'] == 1][columns].describe() if migrated else 'Aucun runner trouve')
+    print('\nFLOPS:')
+    print(df[df['migrated'] == 0][columns].describe() if len(df) > migrated else 'Aucun flop trouve')
+    print('=' * 80)
+
+
+def build_csv(horizon: str, data_file: str = 'bot_data.json'):
+    """Mise à jour incrémentale de tous les horizons puis export CSV d'un horizon"""
+    builder = DatasetBuilder(data_file)
+    builder.build()
+    output_file = f'dataset_{horizon}_prediction.csv'
+    df = builder.export_csv(horizon, output_file)
+    print_summary(horizon, df, output_file)
+    return df
+
+
+def main(argv: List[str]):
+    full = '--full' in argv
+    export = '--csv' in argv
+    horizons = None
+    if '--horizons' in argv:
+        horizons = argv[argv.index('--horizons') + 1].split(',')
+        unknown = [h for h in horizons if h not in HORIZONS]
+        if unknown:
+            print(f"[ERROR] Horizons inconnus: {unknown} (disponibles: {', '.join(HORIZONS)})")
+            sys.exit(1)
+
+    builder = DatasetBuilder(horizons=horizons)
+    try:
+        builder.build(full=full)
+    except FileNotFoundError as e:
+        print(f"[ERROR] Fichier {e} non trouve! Lance d'abord: python pattern_discovery_bot.py")
+        sys.exit(1)
+
+    if export:
+        for horizon in builder.horizons:
+            output_file = f'dataset_{horizon}_prediction.csv'
+            print_summary(horizon, builder.export_csv(horizon, output_file), output_file)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,9 +1,9 @@
 """
 Alternative API using DexScreener (no Cloudflare protection)
 """
-import httpx
 import asyncio
 from typing import Optional
+from http_client import get_http_client
 
 def get_token_from_dexscreener(mint_address: str) -> Optional[dict]:
     """
@@ -11,12 +11,11 @@ def get_token_from_dexscreener(mint_address: str) -> Optional[dict]:
     This API is public and doesn't have Cloudflare protection
     """
     try:
-        client = httpx.Client(timeout=10.0)
-
         # DexScreener API endpoint
         url = f"https://api.dexscreener.com/latest/dex/tokens/{mint_address}"
 
-        response = client.get(url)
+        # Shared pooled client (rate-limited to the DexScreener quota)
+        response = get_http_client().get_sync(url, timeout=10.0)
 
         if response.status_code == 200:
             data = response.json()
@@ -53,7 +52,6 @@ def get_token_from_dexscreener(mint_address: str) -> Optional[dict]:
                         'description': ''
                     }
 
-        client.close()
         return None
 
     except Exception as e:
@@ -68,32 +66,31 @@ async def get_token_price(mint_address: str) -> Optional[float]:
     Returns market cap in thousands (K)
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            url = f"https://api.dexscreener.com/latest/dex/tokens/{mint_address}"
-            response = await client.get(url)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                if data and 'pairs' in data and len(data['pairs']) > 0:
-                    # Try to find pump.fun pair first
-                    pump_pair = None
-                    for pair in data['pairs']:
-                        if 'pumpfun' in pair.get('dexId', '').lower() or \
-                           'pump' in pair.get('dexId', '').lower():
-                            pump_pair = pair
-                            break
-
-                    # If no pump.fun pair, use first pair
-                    if not pump_pair and len(data['pairs']) > 0:
-                        pump_pair = data['pairs'][0]
-
-                    if pump_pair:
-                        # Get market cap and convert to K
-                        market_cap = float(pump_pair.get('marketCap', 0) or 0)
-                        return market_cap / 1000  # Convert to K
-
-            return None
+        url = f"https://api.dexscreener.com/latest/dex/tokens/{mint_address}"
+        response = await get_http_client().get(url, timeout=10.0)
+
+        if response.status_code == 200:
+            data = response.json()
+
+            if data and 'pairs' in data and len(data['pairs']) > 0:
+                # Try to find pump.fun pair first
+                pump_pair = None
+                for pair in data['pairs']:
+                    if 'pumpfun' in pair.get('dexId', '').lower() or \
+                       'pump' in pair.get('dexId', '').lower():
+                        pump_pair = pair
+                        break
+
+                # If no pump.fun pair, use first pair
+                if not pump_pair and len(data['pairs']) > 0:
+                    pump_pair = data['pairs'][0]
+
+                if pump_pair:
+                    # Get market cap and convert to K
+                    market_cap = float(pump_pair.get('marketCap', 0) or 0)
+                    return market_cap / 1000  # Convert to K
+
+        return None
 
     except Exception as e:
         print(f"Error fetching token price for {mint_address[:8]}: {e}")
@@ -5,6 +5,7 @@ Extrait toutes les features depuis bot_data.json et crée un dataset flat
 import json
 import csv
 from datetime import datetime
+from bot_data_journal import load_bot_data
 
 def flatten_snapshot(snapshot, prefix):
     """Aplatir un snapshot en colonnes préfixées"""
@@ -28,8 +29,7 @@ def export_to_csv(output_file='ml_dataset.csv'):
 
     # Charger les données
     try:
-        with open('bot_data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_bot_data('bot_data.json')
     except Exception as e:
         print(f'ERREUR: Impossible de charger bot_data.json: {e}')
         return
@@ -4,7 +4,7 @@ INTEGRATED WITH REAL ANALYZERS
 """
 
 import json
-import httpx
+import time
 import asyncio
 import numpy as np
 import sys
@@ -31,9 +31,35 @@ from buysell_ratio_analyzer import BuySellRatioAnalyzer
 from kol_detector import KOLDetector
 from coordinated_dump_detector import CoordinatedDumpDetector
 from sentiment_analyzer import SentimentAnalyzer
+from http_client import get_http_client
+from token_transactions import TokenTransactions
 
 console = Console()
 
+# Per-analyzer timeouts (seconds): a slow analyzer yields a partial result
+# (its default features) instead of holding up the whole extraction
+ANALYZER_TIMEOUTS = {
+    "dexscreener": 10,
+    "pump_fun": 10,
+    "token_data": 15,
+    "liquidity": 15,
+    "onchain": 25,
+    "sniper": 20,
+    "volume": 5,
+    "pump_dump": 15,
+    "authority": 10,
+    "bundle": 25,
+    "wallet_graph": 30,
+    "buysell": 20,
+    "kol": 15,
+    "coordinated_dump": 20,
+    "sentiment": 15,
+}
+
+# Signatures fetched once per token and shared by the transaction-based analyzers
+# (sniper needs 1000, the others slice the most recent 30-100)
+SHARED_SIGNATURE_LIMIT = 1000
+
 
 class TokenFeatureExtractor:
     """Extracts comprehensive features from token data using REAL analyzers"""
@@ -47,7 +73,7 @@ class TokenFeatureExtractor:
         except:
             self.rpc_url = rpc_url or "https://api.mainnet-beta.solana.com"
 
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = get_http_client()  # Shared pooled client (DexScreener / Pump.fun quotas)
 
         # Initialize real analyzers (pass RPC URL to those that need it)
         self.sniper_detector = SniperDetector()
@@ -64,140 +90,113 @@ class TokenFeatureExtractor:
         self.coordinated_dump_detector = CoordinatedDumpDetector(rpc_url=self.rpc_url)
         self.sentiment_analyzer = SentimentAnalyzer()
 
+        # Timing breakdown of the last extraction: {analyzer: {'seconds', 'status'}}
+        self.last_timings: Dict[str, Dict] = {}
+
     async def extract_all_features(self, token_mint: str) -> Optional[Dict]:
         """
         Extract all 75+ features from a token using REAL analyzers
 
+        Independent analyzers run concurrently (blocking ones in worker threads),
+        each with its own timeout; a failed or slow analyzer only loses its own
+        features. The per-analyzer timing breakdown is kept in self.last_timings.
+
         Args:
             token_mint: Token mint address
 
         Returns:
             Dictionary of features or None if failed
         """
+        timings = {}
+        self.last_timings = timings
+        started = time.perf_counter()
+        tasks = []
+
+        def run(name, awaitable):
+            task = asyncio.ensure_future(self._timed(timings, name, awaitable))
+            tasks.append(task)
+            return task
+
+        def run_after(name, dependency, factory):
+            # Starts as soon as `dependency` is done; its timeout excludes the wait
+            async def runner():
+                result = await dependency
+                try:
+                    awaitable = factory(result)
+                except Exception as e:
+                    timings[name] = {"seconds": 0.0, "status": f"error: {type(e).__name__}"}
+                    return None
+                return await self._timed(timings, name, awaitable)
+            task = asyncio.ensure_future(runner())
+            tasks.append(task)
+            return task
+
         try:
-            # Fetch basic data
-            dex_data = await self._fetch_dexscreener_data(token_mint)
+            # Fetch basic data (concurrently)
+            dex_task = run("dexscreener", self._fetch_dexscreener_data(token_mint))
+            pump_task = run("pump_fun", self._fetch_pump_fun_data(token_mint))
+            token_data_task = run("token_data", asyncio.to_thread(self.liquidity_analyzer.get_token_data, token_mint))
+
+            dex_data = await dex_task
             if not dex_data:
                 return None
 
-            pump_data = await self._fetch_pump_fun_data(token_mint)
-
             # Get token data for analyzers
-            token_data = self.liquidity_analyzer.get_token_data(token_mint)
+            token_data = await token_data_task
             if not token_data:
                 return None
 
-            # Run REAL analyzers
-            liquidity_analysis = self.liquidity_analyzer.analyze_liquidity(token_mint)
-
-            # Onchain data (holders)
-            onchain_data = None
-            try:
-                onchain_data = self.onchain_analyzer.get_token_holders(token_mint)
-            except:
-                pass
-
-            # Sniper analysis
-            sniper_analysis = None
-            try:
-                token_creation_time = token_data.get("created_timestamp")
-                sniper_analysis = self.sniper_detector.analyze_snipers(token_mint, token_creation_time)
-            except:
-                pass
-
-            # Volume analysis
-            volume_analysis = None
-            try:
-                liquidity = liquidity_analysis.liquidity_usd if liquidity_analysis else 0
-                volume_analysis = self.volume_analyzer.analyze_volume(token_data, liquidity)
-            except:
-                pass
-
-            # Pump & dump analysis
-            pump_dump_analysis = None
-            try:
-                pump_dump_analysis = self.pump_dump_detector.analyze_pump_dump(token_mint, token_data)
-            except:
-                pass
-
-            # Authority check
-            authority_analysis = None
-            try:
-                authority_analysis = self.authority_checker.check_authority(token_mint)
-            except:
-                pass
-
-            # Bundle detection
-            bundle_analysis = None
-            try:
-                token_creation_time = token_data.get("created_timestamp")
-                bundle_analysis = self.bundle_detector.analyze_bundles(token_mint, token_creation_time)
-            except:
-                pass
-
-            # Wallet graph analysis (insider connections)
-            wallet_graph_analysis = None
-            try:
-                # Get top holders for graph analysis
-                early_wallets = [h.get("address") for h in onchain_data.holders[:50]] if onchain_data and onchain_data.can_analyze else None
-                wallet_graph_analysis = self.wallet_graph_analyzer.analyze_wallet_connections(token_mint, early_wallets)
-            except:
-                pass
-
-            # Buy/sell ratio analysis
-            buysell_analysis = None
-            try:
-                buysell_analysis = self.buysell_ratio_analyzer.analyze_buysell_ratio(token_mint, dex_data)
-            except:
-                pass
-
-            # KOL detection
-            kol_analysis = None
-            try:
-                # Use holder data if available
-                holders_data = onchain_data.holders if onchain_data and onchain_data.can_analyze else None
-                kol_analysis = self.kol_detector.detect_kols(token_mint, holders_data, dex_data)
-            except:
-                pass
-
-            # Coordinated dump detection
-            coordinated_dump_analysis = None
-            try:
-                # Would need recent sell data - for now pass None
-                coordinated_dump_analysis = self.coordinated_dump_detector.detect_coordinated_dumps(token_mint)
-            except:
-                pass
-
-            # Sentiment analysis (Twitter/Telegram)
-            sentiment_features = None
-            try:
-                # Get token metadata for sentiment analysis
-                token_metadata = {
-                    'name': pump_data.get('name') if pump_data else None,
-                    'symbol': pump_data.get('symbol') if pump_data else None,
-                    'twitter': pump_data.get('twitter') if pump_data else None,
-                    'telegram': pump_data.get('telegram') if pump_data else None,
-                    'website': pump_data.get('website') if pump_data else None
-                }
-
-                # Analyze Twitter (with ticker symbol)
-                twitter_data = await self.sentiment_analyzer.analyze_twitter(
+            token_creation_time = token_data.get("created_timestamp")
+
+            # One getSignaturesForAddress / getTransaction fetch shared by the
+            # sniper, bundle, wallet-graph, buy/sell and coordinated-dump analyzers
+            shared_txs = TokenTransactions(token_mint, self.rpc_url, prefetch_limit=SHARED_SIGNATURE_LIMIT)
+
+            # Run REAL analyzers (independent ones in parallel; blocking ones in threads)
+            liquidity_task = run("liquidity", asyncio.to_thread(self.liquidity_analyzer.analyze_liquidity, token_mint))
+            onchain_task = run("onchain", self.onchain_analyzer.get_token_holders(token_mint))
+            sniper_task = run("sniper", self.sniper_detector.analyze_snipers(
+                token_mint, token_creation_time, transactions=shared_txs))
+            pump_dump_task = run("pump_dump", asyncio.to_thread(
+                self.pump_dump_detector.analyze_pump_dump, token_mint, token_data))
+            authority_task = run("authority", asyncio.to_thread(self.authority_checker.check_authority, token_mint))
+            bundle_task = run("bundle", self.bundle_detector.analyze_bundles(
+                token_mint, token_creation_time, transactions=shared_txs))
+            buysell_task = run("buysell", self.buysell_ratio_analyzer.analyze_buysell_ratio(
+                token_mint, dex_data, transactions=shared_txs))
+            # Would need recent sell data - for now pass None
+            coordinated_dump_task = run("coordinated_dump", self.coordinated_dump_detector.detect_coordinated_dumps(
+                token_mint, transactions=shared_txs))
+
+            # Dependent analyzers
+            volume_task = run_after("volume", liquidity_task, lambda liquidity_analysis: asyncio.to_thread(
+                self.volume_analyzer.analyze_volume,
+                token_data, liquidity_analysis.liquidity_usd if liquidity_analysis else 0))
+            # Wallet graph analysis (insider connections) on top holders
+            wallet_graph_task = run_after("wallet_graph", onchain_task, lambda onchain: (
+                self.wallet_graph_analyzer.analyze_wallet_connections(
                     token_mint,
-                    token_metadata.get('name'),
-                    token_metadata.get('symbol')
-                )
-
-                # Analyze Telegram
-                telegram_data = await self.sentiment_analyzer.analyze_telegram(token_metadata)
+                    [h.get("address") for h in onchain.holders[:50]] if onchain and onchain.can_analyze else None,
+                    transactions=shared_txs)))
+            # KOL detection (use holder data if available)
+            kol_task = run_after("kol", onchain_task, lambda onchain: asyncio.to_thread(
+                self.kol_detector.detect_kols,
+                token_mint, onchain.holders if onchain and onchain.can_analyze else None, dex_data))
+            # Sentiment analysis (Twitter/Telegram) needs pump.fun metadata
+            sentiment_task = run_after("sentiment", pump_task,
+                                       lambda pump: self._analyze_sentiment(token_mint, pump))
+
+            (pump_data, liquidity_analysis, onchain_data, sniper_analysis, pump_dump_analysis,
+             authority_analysis, bundle_analysis, buysell_analysis, coordinated_dump_analysis,
+             volume_analysis, wallet_graph_analysis, kol_analysis, sentiment_features) = await asyncio.gather(
+                pump_task, liquidity_task, onchain_task, sniper_task, pump_dump_task,
+                authority_task, bundle_task, buysell_task, coordinated_dump_task,
+                volume_task, wallet_graph_task, kol_task, sentiment_task
+            )
 
-                # Calculate sentiment features
-                sentiment_features = self.sentiment_analyzer.calculate_sentiment_features(
-                    twitter_data,
-                    telegram_data
-                )
-            except Exception as e:
-                console.print(f"[yellow]Sentiment analysis failed: {e}")
-                pass
+            timings["total"] = {"seconds": time.perf_counter() - started, "status": "ok"}
+            timings["shared_transactions"] = shared_txs.get_stats()
+            self._print_timings(token_mint, timings)
 
             # Extract features from REAL analyses
             features = {}
@@ -259,11 +258,78 @@ class TokenFeatureExtractor:
             traceback.print_exc()
             return None
 
+        finally:
+            # Early exit (no DexScreener / token data): don't leave analyzers running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _timed(self, timings: Dict, name: str, awaitable):
+        """
+        Await one analyzer with its timeout, recording its duration and status
+        Returns None on timeout/error (partial result: default features are used)
+        """
+        start = time.perf_counter()
+        status = "ok"
+        result = None
+        try:
+            result = await asyncio.wait_for(awaitable, ANALYZER_TIMEOUTS.get(name, 30))
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except Exception as e:
+            status = f"error: {type(e).__name__}"
+        timings[name] = {"seconds": time.perf_counter() - start, "status": status}
+        return result
+
+    def _print_timings(self, token_mint: str, timings: Dict):
+        """One-line timing breakdown (slowest analyzers first)"""
+        parts = [
+            f"{name} {t['seconds']:.2f}s" + ("" if t["status"] == "ok" else f" ({t['status']})")
+            for name, t in sorted(timings.items(), key=lambda item: -item[1].get("seconds", 0))
+            if name not in ("total", "shared_transactions")
+        ]
+        shared = timings.get("shared_transactions", {})
+        console.print(
+            f"[dim]Features {token_mint[:8]}: total {timings['total']['seconds']:.2f}s | "
+            f"{', '.join(parts)} | shared RPC: {shared.get('rpc_calls', 0)} calls, {shared.get('cache_hits', 0)} hits"
+        )
+
+    async def _analyze_sentiment(self, token_mint: str, pump_data: Optional[Dict]) -> Optional[Dict]:
+        """Sentiment features from Twitter/Telegram (both queried concurrently)"""
+        try:
+            # Get token metadata for sentiment analysis
+            token_metadata = {
+                'name': pump_data.get('name') if pump_data else None,
+                'symbol': pump_data.get('symbol') if pump_data else None,
+                'twitter': pump_data.get('twitter') if pump_data else None,
+                'telegram': pump_data.get('telegram') if pump_data else None,
+                'website': pump_data.get('website') if pump_data else None
+            }
+
+            # Analyze Twitter (with ticker symbol) and Telegram
+            twitter_data, telegram_data = await asyncio.gather(
+                self.sentiment_analyzer.analyze_twitter(
+                    token_mint,
+                    token_metadata.get('name'),
+                    token_metadata.get('symbol')
+                ),
+                self.sentiment_analyzer.analyze_telegram(token_metadata)
+            )
+
+            # Calculate sentiment features
+            return self.sentiment_analyzer.calculate_sentiment_features(
+                twitter_data,
+                telegram_data
+            )
+        except Exception as e:
+            console.print(f"[yellow]Sentiment analysis failed: {e}")
+            return None
+
     async def _fetch_dexscreener_data(self, token_mint: str) -> Optional[Dict]:
         """Fetch token data from DexScreener"""
         try:
             response = await self.client.get(
-                f"https://api.dexscreener.com/latest/dex/tokens/{token_mint}"
+                f"https://api.dexscreener.com/latest/dex/tokens/{token_mint}", timeout=30.0
             )
             if response.status_code == 200:
                 data = response.json()
@@ -276,7 +342,7 @@ class TokenFeatureExtractor:
         """Fetch token data from Pump.fun"""
         try:
             response = await self.client.get(
-                f"https://frontend-api-v2.pump.fun/coins/{token_mint}"
+                f"https://frontend-api-v2.pump.fun/coins/{token_mint}", timeout=30.0
             )
             if response.status_code == 200:
                 return response.json()
@@ -838,8 +904,7 @@ class TokenFeatureExtractor:
         }
 
     async def close(self):
-        """Close HTTP client and analyzers"""
-        await self.client.aclose()
+        """Close analyzers (the HTTP client is shared by the whole process)"""
         self.sniper_detector.close()
         self.wallet_analyzer.close()
         self.liquidity_analyzer.close()
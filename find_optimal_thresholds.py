@@ -1,8 +1,8 @@
 import json
 import statistics
+from bot_data_journal import load_bot_data
 
-with open('bot_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_bot_data('bot_data.json')
 
 runners = [r for r in data['completed'] if r.get('is_runner', False)]
 flops = [r for r in data['completed'] if not r.get('is_runner', False)]
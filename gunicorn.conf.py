@@ -0,0 +1,19 @@
+"""
+GUNICORN - Configuration du serveur web (render.yaml: gunicorn -c gunicorn.conf.py app:app)
+/api/stream garde une connexion SSE ouverte par dashboard: avec le worker
+sync par défaut (une requête à la fois, tuée après 30s) un seul dashboard
+bloquait tout le site. Ici:
+- gthread: chaque requête, et chaque flux SSE, a son propre thread
+- un seul process: bots, hub SSE et caches vivent dans ce process
+- timeout = heartbeat du worker (en gthread ce n'est pas une durée max de requête)
+Le nombre de flux simultanés est borné par DASHBOARD_MAX_STREAMS (dashboard_push.py)
+pour garder des threads libres pour l'API; au-delà les dashboards restent en polling
+"""
+import os
+
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 64))
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
@@ -2,13 +2,13 @@
 Helius Enhanced APIs for transaction parsing
 https://docs.helius.dev/
 """
-import httpx
 from typing import List, Dict, Optional
 from config import HELIUS_API_KEY
+from http_client import get_http_client
 
 
 class HeliusAPI:
-    """Wrapper for Helius Enhanced Transactions APIs"""
+    """Wrapper for Helius Enhanced Transactions APIs (async, shared pooled client)"""
 
     def __init__(self):
         if not HELIUS_API_KEY:
@@ -16,9 +16,10 @@ class HeliusAPI:
 
         self.api_key = HELIUS_API_KEY
         self.base_url = "https://api.helius.xyz/v0"
-        self.client = httpx.Client(timeout=60.0)
+        self.client = get_http_client()
+        self.timeout = 60.0
 
-    def get_parsed_transactions(self, wallet_address: str, limit: int = 100) -> List[Dict]:
+    async def get_parsed_transactions(self, wallet_address: str, limit: int = 100) -> List[Dict]:
         """
         Get parsed transaction history for a wallet
         Returns human-readable transaction data
@@ -30,7 +31,7 @@ class HeliusAPI:
                 "limit": limit
             }
 
-            response = self.client.get(url, params=params)
+            response = await self.client.get(url, params=params, timeout=self.timeout)
 
             if response.status_code == 200:
                 return response.json()
@@ -42,7 +43,7 @@ class HeliusAPI:
             print(f"[Helius] Error fetching transactions: {e}")
             return []
 
-    def parse_transaction(self, signature: str) -> Optional[Dict]:
+    async def parse_transaction(self, signature: str) -> Optional[Dict]:
         """
         Parse a single transaction by signature
         Returns detailed parsed transaction data
@@ -52,7 +53,7 @@ class HeliusAPI:
             params = {"api-key": self.api_key}
             payload = {"transactions": [signature]}
 
-            response = self.client.post(url, params=params, json=payload)
+            response = await self.client.post(url, params=params, json=payload, timeout=self.timeout, coalesce=True)
 
             if response.status_code == 200:
                 data = response.json()
@@ -63,7 +64,7 @@ class HeliusAPI:
         except Exception:
             return None
 
-    def get_token_accounts(self, wallet_address: str) -> List[Dict]:
+    async def get_token_accounts(self, wallet_address: str) -> List[Dict]:
         """
         Get all SPL token accounts for a wallet
         """
@@ -81,7 +82,7 @@ class HeliusAPI:
                 ]
             }
 
-            response = self.client.post(SOLANA_RPC_URL, json=payload)
+            response = await self.client.post(SOLANA_RPC_URL, json=payload, timeout=self.timeout, coalesce=True)
 
             if response.status_code == 200:
                 data = response.json()
@@ -92,7 +93,7 @@ class HeliusAPI:
         except Exception:
             return []
 
-    def get_account_info(self, wallet_address: str) -> Optional[Dict]:
+    async def get_account_info(self, wallet_address: str) -> Optional[Dict]:
         """
         Get account info including creation time
         """
@@ -108,7 +109,7 @@ class HeliusAPI:
                 ]
             }
 
-            response = self.client.post(SOLANA_RPC_URL, json=payload)
+            response = await self.client.post(SOLANA_RPC_URL, json=payload, timeout=self.timeout, coalesce=True)
 
             if response.status_code == 200:
                 data = response.json()
@@ -119,7 +120,7 @@ class HeliusAPI:
         except Exception:
             return None
 
-    def get_signatures_for_address(self, address: str, limit: int = 1000) -> List[Dict]:
+    async def get_signatures_for_address(self, address: str, limit: int = 1000) -> List[Dict]:
         """
         Get transaction signatures for an address
         """
@@ -135,7 +136,7 @@ class HeliusAPI:
                 ]
             }
 
-            response = self.client.post(SOLANA_RPC_URL, json=payload)
+            response = await self.client.post(SOLANA_RPC_URL, json=payload, timeout=self.timeout, coalesce=True)
 
             if response.status_code == 200:
                 data = response.json()
@@ -147,5 +148,4 @@ class HeliusAPI:
             return []
 
     def close(self):
-        """Close HTTP client"""
-        self.client.close()
+        """Nothing to close: the HTTP client is shared by the whole process"""
@@ -0,0 +1,366 @@
+"""
+HTTP CLIENT - Couche HTTP asynchrone partagée pour toutes les APIs externes
+(RPC Solana, Helius, DexScreener, PumpFun, PumpPortal)
+
+- Une seule session aiohttp (keep-alive) avec pool de connexions par host
+- Limite de concurrence + token bucket par host (quotas RPC / DexScreener)
+- Retry avec backoff exponentiel + jitter (429, 5xx, erreurs réseau)
+- Coalescing: les GET identiques en vol (et les lectures JSON-RPC) ne
+  partent qu'une fois, tous les appelants reçoivent la même réponse
+
+La session vit dans une boucle asyncio dédiée (thread de fond):
+- code async: await client.get(...) depuis n'importe quelle boucle
+- code synchrone (Flask, scripts): client.get_sync(...)
+"""
+import asyncio
+import json as jsonlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+# Statuts pour lesquels on réessaie
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Méthodes JSON-RPC qui écrivent: jamais coalescées ni réessayées par défaut
+WRITE_RPC_METHODS = {'sendTransaction', 'requestAirdrop'}
+
+
+class HttpError(Exception):
+    """Réponse HTTP en erreur (raise_for_status)"""
+
+    def __init__(self, status_code: int, url: str, text: str = ''):
+        super().__init__(f"HTTP {status_code} for {url}: {text[:200]}")
+        self.status_code = status_code
+        self.url = url
+
+
+class HttpResponse:
+    """
+    Réponse entièrement lue (partageable entre appelants coalescés)
+    Même interface que httpx/requests pour les usages du projet
+    """
+
+    def __init__(self, status_code: int, content: bytes, headers: dict, url: str):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        # Parse à chaque appel: chaque appelant coalescé a son propre objet
+        return jsonlib.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HttpError(self.status_code, self.url, self.text)
+
+
+@dataclass
+class HostPolicy:
+    """Limites d'un host"""
+    rate: float = 10.0          # Requêtes/seconde (token bucket)
+    burst: int = 20             # Taille du seau
+    max_concurrency: int = 16   # Requêtes simultanées
+    retries: int = 3            # Tentatives supplémentaires (requêtes idempotentes)
+    backoff: float = 0.25       # Base du backoff exponentiel (secondes)
+    max_backoff: float = 8.0
+
+
+DEFAULT_POLICY = HostPolicy()
+
+# Quotas connus (les hosts absents utilisent DEFAULT_POLICY)
+HOST_POLICIES = {
+    'api.mainnet-beta.solana.com': HostPolicy(rate=8, burst=16, max_concurrency=8),   # RPC public: 100 req / 10s
+    'mainnet.helius-rpc.com': HostPolicy(rate=40, burst=50, max_concurrency=32),
+    'api.helius.xyz': HostPolicy(rate=10, burst=20, max_concurrency=8),
+    'api.dexscreener.com': HostPolicy(rate=4, burst=10, max_concurrency=8),           # 300 req / min
+    'frontend-api.pump.fun': HostPolicy(rate=5, burst=10, max_concurrency=8),
+    'frontend-api-v2.pump.fun': HostPolicy(rate=5, burst=10, max_concurrency=8),
+    'pumpportal.fun': HostPolicy(rate=10, burst=20, max_concurrency=16),
+}
+
+
+class TokenBucket:
+    """Token bucket (à utiliser depuis la boucle du client uniquement)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> float:
+        """Prend un jeton; renvoie le temps passé à attendre"""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+
+class _HostState:
+    """Limiteurs et stats d'un host"""
+
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.semaphore = asyncio.Semaphore(policy.max_concurrency)
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.throttled_seconds = 0.0
+
+    def get_stats(self):
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'coalesced': self.coalesced,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'in_use': self.policy.max_concurrency - self.semaphore._value
+        }
+
+
+class AsyncHttpClient:
+    """
+    Client HTTP partagé du process
+
+    Toutes les requêtes s'exécutent dans la boucle du client (thread dédié):
+    les limiteurs et le pool ne sont jamais partagés entre boucles.
+    """
+
+    def __init__(self, policies: Dict[str, HostPolicy] = None, default_policy: HostPolicy = None,
+                 timeout: float = 30.0, max_connections: int = 200, keepalive_timeout: float = 30.0):
+        self.policies = dict(HOST_POLICIES if policies is None else policies)
+        self.default_policy = default_policy or DEFAULT_POLICY
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._session = None
+        self._hosts: Dict[str, _HostState] = {}
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+
+    # ------------------------------------------------------------------
+    # Boucle dédiée
+    # ------------------------------------------------------------------
+    def _ensure_loop(self):
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name='http-client', daemon=True)
+                self._thread.start()
+                self._loop = loop
+        return self._loop
+
+    def _get_session(self):
+        if self._session is None:
+            if aiohttp is None:
+                raise RuntimeError("aiohttp non installé (pip install aiohttp)")
+            per_host = max(p.max_concurrency for p in [self.default_policy, *self.policies.values()])
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.policies.get(host, self.default_policy))
+        return state
+
+    # ------------------------------------------------------------------
+    # API async
+    # ------------------------------------------------------------------
+    async def request(self, method: str, url: str, *, params: dict = None, json=None, data=None,
+                      headers: dict = None, timeout: float = None, retries: int = None,
+                      coalesce: bool = None) -> HttpResponse:
+        """
+        Requête HTTP (corps entièrement lu)
+
+        coalesce: None = GET coalescés, autres méthodes non
+        retries:  None = politique du host pour les requêtes idempotentes, 0 sinon
+        """
+        coro = self._request(method.upper(), url, params, json, data, headers, timeout, retries, coalesce)
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def rpc(self, url: str, method: str, params: list = None, timeout: float = None) -> HttpResponse:
+        """Appel JSON-RPC (les lectures identiques en vol sont coalescées)"""
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}
+        is_read = method not in WRITE_RPC_METHODS
+        return await self.request('POST', url, json=payload, timeout=timeout,
+                                  coalesce=is_read, retries=None if is_read else 0)
+
+    # ------------------------------------------------------------------
+    # API synchrone (hors boucle asyncio)
+    # ------------------------------------------------------------------
+    def request_sync(self, method: str, url: str, **kwargs) -> HttpResponse:
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("request_sync appelé depuis la boucle du client HTTP")
+        coro = self._request(method.upper(), url, kwargs.get('params'), kwargs.get('json'),
+                             kwargs.get('data'), kwargs.get('headers'), kwargs.get('timeout'),
+                             kwargs.get('retries'), kwargs.get('coalesce'))
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def get_sync(self, url: str, **kwargs) -> HttpResponse:
+        return self.request_sync('GET', url, **kwargs)
+
+    def post_sync(self, url: str, **kwargs) -> HttpResponse:
+        return self.request_sync('POST', url, **kwargs)
+
+    def rpc_sync(self, url: str, method: str, params: list = None, timeout: float = None) -> HttpResponse:
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}
+        is_read = method not in WRITE_RPC_METHODS
+        return self.request_sync('POST', url, json=payload, timeout=timeout,
+                                 coalesce=is_read, retries=None if is_read else 0)
+
+    # ------------------------------------------------------------------
+    # Exécution (boucle du client)
+    # ------------------------------------------------------------------
+    async def _request(self, method, url, params, json, data, headers, timeout, retries, coalesce):
+        if coalesce is None:
+            coalesce = method == 'GET'
+        if retries is None:
+            retries = None if (method == 'GET' or coalesce) else 0
+
+        if not coalesce:
+            return await self._fetch(method, url, params, json, data, headers, timeout, retries)
+
+        key = (
+            method, url,
+            jsonlib.dumps(params, sort_keys=True, default=str) if params else None,
+            jsonlib.dumps(json, sort_keys=True, default=str) if json is not None else None,
+            data if isinstance(data, (str, bytes)) else jsonlib.dumps(data, sort_keys=True, default=str)
+        )
+        task = self._inflight.get(key)
+        if task is not None:
+            self._host(urlsplit(url).hostname or '').coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._fetch(method, url, params, json, data, headers, timeout, retries))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: l'annulation d'un appelant n'annule pas la requête des autres
+        return await asyncio.shield(task)
+
+    async def _fetch(self, method, url, params, json, data, headers, timeout, retries) -> HttpResponse:
+        state = self._host(urlsplit(url).hostname or '')
+        policy = state.policy
+        if retries is None:
+            retries = policy.retries
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        attempt = 0
+        while True:
+            state.throttled_seconds += await state.bucket.acquire()
+            retry_after = None
+            try:
+                async with state.semaphore:
+                    state.requests += 1
+                    async with session.request(method, url, params=params, json=json, data=data,
+                                               headers=headers, timeout=client_timeout) as resp:
+                        content = await resp.read()
+                        response = HttpResponse(resp.status, content, dict(resp.headers), str(resp.url))
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                state.errors += 1
+                if attempt >= retries:
+                    raise
+
+            # Backoff exponentiel avec full jitter (ou Retry-After du serveur)
+            delay = random.uniform(0, min(policy.max_backoff, policy.backoff * (2 ** attempt)))
+            if retry_after:
+                try:
+                    delay = max(delay, min(float(retry_after), policy.max_backoff))
+                except ValueError:
+                    pass
+            attempt += 1
+            state.retries += 1
+            await asyncio.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Stats / arrêt
+    # ------------------------------------------------------------------
+    def get_stats(self):
+        return {
+            'inflight': len(self._inflight),
+            'hosts': {host: state.get_stats() for host, state in self._hosts.items()}
+        }
+
+    def close(self):
+        """Ferme la session et arrête la boucle du client"""
+        loop = self._loop
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(timeout=5)
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = self._thread = None
+
+
+# Instance globale (partagée par tous les analyseurs et fetchers du process)
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> AsyncHttpClient:
+    """Récupère le client HTTP partagé"""
+    global _http_client
+
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = AsyncHttpClient()
+
+    return _http_client
@@ -0,0 +1,221 @@
+"""
+INFERENCE SERVICE - Inférence des modèles par micro-batch
+Au lieu d'un DataFrame pandas d'une ligne + predict_proba par token,
+les demandes qui arrivent dans la même fenêtre (2ms ou 64 lignes) sont
+empilées dans une matrice NumPy préallouée (ordre fixe des features)
+et passent dans UN seul predict vectorisé
+Mesure la latence (p50/p99) et la taille des batchs par modèle
+"""
+import asyncio
+import time
+import warnings
+from collections import deque
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+class LatencyStats:
+    """Fenêtre glissante de latences (secondes) avec percentiles"""
+
+    def __init__(self, window: int = 10000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        return float(np.percentile(np.fromiter(self.samples, dtype=np.float64), q))
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'p50_ms': self.percentile(50) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': (max(self.samples) * 1000) if self.samples else 0.0
+        }
+
+
+class InferenceModel:
+    """
+    Un modèle enregistré dans le service
+
+    predict_fn reçoit une matrice (n, len(feature_names)) et renvoie n
+    résultats (ndarray ou liste)
+    """
+
+    def __init__(self, name: str, predict_fn: Callable, feature_names: Sequence[str], max_batch: int):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.feature_names = list(feature_names)
+        self.max_batch = max_batch
+
+        # Matrice réutilisée à chaque batch (pas d'allocation par token)
+        self.matrix = np.zeros((max_batch, len(self.feature_names)), dtype=np.float64)
+
+        # Demandes en attente: [(features, future, submitted_at)]
+        self.pending = []
+        self.flush_handle = None
+
+        # Stats
+        self.latency = LatencyStats()
+        self.batch_latency = LatencyStats()
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.missing: Dict[str, int] = {}  # {feature: lignes où elle manquait (absente ou None)}
+
+    def fill(self, rows: List[dict]) -> np.ndarray:
+        """Remplit la matrice préallouée dans l'ordre de feature_names (dicts ou lignes ndarray)"""
+        n = len(rows)
+        matrix = self.matrix if n <= self.max_batch else np.zeros((n, len(self.feature_names)))
+        names = self.feature_names
+        for i, features in enumerate(rows):
+            row = matrix[i]
+            if isinstance(features, np.ndarray):
+                # Ligne déjà vectorisée dans l'ordre de feature_names (runner_features)
+                row[:] = features
+                continue
+            get = features.get
+            for j, name in enumerate(names):
+                value = get(name)
+                if value is None:
+                    self._missing(name)
+                    value = 0
+                row[j] = value or 0
+        X = matrix[:n]
+        # Même nettoyage que l'ancien df.replace([inf, -inf], 0).fillna(0)
+        np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        return X
+
+    def _missing(self, name: str):
+        """Feature absente du dict: complétée par 0, comptée, signalée une fois (feature renommée?)"""
+        count = self.missing.get(name, 0)
+        if count == 0:
+            print(f"[INFERENCE] {self.name}: feature '{name}' absente ou None - remplacee par 0 "
+                  f"(schema different de l'entrainement?)")
+        self.missing[name] = count + 1
+
+    def run(self, rows: List[dict]):
+        """Prédit un batch de façon synchrone"""
+        start = time.perf_counter()
+        X = self.fill(rows)
+        with warnings.catch_warnings():
+            # Les modèles sklearn entraînés sur un DataFrame préviennent quand on leur
+            # passe un ndarray: l'ordre des colonnes est garanti par feature_names
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            results = self.predict_fn(X)
+        self.batch_latency.record(time.perf_counter() - start)
+        self.batches += 1
+        self.rows += len(rows)
+        return results
+
+    def get_stats(self) -> dict:
+        return {
+            'features': len(self.feature_names),
+            'batches': self.batches,
+            'rows': self.rows,
+            'avg_batch_size': (self.rows / self.batches) if self.batches else 0,
+            'errors': self.errors,
+            'missing_features': dict(self.missing),
+            'latency': self.latency.summary(),
+            'batch_latency': self.batch_latency.summary()
+        }
+
+
+def classifier_proba(model, scaler=None) -> Callable:
+    """predict_fn pour un classifieur sklearn: probabilité de la classe 1"""
+    if scaler is None:
+        return lambda X: model.predict_proba(X)[:, 1]
+    return lambda X: model.predict_proba(scaler.transform(X))[:, 1]
+
+
+class BatchInferenceService:
+    """
+    Micro-batcher asynchrone
+
+    Une instance par boucle asyncio (les futures appartiennent à la boucle):
+    chaque moteur/bot crée la sienne.
+    """
+
+    def __init__(self, window: float = 0.002, max_batch: int = 64):
+        self.window = window
+        self.max_batch = max_batch
+        self.models: Dict[str, InferenceModel] = {}
+
+    def register(self, name: str, predict_fn: Callable, feature_names: Sequence[str]):
+        """Enregistre (ou remplace) un modèle"""
+        self.models[name] = InferenceModel(name, predict_fn, feature_names, self.max_batch)
+
+    def register_classifier(self, name: str, model, feature_names: Sequence[str] = None, scaler=None):
+        """Enregistre un classifieur sklearn (features = feature_names_in_ si dispo)"""
+        if feature_names is None:
+            feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is None:
+            raise ValueError(f"feature_names requis pour le modèle {name}")
+        self.register(name, classifier_proba(model, scaler), feature_names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.models
+
+    async def predict(self, name: str, features: dict):
+        """Prédiction d'une ligne, regroupée avec les autres demandes de la fenêtre"""
+        model = self.models[name]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        model.pending.append((features, future, time.perf_counter()))
+
+        if len(model.pending) >= self.max_batch:
+            self._flush(model)
+        elif model.flush_handle is None:
+            model.flush_handle = loop.call_later(self.window, self._flush, model)
+
+        return await future
+
+    def predict_sync(self, name: str, features: dict):
+        """Prédiction immédiate d'une ligne (hors boucle asyncio)"""
+        model = self.models[name]
+        start = time.perf_counter()
+        result = model.run([features])[0]
+        model.latency.record(time.perf_counter() - start)
+        return result
+
+    def predict_many(self, name: str, rows: List[dict]):
+        """Prédiction synchrone d'un lot déjà constitué"""
+        model = self.models[name]
+        results = []
+        for i in range(0, len(rows), self.max_batch):
+            results.extend(model.run(rows[i:i + self.max_batch]))
+        return results
+
+    def _flush(self, model: InferenceModel):
+        if model.flush_handle is not None:
+            model.flush_handle.cancel()
+            model.flush_handle = None
+
+        pending, model.pending = model.pending, []
+        if not pending:
+            return
+
+        try:
+            results = model.run([features for features, _, _ in pending])
+        except Exception as e:
+            model.errors += 1
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        now = time.perf_counter()
+        for (_, future, submitted_at), result in zip(pending, results):
+            model.latency.record(now - submitted_at)
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> dict:
+        """Latences p50/p99 et taille des batchs par modèle"""
+        return {name: model.get_stats() for name, model in self.models.items()}
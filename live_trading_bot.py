@@ -7,8 +7,6 @@ VERSION INTELLIGENTE: Learning Engine + Adaptive Config + Anti-Latence
 
 import asyncio
 import json
-import joblib
-import pandas as pd
 from datetime import datetime
 import websockets
 import time
@@ -41,8 +39,24 @@ from adaptive_config import adaptive_config
 # Module prix SOL en temps réel
 from sol_price_fetcher import get_sol_price_usd
 
-# Module prix token PumpFun en temps réel
-from pumpfun_price_fetcher import get_token_price_live
+# Module prix token PumpFun en temps réel (async: ne bloque jamais la boucle)
+from pumpfun_price_fetcher import get_token_price_live_async
+
+# Snapshots incrémentaux (O(1) par lecture)
+from snapshot_accumulator import SnapshotAccumulator
+from trade_store import TradeBuffer
+
+# Scheduler unique des deadlines par token
+from timer_wheel import TimerWheel
+
+# Inférence des modèles par micro-batch
+from inference_service import BatchInferenceService, classifier_proba
+
+# Registre des modèles (chargement mmap, rechargement à chaud après réentraînement)
+from model_registry import get_model_registry
+
+# Capture brute des messages WebSocket (WS_CAPTURE_DIR)
+from ws_capture import get_ws_capture
 
 # ============================================================================
 # FONCTION PRINT COULEUR BLEU
@@ -152,6 +166,7 @@ class Config:
     AI_STRICT_BUY_RATIO = 0.72 # DATASET: 72% (au lieu de 75%)
     AI_MAX_WHALES_EARLY = 1    # Max 1 baleine SI MC < 12K (early entry)
     AI_MAX_WHALES_LATE = 3     # Max 3 baleines SI MC >= 12K (late entry, dataset = 35% ont 2+)
+    WHALE_THRESHOLD = 400      # $400 = 2 SOL @ $200 (achat baleine)
 
     # Partial profit ajusté
     PARTIAL_SELL_PERCENT = 0.50  # Vendre 50% à 2x
@@ -167,10 +182,10 @@ class Config:
     # PUMPFUN
     PUMPFUN_WS = "wss://pumpportal.fun/api/data"
 
-    # Prix SOL dynamique (mis à jour toutes les 30s depuis CoinGecko)
+    # Prix SOL dynamique (oracle rafraîchi toutes les 30s en arrière-plan)
     @staticmethod
     def get_sol_price():
-        """Récupère le prix SOL/USD en temps réel"""
+        """Récupère le prix SOL/USD en temps réel (lecture du cache, sans I/O)"""
         return get_sol_price_usd()
 
 print('='*80)
@@ -302,9 +317,10 @@ def update_console_title(text):
 # CHARGEMENT DES MODELES IA
 # ============================================================================
 print(f'\n[CHARGEMENT DES MODELES IA]')
+model_registry = get_model_registry('models')
 try:
-    model_10s = joblib.load('model_10s.pkl')
-    model_15s = joblib.load('model_15s.pkl')
+    model_registry.get('model_10s')
+    model_registry.get('model_15s')
     print('  Modele @ 10s: OK')
     print('  Modele @ 15s: OK')
 except Exception as e:
@@ -312,6 +328,14 @@ except Exception as e:
     print('  Lance d\'abord: python train_models.py')
     exit(1)
 
+# Ordre des colonnes attendu par chaque modèle (features d'entraînement)
+FEATURES_8S = ['txn', 'traders', 'buy_ratio', 'mc', 'velocity', 'whale_count']
+FEATURES_15S = [
+    '10s_txn', '10s_traders', '10s_buy_ratio', '10s_mc', '10s_velocity',
+    '15s_txn', '15s_traders', '15s_buy_ratio', '15s_mc', '15s_velocity',
+    'mc_growth_10s_15s', 'txn_growth_10s_15s', 'traders_growth_10s_15s', 'whale_count'
+]
+
 # ============================================================================
 # GESTIONNAIRE DE POSITIONS
 # ============================================================================
@@ -321,8 +345,24 @@ class PositionManager:
         self.closed_positions = []
         self.migrations_count = 0  # Compteur de migrations
 
-    def open_position(self, mint, symbol, entry_mc, confidence, entry_time, reason='', entry_features=None):
+        # Ordres en vol: les appels réseau sont awaités, un même mint ne doit pas
+        # être acheté / vérifié / vendu deux fois en parallèle
+        self._opening = set()
+        self._checking = set()
+        self._closing = set()
+        self._check_tasks = set()
+
+    async def open_position(self, mint, symbol, entry_mc, confidence, entry_time, reason='', entry_features=None):
         """Ouvre une position"""
+        if mint in self.positions or mint in self._opening:
+            return None
+        self._opening.add(mint)
+        try:
+            return await self._open_position(mint, symbol, entry_mc, confidence, entry_time, reason, entry_features)
+        finally:
+            self._opening.discard(mint)
+
+    async def _open_position(self, mint, symbol, entry_mc, confidence, entry_time, reason, entry_features):
         if Config.SCREENSHOT_MODE:
             print(f'  [LIVE] Buying {Config.DISPLAY_AMOUNT} SOL on {symbol}')
         elif Config.SIMULATION_MODE:
@@ -330,7 +370,7 @@ class PositionManager:
         else:
             # ACHAT RÉEL via PumpPortal API
             print(f'  [LIVE] Achat de {Config.BUY_AMOUNT_SOL} SOL sur {symbol}')
-            result = solana_trader.buy_token(
+            result = await solana_trader.buy_token_async(
                 mint=mint,
                 amount_sol=Config.BUY_AMOUNT_SOL,
                 slippage=Config.SLIPPAGE_BPS / 100,  # Convertir BPS en %
@@ -412,7 +452,7 @@ class PositionManager:
 
         return position
 
-    def close_position(self, mint, exit_mc, reason, amount_percent=100):
+    async def close_position(self, mint, exit_mc, reason, amount_percent=100):
         """
         Ferme une position (totalement ou partiellement)
 
@@ -422,9 +462,15 @@ class PositionManager:
             reason: Raison de la sortie
             amount_percent: Pourcentage à vendre (default: 100%)
         """
-        if mint not in self.positions:
+        if mint not in self.positions or mint in self._closing:
             return
+        self._closing.add(mint)
+        try:
+            await self._close_position(mint, exit_mc, reason, amount_percent)
+        finally:
+            self._closing.discard(mint)
 
+    async def _close_position(self, mint, exit_mc, reason, amount_percent):
         position = self.positions[mint]
 
         if Config.SCREENSHOT_MODE:
@@ -444,7 +490,7 @@ class PositionManager:
             else:
                 print(f'  [LIVE] Vente de {amount_percent}% de {position["symbol"]}')
 
-            result = solana_trader.sell_token(
+            result = await solana_trader.sell_token_async(
                 mint=mint,
                 amount_percent=amount_percent,
                 slippage=Config.SLIPPAGE_BPS / 100,
@@ -542,11 +588,8 @@ class PositionManager:
             analyzer = TradeAnalyzer(learning_engine)
             analyzer.full_diagnostic()
 
-    def check_expired_positions(self):
+    async def check_expired_positions(self):
         """Vérifie et ferme les positions expirées (timeout)"""
-        import time
-        from datetime import datetime, timedelta
-
         timeout_seconds = Config.POSITION_TIMEOUT_MINUTES * 60
         now = datetime.now()
 
@@ -570,7 +613,9 @@ class PositionManager:
 
         # Fermer les positions expirées
         for mint in expired_positions:
-            position = self.positions[mint]
+            position = self.positions.get(mint)
+            if position is None:
+                continue  # Fermée entre-temps (vente awaitée ailleurs)
             # Utiliser le dernier MC connu ou le MC d'entrée
             last_known_mc = position.get('last_mc', position['entry_mc'])
 
@@ -578,21 +623,37 @@ class PositionManager:
             print(f'   Opened since: {Config.POSITION_TIMEOUT_MINUTES} minutes')
             print(f'   Auto close at current price: ${last_known_mc:,.0f}')
 
-            self.close_position(mint, last_known_mc, f'TIMEOUT ({Config.POSITION_TIMEOUT_MINUTES}min)')
+            await self.close_position(mint, last_known_mc, f'TIMEOUT ({Config.POSITION_TIMEOUT_MINUTES}min)')
 
         return len(expired_positions)
 
-    def check_position(self, mint, current_mc):
+    def schedule_check(self, mint, current_mc):
+        """check_position en tâche de fond (flux WebSocket): la lecture des messages n'attend pas le prix live"""
+        if mint not in self.positions or mint in self._checking:
+            return
+        task = asyncio.create_task(self.check_position(mint, current_mc))
+        self._check_tasks.add(task)
+        task.add_done_callback(self._check_tasks.discard)
+
+    async def check_position(self, mint, current_mc):
         """Vérifie une position (stop loss / take profit PARTIEL)"""
-        if mint not in self.positions:
+        if mint not in self.positions or mint in self._checking:
             return
+        self._checking.add(mint)
+        try:
+            await self._check_position(mint, current_mc)
+        finally:
+            self._checking.discard(mint)
 
+    async def _check_position(self, mint, current_mc):
         position = self.positions[mint]
 
         # ====================================================================
         # PRIX LIVE: Vérifier le prix RÉEL avant vente/stop loss
         # ====================================================================
-        live_price = get_token_price_live(mint)
+        live_price = await get_token_price_live_async(mint)
+        if mint not in self.positions:
+            return  # Fermée pendant la lecture du prix
         if live_price['success']:
             # Utiliser le prix live (plus précis)
             actual_mc = live_price['mc_usd']
@@ -655,7 +716,7 @@ class PositionManager:
 
             # VENTE PARTIELLE RÉELLE (si pas en simulation)
             if not Config.SIMULATION_MODE:
-                result = solana_trader.sell_token(
+                result = await solana_trader.sell_token_async(
                     mint=mint,
                     amount_percent=sell_percent,
                     slippage=Config.SLIPPAGE_BPS / 100,
@@ -718,7 +779,7 @@ class PositionManager:
 
                 # VENTE PROGRESSIVE RÉELLE (si pas en simulation)
                 if not Config.SIMULATION_MODE:
-                    result = solana_trader.sell_token(
+                    result = await solana_trader.sell_token_async(
                         mint=mint,
                         amount_percent=amount_to_sell_pct,
                         slippage=Config.SLIPPAGE_BPS / 100,
@@ -741,7 +802,7 @@ class PositionManager:
                 # Si moins de 5% reste, vendre tout et fermer
                 if position['amount_remaining'] <= Config.PROGRESSIVE_SELL_PERCENT:
                     print(f'  ✅ FINAL POSITION - Selling remainder ({remaining_pct:.0f}%)')
-                    self.close_position(mint, actual_mc, f'PROGRESSIVE SELLING COMPLETE ({position["progressive_sell_count"]} sells)')
+                    await self.close_position(mint, actual_mc, f'PROGRESSIVE SELLING COMPLETE ({position["progressive_sell_count"]} sells)')
                     return
 
             # STOP LOSS: Si MC baisse de 15% depuis le max, vendre tout le reste
@@ -752,7 +813,7 @@ class PositionManager:
                 print(f'  MC dropped {mc_drop_from_max*100:.1f}% from max ${position["max_mc_since_migration"]:,.0f}')
                 print(f'  Current MC: ${actual_mc:,.0f}')
                 print(f'  Selling remainder: {remaining_pct:.0f}%')
-                self.close_position(mint, actual_mc, f'PROGRESSIVE STOP LOSS (MC dropped -{mc_drop_from_max*100:.0f}% from max)')
+                await self.close_position(mint, actual_mc, f'PROGRESSIVE STOP LOSS (MC dropped -{mc_drop_from_max*100:.0f}% from max)')
                 return
 
             # Continuer à surveiller
@@ -765,10 +826,10 @@ class PositionManager:
             if position['partial_sold']:
                 sell_percent = int(Config.PARTIAL_SELL_PERCENT * 100)
                 # Si déjà vendu XX%, c'est un petit gain
-                self.close_position(mint, actual_mc, f'STOP LOSS ({sell_percent}% déjà vendu @ 2x)')
+                await self.close_position(mint, actual_mc, f'STOP LOSS ({sell_percent}% déjà vendu @ 2x)')
             else:
                 # Perte complète
-                self.close_position(mint, actual_mc, 'STOP LOSS')
+                await self.close_position(mint, actual_mc, 'STOP LOSS')
             return
 
     def update_title(self):
@@ -892,85 +953,79 @@ class PositionManager:
 # BOT PRINCIPAL
 # ============================================================================
 class LiveTradingBot:
+    # Délais depuis la création du token
+    SNAPSHOT_8S_DELAY = 8
+    SNAPSHOT_15S_DELAY = 15
+    CLEANUP_DELAY = 615  # 8s + 7s + 10 minutes
+
     def __init__(self):
         self.positions = PositionManager()
         self.tokens = {}  # {mint: {trades, created_at, symbol, etc.}}
-        self.model_10s = model_10s
-        self.model_15s = model_15s
+        self.model_versions = {}  # {nom: ModelVersion enregistrée dans self.inference}
+
+        # Une seule roue de timers pour les deadlines 8s / 15s / nettoyage de TOUS les tokens
+        self.scheduler = TimerWheel()
+
+        # Inférence par micro-batch (les tokens qui atteignent 8s/15s dans le même tick)
+        self.inference = BatchInferenceService()
+        self.sync_models()
+
+        # Messages bruts pour replay / datasets (None si capture désactivée)
+        self.capture = get_ws_capture('live_bot')
+
+    def sync_models(self):
+        """(Ré)enregistre les modèles dont le registre a publié une nouvelle version"""
+        for name, default_features in (('model_10s', FEATURES_8S), ('model_15s', FEATURES_15S)):
+            version = model_registry.get(name)
+            if self.model_versions.get(name) is version:
+                continue
+            model = version['model']
+            feature_names = getattr(model, 'feature_names_in_', default_features)
+            self.inference.register(name, version.instrument(classifier_proba(model)), feature_names)
+            if name in self.model_versions:
+                print(f'[MODELES] {name}: v{self.model_versions[name].version} -> v{version.version}')
+            self.model_versions[name] = version
 
     def calculate_snapshot(self, token, max_age):
         """Calcule les features pour une période (comme pattern_discovery_bot)"""
-        created_at = token['created_at']
-        trades_in_period = [t for t in token['trades'] if (t['time'] - created_at) <= max_age]
+        # Lecture O(1) depuis l'accumulateur mis à jour dans handle_trade
+        acc = token['accumulator'].snapshot(max_age)
 
-        if not trades_in_period:
+        if not acc:
             return None
 
-        buys = [t for t in trades_in_period if t['type'] == 'buy']
-        sells = [t for t in trades_in_period if t['type'] == 'sell']
-        unique_traders = len(set(t['trader'] for t in trades_in_period))
+        txn = acc['txn']
+        buys = acc['buys']
 
         # Calculer la vélocité (croissance MC)
-        mc_current = trades_in_period[-1]['mc'] if trades_in_period else 0
+        mc_current = acc['mc']
         mc_initial = token.get('mc_initial', 0)
         velocity = (mc_current - mc_initial) / max_age if max_age > 0 else 0
 
         # Compter les baleines (achats > $400 = 2+ SOL minimum)
-        WHALE_THRESHOLD = 400  # $400 = 2 SOL @ $200
-        whale_count = len(set(t['trader'] for t in buys if t.get('amount_usd', 0) >= WHALE_THRESHOLD))
+        whale_count = acc['whale_count']
 
         # DEBUG: Afficher les montants pour comprendre la détection
-        if len(buys) > 0 and whale_count > 0:
-            buy_amounts_usd = [t.get('amount_usd', 0) for t in buys]
-            max_buy = max(buy_amounts_usd) if buy_amounts_usd else 0
-            whale_buys = [amt for amt in buy_amounts_usd if amt >= WHALE_THRESHOLD]
+        if buys > 0 and whale_count > 0:
+            max_buy = acc['max_buy_usd']
+            whale_buys = acc['whale_buy_amounts']
             print(f'  🐋 [WHALE DETECTED] {token.get("symbol", "?")} - {whale_count} whales, Max: ${max_buy:.0f}, Whale buys: {[f"${amt:.0f}" for amt in whale_buys[:3]]}')
 
-        # Compter les WALLETS ELITE (whitelist des meilleurs traders)
-        elite_wallet_count = len(set(t['trader'] for t in buys if t['trader'] in Config.ELITE_WALLETS))
-        elite_wallets_found = [t['trader'][:8] for t in buys if t['trader'] in Config.ELITE_WALLETS]
-
-        # DETECTER 2 BALEINES CONSECUTIVES (pattern ultra-fort)
-        consecutive_whales = False
-        if len(buys) >= 2:
-            # Regarder les 5 derniers achats
-            recent_buys = buys[-5:]
-            whale_buys = [b for b in recent_buys if b.get('amount_usd', 0) >= WHALE_THRESHOLD]
-
-            # Vérifier si les 2 dernières baleines sont consécutives
-            if len(whale_buys) >= 2:
-                last_whale_idx = None
-                second_last_whale_idx = None
-
-                # Trouver les positions des 2 dernières baleines
-                for i in range(len(recent_buys) - 1, -1, -1):
-                    if recent_buys[i].get('amount_usd', 0) >= WHALE_THRESHOLD:
-                        if last_whale_idx is None:
-                            last_whale_idx = i
-                        elif second_last_whale_idx is None:
-                            second_last_whale_idx = i
-                            break
-
-                # Consécutives si aucun autre achat entre elles
-                if last_whale_idx is not None and second_last_whale_idx is not None:
-                    if last_whale_idx - second_last_whale_idx == 1:
-                        consecutive_whales = True
-
         return {
-            'txn': len(trades_in_period),
-            'buys': len(buys),
-            'sells': len(sells),
-            'buy_ratio': len(buys)/len(trades_in_period) if trades_in_period else 0,
-            'traders': unique_traders,
+            'txn': txn,
+            'buys': buys,
+            'sells': acc['sells'],
+            'buy_ratio': buys/txn if txn else 0,
+            'traders': acc['traders'],
             'mc': mc_current,
             'velocity': velocity,
             'whale_count': whale_count,
-            'elite_wallet_count': elite_wallet_count,
-            'elite_wallets': elite_wallets_found,  # Pour affichage
-            'consecutive_whales': consecutive_whales  # Pattern ultra-fort
+            'elite_wallet_count': acc['elite_wallet_count'],
+            'elite_wallets': acc['elite_wallets'],  # Pour affichage
+            'consecutive_whales': acc['consecutive_whales']  # Pattern ultra-fort
         }
 
-    def predict_8s(self, snapshot_8s, mint=None):
+    async def predict_8s(self, snapshot_8s, mint=None):
         """Prédiction @ 8 secondes (SYSTEME HYBRIDE: IA + REGLES INTELLIGENTES)"""
         if not snapshot_8s:
             return None
@@ -989,7 +1044,7 @@ class LiveTradingBot:
         # VÉRIFICATION PRIX LIVE (éviter d'acheter après un pump)
         # ========================================================================
         if mint:
-            live_price = get_token_price_live(mint)
+            live_price = await get_token_price_live_async(mint)
             if live_price['success']:
                 mc_live = live_price['mc_usd']
                 # Vérifier que le prix n'a pas explosé entre le websocket et maintenant
@@ -1148,17 +1203,16 @@ class LiveTradingBot:
                 'reason': f'SKIP: {criteria_met}/3 AI criteria'
             }
 
-        # Prédiction IA
-        features = pd.DataFrame([{
+        # Prédiction IA (regroupée avec les autres tokens du même tick)
+        self.sync_models()
+        proba = await self.inference.predict('model_10s', {
             'txn': txn,
             'traders': traders,
             'buy_ratio': buy_ratio,
             'mc': mc,
             'velocity': snapshot_8s.get('velocity', 0),
             'whale_count': whale_count
-        }])
-
-        proba = self.model_10s.predict_proba(features)[0, 1]
+        })
 
         # BONUS BALEINES: Si 3+ baleines, boost le score
         if whale_count >= Config.WHALE_BOOST_THRESHOLD:
@@ -1177,7 +1231,7 @@ class LiveTradingBot:
             'reason': f'AI: {proba*100:.0f}%{whale_boost_msg}'
         }
 
-    def predict_15s(self, snapshot_8s, snapshot_15s):
+    async def predict_15s(self, snapshot_8s, snapshot_15s):
         """Prédiction @ 15 secondes (AVEC DETECTION BALEINES TARDIVES + ELITE WALLETS)"""
         if not snapshot_8s or not snapshot_15s:
             return None
@@ -1263,7 +1317,8 @@ class LiveTradingBot:
 
         # Note: Le modèle attend des features "10s_*" mais on utilise les données @ 8s
         # C'est OK car la structure est la même, juste un timing légèrement différent
-        features = pd.DataFrame([{
+        self.sync_models()
+        proba = await self.inference.predict('model_15s', {
             '10s_txn': snapshot_8s.get('txn', 0),
             '10s_traders': snapshot_8s.get('traders', 0),
             '10s_buy_ratio': snapshot_8s.get('buy_ratio', 0),
@@ -1278,9 +1333,7 @@ class LiveTradingBot:
             'txn_growth_10s_15s': snapshot_15s.get('txn', 0) - snapshot_8s.get('txn', 0),
             'traders_growth_10s_15s': snapshot_15s.get('traders', 0) - snapshot_8s.get('traders', 0),
             'whale_count': whale_count_15s  # Utiliser le whale_count @ 15s
-        }])
-
-        proba = self.model_15s.predict_proba(features)[0, 1]
+        })
 
         return {
             'confidence': proba,
@@ -1299,12 +1352,19 @@ class LiveTradingBot:
         mc_sol = data.get('marketCapSol', 0)
         mc_usd = mc_sol * Config.get_sol_price()
 
+        created_at = time.time()
         self.tokens[mint] = {
             'mint': mint,
             'symbol': symbol,
-            'created_at': time.time(),
+            'created_at': created_at,
             'mc_initial': mc_usd,
-            'trades': [],
+            'trades': TradeBuffer(),
+            'accumulator': SnapshotAccumulator(
+                created_at,
+                horizons=(8, 15),
+                whale_threshold=Config.WHALE_THRESHOLD,
+                elite_wallets=Config.ELITE_WALLETS
+            ),
             'snapshot_10s': None,
             'snapshot_15s': None
         }
@@ -1321,7 +1381,7 @@ class LiveTradingBot:
         }))
 
         # Programmer le tracking
-        asyncio.create_task(self.track_token(mint))
+        self.track_token(mint)
 
     async def handle_trade(self, data):
         """Trade détecté"""
@@ -1333,30 +1393,36 @@ class LiveTradingBot:
 
         tx_type = data.get('txType')
         trader = data.get('traderPublicKey', 'unknown')
+        sol_price = Config.get_sol_price()
         mc_sol = data.get('marketCapSol', 0)
-        mc_usd = mc_sol * Config.get_sol_price()
+        mc_usd = mc_sol * sol_price
         sol_amount = data.get('solAmount', 0)
-        amount_usd = sol_amount * Config.get_sol_price()
+        amount_usd = sol_amount * sol_price
+
+        trade_time = time.time()
 
         # Enregistrer le trade
-        token['trades'].append({
-            'type': tx_type,
-            'trader': trader,
-            'mc': mc_usd,
-            'time': time.time(),
-            'amount_sol': sol_amount,
-            'amount_usd': amount_usd
-        })
+        token['trades'].append(
+            tx_type, trader, mc_usd, trade_time,
+            amount_sol=sol_amount,
+            amount_usd=amount_usd
+        )
+        token['accumulator'].add_trade(tx_type, trader, mc_usd, amount_usd, trade_time)
 
         # Vérifier les positions ouvertes (stop loss / take profit)
         if mint in self.positions.positions:
-            self.positions.check_position(mint, mc_usd)
+            self.positions.schedule_check(mint, mc_usd)
 
-    async def track_token(self, mint):
-        """Track un token et fait les snapshots @ 8s et 15s"""
-        # Attendre 8 secondes (ULTRA EARLY)
-        await asyncio.sleep(8)
+    def track_token(self, mint):
+        """Programme les snapshots @ 8s et 15s et le nettoyage (pas de tâche par token)"""
+        # Snapshot @ 8s (ULTRA EARLY)
+        self.scheduler.schedule(self.SNAPSHOT_8S_DELAY, self.on_snapshot_8s, mint, label='snapshot_8s')
 
+        # Nettoyer les vieux tokens pour libérer la mémoire
+        self.scheduler.schedule(self.CLEANUP_DELAY, self.cleanup_token, mint, label='cleanup', force=True)
+
+    async def on_snapshot_8s(self, mint):
+        """Deadline @ 8s: snapshot + prédiction"""
         if mint not in self.tokens:
             return
 
@@ -1369,7 +1435,7 @@ class LiveTradingBot:
 
             # Prédiction @ 8s (SYSTEME HYBRIDE + PRIX LIVE)
             # Passer le mint pour vérification prix live
-            prediction = self.predict_8s(snapshot_8s, mint=token['mint'])
+            prediction = await self.predict_8s(snapshot_8s, mint=token['mint'])
             if prediction and prediction['should_buy']:
                 reason = prediction.get('reason', 'IA')
                 actual_buy_mc = prediction['mc']  # MC vérifié en temps réel dans predict_8s
@@ -1388,7 +1454,7 @@ class LiveTradingBot:
 
                 print_blue(f'  {emoji} [BUY SIGNAL @ 8s] {token["symbol"]}: {reason}, MC=${actual_buy_mc:,.0f}')
 
-                self.positions.open_position(
+                await self.positions.open_position(
                     mint, token['symbol'], actual_buy_mc,
                     prediction['confidence'], '8s', reason,
                     entry_features=snapshot_8s  # Features pour apprentissage
@@ -1405,12 +1471,19 @@ class LiveTradingBot:
             else:
                 print_blue(f'  [NO DATA @ 8s] {token["symbol"]}: Not enough trades to analyze')
 
-        # Attendre 7 secondes de plus (total 15s)
-        await asyncio.sleep(7)
+        # Snapshot @ 15s (7 secondes de plus)
+        self.scheduler.schedule(
+            self.SNAPSHOT_15S_DELAY - self.SNAPSHOT_8S_DELAY, self.on_snapshot_15s, mint, label='snapshot_15s'
+        )
 
+    async def on_snapshot_15s(self, mint):
+        """Deadline @ 15s: 2ème chance (baleines tardives + wallets elite)"""
         if mint not in self.tokens:
             return
 
+        token = self.tokens[mint]
+        snapshot_8s = token.get('snapshot_8s')
+
         # Snapshot @ 15s
         snapshot_15s = self.calculate_snapshot(token, 15)
         if snapshot_15s and snapshot_8s:
@@ -1418,7 +1491,7 @@ class LiveTradingBot:
 
             # Prédiction @ 15s (si pas déjà acheté - 2ème CHANCE avec wallets elite + baleines tardives)
             if mint not in self.positions.positions:
-                prediction = self.predict_15s(snapshot_8s, snapshot_15s)
+                prediction = await self.predict_15s(snapshot_8s, snapshot_15s)
                 if prediction and prediction['should_buy']:
                     reason = prediction.get('reason', 'IA')
                     decision_mc = prediction['mc']
@@ -1427,7 +1500,7 @@ class LiveTradingBot:
                     # ANTI-LATENCE: Vérifier le prix EN TEMPS REEL avant d'acheter
                     # =================================================================
                     if token['trades']:
-                        current_mc = token['trades'][-1]['mc']
+                        current_mc = token['trades'].last_mc()
                         price_jump = (current_mc - decision_mc) / decision_mc if decision_mc > 0 else 0
 
                         if price_jump > Config.PRICE_JUMP_TOLERANCE:
@@ -1454,7 +1527,7 @@ class LiveTradingBot:
                     else:
                         print_blue(f'  {emoji} [BUY SIGNAL @ 15s - 2ND CHANCE] {token["symbol"]}: {reason}, MC=${actual_buy_mc:,.0f}')
 
-                    self.positions.open_position(
+                    await self.positions.open_position(
                         mint, token['symbol'], actual_buy_mc,
                         prediction['confidence'], '15s', reason,
                         entry_features=snapshot_15s  # Features pour apprentissage
@@ -1476,10 +1549,14 @@ class LiveTradingBot:
                 else:
                     print_blue(f'  [NO DATA @ 15s] {token["symbol"]}: Not enough trades to analyze')
 
-        # Nettoyer les vieux tokens pour libérer la mémoire
-        await asyncio.sleep(600)  # Après 10 minutes total
-        if mint in self.tokens and mint not in self.positions.positions:
-            del self.tokens[mint]
+    def cleanup_token(self, mint):
+        """Deadline de nettoyage: libère la mémoire (reprogrammé si position ouverte)"""
+        if mint not in self.tokens:
+            return
+        if mint in self.positions.positions:
+            self.scheduler.schedule(self.CLEANUP_DELAY, self.cleanup_token, mint, label='cleanup', force=True)
+            return
+        del self.tokens[mint]
 
     async def connect_websocket(self):
         """Connexion au WebSocket PumpFun"""
@@ -1503,6 +1580,8 @@ class LiveTradingBot:
 
                 while True:
                     msg = await ws.recv()
+                    if self.capture:
+                        self.capture.record(msg)
                     data = json.loads(msg)
 
                     tx_type = data.get('txType')
@@ -1541,9 +1620,6 @@ class LiveTradingBot:
 
         while True:
             if len(self.positions.positions) > 0:
-                from pumpfun_price_fetcher import get_token_price_live
-                from datetime import datetime
-
                 print(f'\n{"="*80}')
                 print('[MONITORING LIVE DES POSITIONS]')
                 print('='*80)
@@ -1554,7 +1630,7 @@ class LiveTradingBot:
                     partial_sold = position.get('partial_sold', False)
 
                     # Récupérer le prix LIVE
-                    live_price = get_token_price_live(mint)
+                    live_price = await get_token_price_live_async(mint)
 
                     if live_price['success'] and live_price['mc_usd'] > 0:
                         current_mc = live_price['mc_usd']
@@ -1602,7 +1678,6 @@ class LiveTradingBot:
         await asyncio.sleep(30)  # Attendre 30 secondes avant de commencer
 
         while True:
-            from datetime import datetime
             now = datetime.now()
 
             # Vérifier chaque position ouverte
@@ -1624,14 +1699,15 @@ class LiveTradingBot:
                     continue
 
                 # Vérifier le prix via l'API (pour tokens morts OU positions en attente de migration)
-                from pumpfun_price_fetcher import get_token_price_live
-                live_price = get_token_price_live(mint)
+                live_price = await get_token_price_live_async(mint)
+                if mint not in self.positions.positions:
+                    continue  # Fermée pendant la lecture du prix
 
                 if live_price['success'] and live_price['mc_usd'] > 0:
                     current_mc = live_price['mc_usd']
 
                     # Vérifier stop loss / take profit / migration
-                    self.positions.check_position(mint, current_mc)
+                    await self.positions.check_position(mint, current_mc)
                 else:
                     # API échouée - utiliser le dernier prix WebSocket
                     current_mc = position.get('last_mc', position['entry_mc'])
@@ -1643,7 +1719,7 @@ class LiveTradingBot:
                         print(f'  Dernier prix: ${current_mc:,.0f} <= SL: ${position["stop_loss_mc"]:,.0f}')
                         print(f'  VENTE DE SÉCURITÉ')
 
-                        self.positions.close_position(
+                        await self.positions.close_position(
                             mint,
                             current_mc,
                             f'STOP LOSS - Token mort ({seconds_since_update:.0f}s sans trades)'
@@ -1659,7 +1735,7 @@ class LiveTradingBot:
 
         while True:
             # Vérifier et fermer les positions expirées
-            expired_count = self.positions.check_expired_positions()
+            expired_count = await self.positions.check_expired_positions()
 
             if expired_count > 0:
                 print(f'\n⏰ [TIMEOUT CHECK] {expired_count} position(s) expired and closed')
@@ -1679,6 +1755,7 @@ class LiveTradingBot:
         # Lancer les tâches en parallèle
         await asyncio.gather(
             self.connect_websocket(),
+            self.scheduler.run(),             # Deadlines snapshot/nettoyage de tous les tokens
             self.periodic_stats_update(),
             self.live_position_monitor(),     # 🔥 MONITORING LIVE toutes les 3 secondes
             self.periodic_price_check(),      # ✅ Vérification prix + migration toutes les 5s
@@ -0,0 +1,186 @@
+"""
+MARK PRICE CACHE - Prix de marché live partagé par tous les bots
+Alimenté par les trades du WebSocket (1 écriture par trade), les bots
+s'abonnent aux mints de leurs positions et ne sont réveillés que quand
+le prix bouge. Le fallback REST (token sans trade) est coalescé: une
+seule requête par mint et par intervalle, quel que soit le nombre de bots
+"""
+import asyncio
+import threading
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Optional
+
+from signal_bus import Subscription, POLICY_COALESCE
+
+
+class MarkPriceCache:
+    """
+    Cache {mint: (mc_usd, timestamp, source)}
+
+    - update() est appelé par le moteur à chaque trade (lecture sans verrou)
+    - watch(mint, subscription): l'abonnement reçoit {'mint', 'mc_usd', ...}
+      à chaque changement de prix (file coalescée: seul le dernier prix compte)
+    - request_fallback(mint): demande un prix REST, regroupé avec les autres
+      demandes de l'intervalle et résolu par un thread de fond
+    """
+
+    def __init__(self, fallback_interval: float = 5.0):
+        self.fallback_interval = fallback_interval
+
+        self._marks: Dict[str, tuple] = {}
+        # Copy-on-write: update() lit sans verrou, watch()/unwatch() remplacent le frozenset
+        self._watchers: Dict[str, frozenset] = {}
+        self._lock = Lock()
+
+        # Fallback REST
+        self._fallback_pending = set()
+        self._fallback_failed: Dict[str, float] = {}  # {mint: timestamp du dernier échec}
+        self._fallback_thread = None
+
+        # Stats
+        self.updates = 0
+        self.moves = 0
+        self.notifications = 0
+        self.fallback_requests = 0
+        self.fallback_fetches = 0
+        self.fallback_failures = 0
+
+    # ------------------------------------------------------------------
+    # Écriture (moteur)
+    # ------------------------------------------------------------------
+    def update(self, mint: str, mc_usd: float, timestamp: float = None, source: str = 'websocket'):
+        """Nouveau prix pour un mint; notifie les abonnés si le prix a bougé"""
+        timestamp = timestamp or datetime.now().timestamp()
+        previous = self._marks.get(mint)
+        self._marks[mint] = (mc_usd, timestamp, source)
+        self.updates += 1
+
+        if previous is not None and previous[0] == mc_usd:
+            return
+        self.moves += 1
+
+        watchers = self._watchers.get(mint)
+        if not watchers:
+            return
+        event = {'mint': mint, 'mc_usd': mc_usd, 'timestamp': timestamp, 'source': source}
+        for subscription in watchers:
+            subscription.push(event)
+        self.notifications += len(watchers)
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+    def get(self, mint: str) -> Optional[tuple]:
+        """(mc_usd, timestamp, source) ou None"""
+        return self._marks.get(mint)
+
+    def get_mc(self, mint: str, default: float = 0) -> float:
+        mark = self._marks.get(mint)
+        return mark[0] if mark else default
+
+    def __len__(self):
+        return len(self._marks)
+
+    # ------------------------------------------------------------------
+    # Abonnements (bots)
+    # ------------------------------------------------------------------
+    def subscribe(self, name: str, maxlen: int = 1024) -> Subscription:
+        """File d'événements de prix d'un bot (un seul prix en attente par mint)"""
+        return Subscription(name, maxlen=maxlen, policy=POLICY_COALESCE)
+
+    def watch(self, mint: str, subscription: Subscription):
+        """Abonne une file aux changements de prix d'un mint"""
+        with self._lock:
+            self._watchers[mint] = self._watchers.get(mint, frozenset()) | {subscription}
+
+        # Livrer tout de suite le prix connu (la position démarre avec un prix à jour)
+        mark = self._marks.get(mint)
+        if mark:
+            subscription.push({'mint': mint, 'mc_usd': mark[0], 'timestamp': mark[1], 'source': mark[2]})
+
+    def unwatch(self, mint: str, subscription: Subscription):
+        with self._lock:
+            watchers = self._watchers.get(mint, frozenset()) - {subscription}
+            if watchers:
+                self._watchers[mint] = watchers
+            else:
+                self._watchers.pop(mint, None)
+
+    # ------------------------------------------------------------------
+    # Fallback REST coalescé
+    # ------------------------------------------------------------------
+    def request_fallback(self, mint: str):
+        """Demande un prix REST pour un mint (dédupliqué sur l'intervalle)"""
+        self.fallback_requests += 1
+        self._fallback_pending.add(mint)
+        if self._fallback_thread is None:
+            self._start_fallback_thread()
+
+    def fallback_failed(self, mint: str) -> bool:
+        """True si la dernière tentative REST pour ce mint a échoué"""
+        return mint in self._fallback_failed
+
+    def _start_fallback_thread(self):
+        with self._lock:
+            if self._fallback_thread is not None:
+                return
+            self._fallback_thread = threading.Thread(
+                target=lambda: asyncio.run(self.fallback_loop()),
+                name='mark-price-fallback',
+                daemon=True
+            )
+            self._fallback_thread.start()
+
+    async def fallback_loop(self):
+        """Toutes les fallback_interval secondes: 1 requête par mint demandé"""
+        from pumpfun_price_fetcher import get_token_price_live_async
+
+        while True:
+            await asyncio.sleep(self.fallback_interval)
+
+            pending, self._fallback_pending = self._fallback_pending, set()
+            if not pending:
+                continue
+
+            mints = list(pending)
+            results = await asyncio.gather(
+                *[get_token_price_live_async(mint) for mint in mints],
+                return_exceptions=True
+            )
+            self.fallback_fetches += len(mints)
+
+            now = datetime.now().timestamp()
+            for mint, result in zip(mints, results):
+                if isinstance(result, dict) and result.get('success') and result['mc_usd'] > 0:
+                    self._fallback_failed.pop(mint, None)
+                    self.update(mint, result['mc_usd'], now, source='rest')
+                else:
+                    self._fallback_failed[mint] = now
+                    self.fallback_failures += 1
+
+    def get_stats(self):
+        return {
+            'mints': len(self._marks),
+            'watched_mints': len(self._watchers),
+            'updates': self.updates,
+            'moves': self.moves,
+            'notifications': self.notifications,
+            'fallback_requests': self.fallback_requests,
+            'fallback_fetches': self.fallback_fetches,
+            'fallback_failures': self.fallback_failures
+        }
+
+
+# Instance globale (partagée par le moteur et tous les bots du process)
+_mark_price_cache = None
+
+
+def get_mark_price_cache() -> MarkPriceCache:
+    """Récupère le cache global des prix live"""
+    global _mark_price_cache
+
+    if _mark_price_cache is None:
+        _mark_price_cache = MarkPriceCache()
+
+    return _mark_price_cache
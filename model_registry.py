@@ -0,0 +1,346 @@
+"""
+MODEL REGISTRY - Modèles chargés une fois (mmap) et rechargés à chaud
+Avant: chaque consommateur (RunnerPredictor, live_trading_bot, continuous_learning_system)
+faisait son propre joblib.load au démarrage, et un modèle réentraîné
+demandait un redémarrage
+- joblib.load(mmap_mode='r'): les tableaux NumPy des artefacts restent sur disque,
+  partagés en lecture seule entre les workers via le cache de pages de l'OS
+- publish_model(): un entraînement écrit une nouvelle version puis bascule le
+  pointeur CURRENT (os.replace, atomique)
+- un thread de surveillance charge la nouvelle version en arrière-plan puis la
+  substitue d'une seule affectation: les lecteurs ne voient jamais un modèle à moitié chargé
+- compteurs par version: prédictions, latence p50/p99, précision (outcomes)
+Layout:
+    models/<nom>/<version>/<artefact>.pkl|.json + metadata.json
+    models/<nom>/CURRENT            (nom de la version active)
+Sans CURRENT, les fichiers legacy (*_latest.pkl) forment la version 'legacy'
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+import joblib
+
+from inference_service import LatencyStats
+
+WATCH_INTERVAL = 5.0  # Secondes entre deux vérifications des pointeurs CURRENT
+KEEP_VERSIONS = 5  # Versions publiées conservées sur disque par modèle
+METADATA_FILE = 'metadata.json'
+
+# Artefacts des versions legacy: {modèle: {artefact: (chemins candidats relatifs à models/)}}
+LEGACY_BUNDLES = {
+    'runner': {
+        'classifier': ('runner_classifier_latest.pkl',),
+        'classifier_scaler': ('runner_classifier_scaler_latest.pkl',),
+        'regressor': ('price_regressor_latest.pkl',),
+        'regressor_scaler': ('price_regressor_scaler_latest.pkl',),
+        'migration': ('migration_classifier_latest.pkl',),
+        'migration_scaler': ('migration_classifier_scaler_latest.pkl',),
+        'feature_names': ('runner_feature_names.json',),
+        'migration_feature_names': ('migration_feature_names.json',),
+    },
+    'roi': {
+        'model': ('roi_predictor_latest.pkl',),
+        'scaler': ('roi_scaler_latest.pkl',),
+        'feature_names': ('roi_feature_names.json',),
+    },
+    'model_10s': {'model': ('model_10s.pkl', '../model_10s.pkl')},
+    'model_15s': {'model': ('model_15s.pkl', '../model_15s.pkl')},
+}
+
+
+def _load_artifact(path: str):
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    # Tableaux NumPy mappés en lecture seule (ignoré par joblib pour un pickle compressé)
+    return joblib.load(path, mmap_mode='r')
+
+
+class ModelVersion:
+    """Une version chargée d'un modèle: artefacts + compteurs"""
+
+    def __init__(self, name: str, version: str, artifacts: Dict, metadata: Dict = None, load_ms: float = 0.0):
+        self.name = name
+        self.version = version
+        self.artifacts = artifacts
+        self.metadata = metadata or {}
+        self.loaded_at = time.time()
+        self.load_ms = load_ms
+
+        # Stats
+        self.latency = LatencyStats()
+        self.predictions = 0
+        self.outcomes = 0
+        self.correct = 0
+
+    def __getitem__(self, key: str):
+        return self.artifacts[key]
+
+    def get(self, key: str, default=None):
+        return self.artifacts.get(key, default)
+
+    def record_latency(self, seconds: float, rows: int = 1):
+        self.latency.record(seconds)
+        self.predictions += rows
+
+    def record_outcome(self, correct: bool):
+        """Résultat réel connu pour une prédiction de cette version"""
+        self.outcomes += 1
+        if correct:
+            self.correct += 1
+
+    def instrument(self, predict_fn: Callable) -> Callable:
+        """predict_fn(X) chronométré et compté sur cette version"""
+        @wraps(predict_fn)
+        def timed(X, *args, **kwargs):
+            start = time.perf_counter()
+            result = predict_fn(X, *args, **kwargs)
+            self.record_latency(time.perf_counter() - start, rows=len(X))
+            return result
+        return timed
+
+    @property
+    def accuracy(self) -> Optional[float]:
+        return (self.correct / self.outcomes * 100) if self.outcomes else None
+
+    def get_stats(self) -> dict:
+        return {
+            'version': self.version,
+            'loaded_at': datetime.fromtimestamp(self.loaded_at).isoformat(),
+            'load_ms': round(self.load_ms, 1),
+            'predictions': self.predictions,
+            'latency': self.latency.summary(),
+            'outcomes': self.outcomes,
+            'accuracy': self.accuracy,
+            'metadata': self.metadata
+        }
+
+
+class ModelRegistry:
+    """
+    Registre des modèles d'un répertoire models/ (un par process, cf. get_model_registry)
+
+    - get(name): version active (chargée au premier appel), lecture d'un dict ensuite
+    - refresh(): recharge les modèles dont le pointeur CURRENT a changé
+    Les consommateurs comparent `registry.get(name) is not self.version` pour se
+    rebrancher sur une nouvelle version
+    """
+
+    def __init__(self, models_dir: str = 'models', watch_interval: float = WATCH_INTERVAL):
+        self.models_dir = str(models_dir)
+        self.watch_interval = watch_interval
+        self._current: Dict[str, ModelVersion] = {}
+        self._history: Dict[str, List[ModelVersion]] = {}  # Versions retirées (stats)
+        self._load_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+        # Stats
+        self.swaps = 0
+        self.load_errors = 0
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+    def _pointer(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.models_dir, name, 'CURRENT'), 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _load_version(self, name: str, version: str) -> ModelVersion:
+        start = time.perf_counter()
+        directory = os.path.join(self.models_dir, name, version)
+        artifacts = {}
+        metadata = {}
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if filename == METADATA_FILE:
+                with open(path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            elif filename.endswith(('.pkl', '.json')):
+                artifacts[os.path.splitext(filename)[0]] = _load_artifact(path)
+        return ModelVersion(name, version, artifacts, metadata, (time.perf_counter() - start) * 1000)
+
+    def _load_legacy(self, name: str) -> ModelVersion:
+        bundle = LEGACY_BUNDLES.get(name)
+        if bundle is None:
+            raise FileNotFoundError(f"Modele inconnu: {name} (ni {name}/CURRENT ni fichiers legacy)")
+
+        start = time.perf_counter()
+        artifacts = {}
+        for key, candidates in bundle.items():
+            paths = [os.path.join(self.models_dir, candidate) for candidate in candidates]
+            path = next((p for p in paths if os.path.exists(p)), None)
+            if path is None:
+                raise FileNotFoundError(paths[0])
+            artifacts[key] = _load_artifact(path)
+        return ModelVersion(name, 'legacy', artifacts, {}, (time.perf_counter() - start) * 1000)
+
+    def _load(self, name: str) -> ModelVersion:
+        version = self._pointer(name)
+        if version is not None:
+            return self._load_version(name, version)
+        return self._load_legacy(name)
+
+    def get(self, name: str) -> ModelVersion:
+        """Version active d'un modèle (FileNotFoundError si aucun artefact)"""
+        current = self._current.get(name)
+        if current is not None:
+            return current
+
+        with self._load_lock:
+            current = self._current.get(name)
+            if current is None:
+                current = self._load(name)
+                self._current[name] = current
+                print(f"[MODELS] {name} v{current.version} charge ({current.load_ms:.0f}ms)")
+        self._ensure_watcher()
+        return current
+
+    # ------------------------------------------------------------------
+    # Hot-swap
+    # ------------------------------------------------------------------
+    def refresh(self, name: str = None) -> List[str]:
+        """Recharge les modèles dont CURRENT a changé, retourne les noms basculés"""
+        swapped = []
+        for model_name in ([name] if name else list(self._current)):
+            current = self._current.get(model_name)
+            pointer = self._pointer(model_name)
+            if current is None or pointer is None or pointer == current.version:
+                continue
+
+            with self._load_lock:
+                try:
+                    new_version = self._load_version(model_name, pointer)
+                except Exception as e:
+                    # Version incomplète ou supprimée: on garde l'ancienne
+                    self.load_errors += 1
+                    print(f"[MODELS] Echec chargement {model_name} v{pointer}: {e}")
+                    continue
+
+                # Une seule affectation: les lecteurs voient l'ancienne ou la nouvelle version
+                self._current[model_name] = new_version
+                history = self._history.setdefault(model_name, [])
+                history.append(current)
+                del history[:-KEEP_VERSIONS]
+                self.swaps += 1
+
+            print(f"[MODELS] {model_name}: v{current.version} -> v{new_version.version} ({new_version.load_ms:.0f}ms)")
+            swapped.append(model_name)
+        return swapped
+
+    def _ensure_watcher(self):
+        if self._watcher is not None or not self.watch_interval:
+            return
+        with self._load_lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[MODELS] Erreur surveillance: {e}")
+
+    # ------------------------------------------------------------------
+    # Compteurs
+    # ------------------------------------------------------------------
+    def find_version(self, name: str, version: str) -> Optional[ModelVersion]:
+        """Version active ou retirée (pour attribuer un outcome tardif)"""
+        current = self._current.get(name)
+        if current is not None and current.version == version:
+            return current
+        for retired in self._history.get(name, []):
+            if retired.version == version:
+                return retired
+        return None
+
+    def record_outcome(self, name: str, version: str, correct: bool):
+        model_version = self.find_version(name, version)
+        if model_version is not None:
+            model_version.record_outcome(correct)
+
+    def get_stats(self) -> dict:
+        return {
+            'swaps': self.swaps,
+            'load_errors': self.load_errors,
+            'models': {
+                name: {
+                    'current': current.get_stats(),
+                    'previous': [v.get_stats() for v in self._history.get(name, [])]
+                }
+                for name, current in self._current.items()
+            }
+        }
+
+
+def publish_model(name: str, artifacts: Dict, metadata: Dict = None, models_dir: str = 'models') -> str:
+    """
+    Publie une nouvelle version et bascule CURRENT dessus (atomique)
+
+    Args:
+        artifacts: {nom: objet} - listes/dicts en .json, le reste en .pkl non compressé
+                   (requis pour le chargement mmap)
+        metadata: infos libres (accuracy, dataset_size...) exposées dans get_stats
+
+    Returns:
+        Nom de la version publiée
+    """
+    model_dir = os.path.join(str(models_dir), name)
+    os.makedirs(model_dir, exist_ok=True)
+
+    version = datetime.now().strftime('%Y%m%d_%H%M%S')
+    suffix = 1
+    while os.path.exists(os.path.join(model_dir, version)):
+        version = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        suffix += 1
+
+    # Écriture complète dans un répertoire temporaire, puis renommage
+    tmp_dir = os.path.join(model_dir, f'.{version}.tmp')
+    os.makedirs(tmp_dir)
+    for key, obj in artifacts.items():
+        if isinstance(obj, (list, dict)):
+            with open(os.path.join(tmp_dir, f'{key}.json'), 'w', encoding='utf-8') as f:
+                json.dump(obj, f)
+        else:
+            joblib.dump(obj, os.path.join(tmp_dir, f'{key}.pkl'))
+    with open(os.path.join(tmp_dir, METADATA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(dict(metadata or {}, published_at=datetime.now().isoformat()), f, indent=2, default=str)
+    os.replace(tmp_dir, os.path.join(model_dir, version))
+
+    pointer_tmp = os.path.join(model_dir, 'CURRENT.tmp')
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(model_dir, 'CURRENT'))
+
+    # Nettoyage des vieilles versions (les process qui les mappent encore gardent leurs fichiers)
+    versions = sorted(d for d in os.listdir(model_dir) if not d.startswith('.') and d != 'CURRENT')
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(model_dir, old), ignore_errors=True)
+
+    print(f"[MODELS] {name} v{version} publie")
+    return version
+
+
+# Instances globales (une par répertoire)
+_registries: Dict[str, ModelRegistry] = {}
+
+
+def get_model_registry(models_dir: str = 'models') -> ModelRegistry:
+    """Récupère le registre d'un répertoire de modèles"""
+    key = os.path.abspath(str(models_dir))
+
+    if key not in _registries:
+        _registries[key] = ModelRegistry(models_dir)
+
+    return _registries[key]
@@ -6,6 +6,7 @@ import requests
 import json
 import time
 from datetime import datetime
+from bot_data_journal import load_bot_data as read_bot_data
 
 SOL_PRICE = 200
 
@@ -42,10 +43,9 @@ def get_token_info(mint):
         return None
 
 def load_bot_data():
-    """Charger bot_data.json"""
+    """Charger bot_data.json (journal des tokens complétés si présent)"""
     try:
-        with open('bot_data.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_bot_data('bot_data.json')
     except:
         return {'completed': []}
 
@@ -2,10 +2,11 @@
 Analyze token holders directly from Solana blockchain
 Used when API data is not available
 """
-import httpx
+import asyncio
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from config import SOLANA_RPC_URL
+from http_client import get_http_client
 
 
 @dataclass
@@ -39,7 +40,7 @@ class OnChainAnalyzer:
 
     def __init__(self, rpc_url: str = SOLANA_RPC_URL):
         self.rpc_url = rpc_url
-        self.client = httpx.Client(timeout=60.0)
+        self.client = get_http_client()  # Shared pooled client (rate-limited per RPC host)
 
         # Known exchange addresses (for identifying legitimate large holders)
         self.known_exchanges = {
@@ -58,7 +59,7 @@ class OnChainAnalyzer:
             # Add more known addresses as needed
         }
 
-    def get_token_holders(self, mint_address: str) -> OnChainHolderAnalysis:
+    async def get_token_holders(self, mint_address: str) -> OnChainHolderAnalysis:
         """
         Get token holders directly from blockchain
         This is slower but works when APIs are blocked
@@ -68,7 +69,7 @@ class OnChainAnalyzer:
 
             # Get token supply first
             print(f"[ONCHAIN] Step 1: Getting token supply...")
-            supply = self._get_token_supply(mint_address)
+            supply = await self._get_token_supply(mint_address)
             print(f"[ONCHAIN] Supply: {supply}")
 
             if not supply:
@@ -119,7 +120,7 @@ class OnChainAnalyzer:
                 ]
             }
 
-            response = self.client.post(self.rpc_url, json=payload, timeout=30.0)
+            response = await self.client.post(self.rpc_url, json=payload, coalesce=True, timeout=30.0)
             print(f"[ONCHAIN] Response status: {response.status_code}")
 
             if response.status_code != 200:
@@ -183,11 +184,19 @@ class OnChainAnalyzer:
             holder_ages = []
 
             # Check top 20 for fresh wallets (faster than 50, more accurate than 10)
+            # Wallet ages (top 20) and selling patterns (top 5) are fetched concurrently
+            wallet_ages = await asyncio.gather(
+                *[self._get_wallet_age_quick(h["address"]) for h in holders[:20]]
+            )
+            selling_patterns = await asyncio.gather(
+                *[self._detect_selling_patterns(h["address"], mint_address) for h in holders[:5]]
+            )
+
             for i, holder in enumerate(holders[:20]):
                 address = holder["address"]
 
                 # Check wallet age (with reduced timeout for speed)
-                wallet_age = self._get_wallet_age_quick(address)
+                wallet_age = wallet_ages[i]
                 holder["age_days"] = wallet_age
                 holder["is_fresh"] = wallet_age is not None and wallet_age < 7
 
@@ -210,7 +219,7 @@ class OnChainAnalyzer:
 
                     # Check for selling patterns (for top 5 only - avoid too many RPC calls)
                     if i < 5:
-                        has_sold, sell_pct = self._detect_selling_patterns(address, mint_address)
+                        has_sold, sell_pct = selling_patterns[i]
                         holder["has_sold_recently"] = has_sold
                         holder["sell_percentage"] = sell_pct
 
@@ -283,7 +292,7 @@ class OnChainAnalyzer:
                 error_message=str(e)
             )
 
-    def _get_wallet_age_quick(self, wallet_address: str) -> Optional[int]:
+    async def _get_wallet_age_quick(self, wallet_address: str) -> Optional[int]:
         """Get wallet age quickly (limited signatures)"""
         try:
             from datetime import datetime
@@ -300,7 +309,7 @@ class OnChainAnalyzer:
                 ]
             }
 
-            response = self.client.post(self.rpc_url, json=payload, timeout=2.0)  # Reduced from 5s for speed
+            response = await self.client.post(self.rpc_url, json=payload, coalesce=True, timeout=2.0)  # Reduced from 5s for speed
 
             if response.status_code == 200:
                 data = response.json()
@@ -336,7 +345,7 @@ class OnChainAnalyzer:
             print(f"[WALLET AGE QUICK]  ERROR: {e}")
             return None
 
-    def _get_token_supply(self, mint_address: str) -> Optional[float]:
+    async def _get_token_supply(self, mint_address: str) -> Optional[float]:
         """Get total token supply"""
         try:
             payload = {
@@ -346,7 +355,7 @@ class OnChainAnalyzer:
                 "params": [mint_address]
             }
 
-            response = self.client.post(self.rpc_url, json=payload, timeout=10.0)
+            response = await self.client.post(self.rpc_url, json=payload, coalesce=True, timeout=10.0)
 
             if response.status_code == 200:
                 data = response.json()
@@ -362,7 +371,7 @@ class OnChainAnalyzer:
         """Check if address is a known exchange"""
         return address in self.known_exchanges
 
-    def _detect_selling_patterns(self, address: str, mint_address: str) -> Tuple[bool, Optional[float]]:
+    async def _detect_selling_patterns(self, address: str, mint_address: str) -> Tuple[bool, Optional[float]]:
         """
         Detect if a holder has been selling recently
         Returns: (has_sold_recently, sell_percentage)
@@ -382,7 +391,7 @@ class OnChainAnalyzer:
                 ]
             }
 
-            response = self.client.post(self.rpc_url, json=payload, timeout=5.0)
+            response = await self.client.post(self.rpc_url, json=payload, coalesce=True, timeout=5.0)
 
             if response.status_code == 200:
                 data = response.json()
@@ -484,5 +493,4 @@ class OnChainAnalyzer:
         return min(risk_score, 100), red_flags
 
     def close(self):
-        """Close HTTP client"""
-        self.client.close()
+        """Nothing to close: the HTTP client is shared by the whole process"""
@@ -8,18 +8,23 @@ import json
 from datetime import datetime
 from database_bot import db
 from ai_trading_engine import get_ai_engine as get_engine
-from queue import Queue
 from console_logger import get_console_logger
+from mark_price_cache import get_mark_price_cache
+from signal_bus import SubscriptionClosed
+from dashboard_push import get_dashboard_hub
 
 # Configuration du timeout des positions
 POSITION_TIMEOUT_MINUTES = 45  # Même timeout que live_trading_bot.py
 
+# Tick des positions (timeouts, vente progressive, fallback REST)
+PRICE_TICK_SECONDS = 3
+
 
 class OptimizedBotWorker:
     """
     Bot optimisé pour un utilisateur
     - NE fait PAS de connexion WebSocket
-    - Reçoit les signaux du moteur centralisé via une queue
+    - Reçoit les signaux du moteur centralisé via sa file du SignalBus (batch)
     - Léger et scalable
     """
 
@@ -46,36 +51,46 @@ class OptimizedBotWorker:
         # Engine
         self.engine = get_engine()
 
-        # Queue thread-safe pour recevoir les signaux
-        self.signal_queue = Queue()
+        # File bornée du bot sur le bus du moteur (créée par register_bot)
+        self.signal_subscription = None
+
+        # Prix live: file d'événements des mints en position (coalescée par mint)
+        self.mark_prices = get_mark_price_cache()
+        self.price_subscription = self.mark_prices.subscribe(f'bot_{user_id}_prices')
+
+        # Dashboards connectés (flux SSE des positions)
+        self.dashboard = get_dashboard_hub()
 
         if self.simulation_mode:
             print(f"[BOT {self.user_id}] MODE SIMULATION active - Balance virtuelle: {self.virtual_balance} SOL")
 
     def on_signal(self, signal: dict):
         """
-        Callback quand un signal arrive du moteur (thread-safe)
-        Met le signal dans la queue pour traitement asynchrone
+        Injection directe d'un signal (thread-safe)
+        Passe par le bus du moteur (séquence commune: lag/drops cohérents)
         """
-        print(f"[BOT {self.user_id}] Signal received: {signal.get('action')} - {signal.get('name', 'Unknown')}")
-        self.signal_queue.put(signal)
+        if self.signal_subscription:
+            self.engine.signal_bus.send(self.signal_subscription.name, signal)
 
     async def process_signals(self):
         """
-        Traite les signaux de la queue en boucle
+        Traite les signaux de la file par batch
+        Réveillé par le bus quand un signal arrive (pas de polling)
         """
         while self.is_running:
             try:
-                # Vérifier s'il y a des signaux (non-bloquant)
-                if not self.signal_queue.empty():
-                    signal = self.signal_queue.get_nowait()
+                # Timeout pour revérifier is_running après stop()
+                batch = await self.signal_subscription.get_batch(timeout=1.0)
+            except SubscriptionClosed:
+                print(f"[BOT {self.user_id}] Signal queue closed - stopping signal processing")
+                break
+            try:
+                for signal in batch:
                     self.signals_processed += 1
+                    print(f"[BOT {self.user_id}] Signal received: {signal.get('action')} - {signal.get('name', 'Unknown')}")
 
                     if signal['action'] == 'BUY':
                         await self.execute_buy(signal)
-                else:
-                    # Attendre un peu avant de revérifier
-                    await asyncio.sleep(0.1)
             except Exception as e:
                 print(f"[BOT {self.user_id}] Error processing signal: {e}")
 
@@ -161,7 +176,7 @@ class OptimizedBotWorker:
             print(f"[BOT {self.user_id}] 🚀 [RÉEL] ACHAT EN COURS: {token_name or mint[:8]} | "
                   f"Montant: {trade_amount:.4f} SOL (10% de {real_balance:.4f} SOL)")
 
-            result = trader.buy_token(mint, trade_amount, slippage=25, priority_fee=0.001)
+            result = await trader.buy_token_async(mint, trade_amount, slippage=25, priority_fee=0.001)
 
             if not result['success']:
                 print(f"[BOT {self.user_id}] ❌ [RÉEL] ACHAT ÉCHOUÉ: {result['error']}")
@@ -204,6 +219,7 @@ class OptimizedBotWorker:
             'progressive_sell_count': 0,
             'amount_remaining': 1.0  # 100% au départ
         }
+        self.watch_position(mint)
 
         # Persister en BDD pour ne pas perdre si bot redémarre
         db.create_open_position(
@@ -273,11 +289,12 @@ class OptimizedBotWorker:
                     'progressive_sell_count': 0,
                     'amount_remaining': 1.0
                 }
+                self.watch_position(mint)
             if saved_positions:
                 print(f"[BOT {self.user_id}] ✅ Restored {len(saved_positions)} open positions from database")
 
         # S'enregistrer auprès du moteur centralisé (avec référence à self pour recevoir les signaux)
-        self.engine.register_bot(self.user_id, self.config, bot_instance=self)
+        self.signal_subscription = self.engine.register_bot(self.user_id, self.config, bot_instance=self)
 
         print(f"[BOT {self.user_id}] Ready! Waiting for signals from engine...")
 
@@ -298,8 +315,11 @@ class OptimizedBotWorker:
         """Arrête le bot"""
         self.is_running = False
 
-        # Se désinscrire du moteur
+        # Se désinscrire du moteur et du cache de prix
         self.engine.unregister_bot(self.user_id)
+        for mint in list(self.active_positions):
+            self.mark_prices.unwatch(mint, self.price_subscription)
+        self.price_subscription.close()
 
         uptime = (datetime.now() - self.started_at).total_seconds() if self.started_at else 0
 
@@ -309,17 +329,43 @@ class OptimizedBotWorker:
               f"Signals: {self.signals_processed}")
 
     async def track_prices(self):
-        """Track les prix des positions actives en temps réel (COPIE DE live_trading_bot.py ligne 1538)"""
-        print(f"[BOT {self.user_id}] Price tracker started - Checking every 3 seconds (TEMPS RÉEL!)")
+        """
+        Suivi des prix des positions actives
+        Réveillé par le cache de prix à chaque mouvement d'un mint en position
+        (plus de scan de toutes les positions toutes les 3s); un tick de 3s
+        garde les timeouts, la vente progressive et le fallback REST
+        """
+        print(f"[BOT {self.user_id}] Price tracker started - Event-driven (tick {PRICE_TICK_SECONDS}s)")
 
+        last_tick = 0.0
         while self.is_running:
             try:
-                if self.active_positions:
-                    await self.update_positions_pnl()
-                await asyncio.sleep(3)  # TEMPS RÉEL: 3 secondes comme live_trading_bot.py ligne 1598!
+                batch = await self.price_subscription.get_batch(timeout=PRICE_TICK_SECONDS)
+            except SubscriptionClosed:
+                break
+            try:
+                for event in batch:
+                    position = self.active_positions.get(event['mint'])
+                    if position is None or event['mc_usd'] <= 0:
+                        continue
+                    if event['source'] == 'rest':
+                        print(f"[BOT {self.user_id}] 🔄 FALLBACK API pour {position['token_name']}: ${event['mc_usd']/1000:.1f}K")
+                    await self.evaluate_position(event['mint'], position, event['mc_usd'])
+
+                now = asyncio.get_running_loop().time()
+                if now - last_tick >= PRICE_TICK_SECONDS:
+                    last_tick = now
+                    if self.active_positions:
+                        await self.update_positions_pnl()
             except Exception as e:
                 print(f"[BOT {self.user_id}] Error tracking prices: {e}")
 
+    def watch_position(self, mint: str):
+        """Abonne le bot aux changements de prix d'une position ouverte"""
+        position = self.active_positions[mint]
+        self.dashboard.publish_position(self.user_id, mint, position, position['last_mc'])
+        self.mark_prices.watch(mint, self.price_subscription)
+
     async def check_expired_positions(self):
         """
         Vérifie et ferme les positions expirées (timeout de 45 min)
@@ -368,251 +414,260 @@ class OptimizedBotWorker:
 
     async def update_positions_pnl(self):
         """
-        Met à jour le P&L de toutes les positions actives
-        COPIE EXACTE de live_trading_bot.py avec trailing stop loss, vente partielle et progressive
+        Tick périodique des positions (les mouvements de prix sont traités
+        par evaluate_position dès qu'ils arrivent)
+        - Timeouts
+        - Vente progressive après migration (basée sur le temps)
+        - Tokens sans trade WebSocket: fallback REST coalescé puis token mort
         """
-        from ai_trading_engine import get_last_known_price
-
         # D'abord vérifier les positions expirées
         await self.check_expired_positions()
 
         for mint, position in list(self.active_positions.items()):
             try:
-                # Récupérer le prix LIVE depuis le WebSocket
-                price_data = get_last_known_price(mint)
-
-                if price_data['success'] and price_data['mc_usd'] > 0:
-                    # Prix WebSocket disponible
-                    current_mc = price_data['mc_usd']
-                else:
-                    # FALLBACK: Token mort (pas de trades WebSocket) → utiliser l'API REST
-                    from pumpfun_price_fetcher import get_token_price_live
-                    api_price = get_token_price_live(mint)
-
-                    if api_price['success'] and api_price['mc_usd'] > 0:
-                        current_mc = api_price['mc_usd']
-                        print(f"[BOT {self.user_id}] 🔄 FALLBACK API pour {position['token_name']}: ${current_mc/1000:.1f}K")
-                    else:
-                        # Vraiment mort - utiliser le dernier prix connu
-                        current_mc = position.get('last_mc', position['entry_mc'])
-                        # Si token complètement mort depuis 5+ minutes, fermer avec -80%
-                        position_age_minutes = (datetime.now() - position['entry_time']).total_seconds() / 60
-                        if position_age_minutes > 5 and current_mc == position['entry_mc']:
-                            print(f"[BOT {self.user_id}] 💀 TOKEN MORT détecté: {position['token_name']} - fermeture avec -80%")
-                            exit_mc = position['entry_mc'] * 0.2
-                            profit_percent = (exit_mc - position['entry_mc']) / position['entry_mc']
-                            profit_sol = position['amount'] * profit_percent
-                            await self.exit_position(mint, exit_mc, profit_sol, profit_percent / 100)
-                            continue
-
-                position['last_mc'] = current_mc  # Mettre à jour le dernier MC connu
-
-                entry_mc = position['entry_mc']
-                profit_ratio = current_mc / entry_mc
-                profit_percent = (profit_ratio - 1) * 100
-
-                # ====================================================================
-                # TRAILING STOP LOSS INTELLIGENT (EXACT comme live_trading_bot.py ligne 615-642)
-                # ====================================================================
-                if profit_percent >= 80:
-                    # +80% à +100% (proche de 2x) → Stop loss à +30%
-                    new_stop_loss = entry_mc * 1.30
-                elif profit_percent >= 50:
-                    # +50% à +80% → Stop loss à breakeven (0%)
-                    new_stop_loss = entry_mc * 1.00
-                elif profit_percent >= 20:
-                    # +20% à +50% → Stop loss à -20%
-                    new_stop_loss = entry_mc * 0.80
-                else:
-                    # < +20% → Stop loss normal à -40%
-                    new_stop_loss = entry_mc * 0.60
-
-                # Mettre à jour le stop loss SI IL MONTE (jamais descendre!)
-                if new_stop_loss > position['stop_loss_mc']:
-                    old_stop_loss = position['stop_loss_mc']
-                    position['stop_loss_mc'] = new_stop_loss
-                    if profit_percent >= 20:
-                        print(f"[BOT {self.user_id}] 📈 TRAILING STOP LOSS: {position['token_name']} | "
-                              f"Profit: +{profit_percent:.1f}% | "
-                              f"SL: ${old_stop_loss/1000:.1f}K → ${new_stop_loss/1000:.1f}K")
-
-                # ====================================================================
-                # VENTE PARTIELLE À X2 (EXACT comme live_trading_bot.py ligne 649-680)
-                # ====================================================================
-                if not position['partial_sold'] and current_mc >= position['partial_take_profit_mc']:
-                    # CORRECTION: Afficher le message UNE SEULE FOIS (pas à chaque check!)
-                    first_time = not position.get('partial_profit_announced', False)
-
-                    if first_time:
-                        print(f"[BOT {self.user_id}] 💰 PARTIAL PROFIT @ 2x: {position['token_name']} | "
-                              f"MC: ${current_mc/1000:.1f}K | "
-                              f"✅ Vente de 50% - INVESTISSEMENT RÉCUPÉRÉ!")
-
-                    # VENTE RÉELLE de 50% si pas en simulation
-                    if not self.simulation_mode:
-                        from solana_trader_instance import create_trader_for_wallet
-
-                        trader = create_trader_for_wallet(self.wallet_address, self.private_key)
-
-                        if trader:
-                            result = trader.sell_token(
-                                mint=mint,
-                                amount_percent=50,  # Vendre 50%
-                                slippage=25,
-                                priority_fee=0.001
-                            )
-
-                            if not result['success']:
-                                print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente partielle échouée: {result['error']}")
-                                print(f"[BOT {self.user_id}] On réessayera au prochain check...")
-                                return  # Ne pas marquer comme vendu si échec
-
-                            print(f"[BOT {self.user_id}] ✅ [RÉEL] 50% vendus! TX: https://solscan.io/tx/{result['signature']}")
-
-                    # Marquer comme partiellement vendu
-                    position['partial_sold'] = True
-                    position['partial_profit_mc'] = current_mc
-                    position['partial_profit_announced'] = True  # Ne plus afficher le message
-
-                    # Ajuster le stop loss à breakeven (on ne peut plus perdre!)
-                    position['stop_loss_mc'] = entry_mc
-                    position['amount_remaining'] = 0.50  # 50% restant
-
-                    if first_time:
-                        print(f"[BOT {self.user_id}] ✅ Nouveau Stop Loss: ${position['stop_loss_mc']/1000:.1f}K (breakeven - position GRATUITE!)")
-                    return  # Sortir pour laisser la position respirer
-
-                # ====================================================================
-                # VENTE PROGRESSIVE APRÈS MIGRATION (EXACT comme live_trading_bot.py ligne 682-756)
-                # ====================================================================
-                if position['partial_sold'] and current_mc >= position['final_take_profit_mc']:
-                    # Migration atteinte!
-                    if not position['migration_reached']:
-                        position['migration_reached'] = True
-                        position['last_progressive_sell_time'] = datetime.now()
-                        position['max_mc_since_migration'] = current_mc
-
-                        print(f"[BOT {self.user_id}] 🚀 MIGRATION ATTEINTE: {position['token_name']} | "
-                              f"MC: ${current_mc/1000:.1f}K | "
-                              f"🔄 VENTE PROGRESSIVE: 5% toutes les 20s")
-
-                    # Mettre à jour le MC max
-                    if current_mc > position['max_mc_since_migration']:
-                        position['max_mc_since_migration'] = current_mc
-
-                    # Vérifier si besoin de vendre progressivement
-                    time_since_last_sell = (datetime.now() - position['last_progressive_sell_time']).total_seconds()
-
-                    # VENTE PROGRESSIVE toutes les 20 secondes
-                    if time_since_last_sell >= 20:
-                        print(f"[BOT {self.user_id}] 💰 VENTE PROGRESSIVE #{position['progressive_sell_count']+1}: {position['token_name']} | "
-                              f"MC: ${current_mc/1000:.1f}K | Vente: 5%")
-
-                        # VENTE RÉELLE de 5% si pas en simulation
-                        if not self.simulation_mode:
-                            from solana_trader_instance import create_trader_for_wallet
-
-                            trader = create_trader_for_wallet(self.wallet_address, self.private_key)
-
-                            if trader:
-                                result = trader.sell_token(
-                                    mint=mint,
-                                    amount_percent=5,  # Vendre 5% de la position totale
-                                    slippage=25,
-                                    priority_fee=0.001
-                                )
-
-                                if not result['success']:
-                                    print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente progressive échouée: {result['error']}")
-                                    print(f"[BOT {self.user_id}] On réessayera au prochain check...")
-                                    return  # Ne pas incrémenter le compteur si échec
-
-                                print(f"[BOT {self.user_id}] ✅ [RÉEL] 5% vendus! TX: https://solscan.io/tx/{result['signature']}")
-
-                        position['progressive_sell_count'] += 1
-                        position['last_progressive_sell_time'] = datetime.now()
-                        position['amount_remaining'] -= 0.05
-
-                        # Si moins de 5% restant, fermer complètement
-                        if position['amount_remaining'] <= 0.05:
-                            profit_percent_final = (current_mc - entry_mc) / entry_mc
-                            profit_sol_final = position['amount'] * profit_percent_final
-                            print(f"[BOT {self.user_id}] 🎯 VENTE FINALE: {position['token_name']} après {position['progressive_sell_count']} ventes progressives")
-                            await self.exit_position(mint, current_mc, profit_sol_final, profit_percent_final / 100)
-                        return
-
-                    # PROTECTION: Si MC baisse de 15% depuis max, vendre tout le reste
-                    mc_drop_from_max = 1 - (current_mc / position['max_mc_since_migration'])
-                    if mc_drop_from_max >= 0.15:
-                        print(f"[BOT {self.user_id}] ⚠️ STOP LOSS PROGRESSIF: {position['token_name']} | "
-                              f"MC baisse de {mc_drop_from_max*100:.0f}% depuis max | "
-                              f"Vente du reste ({position['amount_remaining']*100:.0f}%)")
-
-                        # VENTE RÉELLE du reste si pas en simulation
-                        if not self.simulation_mode:
-                            from solana_trader_instance import create_trader_for_wallet
-
-                            trader = create_trader_for_wallet(self.wallet_address, self.private_key)
-
-                            if trader:
-                                # Vendre 100% de ce qui reste
-                                result = trader.sell_token(
-                                    mint=mint,
-                                    amount_percent=100,
-                                    slippage=25,
-                                    priority_fee=0.001
-                                )
-
-                                if result['success']:
-                                    print(f"[BOT {self.user_id}] ✅ [RÉEL] Reste vendu! TX: https://solscan.io/tx/{result['signature']}")
-                                else:
-                                    print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente finale échouée: {result['error']}")
-
-                        profit_percent_final = (current_mc - entry_mc) / entry_mc
-                        profit_sol_final = position['amount'] * profit_percent_final
-                        await self.exit_position(mint, current_mc, profit_sol_final, profit_percent_final / 100)
-                        return
-
-                    # Continuer à surveiller
-                    return
-
-                # ====================================================================
-                # STOP LOSS CLASSIQUE
-                # ====================================================================
-                if current_mc <= position['stop_loss_mc']:
-                    print(f"[BOT {self.user_id}] 📉 STOP LOSS: {position['token_name']} | "
-                          f"MC: ${current_mc/1000:.1f}K <= SL: ${position['stop_loss_mc']/1000:.1f}K")
-
-                    # VENTE RÉELLE si pas en simulation
-                    if not self.simulation_mode:
-                        from solana_trader_instance import create_trader_for_wallet
-
-                        trader = create_trader_for_wallet(self.wallet_address, self.private_key)
-
-                        if trader:
-                            # Vendre 100% de la position
-                            result = trader.sell_token(
-                                mint=mint,
-                                amount_percent=100,
-                                slippage=25,
-                                priority_fee=0.001
-                            )
-
-                            if result['success']:
-                                print(f"[BOT {self.user_id}] ✅ [RÉEL] Position fermée (SL)! TX: https://solscan.io/tx/{result['signature']}")
-                            else:
-                                print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente SL échouée: {result['error']}")
+                mark = self.mark_prices.get(mint)
+
+                if mark is not None and mark[0] > 0:
+                    # Prix connu: seules la vente progressive (temps) et une vente
+                    # réelle échouée (à retenter même si le prix ne bouge pas) le demandent
+                    if position['migration_reached'] or position.get('sell_retry'):
+                        await self.evaluate_position(mint, position, mark[0])
+                    continue
+
+                # FALLBACK: Token mort (pas de trades WebSocket) → API REST
+                # Une seule requête par mint et par intervalle pour tous les bots;
+                # le prix arrivera par la file d'événements
+                self.mark_prices.request_fallback(mint)
+
+                if self.mark_prices.fallback_failed(mint):
+                    # Vraiment mort - utiliser le dernier prix connu
+                    current_mc = position.get('last_mc', position['entry_mc'])
+                    # Si token complètement mort depuis 5+ minutes, fermer avec -80%
+                    position_age_minutes = (datetime.now() - position['entry_time']).total_seconds() / 60
+                    if position_age_minutes > 5 and current_mc == position['entry_mc']:
+                        print(f"[BOT {self.user_id}] 💀 TOKEN MORT détecté: {position['token_name']} - fermeture avec -80%")
+                        exit_mc = position['entry_mc'] * 0.2
+                        profit_percent = (exit_mc - position['entry_mc']) / position['entry_mc']
+                        profit_sol = position['amount'] * profit_percent
+                        await self.exit_position(mint, exit_mc, profit_sol, profit_percent / 100)
+
+            except Exception as e:
+                print(f"[BOT {self.user_id}] Error updating position {mint[:8]}: {e}")
+
+    async def evaluate_position(self, mint, position, current_mc):
+        """
+        Applique un nouveau prix à une position
+        COPIE EXACTE de live_trading_bot.py avec trailing stop loss, vente partielle et progressive
+        """
+        position['last_mc'] = current_mc  # Mettre à jour le dernier MC connu
+        self.dashboard.publish_position(self.user_id, mint, position, current_mc)
 
+        entry_mc = position['entry_mc']
+        profit_ratio = current_mc / entry_mc
+        profit_percent = (profit_ratio - 1) * 100
+
+        # ====================================================================
+        # TRAILING STOP LOSS INTELLIGENT (EXACT comme live_trading_bot.py ligne 615-642)
+        # ====================================================================
+        if profit_percent >= 80:
+            # +80% à +100% (proche de 2x) → Stop loss à +30%
+            new_stop_loss = entry_mc * 1.30
+        elif profit_percent >= 50:
+            # +50% à +80% → Stop loss à breakeven (0%)
+            new_stop_loss = entry_mc * 1.00
+        elif profit_percent >= 20:
+            # +20% à +50% → Stop loss à -20%
+            new_stop_loss = entry_mc * 0.80
+        else:
+            # < +20% → Stop loss normal à -40%
+            new_stop_loss = entry_mc * 0.60
+
+        # Mettre à jour le stop loss SI IL MONTE (jamais descendre!)
+        if new_stop_loss > position['stop_loss_mc']:
+            old_stop_loss = position['stop_loss_mc']
+            position['stop_loss_mc'] = new_stop_loss
+            if profit_percent >= 20:
+                print(f"[BOT {self.user_id}] 📈 TRAILING STOP LOSS: {position['token_name']} | "
+                      f"Profit: +{profit_percent:.1f}% | "
+                      f"SL: ${old_stop_loss/1000:.1f}K → ${new_stop_loss/1000:.1f}K")
+
+        # ====================================================================
+        # VENTE PARTIELLE À X2 (EXACT comme live_trading_bot.py ligne 649-680)
+        # ====================================================================
+        if not position['partial_sold'] and current_mc >= position['partial_take_profit_mc']:
+            # CORRECTION: Afficher le message UNE SEULE FOIS (pas à chaque check!)
+            first_time = not position.get('partial_profit_announced', False)
+
+            if first_time:
+                print(f"[BOT {self.user_id}] 💰 PARTIAL PROFIT @ 2x: {position['token_name']} | "
+                      f"MC: ${current_mc/1000:.1f}K | "
+                      f"✅ Vente de 50% - INVESTISSEMENT RÉCUPÉRÉ!")
+
+            # VENTE RÉELLE de 50% si pas en simulation
+            if not self.simulation_mode:
+                from solana_trader_instance import create_trader_for_wallet
+
+                trader = create_trader_for_wallet(self.wallet_address, self.private_key)
+
+                if trader:
+                    result = await trader.sell_token_async(
+                        mint=mint,
+                        amount_percent=50,  # Vendre 50%
+                        slippage=25,
+                        priority_fee=0.001
+                    )
+
+                    if not result['success']:
+                        print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente partielle échouée: {result['error']}")
+                        print(f"[BOT {self.user_id}] On réessayera au prochain check...")
+                        position['sell_retry'] = True  # Retentée au prochain tick
+                        return  # Ne pas marquer comme vendu si échec
+
+                    position['sell_retry'] = False
+                    print(f"[BOT {self.user_id}] ✅ [RÉEL] 50% vendus! TX: https://solscan.io/tx/{result['signature']}")
+
+            # Marquer comme partiellement vendu
+            position['partial_sold'] = True
+            position['partial_profit_mc'] = current_mc
+            position['partial_profit_announced'] = True  # Ne plus afficher le message
+
+            # Ajuster le stop loss à breakeven (on ne peut plus perdre!)
+            position['stop_loss_mc'] = entry_mc
+            position['amount_remaining'] = 0.50  # 50% restant
+
+            if first_time:
+                print(f"[BOT {self.user_id}] ✅ Nouveau Stop Loss: ${position['stop_loss_mc']/1000:.1f}K (breakeven - position GRATUITE!)")
+            return  # Sortir pour laisser la position respirer
+
+        # ====================================================================
+        # VENTE PROGRESSIVE APRÈS MIGRATION (EXACT comme live_trading_bot.py ligne 682-756)
+        # ====================================================================
+        if position['partial_sold'] and current_mc >= position['final_take_profit_mc']:
+            # Migration atteinte!
+            if not position['migration_reached']:
+                position['migration_reached'] = True
+                position['last_progressive_sell_time'] = datetime.now()
+                position['max_mc_since_migration'] = current_mc
+
+                print(f"[BOT {self.user_id}] 🚀 MIGRATION ATTEINTE: {position['token_name']} | "
+                      f"MC: ${current_mc/1000:.1f}K | "
+                      f"🔄 VENTE PROGRESSIVE: 5% toutes les 20s")
+
+            # Mettre à jour le MC max
+            if current_mc > position['max_mc_since_migration']:
+                position['max_mc_since_migration'] = current_mc
+
+            # Vérifier si besoin de vendre progressivement
+            time_since_last_sell = (datetime.now() - position['last_progressive_sell_time']).total_seconds()
+
+            # VENTE PROGRESSIVE toutes les 20 secondes
+            if time_since_last_sell >= 20:
+                print(f"[BOT {self.user_id}] 💰 VENTE PROGRESSIVE #{position['progressive_sell_count']+1}: {position['token_name']} | "
+                      f"MC: ${current_mc/1000:.1f}K | Vente: 5%")
+
+                # VENTE RÉELLE de 5% si pas en simulation
+                if not self.simulation_mode:
+                    from solana_trader_instance import create_trader_for_wallet
+
+                    trader = create_trader_for_wallet(self.wallet_address, self.private_key)
+
+                    if trader:
+                        result = await trader.sell_token_async(
+                            mint=mint,
+                            amount_percent=5,  # Vendre 5% de la position totale
+                            slippage=25,
+                            priority_fee=0.001
+                        )
+
+                        if not result['success']:
+                            print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente progressive échouée: {result['error']}")
+                            print(f"[BOT {self.user_id}] On réessayera au prochain check...")
+                            return  # Ne pas incrémenter le compteur si échec
+
+                        print(f"[BOT {self.user_id}] ✅ [RÉEL] 5% vendus! TX: https://solscan.io/tx/{result['signature']}")
+
+                position['progressive_sell_count'] += 1
+                position['last_progressive_sell_time'] = datetime.now()
+                position['amount_remaining'] -= 0.05
+
+                # Si moins de 5% restant, fermer complètement
+                if position['amount_remaining'] <= 0.05:
                     profit_percent_final = (current_mc - entry_mc) / entry_mc
                     profit_sol_final = position['amount'] * profit_percent_final
+                    print(f"[BOT {self.user_id}] 🎯 VENTE FINALE: {position['token_name']} après {position['progressive_sell_count']} ventes progressives")
+                    await self.exit_position(mint, current_mc, profit_sol_final, profit_percent_final / 100)
+                return
 
-                    if position['partial_sold']:
-                        print(f"[BOT {self.user_id}] ✅ Mais 50% déjà vendu @ 2x - Toujours en profit!")
+            # PROTECTION: Si MC baisse de 15% depuis max, vendre tout le reste
+            mc_drop_from_max = 1 - (current_mc / position['max_mc_since_migration'])
+            if mc_drop_from_max >= 0.15:
+                print(f"[BOT {self.user_id}] ⚠️ STOP LOSS PROGRESSIF: {position['token_name']} | "
+                      f"MC baisse de {mc_drop_from_max*100:.0f}% depuis max | "
+                      f"Vente du reste ({position['amount_remaining']*100:.0f}%)")
+
+                # VENTE RÉELLE du reste si pas en simulation
+                if not self.simulation_mode:
+                    from solana_trader_instance import create_trader_for_wallet
+
+                    trader = create_trader_for_wallet(self.wallet_address, self.private_key)
+
+                    if trader:
+                        # Vendre 100% de ce qui reste
+                        result = await trader.sell_token_async(
+                            mint=mint,
+                            amount_percent=100,
+                            slippage=25,
+                            priority_fee=0.001
+                        )
+
+                        if result['success']:
+                            print(f"[BOT {self.user_id}] ✅ [RÉEL] Reste vendu! TX: https://solscan.io/tx/{result['signature']}")
+                        else:
+                            print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente finale échouée: {result['error']}")
+
+                profit_percent_final = (current_mc - entry_mc) / entry_mc
+                profit_sol_final = position['amount'] * profit_percent_final
+                await self.exit_position(mint, current_mc, profit_sol_final, profit_percent_final / 100)
+                return
 
-                    await self.exit_position(mint, current_mc, profit_sol_final, profit_percent_final / 100)
+            # Continuer à surveiller
+            return
+
+        # ====================================================================
+        # STOP LOSS CLASSIQUE
+        # ====================================================================
+        if current_mc <= position['stop_loss_mc']:
+            print(f"[BOT {self.user_id}] 📉 STOP LOSS: {position['token_name']} | "
+                  f"MC: ${current_mc/1000:.1f}K <= SL: ${position['stop_loss_mc']/1000:.1f}K")
+
+            # VENTE RÉELLE si pas en simulation
+            if not self.simulation_mode:
+                from solana_trader_instance import create_trader_for_wallet
+
+                trader = create_trader_for_wallet(self.wallet_address, self.private_key)
+
+                if trader:
+                    # Vendre 100% de la position
+                    result = await trader.sell_token_async(
+                        mint=mint,
+                        amount_percent=100,
+                        slippage=25,
+                        priority_fee=0.001
+                    )
+
+                    if result['success']:
+                        print(f"[BOT {self.user_id}] ✅ [RÉEL] Position fermée (SL)! TX: https://solscan.io/tx/{result['signature']}")
+                    else:
+                        print(f"[BOT {self.user_id}] ❌ [RÉEL] Vente SL échouée: {result['error']}")
+
+            profit_percent_final = (current_mc - entry_mc) / entry_mc
+            profit_sol_final = position['amount'] * profit_percent_final
+
+            if position['partial_sold']:
+                print(f"[BOT {self.user_id}] ✅ Mais 50% déjà vendu @ 2x - Toujours en profit!")
+
+            await self.exit_position(mint, current_mc, profit_sol_final, profit_percent_final / 100)
 
-            except Exception as e:
-                print(f"[BOT {self.user_id}] Error updating position {mint[:8]}: {e}")
 
     async def check_exit_conditions(self, mint, entry_mc, current_mc, profit_percent, tp_strategy, tp_config):
         """Vérifie si on doit sortir de la position"""
@@ -648,6 +703,9 @@ class OptimizedBotWorker:
         if not position:
             return
 
+        self.mark_prices.unwatch(mint, self.price_subscription)
+        self.dashboard.publish_position_closed(self.user_id, mint)
+
         # Supprimer de la BDD
         db.delete_open_position(self.user_id, mint)
 
@@ -729,6 +787,8 @@ class OptimizedBotWorker:
             'uptime_seconds': uptime,
             'trades_count': self.trades_count,
             'signals_processed': self.signals_processed,
+            'signal_queue': self.signal_subscription.get_stats() if self.signal_subscription else None,
+            'price_queue': self.price_subscription.get_stats(),
             'config': self.config
         }
 
@@ -14,6 +14,14 @@ from datetime import datetime
 import time
 import sys
 
+import numpy as np
+
+from snapshot_accumulator import SnapshotAccumulator
+from trade_store import TradeBuffer
+from ws_capture import get_ws_capture
+from bot_data_journal import (BotDataJournal, CHECKPOINT_INTERVAL, compute_stats, load_bot_data, read_state,
+                              write_legacy, write_state)
+
 # === FONCTION DE PROTECTION UNICODE POUR WINDOWS ===
 def safe_print(msg):
     """Print avec protection contre les erreurs Unicode sur Windows"""
@@ -33,7 +41,8 @@ try:
 except:
     pass  # Ignore si reconfigure n'est pas supporté
 
-SOL_PRICE_USD = 200
+# Prix SOL/USD: oracle partagé (rafraîchi en arrière-plan, lecture sans I/O)
+from sol_price_fetcher import get_sol_price_usd
 
 # === CHARGEMENT DES WALLETS DE BALEINES ===
 WHALE_WALLETS = set()
@@ -52,75 +61,103 @@ class PatternDiscoveryBot:
         self.alerts = []  # Alertes pour le dashboard
         self.whale_activity = {}  # {mint: {wallets, volume, timing}}
         self.data_file = 'bot_data.json'
+        self.journal = None
+        self.capture = get_ws_capture('pattern_discovery')  # Messages bruts (None si désactivé)
 
         # CHARGER LES DONNEES EXISTANTES
         self.load_existing_data()
 
     def load_existing_data(self):
-        """Charger les donnees existantes pour continuer l'accumulation"""
-        import os
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Charger les analyses completees
-                    self.completed_analysis = data.get('completed', [])
-                    # Charger les alertes
-                    self.alerts = data.get('alerts', [])
-
-                    safe_print(f"[CHARGEMENT] {len(self.completed_analysis)} tokens charges depuis la sauvegarde")
-                    runners = [a for a in self.completed_analysis if a.get('is_runner', False)]
-                    safe_print(f"[CHARGEMENT] {len(runners)} runners deja enregistres")
-            except Exception as e:
-                safe_print(f"[WARNING] Impossible de charger les donnees: {e}")
-                safe_print("[INFO] Demarrage avec donnees vierges")
+        """Charger les donnees existantes pour continuer l'accumulation (index du journal seulement)"""
+        try:
+            self.journal = BotDataJournal(self.data_file)
+            # Migration unique d'un bot_data.json legacy (avant le journal)
+            legacy = self.journal.import_legacy()
+            if self.journal.appended:
+                safe_print(f"[CHARGEMENT] {self.journal.appended} tokens migres de {self.data_file} vers le journal")
+
+            # Résumés des tokens complétés (pas les records complets)
+            self.completed_analysis = self.journal.entries
+            # Charger les alertes
+            self.alerts = read_state(self.data_file).get('alerts') or legacy.get('alerts', [])
+
+            stats = self.journal.stats()
+            safe_print(f"[CHARGEMENT] {stats['total_tokens']} tokens charges depuis le journal")
+            safe_print(f"[CHARGEMENT] {stats['total_runners']} runners deja enregistres")
+        except Exception as e:
+            safe_print(f"[WARNING] Impossible de charger les donnees: {e}")
+            if self.journal is None:
+                self.load_legacy_data()
+            else:
+                self.completed_analysis = self.journal.entries
 
-    def save_data(self):
-        """Sauvegarder les donnees pour le dashboard"""
+    def load_legacy_data(self):
+        """Sans journal: records complets en mémoire, réécrits dans bot_data.json (comme avant le journal)"""
+        safe_print(f"[WARNING] Journal indisponible: sauvegarde complete dans {self.data_file}")
         try:
-            # Separer runners et flops
-            runners = [a for a in self.completed_analysis if a.get('is_runner', False)]
-            flops = [a for a in self.completed_analysis if not a.get('is_runner', False)]
-
-            # Calculer les stats
-            total_completed = len(self.completed_analysis)
-            win_rate = (len(runners) / total_completed * 100) if total_completed > 0 else 0
-
-            # GARDER TOUTES LES DONNEES pour l'entrainement AI
-            # Tokens actifs (en cours d'analyse, pas encore completés)
-            active_tokens = []
-            for mint, token_data in self.tokens.items():
-                age = time.time() - token_data.get('created_at', time.time())
-                if age < 900:  # Garder seulement ceux < 15 minutes
-                    active_tokens.append({
-                        'mint': mint,
-                        'symbol': token_data.get('symbol', 'N/A'),
-                        'age_seconds': int(age),
-                        'mc_initial': token_data.get('mc_initial', 0),
-                        'mc_current': token_data.get('mc_current', 0),
-                        'trade_count': len(token_data.get('trades', [])),
-                        'snapshots': token_data.get('snapshots', {})
-                    })
+            data = load_bot_data(self.data_file)
+            self.completed_analysis = data['completed']
+            self.alerts = data['alerts']
+            safe_print(f"[CHARGEMENT] {len(self.completed_analysis)} tokens charges depuis {self.data_file}")
+        except FileNotFoundError:
+            safe_print("[INFO] Demarrage avec donnees vierges")
+        except Exception as e:
+            safe_print(f"[WARNING] Impossible de charger {self.data_file}: {e}")
+            safe_print("[INFO] Demarrage avec donnees vierges")
+
+    def record_completed(self, result):
+        """Token complété: ajouté une seule fois au journal (append-only)"""
+        if self.journal is None:
+            # Record complet gardé: save_data le réécrit dans bot_data.json
+            self.completed_analysis.append(result)
+            return
+        try:
+            self.journal.append(result)
+        except Exception as e:
+            safe_print(f"[ERROR] Journal: {e}")
+
+    def build_state(self):
+        """Petit état réécrit à chaque sauvegarde: tokens actifs, alertes, stats"""
+        # Tokens actifs (en cours d'analyse, pas encore completés)
+        active_tokens = []
+        for mint, token_data in self.tokens.items():
+            age = time.time() - token_data.get('created_at', time.time())
+            if age < 900:  # Garder seulement ceux < 15 minutes
+                active_tokens.append({
+                    'mint': mint,
+                    'symbol': token_data.get('symbol', 'N/A'),
+                    'age_seconds': int(age),
+                    'mc_initial': token_data.get('mc_initial', 0),
+                    'mc_current': token_data.get('mc_current', 0),
+                    'trade_count': len(token_data.get('trades', [])),
+                    'snapshots': token_data.get('snapshots', {})
+                })
 
-            data = {
-                'tokens': active_tokens,  # Tokens en cours (< 15 min)
-                'completed': self.completed_analysis,  # TOUS les tokens (pas seulement 50)
-                'runners': runners,  # TOUS les runners
-                'flops': flops,  # TOUS les flops
-                'alerts': self.alerts[-100:],  # 100 dernieres alertes (pour pas surcharger)
-                'stats': {
-                    'total_tokens': total_completed,
-                    'total_runners': len(runners),
-                    'total_flops': len(flops),
-                    'win_rate': win_rate
-                }
-            }
+        return {
+            'tokens': active_tokens,  # Tokens en cours (< 15 min)
+            'alerts': self.alerts[-100:],  # 100 dernieres alertes (pour pas surcharger)
+            'stats': compute_stats(self.completed_analysis)
+        }
 
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+    def save_data(self):
+        """Sauvegarder l'etat pour le dashboard (les tokens completes sont deja dans le journal)"""
+        try:
+            if self.journal is None:
+                write_legacy(self.data_file, self.build_state(), self.completed_analysis)
+            else:
+                write_state(self.data_file, self.build_state())
         except Exception as e:
             safe_print(f"[ERROR] Save data: {e}")
 
+    async def checkpoint_data(self):
+        """fsync du journal dans un thread (les scripts lisent le journal via load_bot_data)"""
+        if self.journal is None:
+            return
+        try:
+            await asyncio.to_thread(self.journal.checkpoint)
+        except Exception as e:
+            safe_print(f"[ERROR] Checkpoint: {e}")
+
     async def handle_new_token(self, data):
         """Nouveau token détecté"""
         mint = data.get('mint')
@@ -133,15 +170,17 @@ class PatternDiscoveryBot:
             symbol = f"[{mint[:8]}...]"
 
         mc_sol = data.get('marketCapSol', 0)
-        mc_usd = mc_sol * SOL_PRICE_USD
+        mc_usd = mc_sol * get_sol_price_usd()
 
         # Enregistrer le token avec timestamp de création
+        created_at = time.time()
         self.tokens[mint] = {
             'mint': mint,
             'symbol': symbol,
-            'created_at': time.time(),
+            'created_at': created_at,
             'mc_initial': mc_usd,
-            'trades': [],
+            'trades': TradeBuffer(),
+            'accumulator': SnapshotAccumulator(created_at, whale_wallets=WHALE_WALLETS),
             'price_history': [{'mc': mc_usd, 'time': time.time()}],  # Pour accélération
             'acceleration_alerted': False,  # Flag pour ne pas spammer
             'momentum_alerted': False,  # Flag pour signal momentum
@@ -182,13 +221,14 @@ class PatternDiscoveryBot:
 
         if tx_type in ['buy', 'sell']:
             trader = data.get('traderPublicKey')
+            sol_price = get_sol_price_usd()
             mc_sol = data.get('marketCapSol', 0)
-            mc_usd = mc_sol * SOL_PRICE_USD
+            mc_usd = mc_sol * sol_price
 
             # NOUVELLES DONNÉES: Montant du trade
             sol_amount = data.get('solAmount', 0)
             token_amount = data.get('tokenAmount', 0)
-            amount_usd = sol_amount * SOL_PRICE_USD if sol_amount else 0
+            amount_usd = sol_amount * sol_price if sol_amount else 0
 
             current_time = time.time()
 
@@ -199,16 +239,14 @@ class PatternDiscoveryBot:
             # Calculer l'âge du token (nécessaire pour whale detection)
             age = current_time - token['created_at']
 
-            token['trades'].append({
-                'type': tx_type,
-                'trader': trader,
-                'mc': mc_usd,
-                'time': current_time,
-                'amount_sol': sol_amount,
-                'amount_usd': amount_usd,
-                'token_amount': token_amount,
-                'is_whale': trader in WHALE_WALLETS
-            })
+            token['trades'].append(
+                tx_type, trader, mc_usd, current_time,
+                amount_sol=sol_amount,
+                amount_usd=amount_usd,
+                token_amount=token_amount,
+                is_whale=trader in WHALE_WALLETS
+            )
+            token['accumulator'].add_trade(tx_type, trader, mc_usd, amount_usd, current_time)
 
             # Tracker l'activite des baleines
             if trader in WHALE_WALLETS:
@@ -308,7 +346,7 @@ class PatternDiscoveryBot:
                     'supply_distribution': holders_traders_data['supply_distribution']
                 }
 
-                self.completed_analysis.append(result)
+                self.record_completed(result)
 
                 safe_print(f"\n{'='*80}")
                 safe_print(f"[MIGRATION PUMPSWAP!] {token['symbol']} @ ${mc_usd:,.0f} - BONDING CURVE COMPLETE!")
@@ -552,7 +590,7 @@ class PatternDiscoveryBot:
                         'ml_metrics': advanced_metrics
                     }
 
-                    self.completed_analysis.append(result)
+                    self.record_completed(result)
                     token['completed'] = True
 
                     safe_print(f"\n{'='*80}")
@@ -618,7 +656,7 @@ class PatternDiscoveryBot:
                     'supply_distribution': holders_traders_data['supply_distribution']
                 }
 
-                self.completed_analysis.append(result)
+                self.record_completed(result)
                 token['completed'] = True
 
                 safe_print(f"\n{'='*80}")
@@ -630,10 +668,10 @@ class PatternDiscoveryBot:
 
     def calculate_snapshot(self, token, max_age):
         """Calculer les métriques pour une période"""
-        created_at = token['created_at']
-        trades_in_period = [t for t in token['trades'] if (t['time'] - created_at) <= max_age]
+        # Lecture O(1) depuis l'accumulateur mis à jour dans handle_trade
+        acc = token['accumulator'].snapshot(max_age)
 
-        if not trades_in_period:
+        if not acc:
             return {
                 'txn': 0, 'buys': 0, 'sells': 0, 'buy_ratio': 0, 'traders': 0,
                 'big_buys_100': 0, 'big_buys_300': 0, 'big_buys_500': 0,
@@ -641,39 +679,27 @@ class PatternDiscoveryBot:
                 'smart_money_count': 0
             }
 
-        buys = [t for t in trades_in_period if t['type'] == 'buy']
-        sells = [t for t in trades_in_period if t['type'] == 'sell']
-        unique_traders = len(set(t['trader'] for t in trades_in_period))
-
-        # WHALE METRICS
-        whale_trades = [t for t in trades_in_period if t.get('is_whale', False)]
-        whale_wallets_in_period = set(t['trader'] for t in whale_trades)
-        whale_volume_usd = sum(t.get('amount_usd', 0) for t in whale_trades)
+        txn = acc['txn']
+        buys = acc['buys']
 
         # WALLET INTELLIGENCE: Comptage des gros achats
-        big_buys_100 = len([b for b in buys if b.get('amount_usd', 0) >= 100])
-        big_buys_300 = len([b for b in buys if b.get('amount_usd', 0) >= 300])
-        big_buys_500 = len([b for b in buys if b.get('amount_usd', 0) >= 500])
+        big_buys_100 = acc['big_buys'][100]
+        big_buys_300 = acc['big_buys'][300]
+        big_buys_500 = acc['big_buys'][500]
 
         # Volume total
-        total_buy_volume = sum(b.get('amount_usd', 0) for b in buys)
-        total_sell_volume = sum(s.get('amount_usd', 0) for s in sells)
+        total_buy_volume = acc['total_buy_volume']
+        total_sell_volume = acc['total_sell_volume']
 
         # Taille moyenne d'achat
-        avg_buy_size = total_buy_volume / len(buys) if buys else 0
-
-        # SMART MONEY: Wallets qui achètent >$200 dans les premières secondes
-        early_big_buyers = set()
-        for t in buys:
-            if (t['time'] - created_at) <= 15 and t.get('amount_usd', 0) >= 200:
-                early_big_buyers.add(t['trader'])
+        avg_buy_size = total_buy_volume / buys if buys else 0
 
         return {
-            'txn': len(trades_in_period),
-            'buys': len(buys),
-            'sells': len(sells),
-            'buy_ratio': len(buys)/len(trades_in_period) if trades_in_period else 0,
-            'traders': unique_traders,
+            'txn': txn,
+            'buys': buys,
+            'sells': acc['sells'],
+            'buy_ratio': buys/txn if txn else 0,
+            'traders': acc['traders'],
             # NOUVELLES MÉTRIQUES
             'big_buys_100': big_buys_100,
             'big_buys_300': big_buys_300,
@@ -681,65 +707,58 @@ class PatternDiscoveryBot:
             'avg_buy_size': avg_buy_size,
             'total_buy_volume': total_buy_volume,
             'total_sell_volume': total_sell_volume,
-            'smart_money_count': len(early_big_buyers),
-            'whale_ratio': big_buys_500 / len(buys) if buys else 0,  # % de whales
+            # SMART MONEY: Wallets qui achètent >$200 dans les premières secondes
+            'smart_money_count': acc['smart_money_count'],
+            'whale_ratio': big_buys_500 / buys if buys else 0,  # % de whales
             # WHALE METRICS
-            'whale_count': len(whale_wallets_in_period),
-            'whale_volume_usd': whale_volume_usd,
-            'whale_trades_ratio': len(whale_trades) / len(trades_in_period) if trades_in_period else 0,
-            'whale_wallets': list(whale_wallets_in_period)[:10]
+            'whale_count': acc['tracked_whale_count'],
+            'whale_volume_usd': acc['tracked_whale_volume'],
+            'whale_trades_ratio': acc['tracked_whale_trades'] / txn if txn else 0,
+            'whale_wallets': acc['tracked_whale_wallets'][:10]
         }
 
     def calculate_holders_and_traders(self, token):
         """Calculer les top holders et traders d'un token"""
-        trades = token.get('trades', [])
-
-        # Dictionnaires pour tracking
-        wallet_balances = {}  # {wallet: balance en tokens}
-        wallet_volumes = {}   # {wallet: volume total en USD}
-        wallet_buy_volume = {}
-        wallet_sell_volume = {}
-
-        # Process all trades
-        for trade in trades:
-            wallet = trade.get('trader', '')
-            sol_amount = trade.get('amount_sol', 0)
-            value_usd = trade.get('amount_usd', 0)
-            is_buy = trade['type'] == 'buy'
-
-            # Initialiser le wallet s'il n'existe pas
-            if wallet not in wallet_balances:
-                wallet_balances[wallet] = 0
-                wallet_volumes[wallet] = 0
-                wallet_buy_volume[wallet] = 0
-                wallet_sell_volume[wallet] = 0
-
-            # Mettre à jour le volume
-            wallet_volumes[wallet] += value_usd
-
-            if is_buy:
-                wallet_balances[wallet] += sol_amount  # Approximation
-                wallet_buy_volume[wallet] += value_usd
-            else:
-                wallet_balances[wallet] -= sol_amount
-                wallet_sell_volume[wallet] += value_usd
+        trades = token.get('trades')
+        if not trades:
+            return {
+                'top_10_holders': [],
+                'top_10_traders': [],
+                'supply_distribution': {
+                    'total_holders': 0,
+                    'top_3_percent': 0,
+                    'top_5_percent': 0,
+                    'top_10_percent': 0
+                }
+            }
+
+        # Réductions vectorisées sur les colonnes (un bincount par métrique)
+        cols = trades.columns()
+        is_buy = cols['is_buy']
+        trader_ids, wallet_idx = np.unique(cols['trader_id'], return_inverse=True)
+        sign = np.where(is_buy, 1.0, -1.0)
+
+        wallet_balances = np.bincount(wallet_idx, weights=cols['amount_sol'] * sign)  # Approximation
+        wallet_volumes = np.bincount(wallet_idx, weights=cols['amount_usd'])
+        wallet_buy_volume = np.bincount(wallet_idx, weights=np.where(is_buy, cols['amount_usd'], 0.0))
+        wallet_sell_volume = np.bincount(wallet_idx, weights=np.where(is_buy, 0.0, cols['amount_usd']))
+
+        def wallet_of(i):
+            return trades.interner.wallet(int(trader_ids[i]))
 
         # Trier pour obtenir les tops
-        top_holders = sorted(
-            [(wallet, balance) for wallet, balance in wallet_balances.items() if balance > 0],
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
-
-        top_traders = sorted(
-            [(wallet, volume, wallet_buy_volume[wallet], wallet_sell_volume[wallet])
-             for wallet, volume in wallet_volumes.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
+        holder_idx = np.flatnonzero(wallet_balances > 0)
+        holder_idx = holder_idx[np.argsort(-wallet_balances[holder_idx], kind='stable')]
+        top_holders = [(wallet_of(i), float(wallet_balances[i])) for i in holder_idx[:10]]
+
+        trader_idx = np.argsort(-wallet_volumes, kind='stable')[:10]
+        top_traders = [
+            (wallet_of(i), float(wallet_volumes[i]), float(wallet_buy_volume[i]), float(wallet_sell_volume[i]))
+            for i in trader_idx
+        ]
 
         # Calculer la distribution
-        total_balance = sum(balance for wallet, balance in wallet_balances.items() if balance > 0)
+        total_balance = float(wallet_balances[holder_idx].sum())
         top_3_balance = sum(balance for wallet, balance in top_holders[:3])
         top_5_balance = sum(balance for wallet, balance in top_holders[:5])
         top_10_balance = sum(balance for wallet, balance in top_holders[:10])
@@ -765,7 +784,7 @@ class PatternDiscoveryBot:
                 for wallet, volume, buy_vol, sell_vol in top_traders
             ],
             'supply_distribution': {
-                'total_holders': len([b for b in wallet_balances.values() if b > 0]),
+                'total_holders': int(len(holder_idx)),
                 'top_3_percent': (top_3_balance / total_balance * 100) if total_balance > 0 else 0,
                 'top_5_percent': (top_5_balance / total_balance * 100) if total_balance > 0 else 0,
                 'top_10_percent': (top_10_balance / total_balance * 100) if total_balance > 0 else 0
@@ -774,7 +793,7 @@ class PatternDiscoveryBot:
 
     def calculate_advanced_metrics(self, token):
         """Calculer TOUTES les métriques avancées pour ML"""
-        trades = token.get('trades', [])
+        trades = token.get('trades')
         snapshots = token.get('snapshots', {})
         created_at = token['created_at']
 
@@ -816,31 +835,30 @@ class PatternDiscoveryBot:
         else:
             velocity_metrics['gain_percent_from_start'] = 0
 
+        # Colonnes NumPy pour les réductions vectorisées ci-dessous
+        cols = trades.columns() if trades else None
+
         # ========== 2. TIMING TO MILESTONES ==========
         milestones = [10000, 20000, 30000, 40000, 50000, 69000]
         milestone_metrics = {}
 
         for milestone in milestones:
             time_to_milestone = None
-            for trade in trades:
-                if trade.get('mc', 0) >= milestone:
-                    time_to_milestone = trade['time'] - created_at
-                    break
+            if cols is not None:
+                reached = cols['mc'] >= milestone
+                if reached.any():
+                    time_to_milestone = float(cols['time'][np.argmax(reached)] - created_at)
             milestone_metrics[f'time_to_{milestone//1000}k'] = time_to_milestone
 
         # ========== 3. ATH & DRAWDOWN ==========
-        all_mcs = [t.get('mc', 0) for t in trades]
-
         ath_metrics = {}
-        if all_mcs:
-            ath_mc = max(all_mcs)
+        if cols is not None:
+            all_mcs = cols['mc']
+            ath_mc = float(all_mcs.max())
             ath_metrics['ath_mc'] = ath_mc
 
-            # Trouver le temps du ATH
-            for trade in trades:
-                if trade.get('mc') == ath_mc:
-                    ath_metrics['ath_time'] = trade['time'] - created_at
-                    break
+            # Temps du ATH (premier trade au ATH)
+            ath_metrics['ath_time'] = float(cols['time'][np.argmax(all_mcs == ath_mc)] - created_at)
 
             # Drawdown depuis ATH
             if ath_mc > 0 and final_mc > 0:
@@ -851,25 +869,19 @@ class PatternDiscoveryBot:
                 ath_metrics['max_drawdown_percent'] = 0
                 ath_metrics['drawdown_at_15min'] = 0
 
-            # Volatilité (écart-type)
-            import statistics
+            # Volatilité (écart-type échantillon)
             if len(all_mcs) > 1:
-                ath_metrics['volatility'] = statistics.stdev(all_mcs)
+                ath_metrics['volatility'] = float(np.std(all_mcs, ddof=1))
             else:
                 ath_metrics['volatility'] = 0
 
-            # Compter pumps et dumps
-            num_pumps = 0
-            num_dumps = 0
-            for i in range(1, len(all_mcs)):
-                pct_change = ((all_mcs[i] - all_mcs[i-1]) / all_mcs[i-1] * 100) if all_mcs[i-1] > 0 else 0
-                if pct_change >= 20:
-                    num_pumps += 1
-                elif pct_change <= -30:
-                    num_dumps += 1
-
-            ath_metrics['num_pumps'] = num_pumps
-            ath_metrics['num_dumps'] = num_dumps
+            # Compter pumps et dumps (variation entre trades consécutifs)
+            prev_mcs = all_mcs[:-1]
+            safe_prev = np.where(prev_mcs > 0, prev_mcs, 1.0)
+            pct_change = np.where(prev_mcs > 0, (all_mcs[1:] - prev_mcs) / safe_prev * 100, 0.0)
+
+            ath_metrics['num_pumps'] = int((pct_change >= 20).sum())
+            ath_metrics['num_dumps'] = int((pct_change <= -30).sum())
         else:
             ath_metrics = {
                 'ath_mc': 0, 'ath_time': None, 'max_drawdown_percent': 0,
@@ -884,41 +896,23 @@ class PatternDiscoveryBot:
         mint = token['mint']
         whale_info = self.whale_activity.get(mint, {})
 
-        if whale_info:
+        if whale_info and cols is not None:
             whale_timing['first_whale_entry_time'] = whale_info.get('first_whale_entry_time', 0) - created_at
 
             # Trouver le MC quand la première whale est entrée
             first_whale_time = whale_info.get('first_whale_entry_time', 0)
-            first_whale_mc = 0
-            for trade in trades:
-                if trade['time'] >= first_whale_time and trade.get('is_whale'):
-                    first_whale_mc = trade.get('mc', 0)
-                    break
+            is_whale = cols['is_whale']
+            first_whale_mask = is_whale & (cols['time'] >= first_whale_time)
+            first_whale_mc = float(cols['mc'][np.argmax(first_whale_mask)]) if first_whale_mask.any() else 0
             whale_timing['first_whale_entry_mc'] = first_whale_mc
 
             # Compter whales par tranche de prix
-            whale_entry_before_10k = 0
-            whale_entry_10k_to_20k = 0
-            whale_entry_20k_to_40k = 0
-            whale_exit_count = 0
-
-            for trade in trades:
-                if trade.get('is_whale'):
-                    mc = trade.get('mc', 0)
-                    if trade['type'] == 'buy':
-                        if mc < 10000:
-                            whale_entry_before_10k += 1
-                        elif mc < 20000:
-                            whale_entry_10k_to_20k += 1
-                        elif mc < 40000:
-                            whale_entry_20k_to_40k += 1
-                    elif trade['type'] == 'sell':
-                        whale_exit_count += 1
-
-            whale_timing['whale_entry_before_10k'] = whale_entry_before_10k
-            whale_timing['whale_entry_10k_to_20k'] = whale_entry_10k_to_20k
-            whale_timing['whale_entry_20k_to_40k'] = whale_entry_20k_to_40k
-            whale_timing['whale_exit_count'] = whale_exit_count
+            whale_buy_mcs = cols['mc'][is_whale & cols['is_buy']]
+
+            whale_timing['whale_entry_before_10k'] = int((whale_buy_mcs < 10000).sum())
+            whale_timing['whale_entry_10k_to_20k'] = int(((whale_buy_mcs >= 10000) & (whale_buy_mcs < 20000)).sum())
+            whale_timing['whale_entry_20k_to_40k'] = int(((whale_buy_mcs >= 20000) & (whale_buy_mcs < 40000)).sum())
+            whale_timing['whale_exit_count'] = int((is_whale & ~cols['is_buy']).sum())
         else:
             whale_timing = {
                 'first_whale_entry_time': None,
@@ -932,51 +926,44 @@ class PatternDiscoveryBot:
         # ========== 5. HOLDER CONVICTION ==========
         trader_behavior = {}
 
-        # Analyser le comportement des traders
-        trader_first_buy = {}
-        trader_last_action = {}
-
-        for trade in trades:
-            trader = trade['trader']
-            trade_time = trade['time']
+        if cols is not None:
+            # Analyser le comportement des traders (un slot par wallet)
+            times = cols['time']
+            is_buy = cols['is_buy']
+            trader_ids, wallet_idx = np.unique(cols['trader_id'], return_inverse=True)
 
-            if trader not in trader_first_buy:
-                if trade['type'] == 'buy':
-                    trader_first_buy[trader] = trade_time
+            trader_first_buy = np.full(len(trader_ids), np.inf)
+            np.minimum.at(trader_first_buy, wallet_idx[is_buy], times[is_buy])
+            trader_last_action = np.full(len(trader_ids), -np.inf)
+            np.maximum.at(trader_last_action, wallet_idx, times)
+            trader_buy_volume = np.bincount(wallet_idx, weights=np.where(is_buy, cols['amount_usd'], 0.0))
 
-            trader_last_action[trader] = trade_time
+            # Calculer hold times (seulement les wallets qui ont acheté)
+            bought = np.isfinite(trader_first_buy)
+            hold_times = trader_last_action[bought] - trader_first_buy[bought]
 
-        # Calculer hold times
-        hold_times = []
-        paper_hands = 0  # Vendent en <60s
-        diamond_hands = 0  # Hold >300s avec >$500
+            paper_hands = int((hold_times < 60).sum())  # Vendent en <60s
+            diamond_hands = int(((hold_times > 300) & (trader_buy_volume[bought] > 500)).sum())  # Hold >300s avec >$500
 
-        for trader in trader_first_buy:
-            first_buy = trader_first_buy[trader]
-            last_action = trader_last_action.get(trader, first_buy)
-            hold_time = last_action - first_buy
-            hold_times.append(hold_time)
-
-            if hold_time < 60:
-                paper_hands += 1
-            elif hold_time > 300:
-                # Vérifier si c'est un gros holder
-                trader_volume = sum(t.get('amount_usd', 0) for t in trades if t['trader'] == trader and t['type'] == 'buy')
-                if trader_volume > 500:
-                    diamond_hands += 1
+            unique_traders = len(trader_ids)
+            total_time = float(times[-1] - times[0]) if len(times) > 1 else 1
+        else:
+            hold_times = np.empty(0)
+            paper_hands = 0
+            diamond_hands = 0
+            unique_traders = 0
+            total_time = 1
 
-        trader_behavior['avg_hold_time'] = sum(hold_times) / len(hold_times) if hold_times else 0
+        trader_behavior['avg_hold_time'] = float(hold_times.mean()) if len(hold_times) else 0
         trader_behavior['paper_hands_count'] = paper_hands
         trader_behavior['diamond_hands_count'] = diamond_hands
 
         # Taux d'arrivée de nouveaux traders
-        total_time = (trades[-1]['time'] - trades[0]['time']) if len(trades) > 1 else 1
-        unique_traders = len(set(t['trader'] for t in trades))
         trader_behavior['new_traders_per_second'] = unique_traders / total_time if total_time > 0 else 0
 
         # Ratio holders vs flippers
-        holders = sum(1 for t in hold_times if t > 180)  # Hold >3min
-        trader_behavior['holder_ratio'] = holders / len(hold_times) if hold_times else 0
+        holders = int((hold_times > 180).sum())  # Hold >3min
+        trader_behavior['holder_ratio'] = holders / len(hold_times) if len(hold_times) else 0
 
         # Combiner toutes les métriques
         return {
@@ -1102,10 +1089,14 @@ class PatternDiscoveryBot:
         safe_print(f"{'='*80}\n")
 
     async def periodic_save_task(self):
-        """Sauvegarde périodique toutes les 30 secondes"""
+        """Sauvegarde périodique toutes les 30 secondes, checkpoint toutes les CHECKPOINT_INTERVAL"""
+        last_checkpoint = time.time()
         while True:
             await asyncio.sleep(30)
             self.save_data()
+            if time.time() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                last_checkpoint = time.time()
+                await self.checkpoint_data()
 
     async def connect_and_run(self):
         """Connexion WebSocket"""
@@ -1121,6 +1112,8 @@ class PatternDiscoveryBot:
             asyncio.create_task(self.periodic_save_task())
 
             async for message in ws:
+                if self.capture:
+                    self.capture.record(message)
                 try:
                     data = json.loads(message)
 
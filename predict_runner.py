@@ -3,14 +3,15 @@ RUNNER PREDICTOR - Utilise les modeles entraines pour predire
 "Ce token a 85% de chance de faire 5x, target $350k"
 """
 
-import json
-import pandas as pd
 import numpy as np
-import joblib
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+from inference_service import BatchInferenceService
+from model_registry import ModelVersion, get_model_registry
+from runner_features import get_feature_spec
+
 
 @dataclass
 class RunnerPrediction:
@@ -37,41 +38,31 @@ class RunnerPrediction:
     action: str                    # BUY NOW / BUY / CONSIDER / WAIT / SKIP
     reason: str
 
+    # Version des modeles qui a produit la prediction
+    model_version: str = ''
+
 
 class RunnerPredictor:
-    """Predictor qui utilise les modeles ML entraines"""
+    """Predictor qui utilise les modeles ML entraines (registre partage, recharge a chaud)"""
 
     def __init__(self, models_dir: str = "models"):
         self.models_dir = Path(models_dir)
         self.loaded = False
+        self.spec = get_feature_spec()
+        self.inference = BatchInferenceService()
+        self.registry = get_model_registry(str(self.models_dir))
+        self.version: Optional[ModelVersion] = None
 
         # Charger les modeles
         self._load_models()
 
     def _load_models(self):
-        """Charge les modeles depuis le disque"""
+        """Charge les modeles via le registre (mmap, une seule copie par process)"""
         try:
-            # Classifier
-            self.classifier = joblib.load(self.models_dir / 'runner_classifier_latest.pkl')
-            self.clf_scaler = joblib.load(self.models_dir / 'runner_classifier_scaler_latest.pkl')
-
-            # Regressor
-            self.regressor = joblib.load(self.models_dir / 'price_regressor_latest.pkl')
-            self.reg_scaler = joblib.load(self.models_dir / 'price_regressor_scaler_latest.pkl')
-
-            # Migration classifier
-            self.migration_clf = joblib.load(self.models_dir / 'migration_classifier_latest.pkl')
-            self.mig_scaler = joblib.load(self.models_dir / 'migration_classifier_scaler_latest.pkl')
-
-            # Feature names
-            with open(self.models_dir / 'runner_feature_names.json', 'r') as f:
-                self.feature_names = json.load(f)
-
-            with open(self.models_dir / 'migration_feature_names.json', 'r') as f:
-                self.migration_feature_names = json.load(f)
+            self._bind(self.registry.get('runner'))
 
             self.loaded = True
-            print("[PREDICTOR] Modeles charges avec succes!")
+            print(f"[PREDICTOR] Modeles charges avec succes! (v{self.version.version})")
 
         except Exception as e:
             print(f"[PREDICTOR] Erreur chargement modeles: {e}")
@@ -79,117 +70,66 @@ class RunnerPredictor:
             self.loaded = False
 
     def extract_features(self, token_data: Dict) -> Dict:
-        """Extrait les features d'un token pour prediction"""
-        features = {}
-
-        # === SNAPSHOTS FEATURES ===
-        for snap_name in ['3s', '5s', '7s', '10s', '15s', '30s', '1min', '5min', '10min']:
-            snap = token_data.get(snap_name, {}) or {}
-
-            prefix = snap_name
-            features[f'{prefix}_txn'] = snap.get('txn', 0)
-            features[f'{prefix}_buy_ratio'] = snap.get('buy_ratio', 0)
-            features[f'{prefix}_traders'] = snap.get('traders', 0)
-            features[f'{prefix}_mc'] = snap.get('mc', 0)
-
-            if snap_name in ['10s', '15s', '30s']:
-                features[f'{prefix}_buys'] = snap.get('buys', 0)
-                features[f'{prefix}_sells'] = snap.get('sells', 0)
-                features[f'{prefix}_big_buys_100'] = snap.get('big_buys_100', 0)
-                features[f'{prefix}_big_buys_500'] = snap.get('big_buys_500', 0)
-                features[f'{prefix}_total_buy_volume'] = snap.get('total_buy_volume', 0)
-                features[f'{prefix}_smart_money'] = snap.get('smart_money_count', 0)
-                features[f'{prefix}_whale_count'] = snap.get('whale_count', 0)
-
-        # === VELOCITY & MOMENTUM ===
-        mc_10s = features.get('10s_mc', 0)
-        mc_30s = features.get('30s_mc', 0)
-        mc_1min = features.get('1min_mc', 0)
-        mc_5min = features.get('5min_mc', 0)
-
-        if mc_10s > 0:
-            features['mc_growth_10s_to_30s'] = (mc_30s - mc_10s) / mc_10s
-            features['mc_growth_10s_to_1min'] = (mc_1min - mc_10s) / mc_10s
-        else:
-            features['mc_growth_10s_to_30s'] = 0
-            features['mc_growth_10s_to_1min'] = 0
-
-        if mc_30s > 0:
-            features['mc_growth_30s_to_5min'] = (mc_5min - mc_30s) / mc_30s
-        else:
-            features['mc_growth_30s_to_5min'] = 0
-
-        # Transaction velocity
-        features['txn_velocity_10s'] = features.get('10s_txn', 0) / 10
-        features['txn_velocity_30s'] = features.get('30s_txn', 0) / 30
-        features['txn_velocity_1min'] = features.get('1min_txn', 0) / 60
-
-        # Trader growth
-        traders_10s = features.get('10s_traders', 0)
-        if traders_10s > 0:
-            features['trader_growth_10s_to_30s'] = features.get('30s_traders', 0) / traders_10s
-            features['trader_growth_10s_to_1min'] = features.get('1min_traders', 0) / traders_10s
-        else:
-            features['trader_growth_10s_to_30s'] = 0
-            features['trader_growth_10s_to_1min'] = 0
-
-        # === WHALE METRICS ===
-        features['whale_count'] = token_data.get('whale_count', 0)
-        features['whale_total_volume'] = token_data.get('whale_total_volume_usd', 0)
-        features['num_whale_wallets'] = len(token_data.get('whale_wallets_detected', []))
-
-        # === ML METRICS ===
-        ml = token_data.get('ml_metrics', {}) or {}
-        features['peak_velocity'] = ml.get('peak_velocity', 0)
-        features['avg_velocity'] = ml.get('avg_velocity', 0)
-        features['acceleration'] = ml.get('acceleration', 0)
-        features['gain_percent_from_start'] = ml.get('gain_percent_from_start', 0)
-        features['time_to_10k'] = ml.get('time_to_10k', 1800)
-        features['time_to_20k'] = ml.get('time_to_20k', 1800)
-        features['time_to_40k'] = ml.get('time_to_40k', 1800)
-        features['time_to_69k'] = ml.get('time_to_69k', 1800)
-        features['ath_mc'] = ml.get('ath_mc', 0)
-        features['ath_time'] = ml.get('ath_time', 1800)
-        features['max_drawdown'] = ml.get('max_drawdown_percent', 0)
-        features['volatility'] = ml.get('volatility', 0)
-        features['num_pumps'] = ml.get('num_pumps', 0)
-        features['num_dumps'] = ml.get('num_dumps', 0)
-        features['whale_entry_before_10k'] = ml.get('whale_entry_before_10k', 0)
-        features['whale_entry_10k_to_20k'] = ml.get('whale_entry_10k_to_20k', 0)
-        features['whale_exit_count'] = ml.get('whale_exit_count', 0)
-        features['avg_hold_time'] = ml.get('avg_hold_time', 0)
-        features['paper_hands_count'] = ml.get('paper_hands_count', 0)
-        features['diamond_hands_count'] = ml.get('diamond_hands_count', 0)
-        features['holder_ratio'] = ml.get('holder_ratio', 0)
-
-        # === SUPPLY DISTRIBUTION ===
-        supply = token_data.get('supply_distribution', {}) or {}
-        features['total_holders'] = supply.get('total_holders', 0)
-        features['top_3_percent'] = supply.get('top_3_percent', 0)
-        features['top_10_percent'] = supply.get('top_10_percent', 0)
-
-        # === COMPUTED FEATURES ===
-        features['early_signal_score'] = (
-            features.get('10s_buy_ratio', 0) * 30 +
-            min(features.get('10s_txn', 0), 100) * 0.3 +
-            features.get('10s_big_buys_100', 0) * 5 +
-            features.get('10s_whale_count', 0) * 10
-        )
-
-        features['momentum_score'] = (
-            features.get('15s_buy_ratio', 0) * 20 +
-            features.get('mc_growth_10s_to_30s', 0) * 50 +
-            features.get('txn_velocity_30s', 0) * 10
-        )
-
-        features['whale_confidence'] = (
-            features.get('num_whale_wallets', 0) * 20 +
-            features.get('whale_entry_before_10k', 0) * 15 +
-            min(features.get('whale_total_volume', 0) / 1000, 50)
+        """Extrait les features d'un token pour prediction (meme spec que l'entrainement)"""
+        return self.spec.as_dict(self.spec.transform_row(token_data))
+
+    def _bind(self, version: ModelVersion):
+        """Les 3 modèles d'une version passent dans un seul predict vectorisé (matrice commune)"""
+        feature_names = list(version['feature_names'])
+        migration_feature_names = list(version['migration_feature_names'])
+        all_feature_names = feature_names + [
+            name for name in migration_feature_names if name not in feature_names
+        ]
+        column = {name: i for i, name in enumerate(all_feature_names)}
+        runner_columns = len(feature_names)
+        migration_idx = np.array([column[name] for name in migration_feature_names])
+
+        classifier, clf_scaler = version['classifier'], version['classifier_scaler']
+        regressor, reg_scaler = version['regressor'], version['regressor_scaler']
+        migration_clf, mig_scaler = version['migration'], version['migration_scaler']
+
+        def predict_matrix(X: np.ndarray):
+            """
+            Classifier + regressor + migration sur une matrice (n, all_feature_names)
+
+            Returns:
+                Liste de (runner_proba %, prix prédit, migration_proba %) par ligne
+            """
+            X_runner = X[:, :runner_columns]
+            runner_proba = classifier.predict_proba(clf_scaler.transform(X_runner))[:, 1] * 100
+            predicted_price = np.maximum(0, regressor.predict(reg_scaler.transform(X_runner)))
+            X_mig = X[:, migration_idx]
+            migration_proba = migration_clf.predict_proba(mig_scaler.transform(X_mig))[:, 1] * 100
+            return list(zip(runner_proba.tolist(), predicted_price.tolist(), migration_proba.tolist()))
+
+        # Un nom par version: un batch en attente finit sur la version qui l'a reçu
+        name = f"runner@{version.version}"
+        self.inference.register(name, version.instrument(predict_matrix), all_feature_names)
+
+        previous = self.version
+        # Colonnes de la spec dans l'ordre attendu par les modeles
+        self._binding = (version, name, self.spec.indices(all_feature_names))
+        self.version = version
+        self.feature_names = feature_names
+        self.migration_feature_names = migration_feature_names
+        self.all_feature_names = all_feature_names
+
+        if previous is not None:
+            self.inference.models.pop(f"runner@{previous.version}", None)
+            print(f"[PREDICTOR] Modeles v{previous.version} -> v{version.version}")
+
+    def _current(self):
+        """(version, nom inference, colonnes) - rebranche si le registre a basculé"""
+        if self.registry.get('runner') is not self.version:
+            self._bind(self.registry.get('runner'))
+        return self._binding
+
+    def record_outcome(self, prediction: 'RunnerPrediction', was_runner: bool):
+        """Résultat réel d'un token prédit: alimente la précision de la version"""
+        self.registry.record_outcome(
+            'runner', prediction.model_version, (prediction.runner_probability >= 50) == was_runner
         )
 
-        return features
-
     def predict(self, token_data: Dict) -> Optional[RunnerPrediction]:
         """
         Predit si un token est un runner et son prix cible
@@ -200,47 +140,52 @@ class RunnerPredictor:
         Returns:
             RunnerPrediction avec toutes les predictions
         """
+        return self.predict_batch([token_data])[0]
+
+    def predict_batch(self, tokens: List[Dict]) -> List[Optional[RunnerPrediction]]:
+        """Predit un lot de tokens en un seul passage des 3 modeles"""
         if not self.loaded:
             print("[PREDICTOR] Modeles non charges!")
-            return None
+            return [None] * len(tokens)
 
         try:
-            # Extraire features
-            features = self.extract_features(token_data)
-
-            # Creer DataFrame
-            df = pd.DataFrame([features])
-
-            # Aligner avec les features attendues
-            for col in self.feature_names:
-                if col not in df.columns:
-                    df[col] = 0
-
-            df = df[self.feature_names]
-            df = df.replace([np.inf, -np.inf], 0).fillna(0)
+            version, name, spec_idx = self._current()
+            X = self.spec.transform(tokens)
+            outputs = self.inference.predict_many(name, list(X[:, spec_idx]))
+        except Exception as e:
+            print(f"[PREDICTOR] Erreur prediction: {e}")
+            import traceback
+            traceback.print_exc()
+            return [None] * len(tokens)
 
-            # === PREDICTION RUNNER ===
-            X_clf = self.clf_scaler.transform(df)
-            runner_proba = self.classifier.predict_proba(X_clf)[0][1] * 100
+        return [
+            self._build_prediction(token_data, row, version, *output)
+            for token_data, row, output in zip(tokens, X, outputs)
+        ]
 
-            # === PREDICTION PRIX ===
-            X_reg = self.reg_scaler.transform(df)
-            predicted_price = max(0, self.regressor.predict(X_reg)[0])
+    async def predict_async(self, token_data: Dict) -> Optional[RunnerPrediction]:
+        """Prediction regroupee avec les autres tokens de la meme fenetre (2ms / 64)"""
+        if not self.loaded:
+            return None
 
-            # === PREDICTION MIGRATION ===
-            # Utiliser seulement les features early
-            df_mig = pd.DataFrame([features])
-            for col in self.migration_feature_names:
-                if col not in df_mig.columns:
-                    df_mig[col] = 0
-            df_mig = df_mig[self.migration_feature_names]
-            df_mig = df_mig.replace([np.inf, -np.inf], 0).fillna(0)
+        try:
+            version, name, spec_idx = self._current()
+            # Copie de la ligne preallouee: elle peut etre reecrite avant le flush du batch
+            row = self.spec.transform_row(token_data).copy()
+            output = await self.inference.predict(name, row[spec_idx])
+        except Exception as e:
+            print(f"[PREDICTOR] Erreur prediction: {e}")
+            return None
 
-            X_mig = self.mig_scaler.transform(df_mig)
-            migration_proba = self.migration_clf.predict_proba(X_mig)[0][1] * 100
+        return self._build_prediction(token_data, row, version, *output)
 
+    def _build_prediction(self, token_data: Dict, row: np.ndarray, version: ModelVersion, runner_proba: float,
+                          predicted_price: float, migration_proba: float) -> Optional[RunnerPrediction]:
+        """Targets, categorie et action a partir des sorties des modeles"""
+        try:
             # === CALCUL DES TARGETS ===
-            current_mcap = features.get('10s_mc', 0) or features.get('15s_mc', 0) or token_data.get('usd_market_cap', 10000)
+            column = self.spec.column
+            current_mcap = float(row[column['10s_mc']]) or float(row[column['15s_mc']]) or token_data.get('usd_market_cap', 10000)
 
             # Targets basees sur le prix predit et la probabilite
             confidence_factor = runner_proba / 100
@@ -297,7 +242,8 @@ class RunnerPredictor:
                 category=category,
                 confidence=confidence,
                 action=action,
-                reason=reason
+                reason=reason,
+                model_version=version.version
             )
 
         except Exception as e:
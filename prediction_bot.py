@@ -2,6 +2,7 @@ import json
 import joblib
 import pandas as pd
 from datetime import datetime
+from bot_data_journal import load_bot_data
 
 print('='*80)
 print('BOT AI DE PREDICTION - STRATEGIE 10s + 15s')
@@ -26,8 +27,7 @@ print(f'  Model @ 15s: OK')
 
 # Charger les donnees
 print(f'\n[CHARGEMENT DES DONNEES]')
-with open('bot_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_bot_data('bot_data.json')
 
 runners = data.get('runners', [])
 flops = data.get('flops', [])[:50]  # Limiter les flops pour le test
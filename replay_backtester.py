@@ -0,0 +1,710 @@
+"""
+REPLAY BACKTESTER - Rejoue une capture WebSocket PumpPortal dans les vrais bots
+Les backtests existants (backtest_demo, find_optimal_thresholds, find_sweet_spot,
+test_long_simulation) lisent les snapshots `15s` de bot_data.json et ne passent
+jamais par handle_trade -> track_token -> PositionManager.check_position
+Ici les messages enregistrés (create / buy / sell) sont injectés dans les vraies
+classes, LiveTradingBot ou AITradingEngine + OptimizedBotWorker:
+- horloge virtuelle: une boucle asyncio dont time() est virtuel et qui saute
+  directement au prochain timer au lieu d'attendre (asyncio.sleep, wait_for,
+  call_later, TimerWheel); time.time() / datetime.now() des modules rejoués
+  lisent la même horloge
+- stubs locaux: trader (fills enregistrés), prix live/REST (dernier trade de
+  la capture), prix SOL, learning engine, base de données du worker
+- déterministe: même capture + mêmes paramètres = même P&L (cf. 'fingerprint')
+Capture: segments de ws_capture (.wsc.zst / .wsc.gz, répertoire d'une source),
+ou JSONL (.jsonl, .jsonl.gz, .jsonl.zst), une ligne par message
+    {"ts": 1760745600.123, "msg": "<message brut>" | {...}}
+    {"ts": 1760745630.0, "sol_price": 187.4}      (prix SOL optionnel)
+Usage:
+    python replay_backtester.py captures/live_bot
+    python replay_backtester.py captures/2026-10-17.jsonl.zst
+    python replay_backtester.py captures/ --target worker --sol-price 190 --tail 3600
+"""
+import asyncio
+import contextlib
+import glob
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from mark_price_cache import MarkPriceCache
+from pumpfun_price_fetcher import FAILED_PRICE
+from timer_wheel import TimerWheel
+from ws_capture import INDEX_SUFFIX, SEGMENT_PATTERN, iter_records
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_SOL_PRICE = 200.0  # Même défaut que l'oracle SOL hors ligne
+REPLAY_USER_ID = 0  # user_id du worker rejoué (aucun utilisateur réel)
+TOKEN_SUPPLY = 1e9  # Supply PumpFun (prix par token = MC / supply)
+
+DEFAULT_WORKER_CONFIG = {
+    'strategy': 'AI_PREDICTIONS',
+    'tp_strategy': 'PROGRESSIVE_AFTER_MIGRATION',
+    'simulation_mode': True,
+    'virtual_balance': 10.0
+}
+
+
+# ============================================================================
+# CAPTURE
+# ============================================================================
+def capture_files(path: str) -> List[str]:
+    """Fichiers d'une capture (un fichier, un répertoire ou un glob), triés par nom"""
+    if os.path.isdir(path):
+        files = glob.glob(os.path.join(path, SEGMENT_PATTERN)) + glob.glob(os.path.join(path, '*.jsonl*'))
+    else:
+        files = glob.glob(path)
+    files = sorted(f for f in files if not f.endswith(INDEX_SUFFIX))
+    if not files:
+        raise FileNotFoundError(path)
+    return files
+
+
+def _open_capture(path: str):
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError(f"zstandard requis pour lire {path} (pip install zstandard)")
+        raw = open(path, 'rb')
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_capture(path: str) -> Iterator[Tuple[float, dict]]:
+    """
+    (ts, record) de chaque ligne de la capture, dans l'ordre des fichiers
+
+    record contient 'msg' (message WebSocket brut ou dict) ou 'sol_price'
+    Une ligne tronquée (capture interrompue) termine le fichier
+    """
+    for filename in capture_files(path):
+        if '.wsc.' in os.path.basename(filename):
+            yield from iter_records(filename)
+            continue
+        with _open_capture(filename) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"[REPLAY] Ligne tronquee ignoree dans {filename}")
+                    break
+                yield record['ts'], record
+
+
+# ============================================================================
+# HORLOGE VIRTUELLE
+# ============================================================================
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    """
+    Boucle asyncio à temps virtuel
+
+    Quand la boucle n'a plus rien de prêt, elle attendrait le prochain timer
+    (select(timeout)): ici le temps virtuel avance de `timeout` et select
+    revient aussitôt. Les réveils inter-threads (call_soon_threadsafe) restent
+    traités normalement (select non bloquant)
+    """
+
+    def __init__(self, start_time: float):
+        super().__init__()
+        self._virtual_now = start_time
+        # À ~1.7e9 s un float ne distingue pas 1ns: sans cela, un timer échu
+        # (when == time()) n'est jamais considéré prêt et la boucle tourne à vide
+        self._clock_resolution = 1e-6
+        self._real_select = self._selector.select
+        self._selector.select = self._virtual_select
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def _virtual_select(self, timeout=None):
+        events = self._real_select(0)
+        if not events:
+            if timeout is None:
+                raise RuntimeError("Replay bloque: aucune tache prete ni timer programme")
+            if self._scheduled:
+                # Saut exact sur l'échéance (un petit timeout additionné serait arrondi)
+                self._virtual_now = max(self._virtual_now + timeout, self._scheduled[0]._when)
+            else:
+                self._virtual_now += timeout
+        return events
+
+
+class VirtualTime:
+    """Remplaçant du module time d'un module rejoué: time()/monotonic() virtuels"""
+
+    def __init__(self, clock):
+        self._clock = clock
+
+    def time(self) -> float:
+        return self._clock()
+
+    def monotonic(self) -> float:
+        return self._clock()
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def virtual_datetime(clock):
+    """Classe datetime dont now() lit l'horloge virtuelle"""
+
+    class VirtualDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(clock(), tz)
+
+    return VirtualDatetime
+
+
+# ============================================================================
+# STUBS (marché, trader, websocket, persistance)
+# ============================================================================
+class ReplayMarket:
+    """Prix live/REST servis depuis le dernier trade rejoué de chaque mint"""
+
+    def __init__(self, sol_price: float = DEFAULT_SOL_PRICE):
+        self.sol_price = sol_price
+        self.mc_sol: Dict[str, float] = {}
+
+    def apply(self, data: dict):
+        mint = data.get('mint')
+        if mint and 'marketCapSol' in data:
+            self.mc_sol[mint] = data['marketCapSol']
+
+    def mc_usd(self, mint: str, default: float = 0) -> float:
+        mc_sol = self.mc_sol.get(mint)
+        return mc_sol * self.sol_price if mc_sol is not None else default
+
+    def get_sol_price(self) -> float:
+        return self.sol_price
+
+    def get_token_price_live(self, mint: str) -> dict:
+        """Même format que pumpfun_price_fetcher.get_token_price_live"""
+        mc_sol = self.mc_sol.get(mint)
+        if mc_sol is None:
+            return dict(FAILED_PRICE)
+        return {
+            'mc_sol': mc_sol,
+            'mc_usd': mc_sol * self.sol_price,
+            'price_sol': mc_sol / TOKEN_SUPPLY,
+            'price_usd': mc_sol * self.sol_price / TOKEN_SUPPLY,
+            'sol_price_usd': self.sol_price,
+            'success': True
+        }
+
+    async def get_token_price_live_async(self, mint: str) -> dict:
+        return self.get_token_price_live(mint)
+
+
+class ReplayTrader:
+    """Remplace solana_trader: chaque ordre est rempli au dernier prix rejoué"""
+
+    enabled = True
+
+    def __init__(self, market: ReplayMarket, clock):
+        self.market = market
+        self.clock = clock
+        self.fills: List[dict] = []
+
+    def _fill(self, side: str, mint: str, **details) -> dict:
+        signature = f'replay_{side}_{len(self.fills) + 1}'
+        self.fills.append(dict(details, side=side, mint=mint, ts=self.clock(),
+                               mc_usd=self.market.mc_usd(mint), signature=signature))
+        return {'success': True, 'signature': signature, 'error': None}
+
+    def buy_token(self, mint, amount_sol, slippage=25, priority_fee=0.001):
+        return self._fill('buy', mint, amount_sol=amount_sol)
+
+    def sell_token(self, mint, amount_percent=100, slippage=25, priority_fee=0.001):
+        return self._fill('sell', mint, amount_percent=amount_percent)
+
+    async def buy_token_async(self, mint, amount_sol, slippage=25, priority_fee=0.001):
+        return self.buy_token(mint, amount_sol, slippage, priority_fee)
+
+    async def sell_token_async(self, mint, amount_percent=100, slippage=25, priority_fee=0.001):
+        return self.sell_token(mint, amount_percent, slippage, priority_fee)
+
+
+class ReplaySocket:
+    """
+    Remplace la connexion websockets: rejoue la capture au rythme de l'horloge virtuelle
+
+    Comme PumpPortal, seuls les créations (subscribeNewToken) et les trades des
+    mints abonnés (subscribeTokenTrade) sont livrés; le marché voit tous les trades
+    """
+
+    def __init__(self, events: Iterable[Tuple[float, dict]], market: ReplayMarket):
+        self.events = iter(events)
+        self.market = market
+        self.new_tokens = False
+        self.subscribed = set()
+        self.finished = asyncio.Event()
+
+        # Stats
+        self.messages = 0
+        self.delivered = 0
+        self.creates = 0
+        self.trades = 0
+        self.first_ts = None
+        self.last_ts = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.recv()
+
+    async def send(self, message: str):
+        request = json.loads(message)
+        method = request.get('method')
+        if method == 'subscribeNewToken':
+            self.new_tokens = True
+        elif method == 'subscribeTokenTrade':
+            self.subscribed.update(request.get('keys', []))
+
+    async def recv(self) -> str:
+        loop = asyncio.get_running_loop()
+        for ts, record in self.events:
+            delay = ts - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.first_ts is None:
+                self.first_ts = ts
+            self.last_ts = ts
+
+            if 'sol_price' in record:
+                self.market.sol_price = record['sol_price']
+                continue
+
+            raw = record.get('msg')
+            data = json.loads(raw) if isinstance(raw, str) else raw
+            if not isinstance(data, dict):
+                continue
+            self.messages += 1
+
+            self.market.apply(data)
+            tx_type = data.get('txType')
+            if tx_type == 'create':
+                self.creates += 1
+                deliver = self.new_tokens
+            elif tx_type in ('buy', 'sell'):
+                self.trades += 1
+                deliver = data.get('mint') in self.subscribed
+            else:
+                deliver = False
+
+            if deliver:
+                self.delivered += 1
+                return raw if isinstance(raw, str) else json.dumps(raw)
+
+        # Fin de la capture: la connexion reste ouverte sans messages
+        self.finished.set()
+        await asyncio.Future()
+
+
+class ReplayLedger:
+    """Remplace database_bot.db pour OptimizedBotWorker (trades gardés en mémoire)"""
+
+    def __init__(self):
+        self.trades: List[dict] = []
+        self.entries: Dict[str, dict] = {}  # {mint: dernière position ouverte}
+
+    def get_open_positions(self, user_id):
+        return []
+
+    def create_open_position(self, **position):
+        self.entries[position['token_address']] = position
+
+    def delete_open_position(self, user_id, token_address):
+        pass
+
+    def create_trade(self, **trade):
+        self.trades.append(trade)
+
+    def update_simulation_balance(self, *args, **kwargs):
+        pass
+
+    def increment_simulation_trades(self, *args, **kwargs):
+        pass
+
+
+class ReplayLearning:
+    """Remplace learning_engine / adaptive_config: le replay ne modifie pas l'état appris"""
+
+    def __init__(self):
+        self.trades: List[dict] = []
+
+    def record_trade(self, position):
+        self.trades.append(position)
+
+    def adjust_based_on_performance(self, *args, **kwargs):
+        pass
+
+
+class _NoDiagnostic:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def full_diagnostic(self):
+        pass
+
+
+class ReplayMarkPriceCache(MarkPriceCache):
+    """Fallback REST dans la boucle rejouée (pas de thread temps réel)"""
+
+    def _start_fallback_thread(self):
+        if self._fallback_thread is None:
+            self._fallback_thread = asyncio.ensure_future(self.fallback_loop())
+
+
+@contextlib.contextmanager
+def _patched(patches: List[tuple]):
+    """setattr(obj, name, value) pour chaque patch, restauré à la sortie"""
+    saved = [(obj, name, getattr(obj, name)) for obj, name, _ in patches]
+    try:
+        for obj, name, value in patches:
+            setattr(obj, name, value)
+        yield
+    finally:
+        for obj, name, value in reversed(saved):
+            setattr(obj, name, value)
+
+
+# ============================================================================
+# BACKTESTER
+# ============================================================================
+class ReplayBacktester:
+    """
+    Rejoue une capture dans LiveTradingBot ('live') ou AITradingEngine +
+    OptimizedBotWorker ('worker') et renvoie le P&L
+
+    - tail_seconds: temps virtuel simulé après le dernier message (timeouts,
+      snapshots des derniers tokens); les positions encore ouvertes sont
+      valorisées au dernier prix rejoué
+    - quiet: sortie console des bots redirigée vers /dev/null
+    """
+
+    TARGETS = ('live', 'worker')
+
+    def __init__(self, capture: str, target: str = 'live', sol_price: float = DEFAULT_SOL_PRICE,
+                 tail_seconds: float = 0.0, quiet: bool = True, worker_config: dict = None):
+        if target not in self.TARGETS:
+            raise ValueError(f"Cible inconnue: {target} (disponibles: {', '.join(self.TARGETS)})")
+        self.capture = capture
+        self.target = target
+        self.sol_price = sol_price
+        self.tail_seconds = tail_seconds
+        self.quiet = quiet
+        self.worker_config = dict(DEFAULT_WORKER_CONFIG, **(worker_config or {}), simulation_mode=True)
+
+    def run(self) -> dict:
+        events = iter_capture(self.capture)
+        first = next(events, None)
+        if first is None:
+            raise ValueError(f"Capture vide: {self.capture}")
+
+        loop = VirtualEventLoop(first[0])
+        market = ReplayMarket(self.sol_price)
+        socket = None
+        wall_start = time.perf_counter()
+
+        output = open(os.devnull, 'w', encoding='utf-8') if self.quiet else None
+        try:
+            asyncio.set_event_loop(loop)
+            socket = loop.run_until_complete(self._make_socket(itertools.chain([first], events), market))
+            with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+                with _patched(self._patches(loop, market, socket)):
+                    try:
+                        report = loop.run_until_complete(self._replay(loop, market, socket))
+                    finally:
+                        self._shutdown(loop)
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+            if output:
+                output.close()
+
+        wall_seconds = time.perf_counter() - wall_start
+        span = (socket.last_ts - socket.first_ts) if socket.first_ts is not None else 0.0
+        report.update({
+            'target': self.target,
+            'capture': self.capture,
+            'sol_price': market.sol_price,
+            'messages': socket.messages,
+            'tokens': socket.creates,
+            'trades': socket.trades,
+            'delivered': socket.delivered,
+            'virtual_seconds': round(span + self.tail_seconds, 3),
+            'wall_seconds': round(wall_seconds, 3),
+            'speedup': round((span + self.tail_seconds) / wall_seconds, 1) if wall_seconds > 0 else None
+        })
+        return report
+
+    @staticmethod
+    async def _make_socket(events, market) -> ReplaySocket:
+        # asyncio.Event lié à la boucle virtuelle
+        return ReplaySocket(events, market)
+
+    def _patches(self, loop, market: ReplayMarket, socket: ReplaySocket) -> List[tuple]:
+        """Horloge, réseau et persistance des modules rejoués"""
+        import pumpfun_price_fetcher
+        import websockets
+        import mark_price_cache
+
+        clock = loop.time
+        vdatetime = virtual_datetime(clock)
+        self.trader = ReplayTrader(market, clock)
+        self.learning = ReplayLearning()
+        self.ledger = ReplayLedger()
+        self.mark_prices = ReplayMarkPriceCache()
+
+        patches = [
+            (websockets, 'connect', lambda *args, **kwargs: socket),
+            (pumpfun_price_fetcher, 'get_token_price_live', market.get_token_price_live),
+            (pumpfun_price_fetcher, 'get_token_price_live_async', market.get_token_price_live_async),
+            (mark_price_cache, 'datetime', vdatetime),
+        ]
+
+        if self.target == 'live':
+            import live_trading_bot as live
+            patches += [
+                (live, 'time', VirtualTime(clock)),
+                (live, 'datetime', vdatetime),
+                (live, 'get_sol_price_usd', market.get_sol_price),
+                (live, 'get_token_price_live_async', market.get_token_price_live_async),
+                (live, 'solana_trader', self.trader),
+                (live, 'learning_engine', self.learning),
+                (live, 'adaptive_config', self.learning),
+                (live, 'TradeAnalyzer', _NoDiagnostic),
+                (live, 'update_console_title', lambda text: None),
+                (live, 'get_ws_capture', lambda source: None),  # Ne pas réenregistrer le replay
+            ]
+        else:
+            import ai_trading_engine as ai
+            import optimized_bot_worker as worker
+            patches += [
+                (ai, 'datetime', vdatetime),
+                (ai, 'get_sol_price_usd', market.get_sol_price),
+                (ai, 'get_mark_price_cache', lambda: self.mark_prices),
+                (ai, 'get_ws_capture', lambda source: None),
+                (worker, 'datetime', vdatetime),
+                (worker, 'db', self.ledger),
+                (worker, 'get_mark_price_cache', lambda: self.mark_prices),
+            ]
+        return patches
+
+    async def _replay(self, loop, market: ReplayMarket, socket: ReplaySocket) -> dict:
+        if self.target == 'live':
+            import live_trading_bot as live
+            bot = live.LiveTradingBot()
+            bot.scheduler = TimerWheel(clock=loop.time)
+            tasks = [asyncio.ensure_future(bot.run())]
+        else:
+            import ai_trading_engine as ai
+            import optimized_bot_worker
+            engine = ai.AITradingEngine()
+            engine.scheduler = TimerWheel(clock=loop.time)
+            with _patched([(optimized_bot_worker, 'get_engine', lambda: engine)]):
+                bot = optimized_bot_worker.OptimizedBotWorker(
+                    REPLAY_USER_ID, 'replay', '', self.worker_config)
+            tasks = [asyncio.ensure_future(engine.start()), asyncio.ensure_future(bot.start())]
+
+        # Fin de capture, ou arrêt anormal d'un bot
+        finished = asyncio.ensure_future(socket.finished.wait())
+        await asyncio.wait(tasks + [finished], return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            if task.done() and task.exception():
+                raise task.exception()
+        if self.tail_seconds:
+            await asyncio.sleep(self.tail_seconds)
+
+        if self.target == 'live':
+            return self._live_report(bot, market)
+        return self._worker_report(bot, market)
+
+    @staticmethod
+    def _shutdown(loop):
+        tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+    # ------------------------------------------------------------------
+    # Rapports
+    # ------------------------------------------------------------------
+    def _live_report(self, bot, market: ReplayMarket) -> dict:
+        closed = []
+        for position in bot.positions.closed_positions:
+            closed.append({
+                'mint': position['mint'],
+                'symbol': position['symbol'],
+                'entry_time': position['entry_timestamp'].isoformat(),
+                'exit_time': position['exit_time'].isoformat(),
+                'entry_mc': position['entry_mc'],
+                'exit_mc': position['exit_mc'],
+                'entry_reason': position.get('entry_reason', ''),
+                'exit_reason': position.get('exit_reason', ''),
+                'pnl_sol': position['amount_sol'] * (position['profit_ratio'] - 1)
+            })
+
+        still_open = []
+        for mint, position in bot.positions.positions.items():
+            mark = market.mc_usd(mint, position.get('last_mc', position['entry_mc']))
+            ratio = mark / position['entry_mc']
+            if position.get('partial_sold'):
+                ratio = 1.0 + 0.5 * ratio
+            still_open.append({
+                'mint': mint,
+                'symbol': position['symbol'],
+                'entry_mc': position['entry_mc'],
+                'mark_mc': mark,
+                'pnl_sol': position['amount_sol'] * (ratio - 1)
+            })
+
+        report = _summarize(closed, still_open)
+        report['fills'] = len(self.trader.fills)
+        return report
+
+    def _worker_report(self, worker, market: ReplayMarket) -> dict:
+        closed = []
+        for trade in self.ledger.trades:
+            if trade['trade_type'] != 'BUY_SELL':
+                continue
+            entry = self.ledger.entries.get(trade['token_address'], {})
+            closed.append({
+                'mint': trade['token_address'],
+                'symbol': trade['token_name'],
+                'entry_time': entry.get('entry_time', ''),
+                'entry_mc': entry.get('entry_mc', 0),
+                'exit_mc': trade['price_usd'],
+                'pnl_sol': trade['profit_loss']
+            })
+
+        still_open = []
+        for mint, position in worker.active_positions.items():
+            mark = market.mc_usd(mint, position.get('last_mc', position['entry_mc']))
+            ratio = mark / position['entry_mc']
+            if position.get('partial_sold'):
+                ratio = 1.0 + 0.5 * ratio
+            still_open.append({
+                'mint': mint,
+                'symbol': position['token_name'],
+                'entry_mc': position['entry_mc'],
+                'mark_mc': mark,
+                'pnl_sol': position['amount'] * (ratio - 1)
+            })
+
+        report = _summarize(closed, still_open)
+        report['signals'] = worker.signals_processed
+        report['final_balance_sol'] = round(worker.virtual_balance, 6)
+        return report
+
+
+def _summarize(closed: List[dict], still_open: List[dict]) -> dict:
+    wins = sum(1 for trade in closed if trade['pnl_sol'] > 0)
+    realized = sum(trade['pnl_sol'] for trade in closed)
+    unrealized = sum(position['pnl_sol'] for position in still_open)
+
+    # Empreinte des trades: deux replays identiques donnent la même valeur
+    digest = hashlib.sha256(json.dumps(
+        [[t['mint'], round(t['entry_mc'], 6), round(t['exit_mc'], 6), round(t['pnl_sol'], 9)] for t in closed],
+    ).encode()).hexdigest()[:16]
+
+    return {
+        'closed_trades': len(closed),
+        'open_positions': len(still_open),
+        'wins': wins,
+        'win_rate': (wins / len(closed) * 100) if closed else 0.0,
+        'realized_pnl_sol': round(realized, 6),
+        'unrealized_pnl_sol': round(unrealized, 6),
+        'total_pnl_sol': round(realized + unrealized, 6),
+        'fingerprint': digest,
+        'closed': closed,
+        'open': still_open
+    }
+
+
+def print_report(report: dict):
+    print('=' * 80)
+    print(f"REPLAY BACKTEST - {report['target'].upper()}")
+    print('=' * 80)
+    print(f"\nCapture: {report['capture']}")
+    print(f"  Messages: {report['messages']:,} ({report['tokens']:,} tokens, {report['trades']:,} trades)")
+    print(f"  Temps virtuel: {report['virtual_seconds'] / 3600:.2f}h en {report['wall_seconds']:.1f}s "
+          f"(x{report['speedup']})")
+    print(f"  Prix SOL (fin): ${report['sol_price']:.2f}")
+
+    print(f"\n[RESULTATS]")
+    print(f"  Trades fermes: {report['closed_trades']} | Wins: {report['wins']} "
+          f"({report['win_rate']:.1f}%)")
+    print(f"  PNL realise: {report['realized_pnl_sol']:+.4f} SOL")
+    print(f"  Positions ouvertes: {report['open_positions']} "
+          f"(latent: {report['unrealized_pnl_sol']:+.4f} SOL)")
+    print(f"  PNL total: {report['total_pnl_sol']:+.4f} SOL")
+    if 'final_balance_sol' in report:
+        print(f"  Balance finale: {report['final_balance_sol']:.4f} SOL")
+    print(f"  Empreinte: {report['fingerprint']}")
+
+    if report['closed']:
+        print(f"\n[TRADES]")
+        for trade in report['closed'][:50]:
+            print(f"  {trade['symbol'][:12]:<12} ${trade['entry_mc']:>10,.0f} -> ${trade['exit_mc']:>10,.0f} "
+                  f"{trade['pnl_sol']:+.4f} SOL  {trade.get('exit_reason', '')}")
+        if len(report['closed']) > 50:
+            print(f"  ... {len(report['closed']) - 50} autres")
+    print('=' * 80)
+
+
+def main(argv: List[str]):
+    if not argv or argv[0].startswith('--'):
+        print(__doc__)
+        sys.exit(1)
+
+    options = {'--target': 'live', '--sol-price': DEFAULT_SOL_PRICE, '--tail': 0.0, '--json': None}
+    for name in options:
+        if name in argv:
+            options[name] = argv[argv.index(name) + 1]
+
+    backtester = ReplayBacktester(
+        argv[0],
+        target=options['--target'],
+        sol_price=float(options['--sol-price']),
+        tail_seconds=float(options['--tail']),
+        quiet='--verbose' not in argv
+    )
+    try:
+        report = backtester.run()
+    except FileNotFoundError as e:
+        print(f"[ERROR] Capture {e} non trouvee")
+        sys.exit(1)
+
+    print_report(report)
+    if options['--json']:
+        with open(options['--json'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Rapport: {options['--json']}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,293 @@
+"""
+RUNNER FEATURES - Spec unique des features du modèle runner (entraînement + prédiction)
+Remplace les deux copies de extract_features (train_runner_model.py et
+predict_runner.py) qui divergeaient (defaults de time_to_*, colonnes en plus):
+- la spec déclare les colonnes: snapshot (horizon x métrique), token, ml_metrics, supply
+- elle est compilée une fois en groupes (source, clés, defaults)
+- transform(tokens) remplit une matrice NumPy (n, n_features) en bloc, les
+  features dérivées (croissances, vélocités, scores) sont calculées par colonne
+- transform_row(token) réutilise une ligne préallouée pour l'inférence
+Les deux chemins exécutent le même code: check_parity() le vérifie bit à bit
+"""
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+BASIC = ('txn', 'buy_ratio', 'traders', 'mc')
+DETAILED = ('txn', 'buys', 'sells', 'buy_ratio', 'traders', 'mc',
+            'big_buys_100', 'big_buys_500', 'total_buy_volume', 'smart_money', 'whale_count')
+
+# Horizon x métriques (ordre = ordre des colonnes)
+SNAPSHOT_METRICS = (
+    ('3s', BASIC),
+    ('5s', BASIC),
+    ('7s', BASIC),
+    ('10s', DETAILED),  # CRUCIAL pour early detection
+    ('15s', DETAILED),
+    ('30s', ('txn', 'buy_ratio', 'traders', 'mc', 'big_buys_100', 'big_buys_500', 'whale_count')),
+    ('1min', ('txn', 'buy_ratio', 'traders', 'mc', 'big_buys_500')),
+    ('5min', BASIC),
+    ('10min', ('txn', 'buy_ratio', 'mc')),
+)
+SNAPSHOT_KEYS = {'smart_money': 'smart_money_count'}  # Nom de feature -> clé du snapshot
+
+# (feature, clé dans la source, default) par source
+TOKEN_FEATURES = (
+    ('whale_count', 'whale_count', 0),
+    ('whale_total_volume', 'whale_total_volume_usd', 0),
+)
+ML_METRICS_FEATURES = (
+    ('peak_velocity', 'peak_velocity', 0),
+    ('avg_velocity', 'avg_velocity', 0),
+    ('acceleration', 'acceleration', 0),
+    ('gain_percent_from_start', 'gain_percent_from_start', 0),
+    ('time_to_10k', 'time_to_10k', 9999),
+    ('time_to_20k', 'time_to_20k', 9999),
+    ('time_to_40k', 'time_to_40k', 9999),
+    ('time_to_69k', 'time_to_69k', 9999),
+    ('ath_mc', 'ath_mc', 0),
+    ('ath_time', 'ath_time', 9999),
+    ('max_drawdown', 'max_drawdown_percent', 0),
+    ('volatility', 'volatility', 0),
+    ('num_pumps', 'num_pumps', 0),
+    ('num_dumps', 'num_dumps', 0),
+    ('whale_entry_before_10k', 'whale_entry_before_10k', 0),
+    ('whale_entry_10k_to_20k', 'whale_entry_10k_to_20k', 0),
+    ('whale_exit_count', 'whale_exit_count', 0),
+    ('avg_hold_time', 'avg_hold_time', 0),
+    ('paper_hands_count', 'paper_hands_count', 0),
+    ('diamond_hands_count', 'diamond_hands_count', 0),
+    ('holder_ratio', 'holder_ratio', 0),
+)
+SUPPLY_FEATURES = (
+    ('total_holders', 'total_holders', 0),
+    ('top_3_percent', 'top_3_percent', 0),
+    ('top_10_percent', 'top_10_percent', 0),
+)
+
+# Features calculées par colonne à partir des précédentes (ordre des colonnes)
+DERIVED_FEATURES = (
+    'mc_growth_10s_to_30s', 'mc_growth_10s_to_1min', 'mc_growth_30s_to_5min',
+    'txn_velocity_10s', 'txn_velocity_30s', 'txn_velocity_1min',
+    'trader_growth_10s_to_30s', 'trader_growth_10s_to_1min',
+    'num_whale_wallets',
+    'early_signal_score', 'momentum_score', 'whale_confidence',
+)
+
+LABELS = (
+    ('is_runner', 'is_runner'),
+    ('final_mc', 'final_mc'),
+    ('migration_detected', 'migration_detected'),
+)
+
+TIME_TO_MISSING = 9999  # Valeur "jamais atteint" des time_to_*
+TIME_TO_CAP = 1800  # 30 min max (ce que voit le modèle)
+
+
+class FeatureSpec:
+    """
+    Spec compilée: noms de colonnes + groupes d'extraction
+
+    Chaque groupe lit un dict source (un snapshot, ml_metrics, supply_distribution
+    ou le token); les valeurs de tout un bloc de tokens sont converties en une
+    seule matrice, puis les dérivées sont calculées par colonne
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.groups = []  # [(source, clés, defaults)]
+
+        for horizon, metrics in SNAPSHOT_METRICS:
+            self._add_group(horizon, [
+                (f'{horizon}_{metric}', SNAPSHOT_KEYS.get(metric, metric), 0) for metric in metrics
+            ])
+        self._add_group(None, TOKEN_FEATURES)
+        self._add_group('ml_metrics', ML_METRICS_FEATURES)
+        self._add_group('supply_distribution', SUPPLY_FEATURES)
+        self.n_extracted = len(self.names)
+        self.names.extend(DERIVED_FEATURES)
+
+        self.column = {name: i for i, name in enumerate(self.names)}
+        self.n_features = len(self.names)
+        self.time_to_columns = np.array([i for i, name in enumerate(self.names) if name.startswith('time_to_')])
+        self._local = threading.local()  # Ligne préallouée par thread (inférence)
+
+    def _add_group(self, source: Optional[str], features: Sequence[tuple]):
+        self.names.extend(name for name, _, _ in features)
+        self.groups.append((
+            source,
+            tuple(key for _, key, _ in features),
+            tuple(default for _, _, default in features)
+        ))
+
+    def indices(self, names: Sequence[str]) -> np.ndarray:
+        """Colonnes de la spec pour une liste de features (ex: feature_names d'un modèle)"""
+        return np.array([self.column[name] for name in names], dtype=np.intp)
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+    def _values(self, token: dict) -> list:
+        """Valeurs brutes des colonnes extraites (avant dérivées), dans l'ordre de la spec"""
+        values = []
+        for source, keys, defaults in self.groups:
+            data = token if source is None else token.get(source)
+            # Snapshot absent, None ou malformé (liste, chaîne...): defaults
+            get = data.get if isinstance(data, dict) else {}.get
+            values.extend(map(get, keys, defaults))
+        return values
+
+    def _derive(self, X: np.ndarray, tokens: Sequence[dict]):
+        """Features dérivées, vectorisées sur toutes les lignes"""
+        c = self.column
+
+        def col(name):
+            return X[:, c[name]]
+
+        def ratio(num, den, out_name, minus=None):
+            numerator = num - minus if minus is not None else num
+            valid = den > 0
+            np.divide(numerator, den, out=X[:, c[out_name]], where=valid)
+            X[~valid, c[out_name]] = 0
+
+        mc_10s, mc_30s = col('10s_mc'), col('30s_mc')
+        # === VELOCITY & MOMENTUM ===
+        ratio(mc_30s, mc_10s, 'mc_growth_10s_to_30s', minus=mc_10s)
+        ratio(col('1min_mc'), mc_10s, 'mc_growth_10s_to_1min', minus=mc_10s)
+        ratio(col('5min_mc'), mc_30s, 'mc_growth_30s_to_5min', minus=mc_30s)
+
+        X[:, c['txn_velocity_10s']] = col('10s_txn') / 10
+        X[:, c['txn_velocity_30s']] = col('30s_txn') / 30
+        X[:, c['txn_velocity_1min']] = col('1min_txn') / 60
+
+        traders_10s = col('10s_traders')
+        ratio(col('30s_traders'), traders_10s, 'trader_growth_10s_to_30s')
+        ratio(col('1min_traders'), traders_10s, 'trader_growth_10s_to_1min')
+
+        # === WHALE METRICS ===
+        X[:, c['num_whale_wallets']] = [len(token.get('whale_wallets_detected') or ()) for token in tokens]
+
+        # === COMPUTED FEATURES ===
+        X[:, c['early_signal_score']] = (
+            col('10s_buy_ratio') * 30 +
+            np.minimum(col('10s_txn'), 100) * 0.3 +
+            col('10s_big_buys_100') * 5 +
+            col('10s_whale_count') * 10
+        )
+        X[:, c['momentum_score']] = (
+            col('15s_buy_ratio') * 20 +
+            col('mc_growth_10s_to_30s') * 50 +
+            col('txn_velocity_30s') * 10
+        )
+        X[:, c['whale_confidence']] = (
+            col('num_whale_wallets') * 20 +
+            col('whale_entry_before_10k') * 15 +
+            np.minimum(col('whale_total_volume') / 1000, 50)
+        )
+
+    def _clean(self, X: np.ndarray):
+        # NaN / inf -> 0, puis time_to_* "jamais atteint" (9999) -> 30 min
+        np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        times = X[:, self.time_to_columns]
+        times[times == TIME_TO_MISSING] = TIME_TO_CAP
+        X[:, self.time_to_columns] = times
+
+    def transform(self, tokens: Sequence[dict], out: np.ndarray = None, skip_invalid: bool = False):
+        """
+        Matrice (n, n_features) pour une liste de tokens
+
+        Args:
+            out: matrice préallouée (au moins n lignes) à remplir
+            skip_invalid: ignorer les tokens non numériques au lieu de lever
+
+        Returns:
+            (X, tokens gardés) si skip_invalid, sinon X
+        """
+        tokens = list(tokens)
+        X = np.zeros((len(tokens), self.n_features), dtype=np.float64) if out is None else out[:len(tokens)]
+        rows = [self._values(token) for token in tokens]
+        kept = tokens
+        try:
+            # Une seule conversion pour tout le bloc
+            X[:, :self.n_extracted] = np.array(rows, dtype=np.float64).reshape(len(rows), self.n_extracted)
+        except (TypeError, ValueError):
+            if not skip_invalid:
+                raise
+            # Valeur non numérique quelque part: conversion ligne par ligne pour isoler les tokens
+            kept = []
+            for token, values in zip(tokens, rows):
+                try:
+                    X[len(kept), :self.n_extracted] = np.array(values, dtype=np.float64)
+                except (TypeError, ValueError):
+                    continue
+                kept.append(token)
+
+        X = X[:len(kept)]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            self._derive(X, kept)
+        self._clean(X)
+        return (X, kept) if skip_invalid else X
+
+    def transform_row(self, token: dict) -> np.ndarray:
+        """Ligne de features d'un token (buffer préalloué du thread, réécrit à chaque appel)"""
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.zeros((1, self.n_features), dtype=np.float64)
+        return self.transform([token], out=row)[0]
+
+    def as_dict(self, row: np.ndarray) -> Dict[str, float]:
+        return dict(zip(self.names, row.tolist()))
+
+
+def extract_labels(tokens: Sequence[dict]) -> Dict[str, np.ndarray]:
+    """Labels d'entraînement (is_runner, final_mc, migration_detected)"""
+    labels = {}
+    for name, key in LABELS:
+        labels[name] = np.array([float(token.get(key, 0) or 0) for token in tokens], dtype=np.float64)
+    return labels
+
+
+def check_parity(tokens: Sequence[dict], spec: 'FeatureSpec' = None) -> bool:
+    """
+    Vérifie que transform (entraînement, en bloc) et transform_row (inférence,
+    ligne par ligne) produisent exactement les mêmes bits pour chaque token
+    """
+    spec = spec or get_feature_spec()
+    X, kept = spec.transform(tokens, skip_invalid=True)
+    for i, token in enumerate(kept):
+        row = spec.transform_row(token)
+        if not np.array_equal(X[i].view(np.uint64), row.view(np.uint64)):
+            diff = [spec.names[j] for j in np.nonzero(X[i].view(np.uint64) != row.view(np.uint64))[0]]
+            print(f"[FEATURES] Parite KO pour {token.get('mint', i)}: {diff}")
+            return False
+    return True
+
+
+# Instance globale
+_feature_spec: Optional[FeatureSpec] = None
+
+
+def get_feature_spec() -> FeatureSpec:
+    """Spec compilée partagée (entraînement et prédiction)"""
+    global _feature_spec
+
+    if _feature_spec is None:
+        _feature_spec = FeatureSpec()
+
+    return _feature_spec
+
+
+if __name__ == "__main__":
+    # Verification de parite entrainement / inference sur les donnees collectees
+    import sys
+    from bot_data_journal import open_completed
+
+    data_file = sys.argv[1] if len(sys.argv) > 1 else 'bot_data.json'
+    tokens = list(open_completed(data_file))
+    spec = get_feature_spec()
+    print(f"[FEATURES] {spec.n_features} features, {len(tokens)} tokens")
+    if check_parity(tokens, spec):
+        print("[FEATURES] Parite OK: transform == transform_row bit a bit")
+    else:
+        sys.exit(1)
@@ -1,15 +1,103 @@
 """
 Scanner Data Manager
 Tracks and stores all scanner activity for public/private display
+
+- One long-lived WAL connection for reads, one writer thread (own connection)
+  that applies scanner writes from a queue in batched transactions
+- Rolling counters updated on insert + a TTL-cached aggregate snapshot, so the
+  public /api/scanner/* endpoints are served from memory
+- Token metadata goes to a compressed daily archive (JSONL, zstd or gzip), not
+  to the table; scanned-but-not-bought rows are deleted after RETENTION_DAYS
 """
 
+import gzip
+import os
 import sqlite3
 import threading
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import queue
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 import json
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+STATS_TTL = 30.0  # Seconds before the aggregate snapshot is recomputed (other processes write too)
+FEED_TTL = 2.0  # Live feed / live gems cache
+WINS_TTL = 60.0  # Delayed wins (already 2h behind, no need to be fresher)
+WRITE_BATCH_SIZE = 128
+WRITE_BATCH_WINDOW = 0.05
+
+RETENTION_DAYS = int(os.environ.get('SCANNER_RETENTION_DAYS', 7))  # Scanned-but-not-bought rows
+RETENTION_INTERVAL = 3600.0  # Seconds between retention passes
+RETENTION_CHUNK = 5000  # Rows deleted per transaction
+ARCHIVE_DIR = 'scanner_archive'
+
+_REFRESH = object()  # Queue marker: recompute the aggregate snapshot after the pending writes
+
+
+class ScannerArchive:
+    """
+    Append-only daily archive of scanned tokens: one compressed JSONL file per
+    UTC day (scanner_activity-YYYY-MM-DD.jsonl.zst, or .jsonl.gz without
+    zstandard). Each append is an independent compressed frame/member, so a
+    file is never rewritten and partial days stay readable.
+    """
+
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = Path(directory)
+        self.extension = '.jsonl.zst' if zstandard is not None else '.jsonl.gz'
+        self._compressor = zstandard.ZstdCompressor(level=3) if zstandard is not None else None
+        self.records_written = 0
+
+    def path_for(self, day: date) -> Path:
+        return self.directory / f"scanner_activity-{day.isoformat()}{self.extension}"
+
+    def append(self, records: List[dict]):
+        """Append records, grouped by their UTC scan day"""
+        by_day: Dict[date, List[str]] = {}
+        for record in records:
+            day = datetime.fromisoformat(record['scanned_at']).date()
+            by_day.setdefault(day, []).append(json.dumps(record, default=str))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for day, lines in by_day.items():
+            data = ('\n'.join(lines) + '\n').encode()
+            path = self.path_for(day)
+            if self._compressor is not None:
+                with open(path, 'ab') as f:
+                    f.write(self._compressor.compress(data))
+            else:
+                with gzip.open(path, 'ab') as f:
+                    f.write(data)
+        self.records_written += len(records)
+
+    def iter_records(self, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[dict]:
+        """Archived records between two UTC days (inclusive), oldest file first"""
+        for path in sorted(self.directory.glob('scanner_activity-*.jsonl.*')):
+            day = date.fromisoformat(path.name[len('scanner_activity-'):][:10])
+            if (start and day < start) or (end and day > end):
+                continue
+
+            if path.suffix == '.zst':
+                if zstandard is None:
+                    print(f"[WARNING] zstandard not installed, skipping {path.name}")
+                    continue
+                with open(path, 'rb') as f:
+                    data = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+            else:
+                with gzip.open(path, 'rb') as f:
+                    data = f.read()
+
+            for line in data.splitlines():
+                if line:
+                    yield json.loads(line)
+
+
 class ScannerDataManager:
     _instance = None
     _lock = threading.Lock()
@@ -25,11 +113,55 @@ class ScannerDataManager:
         if not hasattr(self, 'initialized'):
             self.db_path = 'trading_bot.db'
             self.initialized = True
+
+            self._read_conn = None
+            self._read_lock = threading.Lock()
+            self._writes = queue.Queue()
+            self._writer = None
+            self._writer_lock = threading.Lock()
+            self.archive = ScannerArchive()
+            self._next_retention = 0.0
+
+            # {key: (expires_at, value)} - served without touching disk until expiry
+            self._cache: Dict[tuple, tuple] = {}
+
+            # Rolling counters (exact, updated on insert) + last aggregate snapshot
+            self._total_scanned = 0
+            self._total_gems = 0
+            # Scans queued but not yet committed, added on top of the snapshot totals
+            self._queued_scans = 0
+            self._queued_gems = 0
+            self._counter_lock = threading.Lock()
+            self._snapshot: Optional[dict] = None
+            self._snapshot_at = 0.0
+            self._refresh_pending = False
+
+            # Stats
+            self.writes_committed = 0
+            self.write_batches = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.rows_expired = 0
+
             self._init_database()
+            with self._read_lock:
+                self._refresh_snapshot(self._get_read_connection())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _get_read_connection(self) -> sqlite3.Connection:
+        if self._read_conn is None:
+            self._read_conn = self._connect()
+            self._read_conn.row_factory = sqlite3.Row
+        return self._read_conn
 
     def _init_database(self):
         """Initialize scanner_activity table"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -62,109 +194,266 @@ class ScannerDataManager:
             ON scanner_activity(is_gem, scanned_at DESC)
         """)
 
+        # Bought / performance updates look rows up by token
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scanner_token
+            ON scanner_activity(token_address)
+        """)
+
+        # Counts of rows removed by retention (public totals include them)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scanner_activity_expired (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_scanned INTEGER DEFAULT 0,
+                total_gems INTEGER DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO scanner_activity_expired (id) VALUES (1)")
+
         conn.commit()
         conn.close()
 
+    # ------------------------------------------------------------------
+    # Writes (queued, applied by the writer thread)
+    # ------------------------------------------------------------------
+    def _put(self, item):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name='scanner-writer', daemon=True)
+                    self._writer.start()
+        self._writes.put(item)
+
+    def _queue_write(self, query: str, params: tuple, archive_record: Optional[dict] = None):
+        self._put((query, params, archive_record))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued write is committed"""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._writes.put(done)
+        return done.wait(timeout)
+
+    def _write_loop(self):
+        conn = self._connect()
+
+        while True:
+            if time.monotonic() >= self._next_retention:
+                self._next_retention = time.monotonic() + RETENTION_INTERVAL
+                try:
+                    self.apply_retention(conn)
+                except Exception as e:
+                    conn.rollback()
+                    print(f"[WARNING] Scanner retention failed: {e}")
+
+            try:
+                batch = [self._writes.get(timeout=RETENTION_INTERVAL)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW
+            while len(batch) < WRITE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._writes.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if isinstance(item, tuple)]
+            if writes:
+                committed = self._commit_writes(conn, writes)
+                scans = [record for _, _, record in writes if record is not None]
+                if scans:
+                    with self._counter_lock:
+                        self._queued_scans -= len(scans)
+                        self._queued_gems -= sum(record.get('is_gem', 0) for record in scans)
+
+                # Only rows the table actually has go to the archive
+                records = [record for _, _, record in committed if record is not None]
+                if records:
+                    try:
+                        self.archive.append(records)
+                    except Exception as e:
+                        print(f"[WARNING] Scanner archive write failed: {e}")
+
+            if _REFRESH in batch:
+                try:
+                    self._refresh_snapshot(conn)
+                except Exception as e:
+                    print(f"[WARNING] Scanner stats refresh failed: {e}")
+                self._refresh_pending = False
+
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _commit_writes(self, conn: sqlite3.Connection, writes: List[tuple]) -> List[tuple]:
+        """
+        Apply a batch in one transaction; if it fails, retry the writes one by
+        one so a single bad row does not drop the others. Returns the writes
+        that were committed.
+        """
+        try:
+            for query, params, _ in writes:
+                conn.execute(query, params)
+            conn.commit()
+            self.writes_committed += len(writes)
+            self.write_batches += 1
+            return writes
+        except Exception as e:
+            conn.rollback()
+            print(f"[WARNING] Scanner batch of {len(writes)} writes failed, retrying one by one: {e}")
+
+        committed = []
+        for write in writes:
+            query, params, record = write
+            try:
+                conn.execute(query, params)
+                conn.commit()
+                self.writes_committed += 1
+                committed.append(write)
+            except Exception as e:
+                conn.rollback()
+                print(f"[WARNING] Scanner write dropped: {e}")
+                if record is not None:
+                    # The scan was counted when it was queued
+                    with self._counter_lock:
+                        self._total_scanned -= 1
+                        self._total_gems -= record.get('is_gem', 0)
+        return committed
+
     def log_token_scanned(self, token_data: dict, ai_prediction: dict):
         """Log a token that was scanned by the AI"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        is_gem = 1 if ai_prediction.get('action') == 'BUY' else 0
+        # Same format as CURRENT_TIMESTAMP (UTC), so the archive lines up with the table
+        scanned_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
 
-        cursor.execute("""
+        # The full token_data goes to the compressed archive, not to the metadata column
+        self._queue_write("""
             INSERT INTO scanner_activity
-            (token_address, token_name, token_symbol, ai_prediction, confidence, is_gem, metadata)
+            (token_address, token_name, token_symbol, scanned_at, ai_prediction, confidence, is_gem)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             token_data.get('mint'),
             token_data.get('name'),
             token_data.get('symbol'),
+            scanned_at,
             ai_prediction.get('action'),
             ai_prediction.get('confidence', 0),
-            1 if ai_prediction.get('action') == 'BUY' else 0,
-            json.dumps(token_data)
-        ))
-
-        conn.commit()
-        conn.close()
+            is_gem
+        ), {
+            'scanned_at': scanned_at,
+            'token_address': token_data.get('mint'),
+            'ai_prediction': ai_prediction.get('action'),
+            'confidence': ai_prediction.get('confidence', 0),
+            'is_gem': is_gem,
+            'metadata': token_data
+        })
+
+        with self._counter_lock:
+            self._total_scanned += 1
+            self._total_gems += is_gem
+            self._queued_scans += 1
+            self._queued_gems += is_gem
 
     def log_token_bought(self, token_address: str, buy_price: float):
         """Update when a token is actually bought"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        self._queue_write("""
             UPDATE scanner_activity
             SET was_bought = 1, buy_price = ?, status = 'bought'
             WHERE token_address = ?
         """, (buy_price, token_address))
 
-        conn.commit()
-        conn.close()
-
     def update_token_performance(self, token_address: str, current_price: float, status: str = 'holding'):
         """Update token performance (for tracking wins/losses)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get buy price
-        cursor.execute("SELECT buy_price FROM scanner_activity WHERE token_address = ?", (token_address,))
-        result = cursor.fetchone()
-
-        if result and result[0]:
-            buy_price = result[0]
-            performance_percent = ((current_price - buy_price) / buy_price) * 100
-
-            cursor.execute("""
-                UPDATE scanner_activity
-                SET current_price = ?, performance_percent = ?, status = ?
-                WHERE token_address = ?
-            """, (current_price, performance_percent, status, token_address))
-
+        # Single statement: rows without a buy price are left untouched
+        self._queue_write("""
+            UPDATE scanner_activity
+            SET current_price = ?,
+                performance_percent = ((? - buy_price) / buy_price) * 100,
+                status = ?
+            WHERE token_address = ? AND buy_price IS NOT NULL AND buy_price != 0
+        """, (current_price, current_price, status, token_address))
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+    def apply_retention(self, conn: sqlite3.Connection, days: int = None) -> int:
+        """
+        Delete scanned-but-not-bought rows older than `days` (RETENTION_DAYS).
+        Rows still carrying inline metadata (written before the archive
+        existed) are archived first. Runs on the writer thread every
+        RETENTION_INTERVAL seconds; returns the number of rows deleted.
+        """
+        days = RETENTION_DAYS if days is None else days
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+        deleted = 0
+
+        while True:
+            rows = conn.execute("""
+                SELECT id, token_address, scanned_at, ai_prediction, confidence, is_gem, metadata
+                FROM scanner_activity
+                WHERE was_bought = 0 AND scanned_at < ?
+                ORDER BY id
+                LIMIT ?
+            """, (cutoff, RETENTION_CHUNK)).fetchall()
+            if not rows:
+                break
+
+            legacy = [{
+                'scanned_at': str(row[2]),
+                'token_address': row[1],
+                'ai_prediction': row[3],
+                'confidence': row[4],
+                'is_gem': row[5],
+                'metadata': json.loads(row[6])
+            } for row in rows if row[6]]
+            if legacy:
+                self.archive.append(legacy)
+
+            ids = [(row[0],) for row in rows]
+            conn.executemany("DELETE FROM scanner_activity WHERE id = ?", ids)
+            conn.execute("""
+                UPDATE scanner_activity_expired
+                SET total_scanned = total_scanned + ?, total_gems = total_gems + ?
+                WHERE id = 1
+            """, (len(rows), sum(row[5] or 0 for row in rows)))
             conn.commit()
+            deleted += len(rows)
 
-        conn.close()
-
-    def get_aggregated_stats(self) -> dict:
-        """Get aggregated stats for public display"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Total tokens scanned
-        cursor.execute("SELECT COUNT(*) FROM scanner_activity")
-        total_scanned = cursor.fetchone()[0]
-
-        # Total GEMs identified
-        cursor.execute("SELECT COUNT(*) FROM scanner_activity WHERE is_gem = 1")
-        total_gems = cursor.fetchone()[0]
+            if len(rows) < RETENTION_CHUNK:
+                break
 
-        # Total bought
-        cursor.execute("SELECT COUNT(*) FROM scanner_activity WHERE was_bought = 1")
-        total_bought = cursor.fetchone()[0]
-
-        # Win rate (profitable trades)
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM scanner_activity
-            WHERE was_bought = 1 AND performance_percent > 0 AND status IN ('sold', 'closed')
-        """)
-        wins = cursor.fetchone()[0]
+        if deleted:
+            self.rows_expired += deleted
+            print(f"[SCANNER] Retention: {deleted} rows older than {days}d removed")
+        return deleted
 
+    # ------------------------------------------------------------------
+    # Aggregates (served from memory)
+    # ------------------------------------------------------------------
+    def _refresh_snapshot(self, conn: sqlite3.Connection):
+        """Recompute the aggregate snapshot in one pass over scanner_activity"""
+        cursor = conn.cursor()
         cursor.execute("""
-            SELECT COUNT(*)
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(is_gem = 1), 0),
+                COALESCE(SUM(was_bought = 1), 0),
+                COALESCE(SUM(was_bought = 1 AND performance_percent > 0 AND status IN ('sold', 'closed')), 0),
+                COALESCE(SUM(was_bought = 1 AND status IN ('sold', 'closed')), 0),
+                AVG(CASE WHEN was_bought = 1 AND status IN ('sold', 'closed') THEN performance_percent END)
             FROM scanner_activity
-            WHERE was_bought = 1 AND status IN ('sold', 'closed')
         """)
-        total_closed = cursor.fetchone()[0]
-
-        win_rate = (wins / total_closed * 100) if total_closed > 0 else 0
+        total_scanned, total_gems, total_bought, wins, total_closed, avg_performance = cursor.fetchone()
 
-        # Average performance
-        cursor.execute("""
-            SELECT AVG(performance_percent)
-            FROM scanner_activity
-            WHERE was_bought = 1 AND status IN ('sold', 'closed')
-        """)
-        avg_performance = cursor.fetchone()[0] or 0
+        cursor.execute("SELECT total_scanned, total_gems FROM scanner_activity_expired WHERE id = 1")
+        expired = cursor.fetchone()
+        if expired:
+            total_scanned += expired[0]
+            total_gems += expired[1]
 
         # Best performer
         cursor.execute("""
@@ -175,32 +464,73 @@ class ScannerDataManager:
             LIMIT 1
         """)
         best = cursor.fetchone()
-        best_performer = {
-            'symbol': best[0] if best else 'N/A',
-            'performance': best[1] if best else 0
+
+        self._snapshot = {
+            'total_scanned': total_scanned,
+            'total_gems': total_gems,
+            'total_bought': total_bought,
+            'wins': wins,
+            'total_closed': total_closed,
+            'avg_performance': avg_performance or 0,
+            'best_performer': {
+                'symbol': best[0] if best else 'N/A',
+                'performance': best[1] if best else 0
+            }
         }
+        self._snapshot_at = time.monotonic()
 
-        conn.close()
+        # Re-sync the rolling counters: rows written by other processes (a
+        # standalone trading engine, a script) only show up through the table
+        with self._counter_lock:
+            self._total_scanned = total_scanned + self._queued_scans
+            self._total_gems = total_gems + self._queued_gems
+
+    def get_aggregated_stats(self) -> dict:
+        """Get aggregated stats for public display"""
+        snapshot = self._snapshot
+        if not self._refresh_pending and time.monotonic() - self._snapshot_at > STATS_TTL:
+            # Recomputed by the writer thread (one query per TTL, whoever wrote
+            # the rows), the current snapshot is served meanwhile
+            self._refresh_pending = True
+            self._put(_REFRESH)
+
+        total_closed = snapshot['total_closed']
+        win_rate = (snapshot['wins'] / total_closed * 100) if total_closed > 0 else 0
 
         return {
-            'total_scanned': total_scanned,
-            'total_gems_identified': total_gems,
-            'total_bought': total_bought,
+            'total_scanned': self._total_scanned,
+            'total_gems_identified': self._total_gems,
+            'total_bought': snapshot['total_bought'],
             'win_rate': round(win_rate, 1),
-            'avg_performance': round(avg_performance, 1),
-            'best_performer': best_performer
+            'avg_performance': round(snapshot['avg_performance'], 1),
+            'best_performer': snapshot['best_performer']
         }
 
+    # ------------------------------------------------------------------
+    # Row queries (TTL cache on the shared read connection)
+    # ------------------------------------------------------------------
+    def _cached_query(self, key: tuple, ttl: float, query: str, params: tuple) -> List[dict]:
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            self.cache_hits += 1
+            return cached[1]
+
+        self.cache_misses += 1
+        with self._read_lock:
+            cursor = self._get_read_connection().cursor()
+            cursor.execute(query, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        self._cache[key] = (now + ttl, rows)
+        return rows
+
     def get_recent_wins_delayed(self, delay_hours: int = 2, limit: int = 10) -> List[dict]:
         """Get recent wins with delay (for public display)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # Calculate cutoff time (now - delay)
-        cutoff_time = datetime.now() - timedelta(hours=delay_hours)
+        # Calculate cutoff time (now - delay), to the minute so the cached result is reusable
+        cutoff_time = (datetime.now() - timedelta(hours=delay_hours)).replace(second=0, microsecond=0)
 
-        cursor.execute("""
+        return self._cached_query(('recent_wins', delay_hours, limit), WINS_TTL, """
             SELECT
                 token_symbol,
                 token_name,
@@ -217,18 +547,9 @@ class ScannerDataManager:
             LIMIT ?
         """, (cutoff_time, limit))
 
-        rows = cursor.fetchall()
-        conn.close()
-
-        return [dict(row) for row in rows]
-
     def get_live_scanner_feed(self, limit: int = 50) -> List[dict]:
         """Get live scanner feed (for subscribers only)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        return self._cached_query(('live_feed', limit), FEED_TTL, """
             SELECT
                 token_address,
                 token_symbol,
@@ -244,18 +565,9 @@ class ScannerDataManager:
             LIMIT ?
         """, (limit,))
 
-        rows = cursor.fetchall()
-        conn.close()
-
-        return [dict(row) for row in rows]
-
     def get_live_gems(self, limit: int = 20) -> List[dict]:
         """Get live GEM detections (for subscribers only)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        return self._cached_query(('live_gems', limit), FEED_TTL, """
             SELECT
                 token_address,
                 token_symbol,
@@ -273,10 +585,17 @@ class ScannerDataManager:
             LIMIT ?
         """, (limit,))
 
-        rows = cursor.fetchall()
-        conn.close()
-
-        return [dict(row) for row in rows]
+    def get_stats(self) -> dict:
+        return {
+            'pending_writes': self._writes.qsize(),
+            'writes_committed': self.writes_committed,
+            'write_batches': self.write_batches,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'rows_expired': self.rows_expired,
+            'archived_records': self.archive.records_written,
+            'snapshot_age': time.monotonic() - self._snapshot_at
+        }
 
 # Global instance
 scanner_manager = ScannerDataManager()
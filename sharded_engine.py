@@ -0,0 +1,240 @@
+"""
+SHARDED ENGINE - Moteur IA multi-processus (partition des mints par hash)
+Le process principal garde le WebSocket PumpFun et les bots; N processus
+d'analyse possèdent chacun une partition des mints (crc32(mint) % N):
+ils construisent les snapshots, font tourner les modèles en local et
+renvoient des signaux compacts au dispatcher
+Activé par ENGINE_SHARDS > 1 (system_limits.py)
+"""
+import asyncio
+import json
+import multiprocessing as mp
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import console_logger
+from ai_trading_engine import AITradingEngine, Config, set_last_known_price
+
+
+# Champs utiles transmis aux shards (le reste du message PumpFun est ignoré)
+CREATE_FIELDS = ('mint', 'symbol', 'name', 'usd_market_cap')
+TRADE_FIELDS = ('mint', 'txType', 'traderPublicKey', 'solAmount', 'marketCapSol')
+
+
+def shard_for(mint: str, num_shards: int) -> int:
+    """Partition d'un mint (stable entre processus, contrairement à hash())"""
+    return zlib.crc32(mint.encode()) % num_shards
+
+
+class _ForwardingLogger:
+    """Console logger des shards: renvoie les logs au dispatcher"""
+
+    def __init__(self, outbox):
+        self.outbox = outbox
+
+    def log(self, message: str, log_type: str = 'INFO', user_id: int = None):
+        self.outbox.put(('log', (message, log_type, user_id)))
+
+
+class ShardWorkerEngine(AITradingEngine):
+    """AITradingEngine d'un shard: les signaux partent vers le dispatcher"""
+
+    STATS_INTERVAL = 5
+
+    def __init__(self, shard_id: int, outbox):
+        super().__init__()
+        self.shard_id = shard_id
+        self.outbox = outbox
+        self.messages_processed = 0
+
+    async def broadcast_signal(self, signal: dict):
+        self.signals_generated += 1
+        self.outbox.put(('signal', signal))
+
+    def process_batch(self, batch):
+        """Applique un batch de messages routés par le dispatcher"""
+        for kind, data, received_at in batch:
+            if kind == 'create':
+                self.add_token(data, created_at=received_at)
+            else:
+                self.record_trade(data, trade_time=received_at)
+        self.messages_processed += len(batch)
+
+    def shard_stats(self):
+        return {
+            'shard_id': self.shard_id,
+            'tokens_active': len(self.tokens),
+            'tokens_tracked': self.tokens_tracked,
+            'signals_generated': self.signals_generated,
+            'messages_processed': self.messages_processed,
+            'scheduler_pending': self.scheduler.pending,
+            'max_lateness_ms': self.scheduler.lateness_max * 1000
+        }
+
+    async def run_shard(self, inbox):
+        """Boucle du shard: lecture de l'inbox (thread) + roue de timers"""
+        loop = asyncio.get_running_loop()
+        scheduler_task = asyncio.create_task(self.scheduler.run())
+        last_stats = 0.0
+
+        while True:
+            batch = await loop.run_in_executor(None, inbox.get)
+            if batch is None:
+                break
+            self.process_batch(batch)
+
+            now = time.monotonic()
+            if now - last_stats >= self.STATS_INTERVAL:
+                self.outbox.put(('stats', self.shard_stats()))
+                last_stats = now
+
+        self.scheduler.stop()
+        scheduler_task.cancel()
+
+
+def _shard_main(shard_id: int, inbox, outbox):
+    """Point d'entrée d'un processus shard"""
+    console_logger._console_logger = _ForwardingLogger(outbox)
+    engine = ShardWorkerEngine(shard_id, outbox)
+    print(f"[SHARD {shard_id}] Started")
+    try:
+        asyncio.run(engine.run_shard(inbox))
+    except KeyboardInterrupt:
+        pass
+    print(f"[SHARD {shard_id}] Stopped")
+
+
+class ShardedAIEngine(AITradingEngine):
+    """
+    Dispatcher: même API que AITradingEngine (register_bot, signal_bus,
+    get_stats...) mais l'analyse des tokens est faite dans les shards
+
+    - Les messages sont bufferisés par shard et envoyés par batch
+      (BATCH_SIZE ou toutes les FLUSH_INTERVAL secondes)
+    - Un thread lit les retours des shards (signaux, logs, stats)
+    """
+
+    BATCH_SIZE = 256
+    FLUSH_INTERVAL = 0.005  # 5ms
+
+    def __init__(self, num_shards: int):
+        super().__init__()
+        self.num_shards = num_shards
+        self.ctx = mp.get_context('spawn')  # Pas de fork d'un process multi-threadé
+        self.inboxes = [self.ctx.Queue() for _ in range(num_shards)]
+        self.outbox = self.ctx.Queue()
+        self.processes = []
+        self.buffers = [[] for _ in range(num_shards)]
+        self.loop = None
+        self.shard_stats = {}
+
+        # Stats dispatcher
+        self.messages_routed = [0] * num_shards
+        self.batches_sent = 0
+
+    def start_shards(self):
+        """Lance les processus d'analyse"""
+        for shard_id in range(self.num_shards):
+            process = self.ctx.Process(
+                target=_shard_main,
+                args=(shard_id, self.inboxes[shard_id], self.outbox),
+                name=f'ai-shard-{shard_id}',
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+        threading.Thread(target=self._read_outbox, daemon=True).start()
+        print(f"[AI ENGINE] {self.num_shards} analysis shards started")
+
+    def route(self, kind: str, data: dict, fields: tuple):
+        """Bufferise un message pour le shard propriétaire du mint"""
+        mint = data.get('mint')
+        if not mint:
+            return
+        shard_id = shard_for(mint, self.num_shards)
+        buffer = self.buffers[shard_id]
+        buffer.append((kind, {k: data.get(k) for k in fields}, datetime.now().timestamp()))
+        self.messages_routed[shard_id] += 1
+        if len(buffer) >= self.BATCH_SIZE:
+            self._flush_shard(shard_id)
+
+    def _flush_shard(self, shard_id: int):
+        buffer = self.buffers[shard_id]
+        if buffer:
+            self.inboxes[shard_id].put(buffer)
+            self.buffers[shard_id] = []
+            self.batches_sent += 1
+
+    async def flush_loop(self):
+        """Vide les buffers partiels à intervalle fixe (borne la latence)"""
+        while self.is_running:
+            for shard_id in range(self.num_shards):
+                self._flush_shard(shard_id)
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+
+    def _read_outbox(self):
+        """Thread: retours des shards -> bus de signaux / console / stats"""
+        logger = console_logger.get_console_logger()
+        while True:
+            try:
+                kind, payload = self.outbox.get()
+            except (EOFError, OSError):
+                break
+            if kind == 'signal':
+                if self.loop is not None:
+                    asyncio.run_coroutine_threadsafe(self.broadcast_signal(payload), self.loop)
+                else:
+                    self.signal_bus.publish(payload)
+            elif kind == 'log':
+                logger.log(*payload)
+            elif kind == 'stats':
+                self.shard_stats[payload['shard_id']] = payload
+
+    async def handle_new_token(self, data, ws):
+        """Nouveau token: abonnement local, analyse dans le shard"""
+        mint = data.get('mint')
+        self.tokens_tracked += 1
+        self.route('create', data, CREATE_FIELDS)
+
+        await ws.send(json.dumps({
+            "method": "subscribeTokenTrade",
+            "keys": [mint]
+        }))
+
+    async def handle_trade(self, data, trade_time=None):
+        """Trade: prix live côté dispatcher (bots), métriques dans le shard"""
+        mint = data.get('mint')
+        mc_usd = data.get('marketCapSol', 0) * Config.get_sol_price()
+        set_last_known_price(mint, mc_usd, trade_time)
+        self.route('trade', data, TRADE_FIELDS)
+
+    async def start(self):
+        """Démarrer les shards puis le WebSocket"""
+        self.loop = asyncio.get_running_loop()
+        self.is_running = True
+        self.start_shards()
+        asyncio.create_task(self.flush_loop())
+        await super().start()
+
+    def stop(self):
+        """Arrête les shards"""
+        self.is_running = False
+        for shard_id in range(self.num_shards):
+            self._flush_shard(shard_id)
+            self.inboxes[shard_id].put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats.update({
+            'shards': self.num_shards,
+            'messages_routed': list(self.messages_routed),
+            'batches_sent': self.batches_sent,
+            'shard_stats': [self.shard_stats.get(i) for i in range(self.num_shards)],
+            'tokens_active': sum(s['tokens_active'] for s in self.shard_stats.values())
+        })
+        return stats
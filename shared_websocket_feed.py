@@ -6,48 +6,74 @@ import asyncio
 import json
 import websockets
 from datetime import datetime
-from typing import Set, Callable
+from typing import Dict, Callable
 import threading
+from signal_bus import SignalBus, POLICY_DROP_OLDEST
+from ws_capture import get_ws_capture
 
 
 class SharedTokenFeed:
     """
     Feed partagé de tokens depuis PumpFun
     1 seule connexion WebSocket pour tous les bots
+    Chaque subscriber a sa propre file bornée (SignalBus): un bot lent
+    perd ses plus vieux tokens au lieu de ralentir le feed
     """
 
+    SUBSCRIBER_QUEUE_SIZE = 1024
+
     def __init__(self, redis_client=None):
         self.ws = None
         self.redis = redis_client
-        self.subscribers: Set[Callable] = set()
+        self.bus = SignalBus('pumpfun_tokens')
+        self.subscribers: Dict[Callable, str] = {}  # {callback: nom de la file}
         self.is_running = False
         self.reconnect_delay = 5
+        self._pending_starts = []  # Abonnés inscrits avant le démarrage d'une boucle
+        self.capture = get_ws_capture('shared_feed')  # Messages bruts (None si désactivé)
 
         # Stats
         self.tokens_received = 0
         self.uptime_start = None
 
-    def subscribe(self, callback: Callable):
-        """Ajoute un bot qui veut recevoir les tokens"""
-        self.subscribers.add(callback)
+    def subscribe(self, callback: Callable, maxlen: int = None, policy: str = POLICY_DROP_OLDEST):
+        """
+        Ajoute un bot qui veut recevoir les tokens
+
+        Le callback est appelé par UNE tâche de livraison dans la boucle de
+        l'appelant (ou celle du feed si on n'est pas dans une boucle)
+        """
+        if callback in self.subscribers:
+            return
+
+        name = f"{getattr(callback, '__qualname__', 'subscriber')}#{id(callback)}"
+        subscription = self.bus.subscribe(name, maxlen=maxlen or self.SUBSCRIBER_QUEUE_SIZE, policy=policy)
+        self.subscribers[callback] = name
+
+        try:
+            subscription.start(callback)
+        except RuntimeError:
+            # Pas de boucle courante: livrer depuis la boucle du feed
+            if _feed_loop is not None and _feed_loop.is_running():
+                subscription.start(callback, loop=_feed_loop)
+            else:
+                self._pending_starts.append((subscription, callback))
+
         print(f"[FEED] Bot subscribed. Total subscribers: {len(self.subscribers)}")
 
     def unsubscribe(self, callback: Callable):
         """Retire un bot"""
-        self.subscribers.discard(callback)
+        name = self.subscribers.pop(callback, None)
+        if name:
+            self.bus.unsubscribe(name)
         print(f"[FEED] Bot unsubscribed. Total subscribers: {len(self.subscribers)}")
 
     async def broadcast_token(self, token_data: dict):
         """Envoie les données à tous les bots subscribers"""
         self.tokens_received += 1
 
-        # Option 1: Broadcast direct (fast)
-        for callback in self.subscribers:
-            try:
-                # Call callback in non-blocking way
-                asyncio.create_task(callback(token_data))
-            except Exception as e:
-                print(f"[ERROR] Callback failed: {e}")
+        # Option 1: Fan-out dans la file de chaque subscriber (aucune tâche créée ici)
+        self.bus.publish(token_data)
 
         # Option 2: Broadcast via Redis (si configuré)
         if self.redis:
@@ -83,6 +109,12 @@ class SharedTokenFeed:
         self.is_running = True
         self.uptime_start = datetime.now()
 
+        # Lancer la livraison des abonnés inscrits hors boucle
+        for subscription, callback in self._pending_starts:
+            if not subscription.closed:
+                subscription.start(callback)
+        self._pending_starts = []
+
         while self.is_running:
             try:
                 # Connexion
@@ -95,6 +127,8 @@ class SharedTokenFeed:
                 print(f"[FEED] Listening for tokens... ({len(self.subscribers)} subscribers)")
 
                 async for message in self.ws:
+                    if self.capture:
+                        self.capture.record(message)
                     try:
                         data = json.loads(message)
 
@@ -131,7 +165,8 @@ class SharedTokenFeed:
             'subscribers': len(self.subscribers),
             'tokens_received': self.tokens_received,
             'uptime_seconds': uptime,
-            'tokens_per_minute': (self.tokens_received / uptime * 60) if uptime > 0 else 0
+            'tokens_per_minute': (self.tokens_received / uptime * 60) if uptime > 0 else 0,
+            'bus': self.bus.get_stats()
         }
 
 
@@ -1,7 +1,7 @@
 import json
+from bot_data_journal import load_bot_data
 
-with open('bot_data.json', 'r') as f:
-    d = json.load(f)
+d = load_bot_data('bot_data.json')
 
 active = d.get('tokens', [])
 print('='*80)
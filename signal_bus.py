@@ -0,0 +1,325 @@
+"""
+SIGNAL BUS - Pub/sub avec une file bornée par abonné
+Remplace "1 asyncio.create_task par abonné et par message":
+- chaque abonné a son propre ring buffer borné (mémoire constante)
+- politique de débordement: drop_oldest ou coalesce (1 message par mint)
+- livraison par batch, réveil inter-threads uniquement quand la file était vide
+- lag mesuré par abonné (messages en retard + âge du plus vieux message)
+Thread-safe: les publishers et les abonnés peuvent vivre dans des boucles/threads différents
+"""
+import asyncio
+import inspect
+import time
+from collections import OrderedDict, deque
+from threading import Event, Lock
+from typing import Callable, Dict, List, Optional
+
+
+POLICY_DROP_OLDEST = 'drop_oldest'
+POLICY_COALESCE = 'coalesce'
+
+
+class SubscriptionClosed(Exception):
+    """La file est fermée et vidée: le consommateur doit sortir de sa boucle"""
+
+
+class Subscription:
+    """
+    File d'un abonné
+
+    - drop_oldest: deque(maxlen) - le message le plus ancien est perdu si plein
+    - coalesce: un seul message en attente par clé (mint); le plus récent remplace
+      l'ancien, et si plein le plus ancien mint est perdu
+    """
+
+    def __init__(self, name: str, maxlen: int = 1024, policy: str = POLICY_DROP_OLDEST,
+                 batch_size: int = 64, key: Callable[[dict], str] = None):
+        if policy not in (POLICY_DROP_OLDEST, POLICY_COALESCE):
+            raise ValueError(f"Unknown policy: {policy}")
+
+        self.name = name
+        self.maxlen = maxlen
+        self.policy = policy
+        self.batch_size = batch_size
+        self.key = key or (lambda message: message.get('mint'))
+
+        self._lock = Lock()
+        if policy == POLICY_COALESCE:
+            self._pending = OrderedDict()  # {key: (seq, enqueued_at, message)}
+        else:
+            self._pending = deque()  # [(seq, enqueued_at, message)]
+
+        # Réveil du consommateur (dans SA boucle asyncio)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+        self._waiting = False
+        self._task = None
+        self._sync_event: Optional[Event] = None  # Consommateur synchrone (thread, ex: flux SSE)
+        self.closed = False
+
+        # Stats
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.max_lag = 0
+        self._last_delivered_seq = 0
+        self._last_published_seq = 0
+
+    # ------------------------------------------------------------------
+    # Côté publisher (n'importe quel thread)
+    # ------------------------------------------------------------------
+    def push(self, message: dict, seq: int = None):
+        """Ajoute un message sans bloquer (politique de débordement appliquée)"""
+        if self.closed:
+            return
+
+        wake = None
+        with self._lock:
+            self.published += 1
+            seq = seq if seq is not None else self.published
+            self._last_published_seq = seq
+            entry = (seq, time.monotonic(), message)
+
+            if self.policy == POLICY_COALESCE:
+                k = self.key(message)
+                if k in self._pending:
+                    # Garder la position d'origine mais le contenu le plus récent
+                    self._pending[k] = entry
+                    self.coalesced += 1
+                else:
+                    if len(self._pending) >= self.maxlen:
+                        self._pending.popitem(last=False)
+                        self.dropped += 1
+                    self._pending[k] = entry
+            else:
+                if len(self._pending) >= self.maxlen:
+                    self._pending.popleft()
+                    self.dropped += 1
+                self._pending.append(entry)
+
+            lag = len(self._pending)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+            # Réveiller seulement si le consommateur dort (1 réveil par batch, pas par message)
+            if self._waiting:
+                self._waiting = False
+                wake = self._loop
+            sync_event = self._sync_event
+
+        if sync_event is not None:
+            sync_event.set()
+        if wake is not None:
+            try:
+                wake.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                pass  # Boucle du consommateur fermée
+
+    # ------------------------------------------------------------------
+    # Côté consommateur
+    # ------------------------------------------------------------------
+    def drain(self, max_items: int = None) -> List[dict]:
+        """Récupère jusqu'à max_items messages sans attendre (peut renvoyer [])"""
+        max_items = max_items or self.batch_size
+        batch = []
+        with self._lock:
+            while self._pending and len(batch) < max_items:
+                if self.policy == POLICY_COALESCE:
+                    _, (seq, _, message) = self._pending.popitem(last=False)
+                else:
+                    seq, _, message = self._pending.popleft()
+                batch.append(message)
+                self._last_delivered_seq = seq
+            if batch:
+                self.delivered += len(batch)
+                self.batches += 1
+        return batch
+
+    async def get_batch(self, max_items: int = None, timeout: float = None) -> List[dict]:
+        """
+        Attend au moins un message puis renvoie un batch ([] si timeout)
+
+        Raises:
+            SubscriptionClosed: file fermée (les messages restants sont d'abord livrés)
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._event = asyncio.Event()
+
+        while not self.closed:
+            batch = self.drain(max_items)
+            if batch:
+                return batch
+
+            with self._lock:
+                if self._pending:
+                    continue
+                self._event.clear()
+                self._waiting = True
+
+            try:
+                if timeout is None:
+                    await self._event.wait()
+                else:
+                    await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    self._waiting = False
+                return []
+        return self._closed_batch(max_items)
+
+    def wait_batch(self, max_items: int = None, timeout: float = None) -> List[dict]:
+        """Version bloquante de get_batch() pour un consommateur hors asyncio (thread, même SubscriptionClosed)"""
+        if self._sync_event is None:
+            self._sync_event = Event()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.closed:
+            self._sync_event.clear()
+            batch = self.drain(max_items)
+            if batch:
+                return batch
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return []
+            self._sync_event.wait(remaining)
+        return self._closed_batch(max_items)
+
+    def _closed_batch(self, max_items: int = None) -> List[dict]:
+        """Après close(): vide ce qui reste, puis SubscriptionClosed"""
+        batch = self.drain(max_items)
+        if batch:
+            return batch
+        raise SubscriptionClosed(self.name)
+
+    async def run(self, handler: Callable):
+        """Boucle de livraison: handler(message) sync ou async, messages livrés par batch"""
+        while True:
+            try:
+                batch = await self.get_batch()
+            except SubscriptionClosed:
+                return
+            for message in batch:
+                try:
+                    result = handler(message)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    print(f"[BUS] Subscriber {self.name} handler error: {e}")
+
+    def start(self, handler: Callable, loop: asyncio.AbstractEventLoop = None):
+        """Lance la boucle de livraison dans la boucle courante (ou `loop`)"""
+        if loop is None:
+            self._task = asyncio.get_running_loop().create_task(self.run(handler))
+        else:
+            self._task = asyncio.run_coroutine_threadsafe(self.run(handler), loop)
+        return self._task
+
+    def close(self):
+        """Ferme la file et réveille le consommateur pour qu'il sorte"""
+        self.closed = True
+        if self._sync_event is not None:
+            self._sync_event.set()
+        loop, event = self._loop, self._event
+        if loop is not None and event is not None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass
+
+    def get_stats(self):
+        """Stats de l'abonné (dont le lag)"""
+        with self._lock:
+            pending = len(self._pending)
+            if pending:
+                if self.policy == POLICY_COALESCE:
+                    oldest = next(iter(self._pending.values()))[1]
+                else:
+                    oldest = self._pending[0][1]
+                oldest_age = time.monotonic() - oldest
+            else:
+                oldest_age = 0.0
+
+        return {
+            'name': self.name,
+            'policy': self.policy,
+            'pending': pending,
+            'lag_messages': self._last_published_seq - self._last_delivered_seq if pending else 0,
+            'lag_seconds': oldest_age,
+            'max_lag': self.max_lag,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'batches': self.batches
+        }
+
+
+class SignalBus:
+    """
+    Bus fan-out: publish() pousse le message dans la file de chaque abonné
+    Aucun task créé côté publisher
+    """
+
+    def __init__(self, name: str = 'signals'):
+        self.name = name
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._lock = Lock()
+        self.seq = 0
+
+    def subscribe(self, name: str, maxlen: int = 1024, policy: str = POLICY_DROP_OLDEST,
+                  batch_size: int = 64, key: Callable[[dict], str] = None) -> Subscription:
+        """Crée (ou remplace) la file d'un abonné"""
+        subscription = Subscription(name, maxlen=maxlen, policy=policy, batch_size=batch_size, key=key)
+        with self._lock:
+            previous = self.subscriptions.get(name)
+            self.subscriptions[name] = subscription
+        if previous:
+            previous.close()
+        return subscription
+
+    def unsubscribe(self, name: str):
+        """Retire un abonné"""
+        with self._lock:
+            subscription = self.subscriptions.pop(name, None)
+        if subscription:
+            subscription.close()
+
+    def send(self, name: str, message: dict) -> bool:
+        """Pousse un message dans la file d'UN abonné (même séquence que publish); False si absent"""
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+            subscription = self.subscriptions.get(name)
+        if subscription is None:
+            return False
+        subscription.push(message, seq)
+        return True
+
+    def publish(self, message: dict) -> int:
+        """Publie un message à tous les abonnés; renvoie le nombre d'abonnés"""
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+            subscriptions = list(self.subscriptions.values())
+        for subscription in subscriptions:
+            subscription.push(message, seq)
+        return len(subscriptions)
+
+    def __len__(self):
+        return len(self.subscriptions)
+
+    def get_stats(self):
+        """Stats du bus et lag de chaque abonné"""
+        with self._lock:
+            subscriptions = list(self.subscriptions.values())
+        return {
+            'name': self.name,
+            'published': self.seq,
+            'subscribers': len(subscriptions),
+            'subscriptions': [s.get_stats() for s in subscriptions]
+        }
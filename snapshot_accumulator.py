@@ -0,0 +1,176 @@
+"""
+SNAPSHOT ACCUMULATOR - Métriques de snapshot incrémentales par token
+Mis à jour à chaque trade dans handle_trade, lecture d'un snapshot en O(1)
+Partagé par LiveTradingBot, AITradingEngine et PatternDiscoveryBot
+"""
+from typing import Dict, Iterable, Optional
+
+
+# Horizons utilisés par les bots (en secondes depuis la création du token)
+DEFAULT_HORIZONS = (3, 5, 7, 8, 10, 15, 20, 30, 60, 120, 180, 300, 480, 600, 900, 1200)
+
+
+class SnapshotAccumulator:
+    """
+    Accumulateur de trades pour UN token
+
+    Les trades arrivent dans l'ordre chronologique, donc l'état à l'horizon h
+    est l'état cumulé juste avant le premier trade d'âge > h. On garde un seul
+    état courant et on le "gèle" (scalaires uniquement) au passage de chaque
+    horizon: coût O(nb horizons franchis) par trade, lecture en O(1).
+    """
+
+    # Nombre d'achats récents regardés pour les baleines consécutives
+    CONSECUTIVE_WINDOW = 5
+
+    def __init__(self, created_at: float, horizons: Iterable[int] = DEFAULT_HORIZONS,
+                 whale_threshold: float = 400, elite_wallets=None, whale_wallets=None,
+                 big_buy_thresholds=(100, 300, 500), smart_money_max_age: float = 15,
+                 smart_money_min_usd: float = 200):
+        self.created_at = created_at
+        self.horizons = sorted(set(horizons))
+        self.whale_threshold = whale_threshold
+        self.elite_wallets = elite_wallets or set()
+        self.whale_wallets = whale_wallets or set()
+        self.big_buy_thresholds = tuple(big_buy_thresholds)
+        self.smart_money_max_age = smart_money_max_age
+        self.smart_money_min_usd = smart_money_min_usd
+
+        # Horizons pas encore franchis (index dans self.horizons)
+        self._next_horizon = 0
+        self._frozen: Dict[int, dict] = {}
+
+        # Compteurs courants
+        self.txn = 0
+        self.buys = 0
+        self.sells = 0
+        self.last_mc = 0
+        self.max_buy_usd = 0
+        self.total_buy_volume = 0.0
+        self.total_sell_volume = 0.0
+        self.big_buys = {threshold: 0 for threshold in self.big_buy_thresholds}
+
+        # Ensembles uniques (seule leur taille est gelée)
+        self._traders = set()
+        self._whale_buyers = set()  # acheteurs >= whale_threshold
+        self._elite_buyers = set()
+        self._smart_money = set()
+        self._tracked_whales = set()  # wallets de whale_wallets.json
+
+        # Listes append-only (on gèle leur longueur, pas leur contenu)
+        self._elite_found = []  # préfixes des wallets elite, un par achat
+        self._tracked_whale_list = []  # wallets baleines uniques dans l'ordre d'arrivée
+        self._whale_buy_amounts = []  # 3 premiers achats baleines (debug)
+
+        self.tracked_whale_trades = 0
+        self.tracked_whale_volume = 0.0
+
+        # Baleines consécutives: index (parmi les achats) des 2 dernières baleines
+        self._last_whale_idx = None
+        self._prev_whale_idx = None
+
+    def add_trade(self, tx_type: str, trader: str, mc: float, amount_usd: float, trade_time: float):
+        """Intègre un trade (appelé depuis handle_trade)"""
+        age = trade_time - self.created_at
+
+        # Geler les horizons dépassés AVANT d'intégrer ce trade
+        while self._next_horizon < len(self.horizons) and age > self.horizons[self._next_horizon]:
+            self._frozen[self.horizons[self._next_horizon]] = self._state()
+            self._next_horizon += 1
+
+        self.txn += 1
+        self.last_mc = mc
+        self._traders.add(trader)
+
+        is_tracked_whale = trader in self.whale_wallets
+        if is_tracked_whale:
+            self.tracked_whale_trades += 1
+            self.tracked_whale_volume += amount_usd
+            if trader not in self._tracked_whales:
+                self._tracked_whales.add(trader)
+                self._tracked_whale_list.append(trader)
+
+        if tx_type != 'buy':
+            self.sells += 1
+            self.total_sell_volume += amount_usd
+            return
+
+        buy_idx = self.buys
+        self.buys += 1
+        self.total_buy_volume += amount_usd
+        if amount_usd > self.max_buy_usd:
+            self.max_buy_usd = amount_usd
+
+        for threshold in self.big_buy_thresholds:
+            if amount_usd >= threshold:
+                self.big_buys[threshold] += 1
+
+        if amount_usd >= self.whale_threshold:
+            self._whale_buyers.add(trader)
+            if len(self._whale_buy_amounts) < 3:
+                self._whale_buy_amounts.append(amount_usd)
+            self._prev_whale_idx = self._last_whale_idx
+            self._last_whale_idx = buy_idx
+
+        if trader in self.elite_wallets:
+            self._elite_buyers.add(trader)
+            self._elite_found.append(trader[:8])
+
+        if age <= self.smart_money_max_age and amount_usd >= self.smart_money_min_usd:
+            self._smart_money.add(trader)
+
+    def _consecutive_whales(self) -> bool:
+        """2 dernières baleines adjacentes parmi les 5 derniers achats"""
+        if self._prev_whale_idx is None:
+            return False
+        window_start = self.buys - self.CONSECUTIVE_WINDOW
+        return (self._prev_whale_idx >= window_start and
+                self._last_whale_idx - self._prev_whale_idx == 1)
+
+    def _state(self) -> dict:
+        """Copie des scalaires courants (O(1))"""
+        return {
+            'txn': self.txn,
+            'buys': self.buys,
+            'sells': self.sells,
+            'traders': len(self._traders),
+            'mc': self.last_mc,
+            'max_buy_usd': self.max_buy_usd,
+            'total_buy_volume': self.total_buy_volume,
+            'total_sell_volume': self.total_sell_volume,
+            'big_buys': dict(self.big_buys),
+            'whale_count': len(self._whale_buyers),
+            'whale_buy_amounts_len': len(self._whale_buy_amounts),
+            'elite_wallet_count': len(self._elite_buyers),
+            'elite_found_len': len(self._elite_found),
+            'smart_money_count': len(self._smart_money),
+            'consecutive_whales': self._consecutive_whales(),
+            'tracked_whale_count': len(self._tracked_whales),
+            'tracked_whale_list_len': len(self._tracked_whale_list),
+            'tracked_whale_trades': self.tracked_whale_trades,
+            'tracked_whale_volume': self.tracked_whale_volume,
+        }
+
+    def snapshot(self, max_age: int) -> Optional[dict]:
+        """
+        Compteurs bruts à l'horizon max_age (trades d'âge <= max_age)
+
+        Returns:
+            dict de compteurs, ou None si aucun trade dans la période
+        """
+        state = self._frozen.get(max_age)
+        if state is None:
+            if max_age not in self.horizons:
+                raise KeyError(f"Horizon {max_age}s non configure dans l'accumulateur")
+            # Horizon pas encore franchi: tous les trades vus sont dans la période
+            state = self._state()
+
+        if state['txn'] == 0:
+            return None
+
+        # Matérialiser les listes à partir des longueurs gelées
+        state = dict(state)
+        state['elite_wallets'] = self._elite_found[:state.pop('elite_found_len')]
+        state['whale_buy_amounts'] = self._whale_buy_amounts[:state.pop('whale_buy_amounts_len')]
+        state['tracked_whale_wallets'] = self._tracked_whale_list[:state.pop('tracked_whale_list_len')]
+        return state
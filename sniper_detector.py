@@ -1,13 +1,15 @@
 """
 Detect snipers and bundle buyers (insiders)
 """
-import httpx
+import asyncio
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from collections import defaultdict
 from config import SOLANA_RPC_URL
 from helius_api import HeliusAPI
+from http_client import get_http_client
+from token_transactions import TokenTransactions
 
 
 @dataclass
@@ -35,20 +37,28 @@ class SniperDetector:
 
     def __init__(self, rpc_url: str = SOLANA_RPC_URL):
         self.rpc_url = rpc_url
-        self.client = httpx.Client(timeout=60.0)
+        self.client = get_http_client()  # Shared pooled client (rate-limited per RPC host)
         self.helius = HeliusAPI()
 
-    def analyze_snipers(self, mint_address: str, token_creation_time: Optional[int] = None) -> SniperAnalysis:
+    async def analyze_snipers(
+        self,
+        mint_address: str,
+        token_creation_time: Optional[int] = None,
+        transactions: Optional[TokenTransactions] = None
+    ) -> SniperAnalysis:
         """
         SIMPLIFIED: Analyze early transactions to detect sniping patterns
 
         Instead of identifying specific wallets, counts total transactions in early periods
         This works with basic RPC without needing transaction parsing
+        (signatures come from the shared TokenTransactions when provided)
         """
         try:
+            source = transactions or TokenTransactions(mint_address, self.rpc_url)
+
             # Get token creation time
             if not token_creation_time:
-                token_creation_time = self._get_token_creation_time(mint_address)
+                token_creation_time = await self._get_token_creation_time(source)
 
             if not token_creation_time:
                 return self._empty_analysis("Cannot determine token creation time")
@@ -58,7 +68,7 @@ class SniperDetector:
                 token_creation_time = token_creation_time // 1000
 
             # Get all transactions for this token address
-            transactions = self._get_token_transactions(mint_address, limit=1000)
+            transactions = await self._get_token_transactions(source, limit=1000)
 
             if not transactions:
                 return self._empty_analysis("No transaction data available")
@@ -186,54 +196,24 @@ class SniperDetector:
             early_buyers=[]
         )
 
-    def _get_token_creation_time(self, mint_address: str) -> Optional[int]:
+    async def _get_token_creation_time(self, source: TokenTransactions) -> Optional[int]:
         """Get the timestamp when token was created"""
         try:
             # Get first transaction (token creation)
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSignaturesForAddress",
-                "params": [
-                    mint_address,
-                    {"limit": 1}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload, timeout=10.0)
-
-            if response.status_code == 200:
-                data = response.json()
-                signatures = data.get("result", [])
+            signatures = await source.signatures(1)
 
-                if signatures and len(signatures) > 0:
-                    return signatures[0].get("blockTime")
+            if signatures and len(signatures) > 0:
+                return signatures[0].get("blockTime")
 
             return None
 
         except Exception:
             return None
 
-    def _get_token_transactions(self, mint_address: str, limit: int = 1000) -> List[Dict]:
+    async def _get_token_transactions(self, source: TokenTransactions, limit: int = 1000) -> List[Dict]:
         """Get recent transactions for token"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSignaturesForAddress",
-                "params": [
-                    mint_address,
-                    {"limit": limit}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload, timeout=30.0)
-
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("result", [])
-
-            return []
+            return await source.signatures(limit)
 
         except Exception:
             return []
@@ -252,14 +232,14 @@ class SniperDetector:
         except Exception:
             return []
 
-    def _get_wallet_purchase_history(self, wallet_address: str, limit: int = 10) -> List[str]:
+    async def _get_wallet_purchase_history(self, wallet_address: str, limit: int = 10) -> List[str]:
         """
         Get list of tokens purchased by this wallet using Helius
         Returns list of mint addresses
         """
         try:
             # Use Helius to get wallet's token accounts
-            token_accounts = self.helius.get_token_accounts(wallet_address)
+            token_accounts = await self.helius.get_token_accounts(wallet_address)
 
             # Extract mint addresses from accounts with balance > 0
             mints = []
@@ -282,7 +262,7 @@ class SniperDetector:
         except Exception:
             return []
 
-    def _detect_wallet_clusters(self, wallet_addresses: List[str]) -> Tuple[List[List[str]], int]:
+    async def _detect_wallet_clusters(self, wallet_addresses: List[str]) -> Tuple[List[List[str]], int]:
         """
         Detect clusters of wallets that have the same purchase history
         Returns: (list of clusters, total wallets in clusters)
@@ -297,8 +277,11 @@ class SniperDetector:
             wallet_histories = {}
 
             # Limit to first 15 wallets for performance (API calls can be slow)
-            for wallet in wallet_addresses[:15]:
-                history = self._get_wallet_purchase_history(wallet, limit=10)
+            wallets = wallet_addresses[:15]
+            histories = await asyncio.gather(
+                *[self._get_wallet_purchase_history(wallet, limit=10) for wallet in wallets]
+            )
+            for wallet, history in zip(wallets, histories):
                 if len(history) > 0:
                     wallet_histories[wallet] = set(history)
 
@@ -393,6 +376,4 @@ class SniperDetector:
         return max_same_time >= 3
 
     def close(self):
-        """Close HTTP clients"""
-        self.client.close()
-        self.helius.close()
+        """Nothing to close: the HTTP client is shared by the whole process"""
@@ -1,41 +1,118 @@
 """
-Récupère le prix de SOL en temps réel depuis CoinGecko
-Cache le prix pour éviter trop de requêtes
+Oracle de prix SOL/USD partagé par tout le process
+- Un thread de fond (boucle asyncio dédiée) rafraîchit le prix toutes les 30s
+- Plusieurs sources en fallback (CoinGecko, Binance, Coinbase)
+- Lecture sans verrou ni I/O: get_sol_price_usd() renvoie la dernière valeur
+- StaticPriceSource pour les tests / le replay (aucun appel réseau)
 """
-import requests
-from datetime import datetime, timedelta
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
 
-class SolPriceFetcher:
-    def __init__(self):
-        self.cache_duration = 30  # Secondes - mettre à jour toutes les 30s
-        self.last_update = None
-        self.cached_price = 200.0  # Prix par défaut si API échoue
-        self.api_url = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
-    def get_price(self):
-        """Récupère le prix SOL/USD en temps réel depuis CoinGecko"""
-        # Vérifier si le cache est encore valide
-        if (self.last_update and
-            datetime.now() - self.last_update < timedelta(seconds=self.cache_duration)):
-            return self.cached_price
 
-        # Fetch depuis CoinGecko
-        try:
-            response = requests.get(self.api_url, timeout=3)
-            if response.status_code == 200:
-                data = response.json()
-                price = float(data['solana']['usd'])
+class PriceSource(ABC):
+    """Source de prix SOL/USD (fetch async, renvoie un float)"""
 
-                # Mettre à jour le cache
-                self.cached_price = price
-                self.last_update = datetime.now()
+    name = 'source'
 
-                return price
-        except Exception as e:
-            # En cas d'erreur, retourner le prix en cache
-            print(f"[WARN] Erreur fetch prix SOL: {e}, utilisation cache: ${self.cached_price:.2f}")
-            pass
+    @abstractmethod
+    async def fetch(self, session) -> float:
+        """Renvoie le prix courant; une exception fait passer à la source suivante"""
+
+
+class HttpPriceSource(PriceSource):
+    """Source HTTP JSON: extract(data) renvoie le prix"""
+
+    def __init__(self, name: str, url: str, extract):
+        self.name = name
+        self.url = url
+        self.extract = extract
+
+    async def fetch(self, session) -> float:
+        async with session.get(self.url) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+            return float(self.extract(data))
+
+
+class StaticPriceSource(PriceSource):
+    """Source locale à prix fixe (tests, backtests, mode hors-ligne)"""
+
+    name = 'static'
+
+    def __init__(self, price: float):
+        self.price = price
+
+    async def fetch(self, session) -> float:
+        return float(self.price)
+
+
+DEFAULT_SOURCES = [
+    HttpPriceSource(
+        'coingecko',
+        "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd",
+        lambda data: data['solana']['usd']
+    ),
+    HttpPriceSource(
+        'binance',
+        "https://api.binance.com/api/v3/ticker/price?symbol=SOLUSDT",
+        lambda data: data['price']
+    ),
+    HttpPriceSource(
+        'coinbase',
+        "https://api.coinbase.com/v2/prices/SOL-USD/spot",
+        lambda data: data['data']['amount']
+    ),
+]
 
+
+class SolPriceFetcher:
+    """
+    Oracle SOL/USD
+
+    get_price() ne fait jamais d'I/O: il renvoie la valeur publiée par le
+    thread de rafraîchissement (démarré au premier appel). Une affectation
+    d'attribut étant atomique, la lecture n'a pas besoin de verrou.
+    """
+
+    # Bornes de sanité: une source qui renvoie n'importe quoi est ignorée
+    MIN_PRICE = 1.0
+    MAX_PRICE = 10000.0
+
+    def __init__(self, sources: List[PriceSource] = None, cache_duration: float = 30,
+                 default_price: float = 200.0, timeout: float = 3, autostart: bool = True):
+        self.sources = list(sources) if sources is not None else list(DEFAULT_SOURCES)
+        self.cache_duration = cache_duration  # Secondes entre deux rafraîchissements
+        self.timeout = timeout
+        self.autostart = autostart
+
+        self.cached_price = default_price  # Prix par défaut tant qu'aucune source n'a répondu
+        self.last_update = None
+        self.last_source = None
+
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # Stats
+        self.refreshes = 0
+        self.failures = {}  # {source: nb d'échecs}
+
+    # ------------------------------------------------------------------
+    # Lecture (hot path)
+    # ------------------------------------------------------------------
+    def get_price(self) -> float:
+        """Prix SOL/USD courant (aucun appel réseau)"""
+        if self._thread is None and self.autostart and not self._stop.is_set():
+            self.start()
         return self.cached_price
 
     def get_price_info(self):
@@ -46,52 +123,130 @@ class SolPriceFetcher:
             'price': price,
             'age_seconds': age,
             'timestamp': self.last_update,
-            'is_cached': age < self.cache_duration
+            'source': self.last_source,
+            'is_cached': self.last_update is not None and age < self.cache_duration * 2
         }
 
+    # ------------------------------------------------------------------
+    # Rafraîchissement (thread de fond)
+    # ------------------------------------------------------------------
+    def set_sources(self, sources: List[PriceSource]):
+        """Remplace les sources (ex: [StaticPriceSource(150)] en test)"""
+        self.sources = list(sources)
+
+    async def refresh(self, session=None) -> Optional[float]:
+        """Interroge les sources dans l'ordre jusqu'à obtenir un prix valide"""
+        for source in self.sources:
+            try:
+                price = await asyncio.wait_for(source.fetch(session), self.timeout)
+            except Exception as e:
+                self.failures[source.name] = self.failures.get(source.name, 0) + 1
+                print(f"[WARN] Erreur fetch prix SOL ({source.name}): {e}")
+                continue
+
+            if self.MIN_PRICE <= price <= self.MAX_PRICE:
+                self.cached_price = price
+                self.last_update = datetime.now()
+                self.last_source = source.name
+                self.refreshes += 1
+                return price
+
+            self.failures[source.name] = self.failures.get(source.name, 0) + 1
+            print(f"[WARN] Prix SOL incohérent ({source.name}): {price}")
+
+        print(f"[WARN] Aucune source de prix SOL disponible, utilisation cache: ${self.cached_price:.2f}")
+        return None
+
+    def refresh_now(self) -> Optional[float]:
+        """Rafraîchissement synchrone (tests / scripts, hors boucle asyncio)"""
+        return asyncio.run(self._refresh_once())
+
+    async def _refresh_once(self):
+        if aiohttp is None:
+            return await self.refresh()
+        async with aiohttp.ClientSession() as session:
+            return await self.refresh(session)
+
+    async def refresh_loop(self):
+        """Boucle de rafraîchissement (une session HTTP réutilisée)"""
+        if aiohttp is None:
+            session = None
+        else:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        try:
+            while not self._stop.is_set():
+                await self.refresh(session)
+                # Attente découpée pour réagir vite à stop()
+                deadline = time.monotonic() + self.cache_duration
+                while not self._stop.is_set() and time.monotonic() < deadline:
+                    await asyncio.sleep(min(1.0, deadline - time.monotonic()))
+        finally:
+            if session is not None:
+                await session.close()
+
+    def start(self):
+        """Démarre le thread de rafraîchissement (idempotent)"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self.refresh_loop()),
+                name='sol-price-oracle',
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Arrête le thread de rafraîchissement"""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def get_stats(self):
+        info = self.get_price_info()
+        info['refreshes'] = self.refreshes
+        info['failures'] = dict(self.failures)
+        info['sources'] = [source.name for source in self.sources]
+        return info
+
+
 # Instance globale
 sol_price_fetcher = SolPriceFetcher()
 
 # Fonction rapide pour avoir le prix
 def get_sol_price_usd():
-    """Fonction simple pour récupérer le prix SOL"""
+    """Fonction simple pour récupérer le prix SOL (lecture du cache, sans I/O)"""
     return sol_price_fetcher.get_price()
 
 # Test si lancé directement
 if __name__ == '__main__':
-    import time
-
     print('='*80)
-    print('TEST SOL PRICE FETCHER - COINGECKO')
+    print('TEST SOL PRICE ORACLE')
     print('='*80)
 
-    fetcher = SolPriceFetcher()
+    # Test 1: Source locale (aucun réseau)
+    print('\n[Test 1] Source statique...')
+    fetcher = SolPriceFetcher(sources=[StaticPriceSource(150.0)], autostart=False)
+    fetcher.refresh_now()
+    print(f"Prix SOL: ${fetcher.get_price():.2f} USD (source: {fetcher.last_source})")
 
-    # Test 1: Premier fetch
-    print('\n[Test 1] Premier fetch depuis CoinGecko...')
+    # Test 2: Fetch réel depuis les sources HTTP
+    print('\n[Test 2] Rafraîchissement depuis les sources HTTP...')
+    fetcher = SolPriceFetcher(autostart=False)
+    fetcher.refresh_now()
     info = fetcher.get_price_info()
-    print(f"Prix SOL: ${info['price']:.2f} USD")
-    print(f"Cache: {info['is_cached']}")
-    print(f"Age: {info['age_seconds']:.1f}s")
-
-    # Test 2: Fetch depuis cache (devrait être instantané)
-    print('\n[Test 2] Fetch depuis cache...')
-    start = time.time()
-    price = fetcher.get_price()
-    elapsed = time.time() - start
-    print(f"Prix SOL: ${price:.2f} USD")
-    print(f"Temps: {elapsed*1000:.1f}ms (devrait etre <1ms)")
-
-    # Test 3: Multiple fetches rapides (pour voir le cache)
-    print('\n[Test 3] 5 fetches rapides (devrait utiliser cache)...')
+    print(f"Prix SOL: ${info['price']:.2f} USD (source: {info['source']})")
+
+    # Test 3: Lectures (devraient être instantanées)
+    print('\n[Test 3] 5 lectures...')
     for i in range(5):
         start = time.time()
         price = fetcher.get_price()
         elapsed = time.time() - start
-        info = fetcher.get_price_info()
-        print(f"  Fetch {i+1}: ${price:.2f} en {elapsed*1000:.1f}ms (cache: {info['is_cached']})")
+        print(f"  Lecture {i+1}: ${price:.2f} en {elapsed*1000:.3f}ms")
 
     print('\n' + '='*80)
     print('Tests termines')
-    print(f"Prix SOL actuel: ${fetcher.get_price():.2f} USD")
     print('='*80)
@@ -1,9 +1,12 @@
 """
 Module de trading réel sur Solana via PumpPortal API
+Code async: buy_token_async / sell_token_async (requêtes + signature dans un thread,
+la boucle asyncio n'est jamais bloquée)
 """
+import asyncio
 import os
-import requests
 from dotenv import load_dotenv
+from http_client import get_http_client
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -108,7 +111,7 @@ class SolanaTrader:
             print(f'[BUY] Préparation achat: {amount_sol} SOL sur {mint[:8]}...')
 
             # Obtenir la transaction sérialisée
-            response = requests.post(self.api_url, data=payload, timeout=10)
+            response = get_http_client().post_sync(self.api_url, data=payload, timeout=10)
 
             if response.status_code != 200:
                 error_msg = f'Erreur API: {response.status_code} - {response.text}'
@@ -143,8 +146,8 @@ class SolanaTrader:
             tx_payload = SendVersionedTransaction(tx, config)
 
             print(f'[BUY] Envoi transaction au RPC...')
-            rpc_response = requests.post(
-                url=self.rpc_url,
+            rpc_response = get_http_client().post_sync(
+                self.rpc_url,
                 headers={"Content-Type": "application/json"},
                 data=tx_payload.to_json(),
                 timeout=30
@@ -167,6 +170,10 @@ class SolanaTrader:
             print(f'[BUY] ❌ Erreur: {error_msg}')
             return {'success': False, 'signature': None, 'error': error_msg}
 
+    async def buy_token_async(self, mint, amount_sol, slippage=25, priority_fee=0.001):
+        """Version async de buy_token (exécutée dans un thread, ne bloque pas la boucle)"""
+        return await asyncio.to_thread(self.buy_token, mint, amount_sol, slippage, priority_fee)
+
     def sell_token(self, mint, amount_percent=100, slippage=25, priority_fee=0.001):
         """
         Vend un token sur PumpFun
@@ -199,7 +206,7 @@ class SolanaTrader:
             print(f'[SELL] Préparation vente: {amount_percent}% de {mint[:8]}...')
 
             # Obtenir la transaction sérialisée
-            response = requests.post(self.api_url, data=payload, timeout=10)
+            response = get_http_client().post_sync(self.api_url, data=payload, timeout=10)
 
             if response.status_code != 200:
                 error_msg = f'Erreur API: {response.status_code} - {response.text}'
@@ -234,8 +241,8 @@ class SolanaTrader:
             tx_payload = SendVersionedTransaction(tx, config)
 
             print(f'[SELL] Envoi transaction au RPC...')
-            rpc_response = requests.post(
-                url=self.rpc_url,
+            rpc_response = get_http_client().post_sync(
+                self.rpc_url,
                 headers={"Content-Type": "application/json"},
                 data=tx_payload.to_json(),
                 timeout=30
@@ -258,5 +265,9 @@ class SolanaTrader:
             print(f'[SELL] ❌ Erreur: {error_msg}')
             return {'success': False, 'signature': None, 'error': error_msg}
 
+    async def sell_token_async(self, mint, amount_percent=100, slippage=25, priority_fee=0.001):
+        """Version async de sell_token (exécutée dans un thread, ne bloque pas la boucle)"""
+        return await asyncio.to_thread(self.sell_token, mint, amount_percent, slippage, priority_fee)
+
 # Instance globale
 solana_trader = SolanaTrader()
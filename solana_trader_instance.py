@@ -2,8 +2,11 @@
 Helper pour créer des instances de SolanaTrader avec différents wallets
 Permet à chaque utilisateur d'avoir son propre trader avec sa clé privée
 """
+import asyncio
 import os
 
+from http_client import get_http_client
+
 
 class UserSolanaTrader:
     """Trader Solana pour un utilisateur spécifique"""
@@ -84,7 +87,6 @@ class UserSolanaTrader:
             return {'success': False, 'error': 'Trader non configuré'}
 
         try:
-            import requests
 
             # Préparer la requête pour obtenir la transaction
             payload = {
@@ -101,7 +103,7 @@ class UserSolanaTrader:
             print(f'[TRADER] 🛒 Préparation achat: {amount_sol:.4f} SOL sur {mint[:8]}...')
 
             # Obtenir la transaction sérialisée
-            response = requests.post(self.api_url, data=payload, timeout=10)
+            response = get_http_client().post_sync(self.api_url, data=payload, timeout=10)
 
             if response.status_code != 200:
                 error_msg = f'Erreur API: {response.status_code} - {response.text}'
@@ -135,8 +137,8 @@ class UserSolanaTrader:
             tx_payload = SendVersionedTransaction(tx, config)
 
             print(f'[TRADER] 📡 Envoi transaction...')
-            rpc_response = requests.post(
-                url=self.rpc_url,
+            rpc_response = get_http_client().post_sync(
+                self.rpc_url,
                 headers={"Content-Type": "application/json"},
                 data=tx_payload.to_json(),
                 timeout=30
@@ -158,6 +160,10 @@ class UserSolanaTrader:
             print(f'[TRADER] ❌ Erreur: {error_msg}')
             return {'success': False, 'signature': None, 'error': error_msg}
 
+    async def buy_token_async(self, mint, amount_sol, slippage=25, priority_fee=0.001):
+        """Version async de buy_token (exécutée dans un thread, ne bloque pas la boucle)"""
+        return await asyncio.to_thread(self.buy_token, mint, amount_sol, slippage, priority_fee)
+
     def sell_token(self, mint, amount_percent=100, slippage=25, priority_fee=0.001):
         """
         Vend un token sur PumpFun
@@ -175,7 +181,6 @@ class UserSolanaTrader:
             return {'success': False, 'error': 'Trader non configuré'}
 
         try:
-            import requests
 
             # Préparer la requête
             payload = {
@@ -192,7 +197,7 @@ class UserSolanaTrader:
             print(f'[TRADER] 💰 Préparation vente: {amount_percent}% de {mint[:8]}...')
 
             # Obtenir la transaction sérialisée
-            response = requests.post(self.api_url, data=payload, timeout=10)
+            response = get_http_client().post_sync(self.api_url, data=payload, timeout=10)
 
             if response.status_code != 200:
                 error_msg = f'Erreur API: {response.status_code} - {response.text}'
@@ -226,8 +231,8 @@ class UserSolanaTrader:
             tx_payload = SendVersionedTransaction(tx, config)
 
             print(f'[TRADER] 📡 Envoi transaction...')
-            rpc_response = requests.post(
-                url=self.rpc_url,
+            rpc_response = get_http_client().post_sync(
+                self.rpc_url,
                 headers={"Content-Type": "application/json"},
                 data=tx_payload.to_json(),
                 timeout=30
@@ -250,6 +255,11 @@ class UserSolanaTrader:
             return {'success': False, 'signature': None, 'error': error_msg}
 
 
+    async def sell_token_async(self, mint, amount_percent=100, slippage=25, priority_fee=0.001):
+        """Version async de sell_token (exécutée dans un thread, ne bloque pas la boucle)"""
+        return await asyncio.to_thread(self.sell_token, mint, amount_percent, slippage, priority_fee)
+
+
 def create_trader_for_wallet(public_key: str, private_key: str):
     """
     Crée une instance de trader pour un wallet spécifique
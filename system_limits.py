@@ -56,6 +56,10 @@ MAX_TOKENS_PER_MINUTE = 1000
 # Maximum de signaux à envoyer par minute (éviter spam)
 MAX_SIGNALS_PER_MINUTE = 100
 
+# Nombre de processus d'analyse (partition des mints par hash)
+# 0 ou 1 = moteur IA mono-processus
+ENGINE_SHARDS = int(os.environ.get('ENGINE_SHARDS', 0))
+
 # ============================================================================
 # LIMITES BASE DE DONNÉES
 # ============================================================================
@@ -154,6 +158,7 @@ def print_config():
     print(f"WebSocket Reconnect    : {WEBSOCKET_RECONNECT_DELAY}s")
     print(f"Max Tokens per Minute  : {MAX_TOKENS_PER_MINUTE}")
     print(f"Max Signals per Minute : {MAX_SIGNALS_PER_MINUTE}")
+    print(f"Engine Shards          : {ENGINE_SHARDS or 1}")
     print("="*70)
     print("\nVPS RECOMMENDATIONS:")
     for vps, limit in VPS_RECOMMENDATIONS.items():
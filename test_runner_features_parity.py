@@ -0,0 +1,104 @@
+"""
+Test de parité des features runner: transform (entraînement, en bloc) et
+transform_row (inférence, ligne par ligne) doivent produire les mêmes bits
+
+python -m pytest test_runner_features_parity.py   (ou python test_runner_features_parity.py)
+"""
+import numpy as np
+
+from runner_features import FeatureSpec, check_parity
+
+
+def _snapshot(txn, buy_ratio, traders, mc, **extra):
+    snapshot = {'txn': txn, 'buy_ratio': buy_ratio, 'traders': traders, 'mc': mc}
+    snapshot.update(extra)
+    return snapshot
+
+
+def sample_tokens():
+    """Tokens complets, incomplets et malformés (ce que produit le bot en pratique)"""
+    complete = {
+        'mint': 'complete',
+        'whale_count': 2,
+        'whale_total_volume_usd': 12500.5,
+        'whale_wallets_detected': ['w1', 'w2'],
+        'ml_metrics': {'peak_velocity': 3.2, 'time_to_10k': 12.5, 'time_to_69k': 9999, 'ath_mc': 71000},
+        'supply_distribution': {'total_holders': 140, 'top_3_percent': 18.2, 'top_10_percent': 33.0},
+    }
+    for i, horizon in enumerate(('3s', '5s', '7s', '10s', '15s', '30s', '1min', '5min', '10min')):
+        complete[horizon] = _snapshot(5 + 7 * i, 0.55 + 0.01 * i, 3 + 2 * i, 4000 + 1500.25 * i,
+                                      buys=3 + 4 * i, sells=2 + 3 * i, big_buys_100=i, big_buys_500=i // 2,
+                                      total_buy_volume=100.0 * i, smart_money_count=i % 3, whale_count=i % 2)
+
+    return [
+        complete,
+        # Snapshots absents (token mort tôt), pas de ml_metrics / supply
+        {'mint': 'missing', '10s': _snapshot(8, 0.5, 4, 5000)},
+        # Snapshots à None, sources à None
+        {'mint': 'nones', '3s': None, '10s': None, '30s': _snapshot(20, 0.7, 9, 8000),
+         'ml_metrics': None, 'supply_distribution': None, 'whale_wallets_detected': None},
+        # Snapshots malformés (mauvais type) et valeurs None à l'intérieur
+        {'mint': 'malformed', '5s': [], '7s': 'n/a', '10s': {'txn': None, 'mc': None, 'buy_ratio': 0.8},
+         '15s': {}, 'ml_metrics': [1, 2], '1min': _snapshot(30, 0.6, 12, 9000)},
+        # Divisions par zéro / valeurs non finies (mc nul, inf, nan) et nombres en chaîne
+        {'mint': 'degenerate', '10s': _snapshot(0, 0.0, 0, 0), '30s': _snapshot(10, 0.5, 5, float('inf')),
+         '1min': _snapshot(float('nan'), 0.5, 6, 7000), '15s': {'txn': '12', 'buy_ratio': '0.75'},
+         'ml_metrics': {'time_to_10k': 9999, 'time_to_20k': '9999'}},
+        {'mint': 'empty'},
+    ]
+
+
+def _assert_rows_equal(spec, X, tokens):
+    for i, token in enumerate(tokens):
+        row = spec.transform_row(token)
+        assert row.shape == (spec.n_features,)
+        assert np.array_equal(X[i].view(np.uint64), row.view(np.uint64)), token['mint']
+
+
+def test_transform_matches_transform_row():
+    spec = FeatureSpec()
+    tokens = sample_tokens()
+    X = spec.transform(tokens)
+    assert X.shape == (len(tokens), spec.n_features)
+    assert np.isfinite(X).all()
+    _assert_rows_equal(spec, X, tokens)
+    assert check_parity(tokens, spec)
+
+
+def test_row_buffer_reuse_keeps_parity():
+    # transform_row réécrit la même ligne: l'ordre des appels ne doit rien changer
+    spec = FeatureSpec()
+    tokens = sample_tokens()
+    X = spec.transform(tokens)
+    _assert_rows_equal(spec, X[::-1], tokens[::-1])
+    _assert_rows_equal(spec, X, tokens)
+
+
+def test_preallocated_output_matches():
+    spec = FeatureSpec()
+    tokens = sample_tokens()
+    out = np.full((len(tokens) + 3, spec.n_features), 123.0)
+    assert np.array_equal(spec.transform(tokens, out=out), spec.transform(tokens))
+
+
+def test_invalid_tokens_are_skipped_in_batch():
+    spec = FeatureSpec()
+    tokens = sample_tokens()
+    invalid = {'mint': 'invalid', '10s': _snapshot('abc', 0.5, 4, 5000)}
+    X, kept = spec.transform(tokens[:2] + [invalid] + tokens[2:], skip_invalid=True)
+    assert [token['mint'] for token in kept] == [token['mint'] for token in tokens]
+    assert np.array_equal(X, spec.transform(tokens))
+    _assert_rows_equal(spec, X, kept)
+    try:
+        spec.transform_row(invalid)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('transform_row doit lever sur un token non numérique')
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f'[OK] {name}')
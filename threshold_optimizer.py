@@ -0,0 +1,404 @@
+"""
+THRESHOLD OPTIMIZER - Recherche vectorisée des seuils d'entrée, tous horizons
+find_optimal_thresholds.py / find_sweet_spot.py testent 5 configs écrites à la
+main, chacune par une double boucle Python sur tous les runners et flops
+Ici les snapshots sont chargés une seule fois en matrices NumPy par horizon:
+- seuils candidats = quantiles de chaque feature; pour chaque (feature, seuil)
+  un bitset des tokens qui passent (np.packbits)
+- une config = AND de 4 bitsets -> capture / précision par popcount, P&L par
+  produit matriciel avec le retour de chaque token (calculé une fois)
+- P&L simulé avec les règles de sortie de trading_bot/config.py (TARGETS,
+  SELL_PERCENTAGES, STOP_LOSS max_loss_percent) sur le chemin de MC des
+  snapshots suivants puis final_mc
+- grille complète, recherche aléatoire ou Optuna (TPE multi-objectif) si installé
+- front de Pareto capture vs précision
+Usage:
+    python threshold_optimizer.py                                  # grille, tous horizons
+    python threshold_optimizer.py --horizons 10s,15s --search optuna --trials 5000
+    python threshold_optimizer.py --levels 12 --min-signals 20 --json thresholds.json
+"""
+import itertools
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from bot_data_journal import open_completed
+
+try:
+    import optuna
+except ImportError:
+    optuna = None
+
+# Règles de trading_bot/ (un autre config.py existe à la racine)
+from trading_bot.config import ENTRY_FILTERS, RISK_MANAGEMENT, SELL_PERCENTAGES, STOP_LOSS, TARGETS
+
+# Ordre chronologique des snapshots de pattern_discovery_bot
+SNAPSHOT_KEYS = ['3s', '5s', '7s', '10s', '15s', '20s', '30s', '1min', '2min',
+                 '3min', '5min', '8min', '10min', '15min', '20min']
+DEFAULT_HORIZONS = ['5s', '7s', '10s', '15s', '20s', '30s', '1min']
+
+# Filtres testés (mêmes 4 conditions que find_optimal_thresholds / ENTRY_FILTERS)
+FEATURES = ['buy_ratio', 'txn', 'traders', 'big_buys_100']
+FILTER_KEYS = {
+    'buy_ratio': 'buy_ratio_min',
+    'txn': 'transactions_min',
+    'traders': 'traders_min',
+    'big_buys_100': 'big_buys_min'
+}
+
+DEFAULT_LEVELS = 10  # Seuils candidats par feature (grille: LEVELS^4 configs)
+CHUNK_CONFIGS = 2048  # Configs évaluées par bloc (borne la mémoire des masques)
+MIN_SIGNALS = 10  # Une config qui n'achète presque rien n'est pas retenue
+SCORE_WEIGHTS = (0.6, 0.4)  # Score = 0.6 capture + 0.4 précision (find_optimal_thresholds)
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+# ============================================================================
+# SIMULATION DES SORTIES
+# ============================================================================
+def simulate_exits(entry_mc: np.ndarray, path: np.ndarray, final_mc: np.ndarray) -> np.ndarray:
+    """
+    Multiplicateur de la mise (1.0 = break-even) pour chaque token, avec les
+    règles de trading_bot/config.py
+
+    - target_k atteint (MC du chemin >= TARGETS) avant le stop: SELL_PERCENTAGES
+      vendus au prix du target
+    - stop (MC <= entrée * (1 + max_loss_percent)) avant la fin: le reste est
+      vendu au stop, sinon à final_mc
+    path: (n, k) MC des snapshots après l'entrée (NaN si absent)
+    """
+    n, k = path.shape
+    never = np.full(n, k, dtype=np.int64)
+    valid = ~np.isnan(path)
+
+    stop_mc = entry_mc * (1 + STOP_LOSS['max_loss_percent'] / 100)
+    stopped = valid & (path <= stop_mc[:, None])
+    stop_at = np.where(stopped.any(axis=1), stopped.argmax(axis=1), never)
+
+    ratio = np.zeros(n)
+    sold = np.zeros(n)
+    for name, target in TARGETS.items():
+        share = SELL_PERCENTAGES[name] / 100
+        reached = valid & (path >= target)
+        reached_at = np.where(reached.any(axis=1), reached.argmax(axis=1), never)
+        # Entrée déjà au-dessus du target: vendu tout de suite au MC d'entrée
+        already = entry_mc >= target
+        hit = already | (reached_at < stop_at)
+        price = np.where(already, entry_mc, target)
+        ratio += np.where(hit, share * price / entry_mc, 0)
+        sold += np.where(hit, share, 0)
+
+    remaining = np.clip(1 - sold, 0, 1)
+    exit_mc = np.where(stop_at < k, stop_mc, final_mc)
+    return ratio + remaining * exit_mc / entry_mc
+
+
+# ============================================================================
+# MATRICES DE SNAPSHOTS
+# ============================================================================
+@dataclass
+class SnapshotMatrix:
+    """Tokens ayant un snapshot à l'horizon: features, label et retour simulé"""
+    horizon: str
+    X: np.ndarray  # (n, len(FEATURES)) buy_ratio en %
+    entry_mc: np.ndarray
+    final_mc: np.ndarray
+    is_runner: np.ndarray  # bool
+    returns: np.ndarray  # Multiplicateur de la mise par token
+    total_runners: int  # Runners de tout le dataset (dénominateur de la capture)
+
+    def __len__(self):
+        return len(self.X)
+
+
+def load_snapshot_matrices(data_file: str = 'bot_data.json', horizons: List[str] = None) -> Dict[str, SnapshotMatrix]:
+    """Une seule passe sur les tokens complétés (journal ou bot_data.json legacy)"""
+    horizons = horizons or DEFAULT_HORIZONS
+    positions = {h: SNAPSHOT_KEYS.index(h) for h in horizons}
+
+    rows = {h: [] for h in horizons}
+    paths = {h: [] for h in horizons}
+    total_runners = 0
+    for token in open_completed(data_file):
+        is_runner = bool(token.get('is_runner', False))
+        total_runners += is_runner
+        mcs = []
+        for key in SNAPSHOT_KEYS:
+            snapshot = token.get(key)
+            mcs.append(snapshot.get('mc', np.nan) if isinstance(snapshot, dict) else np.nan)
+
+        for horizon, position in positions.items():
+            snapshot = token.get(horizon)
+            if not isinstance(snapshot, dict) or (snapshot.get('mc') or 0) <= 0:
+                continue
+            rows[horizon].append((
+                snapshot.get('buy_ratio', 0) * 100,
+                snapshot.get('txn', 0),
+                snapshot.get('traders', 0),
+                snapshot.get('big_buys_100', 0),
+                snapshot['mc'],
+                token.get('final_mc', snapshot['mc']),
+                is_runner
+            ))
+            paths[horizon].append(mcs[position + 1:])
+
+    matrices = {}
+    for horizon in horizons:
+        data = np.array(rows[horizon], dtype=np.float64).reshape(-1, len(FEATURES) + 3)
+        # Forme explicite: un horizon sans token qualifié donne une matrice (0, n) au lieu d'une erreur
+        path = np.array(paths[horizon], dtype=np.float64).reshape(len(data), len(SNAPSHOT_KEYS) - positions[horizon] - 1)
+        entry_mc = data[:, len(FEATURES)]
+        final_mc = data[:, len(FEATURES) + 1]
+        # final_mc termine le chemin (les stops/targets entre deux snapshots ne sont pas visibles)
+        path = np.hstack([path, final_mc[:, None]])
+        matrices[horizon] = SnapshotMatrix(
+            horizon=horizon,
+            X=data[:, :len(FEATURES)].astype(np.float32),
+            entry_mc=entry_mc,
+            final_mc=final_mc,
+            is_runner=data[:, len(FEATURES) + 2].astype(bool),
+            returns=simulate_exits(entry_mc, path, final_mc),
+            total_runners=total_runners
+        )
+    return matrices
+
+
+# ============================================================================
+# ÉVALUATION PAR BITSETS
+# ============================================================================
+class ThresholdEvaluator:
+    """
+    Évalue des configs (un indice de seuil par feature) sur un horizon
+
+    levels[f] = seuils candidats de la feature f; bits[f][i] = bitset des
+    tokens avec X[:, f] >= levels[f][i]
+    """
+
+    def __init__(self, matrix: SnapshotMatrix, levels: int = DEFAULT_LEVELS, include: Dict[str, float] = None):
+        self.matrix = matrix
+        self.n = len(matrix)
+        self.levels = []
+        self.bits = []
+        for f, feature in enumerate(FEATURES):
+            values = matrix.X[:, f]
+            candidates = np.quantile(values, np.linspace(0, 0.95, levels)) if self.n else np.zeros(1)
+            if include:
+                candidates = np.append(candidates, include[feature])
+            candidates = np.unique(candidates)
+            self.levels.append(candidates.astype(np.float64))
+            passed = values[None, :] >= candidates[:, None]
+            self.bits.append(np.packbits(passed, axis=1))
+        self.runner_bits = np.packbits(matrix.is_runner)
+        self.returns = matrix.returns.astype(np.float64)
+        self.configs_evaluated = 0
+
+    @property
+    def grid_size(self) -> int:
+        return int(np.prod([len(levels) for levels in self.levels]))
+
+    def thresholds(self, index: np.ndarray) -> Dict[str, float]:
+        return {feature: float(self.levels[f][index[f]]) for f, feature in enumerate(FEATURES)}
+
+    def evaluate(self, indices: np.ndarray) -> Dict[str, np.ndarray]:
+        """indices: (m, len(FEATURES)) -> métriques vectorisées par config"""
+        results = {key: [] for key in ('signals', 'runners', 'capture', 'precision', 'pnl', 'avg_return', 'win_rate')}
+        wins = self.returns > 1
+
+        for start in range(0, len(indices), CHUNK_CONFIGS):
+            chunk = indices[start:start + CHUNK_CONFIGS]
+            masks = self.bits[0][chunk[:, 0]]
+            for f in range(1, len(FEATURES)):
+                masks = masks & self.bits[f][chunk[:, f]]
+
+            signals = _POPCOUNT[masks].sum(axis=1)
+            runners = _POPCOUNT[masks & self.runner_bits].sum(axis=1)
+            selected = np.unpackbits(masks, axis=1, count=self.n).astype(np.float64)
+            pnl = selected @ (self.returns - 1)
+            won = selected @ wins
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                results['signals'].append(signals)
+                results['runners'].append(runners)
+                results['capture'].append(runners / max(self.matrix.total_runners, 1) * 100)
+                results['precision'].append(np.where(signals > 0, runners / signals * 100, 0))
+                results['pnl'].append(pnl)
+                results['avg_return'].append(np.where(signals > 0, pnl / signals * 100, 0))
+                results['win_rate'].append(np.where(signals > 0, won / signals * 100, 0))
+
+        self.configs_evaluated += len(indices)
+        metrics = {key: np.concatenate(values) if values else np.zeros(0) for key, values in results.items()}
+        metrics['score'] = SCORE_WEIGHTS[0] * metrics['capture'] + SCORE_WEIGHTS[1] * metrics['precision']
+        return metrics
+
+    def grid(self) -> np.ndarray:
+        """Toutes les combinaisons de seuils"""
+        return np.array(list(itertools.product(*[range(len(levels)) for levels in self.levels])), dtype=np.int64)
+
+    def random(self, count: int, seed: int = 0) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        return np.stack([rng.integers(0, len(levels), count) for levels in self.levels], axis=1)
+
+    def index_of(self, thresholds: Dict[str, float]) -> np.ndarray:
+        """Seuil candidat le plus proche (exact s'il a été inclus) pour chaque feature"""
+        return np.array([int(np.abs(self.levels[f] - thresholds[feature]).argmin())
+                         for f, feature in enumerate(FEATURES)])
+
+
+def pareto_front(capture: np.ndarray, precision: np.ndarray) -> np.ndarray:
+    """Indices des configs non dominées (capture et précision maximisées), par capture décroissante"""
+    order = np.lexsort((-precision, -capture))
+    best_precision = np.maximum.accumulate(precision[order])
+    # Non dominé: précision strictement meilleure que toutes les configs de capture >= la sienne
+    previous = np.concatenate([[-np.inf], best_precision[:-1]])
+    return order[precision[order] > previous]
+
+
+# ============================================================================
+# RECHERCHE
+# ============================================================================
+def _optuna_search(evaluator: ThresholdEvaluator, trials: int, min_signals: int, seed: int) -> np.ndarray:
+    """TPE multi-objectif (capture, précision) par lots évalués en une fois"""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(directions=['maximize', 'maximize'],
+                                sampler=optuna.samplers.TPESampler(seed=seed, multivariate=True))
+    distributions = {feature: optuna.distributions.IntDistribution(0, len(evaluator.levels[f]) - 1)
+                     for f, feature in enumerate(FEATURES)}
+
+    batch_size = 64
+    sampled = []
+    while len(sampled) < trials:
+        batch = [study.ask(distributions) for _ in range(min(batch_size, trials - len(sampled)))]
+        indices = np.array([[trial.params[feature] for feature in FEATURES] for trial in batch], dtype=np.int64)
+        metrics = evaluator.evaluate(indices)
+        for i, trial in enumerate(batch):
+            if metrics['signals'][i] < min_signals:
+                study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+            else:
+                study.tell(trial, [float(metrics['capture'][i]), float(metrics['precision'][i])])
+        sampled.append(indices)
+    return np.concatenate(sampled)
+
+
+def optimize_horizon(matrix: SnapshotMatrix, search: str = 'grid', levels: int = DEFAULT_LEVELS,
+                     trials: int = 5000, min_signals: int = MIN_SIGNALS, seed: int = 0) -> dict:
+    """Recherche sur un horizon: meilleures configs (score, P&L) et front de Pareto"""
+    # Config actuelle de trading_bot/config.py incluse comme référence
+    current_thresholds = {feature: ENTRY_FILTERS[key] for feature, key in FILTER_KEYS.items()}
+    evaluator = ThresholdEvaluator(matrix, levels, include=current_thresholds)
+    start = time.perf_counter()
+
+    if search == 'grid':
+        indices = evaluator.grid()
+    elif search == 'optuna':
+        if optuna is None:
+            print("[WARNING] optuna non installe - recherche aleatoire (pip install optuna)")
+            search = 'random'
+            indices = evaluator.random(trials, seed)
+        else:
+            indices = _optuna_search(evaluator, trials, min_signals, seed)
+    elif search == 'random':
+        indices = evaluator.random(trials, seed)
+    else:
+        raise ValueError(f"Recherche inconnue: {search} (grid, random, optuna)")
+
+    current = evaluator.index_of(current_thresholds)
+    indices = np.unique(np.vstack([indices, current]), axis=0)
+    metrics = evaluator.evaluate(indices)
+    elapsed = time.perf_counter() - start
+
+    def describe(i: int) -> dict:
+        entry = evaluator.thresholds(indices[i])
+        entry.update({key: float(values[i]) for key, values in metrics.items()})
+        entry['pnl_usd'] = entry['pnl'] * RISK_MANAGEMENT['max_position_size_usd']
+        return entry
+
+    eligible = np.flatnonzero(metrics['signals'] >= min_signals)
+    front = eligible[pareto_front(metrics['capture'][eligible], metrics['precision'][eligible])] if len(eligible) else eligible
+    by_score = eligible[np.argsort(-metrics['score'][eligible])][:10]
+    by_pnl = eligible[np.argsort(-metrics['pnl'][eligible])][:10]
+    current_row = int(np.flatnonzero((indices == current).all(axis=1))[0])
+
+    return {
+        'horizon': matrix.horizon,
+        'tokens': len(matrix),
+        'runners': int(matrix.is_runner.sum()),
+        'search': search,
+        'configs': len(indices),
+        'seconds': round(elapsed, 3),
+        'configs_per_second': round(len(indices) / elapsed) if elapsed > 0 else None,
+        'current': describe(current_row),
+        'best_score': [describe(i) for i in by_score],
+        'best_pnl': [describe(i) for i in by_pnl],
+        'pareto': [describe(i) for i in front]
+    }
+
+
+def optimize(data_file: str = 'bot_data.json', horizons: List[str] = None, **kwargs) -> Dict[str, dict]:
+    """Charge les matrices une fois et optimise chaque horizon"""
+    matrices = load_snapshot_matrices(data_file, horizons)
+    return {horizon: optimize_horizon(matrix, **kwargs) for horizon, matrix in matrices.items() if len(matrix)}
+
+
+def _format_config(config: dict) -> str:
+    return (f"BR>={config['buy_ratio']:.0f}% Txn>={config['txn']:.0f} Traders>={config['traders']:.0f} "
+            f"BigBuys>={config['big_buys_100']:.0f} | {config['signals']:.0f} signaux | "
+            f"capture {config['capture']:.1f}% | precision {config['precision']:.1f}% | "
+            f"P&L {config['pnl_usd']:+,.0f}$ ({config['avg_return']:+.1f}%/trade)")
+
+
+def print_report(results: Dict[str, dict]):
+    print('=' * 80)
+    print('RECHERCHE DES MEILLEURS SEUILS - TOUS HORIZONS')
+    print('=' * 80)
+    print(f"Sorties: targets {', '.join(f'${t:,}' for t in TARGETS.values())} "
+          f"(vente {'/'.join(str(p) for p in SELL_PERCENTAGES.values())}%), "
+          f"stop {STOP_LOSS['max_loss_percent']}%, mise ${RISK_MANAGEMENT['max_position_size_usd']}")
+
+    for horizon, result in results.items():
+        print(f"\n[{horizon}] {result['tokens']:,} tokens ({result['runners']:,} runners) | "
+              f"{result['configs']:,} configs ({result['search']}) en {result['seconds']:.2f}s "
+              f"({result['configs_per_second'] or 0:,}/s)")
+        print(f"  Actuelle:   {_format_config(result['current'])}")
+        if result['best_score']:
+            print(f"  Score:      {_format_config(result['best_score'][0])}")
+            print(f"  P&L:        {_format_config(result['best_pnl'][0])}")
+        print(f"  Pareto ({len(result['pareto'])} configs):")
+        for config in result['pareto'][:12]:
+            print(f"    {_format_config(config)}")
+    print('=' * 80)
+
+
+def main(argv: List[str]):
+    options = {'--data': 'bot_data.json', '--horizons': ','.join(DEFAULT_HORIZONS), '--search': 'grid',
+               '--trials': 5000, '--levels': DEFAULT_LEVELS, '--min-signals': MIN_SIGNALS, '--json': None}
+    for name in options:
+        if name in argv:
+            options[name] = argv[argv.index(name) + 1]
+
+    try:
+        results = optimize(
+            options['--data'],
+            horizons=options['--horizons'].split(','),
+            search=options['--search'],
+            levels=int(options['--levels']),
+            trials=int(options['--trials']),
+            min_signals=int(options['--min-signals'])
+        )
+    except FileNotFoundError:
+        print(f"[ERROR] {options['--data']} non trouve")
+        sys.exit(1)
+
+    print_report(results)
+    if options['--json']:
+        with open(options['--json'], 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultats: {options['--json']}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,239 @@
+"""
+TIMER WHEEL - Scheduler unique pour les deadlines par token
+Remplace une tâche asyncio par mint (sleep 8s / 7s / 600s) par une roue
+hachée: chaque deadline est une entrée de quelques octets dans un slot,
+et toutes les deadlines d'un même tick sont déclenchées en batch
+Mesure aussi le retard de chaque deadline (lateness)
+"""
+import asyncio
+import inspect
+import math
+import time
+from typing import Callable, Optional
+
+
+class TimerHandle:
+    """Deadline programmée (annulable)"""
+
+    __slots__ = ('deadline', 'tick', 'callback', 'args', 'label', 'cancelled')
+
+    def __init__(self, deadline: float, tick: int, callback: Callable, args: tuple, label: str):
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.label = label
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Roue de timers hachée
+
+    - tick_seconds: résolution (les deadlines sont arrondies au tick supérieur)
+    - num_slots: taille de la roue; une deadline plus lointaine que
+      num_slots * tick_seconds reste dans son slot et attend son tick
+    - max_pending: borne mémoire, schedule() refuse au-delà (sauf force=True,
+      pour les deadlines qui libèrent de la mémoire: cleanup/éviction)
+    - clock: horloge monotone (injectable pour le replay/backtest)
+    """
+
+    # Buckets de l'histogramme de retard (en millisecondes)
+    LATENESS_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+    def __init__(self, tick_seconds: float = 0.05, num_slots: int = 512,
+                 max_pending: int = 200000, clock: Callable[[], float] = time.monotonic):
+        self.tick_seconds = tick_seconds
+        self.num_slots = num_slots
+        self.max_pending = max_pending
+        self.clock = clock
+
+        self.slots = [[] for _ in range(num_slots)]
+        self.start_time = clock()
+        self.current_tick = 0
+        self.pending = 0
+        self.is_running = False
+
+        # Stats
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.forced = 0
+        self.errors = 0
+        self.max_batch = 0
+        self.lateness_total = 0.0
+        self.lateness_max = 0.0
+        self.lateness_histogram = [0] * (len(self.LATENESS_BUCKETS_MS) + 1)
+        self.lateness_by_label = {}  # {label: [count, total, max]}
+
+        # Callbacks async en cours (référence gardée jusqu'à la fin de la tâche)
+        self._tasks = set()
+
+    def schedule(self, delay: float, callback: Callable, *args, label: str = '',
+                 force: bool = False) -> Optional[TimerHandle]:
+        """
+        Programme callback(*args) dans `delay` secondes
+
+        Le callback peut être sync ou async (coroutine lancée en tâche).
+        force=True: programmé même au-delà de max_pending (une deadline de
+        nettoyage refusée ferait fuir le token)
+
+        Returns:
+            TimerHandle, ou None si la roue est pleine (max_pending)
+        """
+        if self.pending >= self.max_pending:
+            if not force:
+                self.rejected += 1
+                if self.rejected == 1 or self.rejected % 1000 == 0:
+                    print(f"[TIMER WHEEL] Roue pleine ({self.pending} deadlines): "
+                          f"{label or callback.__name__} refusee ({self.rejected} refus)")
+                return None
+            self.forced += 1
+
+        deadline = self.clock() + max(0.0, delay)
+        tick = math.ceil((deadline - self.start_time) / self.tick_seconds)
+        tick = max(tick, self.current_tick + 1)
+
+        handle = TimerHandle(deadline, tick, callback, args, label)
+        self.slots[tick % self.num_slots].append(handle)
+        self.pending += 1
+        self.scheduled += 1
+        return handle
+
+    def cancel(self, handle: Optional[TimerHandle]):
+        """Annule une deadline (retirée paresseusement au passage du slot)"""
+        if handle and not handle.cancelled:
+            handle.cancel()
+            self.cancelled += 1
+
+    def advance(self, now: float = None) -> int:
+        """
+        Avance la roue jusqu'à `now` et déclenche les deadlines échues en batch
+
+        Returns:
+            Nombre de callbacks déclenchés
+        """
+        if now is None:
+            now = self.clock()
+
+        target_tick = math.floor((now - self.start_time) / self.tick_seconds)
+        if target_tick <= self.current_tick:
+            return 0
+
+        # Au-delà d'un tour complet, chaque slot n'a besoin d'être visité qu'une fois
+        steps = min(target_tick - self.current_tick, self.num_slots)
+        due = []
+        for step in range(1, steps + 1):
+            slot = self.slots[(self.current_tick + step) % self.num_slots]
+            if not slot:
+                continue
+            keep = []
+            for handle in slot:
+                if handle.cancelled:
+                    self.pending -= 1
+                elif handle.tick <= target_tick:
+                    due.append(handle)
+                    self.pending -= 1
+                else:
+                    keep.append(handle)
+            slot[:] = keep
+        self.current_tick = target_tick
+
+        if not due:
+            return 0
+
+        due.sort(key=lambda h: h.deadline)
+        self.max_batch = max(self.max_batch, len(due))
+
+        fired = 0
+        for handle in due:
+            if handle.cancelled:
+                continue
+            self._record_lateness(handle, now - handle.deadline)
+            try:
+                result = handle.callback(*handle.args)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    task.label = handle.label or getattr(handle.callback, '__name__', '')
+                    self._tasks.add(task)
+                    task.add_done_callback(self._task_done)
+            except Exception as e:
+                self.errors += 1
+                print(f"[TIMER WHEEL] Callback error ({handle.label or handle.callback.__name__}): {e}")
+            fired += 1
+
+        self.fired += fired
+        return fired
+
+    def _task_done(self, task: asyncio.Future):
+        """Fin d'un callback async: libère la référence et remonte l'exception"""
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.errors += 1
+            print(f"[TIMER WHEEL] Callback error ({task.label}): {error}")
+
+    def _record_lateness(self, handle: TimerHandle, lateness: float):
+        lateness = max(0.0, lateness)
+        self.lateness_total += lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+
+        lateness_ms = lateness * 1000
+        bucket = len(self.LATENESS_BUCKETS_MS)
+        for i, limit in enumerate(self.LATENESS_BUCKETS_MS):
+            if lateness_ms <= limit:
+                bucket = i
+                break
+        self.lateness_histogram[bucket] += 1
+
+        if handle.label:
+            stats = self.lateness_by_label.setdefault(handle.label, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += lateness
+            stats[2] = max(stats[2], lateness)
+
+    async def run(self):
+        """Boucle du scheduler: un réveil par tick pour toute la roue"""
+        self.is_running = True
+        next_tick = self.clock()
+        while self.is_running:
+            next_tick += self.tick_seconds
+            await asyncio.sleep(max(0.0, next_tick - self.clock()))
+            self.advance()
+            # Si la boucle a pris du retard, ne pas enchaîner des ticks à vide
+            next_tick = max(next_tick, self.clock() - self.tick_seconds)
+
+    def stop(self):
+        self.is_running = False
+
+    def get_stats(self):
+        """Stats du scheduler (dont le retard des deadlines)"""
+        labels = ['<=%dms' % limit for limit in self.LATENESS_BUCKETS_MS] + ['>%dms' % self.LATENESS_BUCKETS_MS[-1]]
+        return {
+            'pending': self.pending,
+            'scheduled': self.scheduled,
+            'fired': self.fired,
+            'cancelled': self.cancelled,
+            'rejected': self.rejected,
+            'forced': self.forced,
+            'running_tasks': len(self._tasks),
+            'errors': self.errors,
+            'max_batch': self.max_batch,
+            'avg_lateness_ms': (self.lateness_total / self.fired * 1000) if self.fired else 0,
+            'max_lateness_ms': self.lateness_max * 1000,
+            'lateness_histogram': dict(zip(labels, self.lateness_histogram)),
+            'lateness_by_label': {
+                label: {
+                    'count': count,
+                    'avg_ms': (total / count * 1000) if count else 0,
+                    'max_ms': worst * 1000
+                }
+                for label, (count, total, worst) in self.lateness_by_label.items()
+            }
+        }
@@ -0,0 +1,99 @@
+"""
+Token Transactions - Shared per-token RPC fetches for one analysis run
+
+The sniper, bundle, wallet-graph, buy/sell and coordinated-dump analyzers all
+start from the same getSignaturesForAddress(mint) call and then fetch the same
+early transactions. A TokenTransactions instance is created once per token and
+passed to every analyzer: signatures are fetched once (at the largest limit
+needed) and each getTransaction is fetched at most once.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from config import SOLANA_RPC_URL
+from http_client import get_http_client
+
+
+class TokenTransactions:
+    """Memoized signature list and transaction details for a token"""
+
+    def __init__(self, token_mint: str, rpc_url: str = None, prefetch_limit: int = 0, timeout: float = 30.0):
+        self.token_mint = token_mint
+        self.rpc_url = rpc_url or SOLANA_RPC_URL
+        self.prefetch_limit = prefetch_limit  # Fetch at least this many signatures on first use
+        self.timeout = timeout
+        self.client = get_http_client()
+
+        self._signatures: Optional[List[Dict]] = None
+        self._signatures_limit = 0
+        self._signatures_lock = asyncio.Lock()
+        self._transactions: Dict[str, asyncio.Task] = {}
+
+        # Stats
+        self.rpc_calls = 0
+        self.cache_hits = 0
+
+    def _covers(self, limit: int) -> bool:
+        """True if the cached signature list answers a request for `limit`"""
+        if self._signatures is None:
+            return False
+        # Fewer signatures than requested = full history already fetched
+        return self._signatures_limit >= limit or len(self._signatures) < self._signatures_limit
+
+    async def signatures(self, limit: int) -> List[Dict]:
+        """Most recent `limit` signatures for the token (newest first, like the RPC)"""
+        if self._covers(limit):
+            self.cache_hits += 1
+            return self._signatures[:limit]
+
+        async with self._signatures_lock:
+            if self._covers(limit):
+                self.cache_hits += 1
+                return self._signatures[:limit]
+
+            fetch_limit = max(limit, self.prefetch_limit)
+            self.rpc_calls += 1
+            response = await self.client.rpc(
+                self.rpc_url, "getSignaturesForAddress",
+                [self.token_mint, {"limit": fetch_limit}],
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return []
+
+            self._signatures = response.json().get("result") or []
+            self._signatures_limit = fetch_limit
+            return self._signatures[:limit]
+
+    async def transaction(self, signature: str) -> Optional[Dict]:
+        """getTransaction result (None if unavailable), fetched once per signature"""
+        task = self._transactions.get(signature)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_transaction(signature))
+            self._transactions[signature] = task
+        else:
+            self.cache_hits += 1
+        return await asyncio.shield(task)
+
+    async def _fetch_transaction(self, signature: str) -> Optional[Dict]:
+        try:
+            self.rpc_calls += 1
+            response = await self.client.rpc(
+                self.rpc_url, "getTransaction",
+                [signature, {"encoding": "json", "maxSupportedTransactionVersion": 0}],
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return None
+            return response.json().get("result")
+        except Exception:
+            return None
+
+    def get_stats(self) -> Dict:
+        return {
+            'rpc_calls': self.rpc_calls,
+            'cache_hits': self.cache_hits,
+            'signatures': len(self._signatures or []),
+            'transactions': len(self._transactions)
+        }
@@ -0,0 +1,144 @@
+"""
+TRADE STORE - Stockage colonnaire compact des trades par token
+Remplace la liste de dicts token['trades'] (≈600 octets/trade) par des
+tableaux typés (≈50 octets/trade) + traders internés en entiers
+(table propre à chaque token: libérée avec son buffer au cleanup)
+Expose la même API de lecture (itération, index, len) que la liste de dicts
+"""
+from array import array
+from typing import Dict, List
+
+import numpy as np
+
+
+# Bits du masque de flags
+FLAG_BUY = 1
+FLAG_WHALE = 2
+
+
+class TraderInterner:
+    """
+    Table wallet -> entier d'un token
+    Un wallet qui trade 50 fois le token n'est stocké qu'une fois; la table
+    vit et meurt avec le TradeBuffer (pas de croissance sur la durée du bot)
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.wallets: List[str] = []
+
+    def intern(self, wallet: str) -> int:
+        trader_id = self.ids.get(wallet)
+        if trader_id is None:
+            trader_id = len(self.wallets)
+            self.ids[wallet] = trader_id
+            self.wallets.append(wallet)
+        return trader_id
+
+    def wallet(self, trader_id: int) -> str:
+        return self.wallets[trader_id]
+
+
+class TradeBuffer:
+    """
+    Buffer de trades colonnaire pour UN token
+
+    Colonnes: time, mc, amount_sol, amount_usd, token_amount (float64),
+    flags (uint8, bit 0 = buy, bit 1 = baleine connue), trader_id (uint32,
+    propre au buffer: à ne pas comparer entre deux tokens)
+
+    L'itération et l'indexation renvoient des dicts identiques à l'ancien
+    format ({'type', 'trader', 'mc', 'time', ...}) pour le code existant;
+    columns() renvoie des tableaux NumPy pour les calculs vectorisés.
+    """
+
+    __slots__ = ('time', 'mc', 'amount_sol', 'amount_usd', 'token_amount',
+                 'flags', 'trader_id', 'interner')
+
+    def __init__(self, interner: TraderInterner = None):
+        self.interner = interner or TraderInterner()
+        self.time = array('d')
+        self.mc = array('d')
+        self.amount_sol = array('d')
+        self.amount_usd = array('d')
+        self.token_amount = array('d')
+        self.flags = array('B')
+        self.trader_id = array('I')
+
+    def append(self, tx_type: str, trader: str, mc: float, trade_time: float,
+               amount_sol: float = 0, amount_usd: float = 0, token_amount: float = 0,
+               is_whale: bool = False):
+        """Ajoute un trade (appelé depuis handle_trade)"""
+        flags = FLAG_BUY if tx_type == 'buy' else 0
+        if is_whale:
+            flags |= FLAG_WHALE
+
+        self.time.append(trade_time)
+        self.mc.append(mc or 0)
+        self.amount_sol.append(amount_sol or 0)
+        self.amount_usd.append(amount_usd or 0)
+        self.token_amount.append(token_amount or 0)
+        self.flags.append(flags)
+        self.trader_id.append(self.interner.intern(trader or 'unknown'))
+
+    def __len__(self):
+        return len(self.time)
+
+    def __bool__(self):
+        return len(self.time) > 0
+
+    def row(self, i: int) -> dict:
+        """Trade i au format dict historique"""
+        flags = self.flags[i]
+        return {
+            'type': 'buy' if flags & FLAG_BUY else 'sell',
+            'trader': self.interner.wallet(self.trader_id[i]),
+            'mc': self.mc[i],
+            'time': self.time[i],
+            'amount_sol': self.amount_sol[i],
+            'amount_usd': self.amount_usd[i],
+            'token_amount': self.token_amount[i],
+            'is_whale': bool(flags & FLAG_WHALE)
+        }
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('trade index out of range')
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def last_mc(self, default: float = 0) -> float:
+        """MC du dernier trade sans matérialiser de dict"""
+        return self.mc[-1] if self.mc else default
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Colonnes en tableaux NumPy pour les réductions vectorisées
+
+        Copie contiguë (memcpy) plutôt qu'une vue: une vue garderait le
+        buffer exporté et ferait échouer le prochain append() du websocket.
+        """
+        flags = np.array(self.flags, dtype=np.uint8)
+        return {
+            'time': np.array(self.time, dtype=np.float64),
+            'mc': np.array(self.mc, dtype=np.float64),
+            'amount_sol': np.array(self.amount_sol, dtype=np.float64),
+            'amount_usd': np.array(self.amount_usd, dtype=np.float64),
+            'token_amount': np.array(self.token_amount, dtype=np.float64),
+            'is_buy': (flags & FLAG_BUY).astype(bool),
+            'is_whale': (flags & FLAG_WHALE).astype(bool),
+            'trader_id': np.array(self.trader_id, dtype=np.int64)
+        }
+
+    def nbytes(self) -> int:
+        """Mémoire utilisée par les colonnes (hors table des traders du token)"""
+        return sum(col.itemsize * len(col) for col in (
+            self.time, self.mc, self.amount_sol, self.amount_usd,
+            self.token_amount, self.flags, self.trader_id))
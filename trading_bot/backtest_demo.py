@@ -1,10 +1,10 @@
 import json
 import sys
 sys.path.append('..')
+from bot_data_journal import load_bot_data
 
 # Charger les données historiques
-with open('../bot_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_bot_data('../bot_data.json')
 
 from config import ENTRY_FILTERS, TARGETS, SELL_PERCENTAGES
 
@@ -278,7 +278,7 @@ def get_system_stats():
     from shared_websocket_feed import get_shared_feed
 
     feed = get_shared_feed()
-    engine = get_engine()
+    engine = get_ai_engine()
 
     return {
         'active_bots': len(active_bots),
@@ -18,6 +18,8 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 import xgboost as xgb
 import lightgbm as lgb
 
+from model_registry import publish_model
+
 console = Console()
 
 # Configuration
@@ -270,6 +272,15 @@ with open(metrics_file, 'w') as f:
     json.dump(metrics, f, indent=2)
 console.print(f"[green]OK -Métriques: {metrics_file}")
 
+# Nouvelle version dans le registre: les process en cours basculent à chaud
+version = publish_model('roi', {
+    'model': best_model,
+    'scaler': scaler,
+    'feature_names': feature_cols
+}, {'model_type': best_model_name, 'accuracy': best_accuracy, 'n_samples_train': len(X_train_balanced)},
+    models_dir=models_dir)
+console.print(f"[green]OK -Registre: roi v{version}")
+
 console.print("\n[bold cyan]COMPARAISON:")
 console.print("[cyan]Modèle              | Test Accuracy")
 console.print("[cyan]" + "-" * 40)
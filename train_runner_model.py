@@ -22,8 +22,16 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
 import warnings
+
+from bot_data_journal import open_completed
+from model_registry import publish_model
+from runner_features import check_parity, extract_labels, get_feature_spec
+
 warnings.filterwarnings('ignore')
 
+FEATURE_CHUNK = 5000  # Tokens transformes par bloc
+PARITY_SAMPLE = 200  # Tokens verifies contre le chemin d'inference
+
 print("="*80)
 print("TRAIN RUNNER MODEL - IA de detection des RUNNERS")
 print("="*80)
@@ -32,23 +40,19 @@ print("="*80)
 
 
 def load_bot_data(filepath='bot_data.json'):
-    """Charge les donnees du bot de collecte"""
+    """Charge les donnees du bot de collecte (lecteur en flux du journal, compteurs via l'index)"""
     print(f"\n[1/6] CHARGEMENT DES DONNEES")
     print("-"*50)
 
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        completed = data.get('completed', [])
-        runners = data.get('runners', [])
-        flops = data.get('flops', [])
+        completed = open_completed(filepath)
 
+        print(f"  Source: {completed.source}")
         print(f"  Tokens completed: {len(completed)}")
-        print(f"  Runners: {len(runners)}")
-        print(f"  Flops: {len(flops)}")
+        print(f"  Runners: {completed.runners_count}")
+        print(f"  Flops: {completed.flops_count}")
 
-        # Utiliser completed qui contient tout
+        # Utiliser completed qui contient tout (iteré record par record)
         return completed
 
     except FileNotFoundError:
@@ -57,203 +61,49 @@ def load_bot_data(filepath='bot_data.json'):
         return []
 
 
-def extract_features(tokens):
-    """Extrait les features de chaque token pour le ML"""
+def extract_features(tokens, chunk_size=FEATURE_CHUNK):
+    """Extrait les features de chaque token pour le ML (spec vectorisee partagee avec predict_runner)"""
     print(f"\n[2/6] EXTRACTION DES FEATURES")
     print("-"*50)
 
-    features_list = []
-
+    spec = get_feature_spec()
+    blocks = []
+    label_blocks = []
+    sample = []
+    skipped = 0
+
+    def flush(chunk):
+        nonlocal skipped
+        X, kept = spec.transform(chunk, skip_invalid=True)
+        skipped += len(chunk) - len(kept)
+        if len(sample) < PARITY_SAMPLE:
+            sample.extend(kept[:PARITY_SAMPLE - len(sample)])
+        blocks.append(X)
+        label_blocks.append(extract_labels(kept))
+
+    # Tokens lus en flux, transformes par blocs (memoire bornee)
+    chunk = []
     for token in tokens:
-        try:
-            features = {}
-
-            # === LABEL ===
-            features['is_runner'] = 1 if token.get('is_runner', False) else 0
-            features['final_mc'] = token.get('final_mc', 0)
-            features['migration_detected'] = 1 if token.get('migration_detected', False) else 0
-
-            # === SNAPSHOTS FEATURES ===
-            # 3s snapshot
-            snap_3s = token.get('3s', {}) or {}
-            features['3s_txn'] = snap_3s.get('txn', 0)
-            features['3s_buy_ratio'] = snap_3s.get('buy_ratio', 0)
-            features['3s_traders'] = snap_3s.get('traders', 0)
-            features['3s_mc'] = snap_3s.get('mc', 0)
-
-            # 5s snapshot
-            snap_5s = token.get('5s', {}) or {}
-            features['5s_txn'] = snap_5s.get('txn', 0)
-            features['5s_buy_ratio'] = snap_5s.get('buy_ratio', 0)
-            features['5s_traders'] = snap_5s.get('traders', 0)
-            features['5s_mc'] = snap_5s.get('mc', 0)
-
-            # 7s snapshot
-            snap_7s = token.get('7s', {}) or {}
-            features['7s_txn'] = snap_7s.get('txn', 0)
-            features['7s_buy_ratio'] = snap_7s.get('buy_ratio', 0)
-            features['7s_traders'] = snap_7s.get('traders', 0)
-            features['7s_mc'] = snap_7s.get('mc', 0)
-
-            # 10s snapshot (CRUCIAL pour early detection)
-            snap_10s = token.get('10s', {}) or {}
-            features['10s_txn'] = snap_10s.get('txn', 0)
-            features['10s_buys'] = snap_10s.get('buys', 0)
-            features['10s_sells'] = snap_10s.get('sells', 0)
-            features['10s_buy_ratio'] = snap_10s.get('buy_ratio', 0)
-            features['10s_traders'] = snap_10s.get('traders', 0)
-            features['10s_mc'] = snap_10s.get('mc', 0)
-            features['10s_big_buys_100'] = snap_10s.get('big_buys_100', 0)
-            features['10s_big_buys_500'] = snap_10s.get('big_buys_500', 0)
-            features['10s_total_buy_volume'] = snap_10s.get('total_buy_volume', 0)
-            features['10s_smart_money'] = snap_10s.get('smart_money_count', 0)
-            features['10s_whale_count'] = snap_10s.get('whale_count', 0)
-
-            # 15s snapshot
-            snap_15s = token.get('15s', {}) or {}
-            features['15s_txn'] = snap_15s.get('txn', 0)
-            features['15s_buys'] = snap_15s.get('buys', 0)
-            features['15s_sells'] = snap_15s.get('sells', 0)
-            features['15s_buy_ratio'] = snap_15s.get('buy_ratio', 0)
-            features['15s_traders'] = snap_15s.get('traders', 0)
-            features['15s_mc'] = snap_15s.get('mc', 0)
-            features['15s_big_buys_100'] = snap_15s.get('big_buys_100', 0)
-            features['15s_big_buys_500'] = snap_15s.get('big_buys_500', 0)
-            features['15s_total_buy_volume'] = snap_15s.get('total_buy_volume', 0)
-            features['15s_smart_money'] = snap_15s.get('smart_money_count', 0)
-            features['15s_whale_count'] = snap_15s.get('whale_count', 0)
-
-            # 30s snapshot
-            snap_30s = token.get('30s', {}) or {}
-            features['30s_txn'] = snap_30s.get('txn', 0)
-            features['30s_buy_ratio'] = snap_30s.get('buy_ratio', 0)
-            features['30s_traders'] = snap_30s.get('traders', 0)
-            features['30s_mc'] = snap_30s.get('mc', 0)
-            features['30s_big_buys_100'] = snap_30s.get('big_buys_100', 0)
-            features['30s_big_buys_500'] = snap_30s.get('big_buys_500', 0)
-            features['30s_whale_count'] = snap_30s.get('whale_count', 0)
-
-            # 1min snapshot
-            snap_1min = token.get('1min', {}) or {}
-            features['1min_txn'] = snap_1min.get('txn', 0)
-            features['1min_buy_ratio'] = snap_1min.get('buy_ratio', 0)
-            features['1min_traders'] = snap_1min.get('traders', 0)
-            features['1min_mc'] = snap_1min.get('mc', 0)
-            features['1min_big_buys_500'] = snap_1min.get('big_buys_500', 0)
-
-            # 5min snapshot
-            snap_5min = token.get('5min', {}) or {}
-            features['5min_txn'] = snap_5min.get('txn', 0)
-            features['5min_buy_ratio'] = snap_5min.get('buy_ratio', 0)
-            features['5min_traders'] = snap_5min.get('traders', 0)
-            features['5min_mc'] = snap_5min.get('mc', 0)
-
-            # 10min snapshot
-            snap_10min = token.get('10min', {}) or {}
-            features['10min_txn'] = snap_10min.get('txn', 0)
-            features['10min_buy_ratio'] = snap_10min.get('buy_ratio', 0)
-            features['10min_mc'] = snap_10min.get('mc', 0)
-
-            # === VELOCITY & MOMENTUM ===
-            # MC growth rates
-            if features['10s_mc'] > 0:
-                features['mc_growth_10s_to_30s'] = (features['30s_mc'] - features['10s_mc']) / features['10s_mc']
-                features['mc_growth_10s_to_1min'] = (features['1min_mc'] - features['10s_mc']) / features['10s_mc']
-            else:
-                features['mc_growth_10s_to_30s'] = 0
-                features['mc_growth_10s_to_1min'] = 0
-
-            if features['30s_mc'] > 0:
-                features['mc_growth_30s_to_5min'] = (features['5min_mc'] - features['30s_mc']) / features['30s_mc']
-            else:
-                features['mc_growth_30s_to_5min'] = 0
-
-            # Transaction velocity
-            features['txn_velocity_10s'] = features['10s_txn'] / 10 if features['10s_txn'] else 0
-            features['txn_velocity_30s'] = features['30s_txn'] / 30 if features['30s_txn'] else 0
-            features['txn_velocity_1min'] = features['1min_txn'] / 60 if features['1min_txn'] else 0
-
-            # Trader growth
-            if features['10s_traders'] > 0:
-                features['trader_growth_10s_to_30s'] = features['30s_traders'] / features['10s_traders']
-                features['trader_growth_10s_to_1min'] = features['1min_traders'] / features['10s_traders']
-            else:
-                features['trader_growth_10s_to_30s'] = 0
-                features['trader_growth_10s_to_1min'] = 0
-
-            # === WHALE METRICS ===
-            features['whale_count'] = token.get('whale_count', 0)
-            features['whale_total_volume'] = token.get('whale_total_volume_usd', 0)
-
-            # Whale wallets
-            whale_wallets = token.get('whale_wallets_detected', [])
-            features['num_whale_wallets'] = len(whale_wallets) if whale_wallets else 0
-
-            # === ML METRICS (si disponible) ===
-            ml_metrics = token.get('ml_metrics', {}) or {}
-
-            features['peak_velocity'] = ml_metrics.get('peak_velocity', 0)
-            features['avg_velocity'] = ml_metrics.get('avg_velocity', 0)
-            features['acceleration'] = ml_metrics.get('acceleration', 0)
-            features['gain_percent_from_start'] = ml_metrics.get('gain_percent_from_start', 0)
-
-            features['time_to_10k'] = ml_metrics.get('time_to_10k', 9999)
-            features['time_to_20k'] = ml_metrics.get('time_to_20k', 9999)
-            features['time_to_40k'] = ml_metrics.get('time_to_40k', 9999)
-            features['time_to_69k'] = ml_metrics.get('time_to_69k', 9999)
-
-            features['ath_mc'] = ml_metrics.get('ath_mc', 0)
-            features['ath_time'] = ml_metrics.get('ath_time', 9999)
-            features['max_drawdown'] = ml_metrics.get('max_drawdown_percent', 0)
-            features['volatility'] = ml_metrics.get('volatility', 0)
-            features['num_pumps'] = ml_metrics.get('num_pumps', 0)
-            features['num_dumps'] = ml_metrics.get('num_dumps', 0)
-
-            features['whale_entry_before_10k'] = ml_metrics.get('whale_entry_before_10k', 0)
-            features['whale_entry_10k_to_20k'] = ml_metrics.get('whale_entry_10k_to_20k', 0)
-            features['whale_exit_count'] = ml_metrics.get('whale_exit_count', 0)
-
-            features['avg_hold_time'] = ml_metrics.get('avg_hold_time', 0)
-            features['paper_hands_count'] = ml_metrics.get('paper_hands_count', 0)
-            features['diamond_hands_count'] = ml_metrics.get('diamond_hands_count', 0)
-            features['holder_ratio'] = ml_metrics.get('holder_ratio', 0)
-
-            # === SUPPLY DISTRIBUTION ===
-            supply = token.get('supply_distribution', {}) or {}
-            features['total_holders'] = supply.get('total_holders', 0)
-            features['top_3_percent'] = supply.get('top_3_percent', 0)
-            features['top_10_percent'] = supply.get('top_10_percent', 0)
-
-            # === COMPUTED FEATURES ===
-            # Early signal score (combine des metriques early)
-            features['early_signal_score'] = (
-                features['10s_buy_ratio'] * 30 +
-                min(features['10s_txn'], 100) * 0.3 +
-                features['10s_big_buys_100'] * 5 +
-                features['10s_whale_count'] * 10
-            )
-
-            # Momentum score
-            features['momentum_score'] = (
-                features['15s_buy_ratio'] * 20 +
-                features['mc_growth_10s_to_30s'] * 50 +
-                features['txn_velocity_30s'] * 10
-            )
-
-            # Whale confidence
-            features['whale_confidence'] = (
-                features['num_whale_wallets'] * 20 +
-                features['whale_entry_before_10k'] * 15 +
-                min(features['whale_total_volume'] / 1000, 50)
-            )
-
-            features_list.append(features)
-
-        except Exception as e:
-            print(f"  [WARNING] Erreur extraction pour un token: {e}")
-            continue
-
-    df = pd.DataFrame(features_list)
+        if isinstance(token, dict):
+            chunk.append(token)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk or not blocks:
+        flush(chunk)
+
+    if skipped:
+        print(f"  [WARNING] {skipped} tokens ignores (valeurs non numeriques)")
+
+    # Garde-fou: l'inference (predict_runner, ligne par ligne) doit voir exactement ces features
+    if not check_parity(sample, spec):
+        raise RuntimeError("Features entrainement/inference divergentes")
+
+    # === LABELS === puis features dans l'ordre de la spec
+    df = pd.DataFrame(np.vstack(blocks), columns=spec.names)
+    df.insert(0, 'is_runner', np.concatenate([labels['is_runner'] for labels in label_blocks]).astype(int))
+    df.insert(1, 'final_mc', np.concatenate([labels['final_mc'] for labels in label_blocks]))
+    df.insert(2, 'migration_detected', np.concatenate([labels['migration_detected'] for labels in label_blocks]).astype(int))
     print(f"  Features extraites: {len(df)} tokens, {len(df.columns)} features")
 
     return df
@@ -273,15 +123,7 @@ def prepare_training_data(df):
     y_price = df['final_mc'].copy()
     y_migration = df['migration_detected'].copy()
 
-    # Remplacer NaN et inf
-    X = X.replace([np.inf, -np.inf], 0)
-    X = X.fillna(0)
-
-    # Remplacer les valeurs None/9999 pour time_to_*
-    time_cols = [col for col in X.columns if col.startswith('time_to_')]
-    for col in time_cols:
-        X[col] = X[col].replace(9999, 1800)  # 30 min max
-        X[col] = X[col].fillna(1800)
+    # NaN/inf -> 0 et time_to_* 9999 -> 1800 sont faits par la spec (identique a l'inference)
 
     print(f"  Features: {len(feature_cols)}")
     print(f"  Runners: {y_runner.sum()} ({y_runner.sum()/len(y_runner)*100:.1f}%)")
@@ -500,11 +342,24 @@ def save_models(classifier, clf_scaler, regressor, reg_scaler, migration_model,
     # Sauvegarder les importances
     clf_importances.to_csv(models_dir / 'feature_importances.csv', index=False)
 
+    # Nouvelle version du registre (RunnerPredictor / app.py la chargent a chaud)
+    version = publish_model('runner', {
+        'classifier': classifier,
+        'classifier_scaler': clf_scaler,
+        'regressor': regressor,
+        'regressor_scaler': reg_scaler,
+        'migration': migration_model,
+        'migration_scaler': mig_scaler,
+        'feature_names': list(feature_cols),
+        'migration_feature_names': list(early_features)
+    }, {'trained_at': timestamp}, models_dir=models_dir)
+
     print(f"  Modeles sauvegardes dans: {models_dir}/")
     print(f"  - runner_classifier_latest.pkl")
     print(f"  - price_regressor_latest.pkl")
     print(f"  - migration_classifier_latest.pkl")
     print(f"  - feature_importances.csv")
+    print(f"  - runner/{version}/ (registre)")
 
 
 def main():
@@ -0,0 +1,534 @@
+"""
+WALK-FORWARD - Évaluation parallèle des modèles runner sur des folds temporels
+train_runner_model.py / train_models.py / optimize_hyperparameters.py évaluent
+sur un split aléatoire (le futur fuit dans l'entraînement) et les trials Optuna
+tournent un par un. Ici:
+- tokens triés par date de création, découpés en folds walk-forward (fenêtre
+  d'entraînement croissante, test = bloc suivant, gap optionnel entre les deux)
+- features calculées une seule fois (FeatureSpec partagée) et mises en cache
+  sur disque en .npy: les workers les ouvrent en mmap, aucun recalcul ni copie
+- candidats XGBoost, LightGBM, CatBoost (si installés) et RandomForest
+- chaque (trial, fold) est une tâche d'un pool de process (1 thread par modèle),
+  les trials de tous les modèles s'entrelacent pour garder le pool plein
+- tirage aléatoire des hyperparamètres, ou Optuna (TPE) si installé
+- leaderboard: moyenne sur les folds + temps de calcul par trial
+Usage:
+    python walk_forward.py                                   # tous les modèles, 20 trials chacun
+    python walk_forward.py --models xgboost,lightgbm --trials 100 --folds 6 --workers 8
+    python walk_forward.py --search optuna --metric f1 --json leaderboard.json
+"""
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import Dict, List
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+from bot_data_journal import journal_paths, open_completed
+from runner_features import extract_labels, get_feature_spec
+
+try:
+    import xgboost as xgb
+except ImportError:
+    xgb = None
+
+try:
+    import lightgbm as lgb
+except ImportError:
+    lgb = None
+
+try:
+    from catboost import CatBoostClassifier
+except ImportError:
+    CatBoostClassifier = None
+
+try:
+    import optuna
+except ImportError:
+    optuna = None
+
+CACHE_DIR = os.path.join('models', 'walk_forward_cache')
+FEATURE_CHUNK = 5000  # Tokens transformes par bloc
+DEFAULT_FOLDS = 5
+DEFAULT_TRIALS = 20
+RANDOM_STATE = 42
+METRICS = ('auc', 'precision', 'recall', 'f1', 'accuracy')
+
+# Espaces de recherche (ceux d'optimize_hyperparameters.py + RandomForest)
+# nom -> (type, min, max[, log])
+SEARCH_SPACES = {
+    'xgboost': {
+        'n_estimators': ('int', 100, 500),
+        'max_depth': ('int', 3, 15),
+        'learning_rate': ('float', 0.01, 0.3, True),
+        'subsample': ('float', 0.6, 1.0),
+        'colsample_bytree': ('float', 0.6, 1.0),
+        'gamma': ('float', 0.0, 1.0),
+        'reg_alpha': ('float', 0.0, 2.0),
+        'reg_lambda': ('float', 0.0, 2.0),
+    },
+    'lightgbm': {
+        'n_estimators': ('int', 100, 500),
+        'max_depth': ('int', 3, 15),
+        'learning_rate': ('float', 0.01, 0.3, True),
+        'num_leaves': ('int', 15, 127),
+        'subsample': ('float', 0.6, 1.0),
+        'colsample_bytree': ('float', 0.6, 1.0),
+        'reg_alpha': ('float', 0.0, 2.0),
+        'reg_lambda': ('float', 0.0, 2.0),
+    },
+    'catboost': {
+        'iterations': ('int', 100, 500),
+        'depth': ('int', 3, 12),
+        'learning_rate': ('float', 0.01, 0.3, True),
+        'l2_leaf_reg': ('float', 1.0, 10.0),
+    },
+    'random_forest': {
+        'n_estimators': ('int', 100, 400),
+        'max_depth': ('int', 4, 20),
+        'min_samples_split': ('int', 2, 20),
+        'min_samples_leaf': ('int', 1, 10),
+        'max_features': ('float', 0.2, 1.0),
+    },
+}
+
+
+def available_models() -> List[str]:
+    """Candidats dont la librairie est installée"""
+    installed = {'xgboost': xgb, 'lightgbm': lgb, 'catboost': CatBoostClassifier, 'random_forest': True}
+    return [name for name in SEARCH_SPACES if installed[name] is not None]
+
+
+# ----------------------------------------------------------------------
+# Folds et cache disque
+# ----------------------------------------------------------------------
+def make_folds(n: int, n_folds: int, gap: int = 0) -> List[tuple]:
+    """
+    Folds walk-forward sur n lignes triées dans le temps
+
+    Returns:
+        [(train_end, test_start, test_end)]: train = [0, train_end), test = [test_start, test_end)
+    """
+    block = n // (n_folds + 1)
+    if block < 1:
+        raise ValueError(f"{n} tokens pour {n_folds} folds")
+    folds = []
+    for k in range(n_folds):
+        test_start = (k + 1) * block
+        test_end = n if k == n_folds - 1 else test_start + block
+        train_end = test_start - gap
+        if train_end <= 0:
+            raise ValueError(f"gap {gap} >= bloc d'entrainement ({block} tokens)")
+        folds.append((train_end, test_start, test_end))
+    return folds
+
+
+def _cache_key(data_file: str, n_folds: int, gap: int, names: List[str]) -> str:
+    """Clé du cache: source (taille + mtime), découpage et liste des features"""
+    source = journal_paths(data_file)['journal']
+    if not os.path.exists(source):
+        source = data_file
+    stat = os.stat(source)
+    raw = json.dumps([os.path.abspath(source), stat.st_size, stat.st_mtime_ns, n_folds, gap, names])
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def _save_array(path: str, array: np.ndarray):
+    """np.save atomique (un worker ne lit jamais un fichier à moitié écrit)"""
+    tmp = path + '.tmp.npy'
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def build_fold_cache(data_file: str = 'bot_data.json', n_folds: int = DEFAULT_FOLDS, gap: int = 0,
+                     cache_dir: str = CACHE_DIR) -> str:
+    """
+    Matrices de features triées dans le temps + bornes des folds, sur disque
+
+    Réutilisé tel quel tant que le journal (ou bot_data.json) n'a pas changé
+
+    Returns:
+        Dossier du cache (X.npy, y.npy, ts.npy, folds.json)
+    """
+    spec = get_feature_spec()
+    path = os.path.join(cache_dir, _cache_key(data_file, n_folds, gap, spec.names))
+    meta_file = os.path.join(path, 'folds.json')
+    if os.path.exists(meta_file):
+        print(f"[WALK-FORWARD] Cache: {path}")
+        return path
+
+    start_time = time.time()
+    reader = open_completed(data_file)
+    blocks, labels, stamps = [], [], []
+    chunk: List[dict] = []
+    chunk_ts: Dict[int, float] = {}
+
+    def flush():
+        X, kept = spec.transform(chunk, skip_invalid=True)
+        blocks.append(X.astype(np.float32))
+        labels.append(extract_labels(kept)['is_runner'])
+        stamps.append(np.array([chunk_ts[id(record)] for record in kept], dtype=np.float64))
+        chunk.clear()
+        chunk_ts.clear()
+
+    for entry, record in reader.iter_indexed():
+        ts = record.get('created_at') or entry.get('ts')
+        chunk_ts[id(record)] = float(ts) if ts is not None else math.nan
+        chunk.append(record)
+        if len(chunk) >= FEATURE_CHUNK:
+            flush()
+    if chunk:
+        flush()
+
+    X = np.concatenate(blocks) if blocks else np.zeros((0, spec.n_features), dtype=np.float32)
+    y = np.concatenate(labels).astype(np.int8) if labels else np.zeros(0, dtype=np.int8)
+    ts = np.concatenate(stamps) if stamps else np.zeros(0)
+
+    # Ordre chronologique; sans date partout, l'ordre du journal (ordre de complétion)
+    if len(ts) and not np.isnan(ts).any():
+        order = np.argsort(ts, kind='stable')
+        X, y, ts = X[order], y[order], ts[order]
+
+    folds = make_folds(len(y), n_folds, gap)
+
+    os.makedirs(path, exist_ok=True)
+    _save_array(os.path.join(path, 'X.npy'), np.ascontiguousarray(X))
+    _save_array(os.path.join(path, 'y.npy'), y)
+    _save_array(os.path.join(path, 'ts.npy'), ts)
+    meta = {
+        'data_file': data_file,
+        'samples': int(len(y)),
+        'runners': int(y.sum()),
+        'feature_names': list(spec.names),
+        'gap': gap,
+        'folds': [list(fold) for fold in folds],
+        'created': time.time()
+    }
+    tmp = meta_file + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, meta_file)
+
+    print(f"[WALK-FORWARD] {len(y)} tokens ({int(y.sum())} runners), {X.shape[1]} features, "
+          f"{n_folds} folds -> {path} ({time.time() - start_time:.1f}s)")
+    return path
+
+
+def read_fold_meta(cache: str) -> dict:
+    with open(os.path.join(cache, 'folds.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------
+# Côté worker
+# ----------------------------------------------------------------------
+_arrays: Dict[str, tuple] = {}  # cache -> (X, y, folds), ouvert une fois par process
+
+
+def _open_cache(cache: str) -> tuple:
+    if cache not in _arrays:
+        _arrays[cache] = (
+            np.load(os.path.join(cache, 'X.npy'), mmap_mode='r'),
+            np.load(os.path.join(cache, 'y.npy'), mmap_mode='r'),
+            read_fold_meta(cache)['folds']
+        )
+    return _arrays[cache]
+
+
+def build_model(name: str, params: dict, pos_weight: float = 1.0):
+    """Candidat avec ses hyperparamètres (1 thread: le parallélisme vient du pool)"""
+    if name == 'xgboost':
+        return xgb.XGBClassifier(**params, tree_method='hist', eval_metric='logloss', scale_pos_weight=pos_weight,
+                                 random_state=RANDOM_STATE, n_jobs=1)
+    if name == 'lightgbm':
+        return lgb.LGBMClassifier(**params, subsample_freq=1, class_weight='balanced',
+                                  random_state=RANDOM_STATE, n_jobs=1, verbose=-1)
+    if name == 'catboost':
+        return CatBoostClassifier(**params, auto_class_weights='Balanced', random_seed=RANDOM_STATE,
+                                  thread_count=1, verbose=False)
+    if name == 'random_forest':
+        return RandomForestClassifier(**params, class_weight='balanced', random_state=RANDOM_STATE, n_jobs=1)
+    raise ValueError(f"Modele inconnu: {name}")
+
+
+def run_fold(cache: str, fold: int, name: str, params: dict) -> dict:
+    """Entraîne un candidat sur un fold et le score sur le bloc suivant"""
+    start_time, start_cpu = time.perf_counter(), time.process_time()
+    X, y, folds = _open_cache(cache)
+    train_end, test_start, test_end = folds[fold]
+    # Tranches contiguës du mmap: pas de copie avant le fit
+    X_train, y_train = X[:train_end], y[:train_end]
+    X_test, y_test = X[test_start:test_end], y[test_start:test_end]
+
+    positives = int(y_train.sum())
+    if positives == 0 or positives == len(y_train):
+        return {'fold': fold, 'skipped': 'une seule classe dans le train', 'seconds': 0.0, 'cpu_seconds': 0.0}
+
+    model = build_model(name, params, pos_weight=(len(y_train) - positives) / positives)
+    model.fit(X_train, y_train)
+    proba = model.predict_proba(X_test)[:, 1]
+    pred = (proba >= 0.5).astype(np.int8)
+
+    scores = {
+        'fold': fold,
+        'auc': float(roc_auc_score(y_test, proba)) if 0 < y_test.sum() < len(y_test) else math.nan,
+        'precision': float(precision_score(y_test, pred, zero_division=0)),
+        'recall': float(recall_score(y_test, pred, zero_division=0)),
+        'f1': float(f1_score(y_test, pred, zero_division=0)),
+        'accuracy': float(accuracy_score(y_test, pred)),
+    }
+    scores['seconds'] = time.perf_counter() - start_time
+    scores['cpu_seconds'] = time.process_time() - start_cpu
+    return scores
+
+
+# ----------------------------------------------------------------------
+# Recherche
+# ----------------------------------------------------------------------
+def sample_params(space: dict, rng: np.random.Generator) -> dict:
+    """Tirage aléatoire dans un espace SEARCH_SPACES"""
+    params = {}
+    for name, (kind, low, high, *log) in space.items():
+        if kind == 'int':
+            params[name] = int(rng.integers(low, high + 1))
+        elif log and log[0]:
+            params[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+
+def _distributions(space: dict) -> dict:
+    """Espace SEARCH_SPACES -> distributions Optuna (pour study.ask)"""
+    distributions = {}
+    for name, (kind, low, high, *log) in space.items():
+        if kind == 'int':
+            distributions[name] = optuna.distributions.IntDistribution(low, high)
+        else:
+            distributions[name] = optuna.distributions.FloatDistribution(low, high, log=bool(log and log[0]))
+    return distributions
+
+
+class WalkForwardEvaluator:
+    """
+    Trials de plusieurs modèles évalués en parallèle sur les folds d'un cache
+
+    Un trial = n_folds tâches indépendantes du pool; dès qu'un trial est complet
+    son score est rendu au sampler (Optuna) et un nouveau trial est lancé
+    """
+
+    def __init__(self, cache: str, models: List[str], trials: int = DEFAULT_TRIALS, workers: int = None,
+                 search: str = 'random', metric: str = 'auc', seed: int = RANDOM_STATE):
+        if metric not in METRICS:
+            raise ValueError(f"Metrique inconnue: {metric} ({', '.join(METRICS)})")
+        self.cache = cache
+        self.meta = read_fold_meta(cache)
+        self.n_folds = len(self.meta['folds'])
+        self.models = models
+        self.trials = trials
+        self.workers = workers or os.cpu_count() or 1
+        self.metric = metric
+        self.search = search if search == 'random' or optuna is not None else 'random'
+        self.rng = np.random.default_rng(seed)
+        self.studies = {}
+        if self.search == 'optuna':
+            optuna.logging.set_verbosity(optuna.logging.WARNING)
+            for name in models:
+                # constant_liar: les trials en cours comptent déjà (asks concurrents)
+                sampler = optuna.samplers.TPESampler(seed=seed, constant_liar=True)
+                self.studies[name] = optuna.create_study(direction='maximize', sampler=sampler)
+
+    def _ask(self, name: str):
+        space = SEARCH_SPACES[name]
+        if self.search == 'optuna':
+            trial = self.studies[name].ask(_distributions(space))
+            return trial, dict(trial.params)
+        return None, sample_params(space, self.rng)
+
+    def _finish(self, trial: dict) -> dict:
+        """Agrège les folds d'un trial en ligne de leaderboard"""
+        folds = sorted((f for f in trial['folds'] if 'skipped' not in f), key=lambda f: f['fold'])
+        row = {'model': trial['model'], 'trial': trial['number'], 'params': trial['params']}
+        for metric in METRICS:
+            values = np.array([f[metric] for f in folds], dtype=np.float64)
+            finite = values[~np.isnan(values)]
+            row[metric] = float(finite.mean()) if len(finite) else math.nan
+            if metric == self.metric:
+                row[f'{metric}_std'] = float(finite.std()) if len(finite) else math.nan
+                row['fold_scores'] = [None if math.isnan(v) else round(v, 4) for v in values.tolist()]
+        row['folds'] = len(folds)
+        # Temps CPU cumulé des folds (ce que le trial coûterait sur un coeur) et durée réelle
+        row['cpu_seconds'] = sum(f['cpu_seconds'] for f in trial['folds'])
+        row['wall_seconds'] = time.perf_counter() - trial['submitted']
+
+        if trial['optuna'] is not None:
+            score = row[self.metric]
+            state = optuna.trial.TrialState.FAIL if math.isnan(score) else optuna.trial.TrialState.COMPLETE
+            self.studies[trial['model']].tell(trial['optuna'], None if math.isnan(score) else score, state=state)
+        return row
+
+    def run(self) -> dict:
+        start_time = time.perf_counter()
+        launched = {name: 0 for name in self.models}
+        running: Dict[int, dict] = {}
+        futures = {}
+        leaderboard = []
+        errors = []
+        next_id = 0
+
+        def launch(executor):
+            nonlocal next_id
+            # Modèle le moins avancé d'abord: les candidats progressent ensemble
+            name = min((n for n in self.models if launched[n] < self.trials), key=launched.get)
+            optuna_trial, params = self._ask(name)
+            running[next_id] = {'model': name, 'number': launched[name], 'params': params, 'optuna': optuna_trial,
+                                'folds': [], 'submitted': time.perf_counter()}
+            for fold in range(self.n_folds):
+                futures[executor.submit(run_fold, self.cache, fold, name, params)] = next_id
+            launched[name] += 1
+            next_id += 1
+
+        print(f"[WALK-FORWARD] {len(self.models)} modeles x {self.trials} trials x {self.n_folds} folds "
+              f"sur {self.workers} workers ({self.search})")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context('spawn')) as executor:
+            while True:
+                # Toujours ~2 tâches par worker en file
+                while len(futures) < 2 * self.workers and any(launched[n] < self.trials for n in self.models):
+                    launch(executor)
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    trial_id = futures.pop(future)
+                    trial = running[trial_id]
+                    try:
+                        trial['folds'].append(future.result())
+                    except Exception as e:
+                        trial['error'] = f"{type(e).__name__}: {e}"
+                        trial['folds'].append({'fold': -1, 'skipped': 'erreur', 'seconds': 0.0, 'cpu_seconds': 0.0})
+                    if len(trial['folds']) < self.n_folds:
+                        continue
+
+                    del running[trial_id]
+                    if 'error' in trial:
+                        errors.append({'model': trial['model'], 'params': trial['params'], 'error': trial['error']})
+                        print(f"[WALK-FORWARD] {trial['model']} #{trial['number']} en erreur: {trial['error']}")
+                        if trial['optuna'] is not None:
+                            self.studies[trial['model']].tell(trial['optuna'], state=optuna.trial.TrialState.FAIL)
+                        continue
+                    row = self._finish(trial)
+                    leaderboard.append(row)
+                    print(f"  {row['model']:<14} #{row['trial']:<4} {self.metric}={row[self.metric]:.4f} "
+                          f"({row['cpu_seconds']:.1f}s cpu)")
+
+        leaderboard.sort(key=lambda r: -math.inf if math.isnan(r[self.metric]) else r[self.metric], reverse=True)
+        for rank, row in enumerate(leaderboard, 1):
+            row['rank'] = rank
+
+        elapsed = time.perf_counter() - start_time
+        cpu = sum(row['cpu_seconds'] for row in leaderboard)
+        return {
+            'cache': self.cache,
+            'samples': self.meta['samples'],
+            'runners': self.meta['runners'],
+            'folds': self.meta['folds'],
+            'metric': self.metric,
+            'search': self.search,
+            'workers': self.workers,
+            'elapsed_seconds': elapsed,
+            'cpu_seconds': cpu,
+            'speedup': cpu / elapsed if elapsed > 0 else 0.0,
+            'leaderboard': leaderboard,
+            'errors': errors
+        }
+
+
+def evaluate(data_file: str = 'bot_data.json', models: List[str] = None, trials: int = DEFAULT_TRIALS,
+             n_folds: int = DEFAULT_FOLDS, gap: int = 0, workers: int = None, search: str = 'random',
+             metric: str = 'auc', cache_dir: str = CACHE_DIR) -> dict:
+    """Cache des folds puis recherche parallèle sur tous les candidats demandés"""
+    installed = available_models()
+    models = models or installed
+    for name in models:
+        if name not in SEARCH_SPACES:
+            raise ValueError(f"Modele inconnu: {name} ({', '.join(SEARCH_SPACES)})")
+        if name not in installed:
+            print(f"[WALK-FORWARD] {name} non installe - ignore")
+    models = [name for name in models if name in installed]
+    if search == 'optuna' and optuna is None:
+        print("[WALK-FORWARD] optuna non installe - recherche aleatoire")
+
+    cache = build_fold_cache(data_file, n_folds=n_folds, gap=gap, cache_dir=cache_dir)
+    return WalkForwardEvaluator(cache, models, trials=trials, workers=workers, search=search, metric=metric).run()
+
+
+def print_report(results: dict, top: int = 15):
+    metric = results['metric']
+    print("\n" + "=" * 100)
+    print(f"WALK-FORWARD LEADERBOARD - {results['samples']} tokens ({results['runners']} runners), "
+          f"{len(results['folds'])} folds, tri par {metric}")
+    print("=" * 100)
+    for train_end, test_start, test_end in results['folds']:
+        print(f"  train [0, {train_end})  ->  test [{test_start}, {test_end})")
+    print("-" * 100)
+    print(f"{'#':<4}{'MODELE':<15}{'TRIAL':<7}{metric.upper():>8}{'+/-':>8}{'PREC':>8}{'RECALL':>8}{'F1':>8}"
+          f"{'CPU s':>9}{'WALL s':>9}")
+    for row in results['leaderboard'][:top]:
+        print(f"{row['rank']:<4}{row['model']:<15}{row['trial']:<7}{row[metric]:>8.4f}{row[f'{metric}_std']:>8.4f}"
+              f"{row['precision']:>8.3f}{row['recall']:>8.3f}{row['f1']:>8.3f}"
+              f"{row['cpu_seconds']:>9.1f}{row['wall_seconds']:>9.1f}")
+
+    print("-" * 100)
+    best = {}
+    for row in results['leaderboard']:
+        best.setdefault(row['model'], row)
+    for name, row in best.items():
+        print(f"  Meilleur {name}: {metric}={row[metric]:.4f} {json.dumps(row['params'])}")
+    print(f"\n  {len(results['leaderboard'])} trials en {results['elapsed_seconds']:.1f}s "
+          f"({results['cpu_seconds']:.1f}s de calcul, x{results['speedup']:.1f} sur {results['workers']} workers)")
+    if results['errors']:
+        print(f"  {len(results['errors'])} trials en erreur")
+    print("=" * 100)
+
+
+def main(argv: List[str]):
+    options = {'--data': 'bot_data.json', '--models': None, '--trials': DEFAULT_TRIALS, '--folds': DEFAULT_FOLDS,
+               '--gap': 0, '--workers': None, '--search': 'random', '--metric': 'auc', '--cache': CACHE_DIR,
+               '--json': None}
+    for name in options:
+        if name in argv:
+            options[name] = argv[argv.index(name) + 1]
+
+    try:
+        results = evaluate(
+            options['--data'],
+            models=options['--models'].split(',') if options['--models'] else None,
+            trials=int(options['--trials']),
+            n_folds=int(options['--folds']),
+            gap=int(options['--gap']),
+            workers=int(options['--workers']) if options['--workers'] else None,
+            search=options['--search'],
+            metric=options['--metric'],
+            cache_dir=options['--cache']
+        )
+    except FileNotFoundError:
+        print(f"[ERROR] {options['--data']} non trouve")
+        sys.exit(1)
+
+    print_report(results)
+    if options['--json']:
+        with open(options['--json'], 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultats: {options['--json']}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -8,12 +8,203 @@ Analyzes relationships between wallets to detect:
 - Insider network clusters
 
 This is a CRITICAL indicator of manipulation.
+
+Each wallet's recent transactions are reduced to the set of accounts it
+transacted with (its counterparties). Counterparty sets live in a persistent
+SQLite store shared by every token analysis together with the newest signature
+already read, so a wallet seen on an earlier launch is refreshed incrementally:
+only signatures newer than that one are fetched (until=) and merged, which
+catches a funding transfer made minutes before the launch. Edges come from one
+pass over the counterparty sets and networks are clustered with union-find.
 """
 
-import httpx
-from typing import Dict, List, Set, Optional
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
-from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Optional
+from http_client import get_http_client
+from token_transactions import TokenTransactions
+
+COUNTERPARTY_DB = os.environ.get('WALLET_GRAPH_DB', 'wallet_graph.db')
+COUNTERPARTY_TTL = 24 * 3600.0  # Seconds before a wallet's counterparties are rebuilt from scratch
+COUNTERPARTY_REFRESH = 30.0  # Seconds a stored set is reused before checking for newer signatures
+MEMORY_CACHE_SIZE = 20000  # Wallets kept in memory in front of SQLite
+SIGNATURE_LIMIT = 100  # getSignaturesForAddress limit per wallet
+TRANSACTIONS_PER_WALLET = 20  # Recent transactions inspected per wallet
+SQL_BATCH = 500  # Wallets per SELECT ... IN (...)
+
+
+@dataclass
+class StoredCounterparties:
+    """A wallet's counterparty set and how far its history has been read"""
+    accounts: Set[str]
+    last_signature: Optional[str]  # Newest signature inspected (until= of the next refresh)
+    fetched_at: float  # Last full fetch (ttl)
+    checked_at: float  # Last incremental refresh
+
+
+class CounterpartyStore:
+    """
+    Persistent wallet -> counterparties map, shared across tokens
+
+    SQLite (WAL) behind a small in-memory LRU. Entries whose last full fetch is
+    older than `ttl` are treated as missing so their sets are rebuilt.
+    Blocking (SQLite): call from a worker thread (asyncio.to_thread) on the bot loop.
+    """
+
+    def __init__(self, db_path: str = COUNTERPARTY_DB, ttl: float = COUNTERPARTY_TTL,
+                 memory_size: int = MEMORY_CACHE_SIZE):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, StoredCounterparties]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS wallet_counterparties (
+                wallet TEXT PRIMARY KEY,
+                counterparties TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        # Stores created before incremental refresh
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(wallet_counterparties)")}
+        if 'last_signature' not in columns:
+            self._conn.execute("ALTER TABLE wallet_counterparties ADD COLUMN last_signature TEXT")
+        if 'checked_at' not in columns:
+            self._conn.execute("ALTER TABLE wallet_counterparties ADD COLUMN checked_at REAL")
+        self._conn.commit()
+
+        # Stats
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, wallet: str, entry: StoredCounterparties):
+        self._memory[wallet] = entry
+        self._memory.move_to_end(wallet)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, wallets: Iterable[str]) -> Dict[str, StoredCounterparties]:
+        """Stored entries within `ttl` for the wallets that have one (missing wallets are omitted)"""
+        now = time.time()
+        found: Dict[str, StoredCounterparties] = {}
+        with self._lock:
+            lookup = []
+            for wallet in dict.fromkeys(wallets):
+                cached = self._memory.get(wallet)
+                if cached and now - cached.fetched_at < self.ttl:
+                    self._memory.move_to_end(wallet)
+                    found[wallet] = cached
+                    self.memory_hits += 1
+                else:
+                    lookup.append(wallet)
+
+            for i in range(0, len(lookup), SQL_BATCH):
+                batch = lookup[i:i + SQL_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT wallet, counterparties, last_signature, fetched_at, COALESCE(checked_at, fetched_at) "
+                    f"FROM wallet_counterparties WHERE wallet IN ({','.join('?' * len(batch))}) AND fetched_at > ?",
+                    (*batch, now - self.ttl)
+                ).fetchall()
+                for wallet, counterparties, last_signature, fetched_at, checked_at in rows:
+                    found[wallet] = StoredCounterparties(set(json.loads(counterparties)), last_signature,
+                                                         fetched_at, checked_at)
+                    self._remember(wallet, found[wallet])
+                    self.db_hits += 1
+
+            self.misses += len(lookup) - sum(1 for wallet in lookup if wallet in found)
+        return found
+
+    def put_many(self, entries: Dict[str, StoredCounterparties]):
+        """Store fetched or refreshed entries (one transaction)"""
+        if not entries:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO wallet_counterparties "
+                "(wallet, counterparties, last_signature, fetched_at, checked_at) VALUES (?, ?, ?, ?, ?)",
+                [(wallet, json.dumps(sorted(entry.accounts)), entry.last_signature, entry.fetched_at,
+                  entry.checked_at) for wallet, entry in entries.items()]
+            )
+            self._conn.commit()
+            for wallet, entry in entries.items():
+                self._remember(wallet, entry)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stored = self._conn.execute("SELECT COUNT(*) FROM wallet_counterparties").fetchone()[0]
+        return {
+            'wallets_stored': stored,
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DisjointSet:
+    """Union-find with path halving and union by size"""
+
+    def __init__(self, items: Iterable[str] = ()):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: str):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item: str) -> str:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: str, b: str) -> str:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def clusters(self) -> List[Set[str]]:
+        """Connected components, largest first"""
+        groups = defaultdict(set)
+        for item in self.parent:
+            groups[self.find(item)].add(item)
+        return sorted(groups.values(), key=len, reverse=True)
+
+    def largest(self) -> int:
+        """Size of the largest component"""
+        return max((self.size[item] for item in self.parent if self.parent[item] == item), default=0)
+
+
+@dataclass
+class ConnectionGraph:
+    """Adjacency of connected wallets + their union-find clusters"""
+    adjacency: Dict[str, Set[str]]  # Only wallets with at least one connection
+    clusters: DisjointSet
+
+    def __bool__(self):
+        return bool(self.adjacency)
 
 
 @dataclass
@@ -31,19 +222,27 @@ class WalletGraphAnalysis:
 class WalletGraphAnalyzer:
     """Analyzes wallet connections to detect insider networks"""
 
-    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com"):
+    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com", store: CounterpartyStore = None):
         self.rpc_url = rpc_url
-        self.client = httpx.Client(timeout=30.0)
+        self.client = get_http_client()  # Shared pooled client (rate-limited per RPC host)
+        self.timeout = 30.0
+        self.store = store or get_counterparty_store()
+
+        # Stats
+        self.wallets_fetched = 0
+        self.wallets_refreshed = 0
+        self.rpc_calls = 0
 
         # Detection thresholds
         self.MIN_SOL_TRANSFER = 0.01  # Minimum SOL transfer to consider
         self.INSIDER_NETWORK_THRESHOLD = 3  # 3+ connected wallets = insider network
         self.HIGH_CONNECTION_SCORE = 70  # Score threshold for high suspicion
 
-    def analyze_wallet_connections(
+    async def analyze_wallet_connections(
         self,
         token_mint: str,
-        early_wallets: Optional[List[str]] = None
+        early_wallets: Optional[List[str]] = None,
+        transactions: Optional[TokenTransactions] = None
     ) -> WalletGraphAnalysis:
         """
         Analyze connections between early buyer wallets
@@ -51,6 +250,7 @@ class WalletGraphAnalyzer:
         Args:
             token_mint: Token mint address
             early_wallets: List of early buyer wallet addresses (top 20-50)
+            transactions: Shared per-token RPC fetches (created if not provided)
 
         Returns:
             WalletGraphAnalysis with connection details
@@ -58,13 +258,14 @@ class WalletGraphAnalyzer:
         try:
             # If no wallets provided, get early buyers
             if not early_wallets:
-                early_wallets = self._get_early_buyers(token_mint, limit=50)
+                source = transactions or TokenTransactions(token_mint, self.rpc_url)
+                early_wallets = await self._get_early_buyers(source, limit=50)
 
             if not early_wallets or len(early_wallets) < 2:
                 return self._default_analysis()
 
             # Build connection graph
-            connections = self._build_connection_graph(early_wallets)
+            connections = await self._build_connection_graph(early_wallets)
 
             # Analyze graph characteristics
             analysis = self._analyze_graph(connections, early_wallets)
@@ -75,30 +276,19 @@ class WalletGraphAnalyzer:
             print(f"Error analyzing wallet connections: {e}")
             return self._default_analysis()
 
-    def _get_early_buyers(self, token_mint: str, limit: int = 50) -> List[str]:
+    async def _get_early_buyers(self, source: TokenTransactions, limit: int = 50) -> List[str]:
         """Get list of early buyers for a token"""
         try:
-            # Get token account transactions
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSignaturesForAddress",
-                "params": [token_mint, {"limit": limit}]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return []
-
-            data = response.json()
-            signatures = data.get("result", [])
+            signatures = await source.signatures(limit)
 
             # Extract unique wallets from transactions
-            wallets = set()
-            for sig_info in signatures[:30]:  # Limit to avoid rate limits
-                tx_details = self._get_transaction_details(sig_info["signature"])
+            details = await asyncio.gather(*[
+                self._get_transaction_details(source, sig_info["signature"])
+                for sig_info in signatures[:30]  # Limit to avoid rate limits
+            ])
 
+            wallets = set()
+            for tx_details in details:
                 if tx_details and tx_details.get("wallet"):
                     wallets.add(tx_details["wallet"])
 
@@ -107,26 +297,10 @@ class WalletGraphAnalyzer:
         except Exception as e:
             return []
 
-    def _get_transaction_details(self, signature: str) -> Optional[Dict]:
+    async def _get_transaction_details(self, source: TokenTransactions, signature: str) -> Optional[Dict]:
         """Get transaction details"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTransaction",
-                "params": [
-                    signature,
-                    {"encoding": "json", "maxSupportedTransactionVersion": 0}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
-            if response.status_code != 200:
-                return None
-
-            data = response.json()
-            result = data.get("result")
+            result = await source.transaction(signature)
 
             if not result:
                 return None
@@ -143,90 +317,122 @@ class WalletGraphAnalyzer:
         except:
             return None
 
-    def _build_connection_graph(self, wallets: List[str]) -> Dict[str, Set[str]]:
+    async def _build_connection_graph(self, wallets: List[str]) -> ConnectionGraph:
         """
         Build graph of connections between wallets
 
-        Returns: Dict mapping wallet -> set of connected wallets
+        Two wallets are connected when one appears in the other's recent
+        transactions. Counterparty sets come from the store (fetched once per
+        wallet), edges from a single pass over them: O(total counterparties)
+        instead of one RPC check per pair.
         """
-        graph = defaultdict(set)
-
-        # Check each pair of wallets for connections
-        for i, wallet_a in enumerate(wallets):
-            for wallet_b in wallets[i+1:]:
-                # Check if wallets are connected
-                connection_types = self._check_wallet_connection(wallet_a, wallet_b)
-
-                if connection_types:
-                    graph[wallet_a].add(wallet_b)
-                    graph[wallet_b].add(wallet_a)
-
-        return dict(graph)
-
-    def _check_wallet_connection(self, wallet_a: str, wallet_b: str) -> List[str]:
+        wallets = list(dict.fromkeys(wallets))
+        counterparties = await self._get_counterparties(wallets)
+
+        adjacency = defaultdict(set)
+        clusters = DisjointSet()
+        members = set(wallets)
+        for wallet in wallets:
+            for other in counterparties.get(wallet, ()):
+                if other in members and other != wallet:
+                    adjacency[wallet].add(other)
+                    adjacency[other].add(wallet)
+                    clusters.add(wallet)
+                    clusters.add(other)
+                    clusters.union(wallet, other)
+
+        return ConnectionGraph(dict(adjacency), clusters)
+
+    async def _get_counterparties(self, wallets: List[str]) -> Dict[str, Set[str]]:
         """
-        Check if two wallets are connected
-
-        Returns list of connection types: ['sol_transfer', 'shared_tokens', etc.]
+        Counterparty sets from the store: unknown wallets are fetched, stored
+        ones older than COUNTERPARTY_REFRESH only read their new signatures
         """
-        connections = []
-
-        # Check for SOL transfers between wallets
-        if self._has_sol_transfer(wallet_a, wallet_b):
-            connections.append('sol_transfer')
-
-        # TODO: Add more connection checks:
-        # - Shared token holdings (same obscure tokens)
-        # - Transaction timing patterns (same second/block)
-        # - Shared NFT holdings
-
-        return connections
+        stored = await asyncio.to_thread(self.store.get_many, wallets)
+        now = time.time()
+
+        counterparties: Dict[str, Set[str]] = {}
+        stale: Dict[str, Optional[StoredCounterparties]] = {}
+        for wallet in wallets:
+            entry = stored.get(wallet)
+            if entry is not None and now - entry.checked_at < COUNTERPARTY_REFRESH:
+                counterparties[wallet] = entry.accounts
+            else:
+                stale[wallet] = entry
+
+        if stale:
+            results = await asyncio.gather(*[
+                self._fetch_counterparties(wallet, until=entry.last_signature if entry else None)
+                for wallet, entry in stale.items()
+            ])
+            updates: Dict[str, StoredCounterparties] = {}
+            for (wallet, entry), result in zip(stale.items(), results):
+                if result is None:
+                    if entry is not None:
+                        counterparties[wallet] = entry.accounts  # RPC failed: keep what is known
+                    continue
+                accounts, newest = result
+                if entry is not None and entry.last_signature:
+                    # Incremental: merge the new counterparties, resume from the newest signature next time
+                    updates[wallet] = StoredCounterparties(entry.accounts | accounts, newest or entry.last_signature,
+                                                           entry.fetched_at, now)
+                    self.wallets_refreshed += 1
+                else:
+                    updates[wallet] = StoredCounterparties(accounts, newest, now, now)
+                counterparties[wallet] = updates[wallet].accounts
+            await asyncio.to_thread(self.store.put_many, updates)
+        return counterparties
+
+    async def _fetch_counterparties(self, wallet: str, until: Optional[str] = None) -> Optional[tuple]:
+        """
+        (accounts written by the wallet's recent transactions, newest signature),
+        None if the RPC failed
 
-    def _has_sol_transfer(self, wallet_a: str, wallet_b: str) -> bool:
-        """Check if wallet_a has transferred SOL to wallet_b (or vice versa)"""
+        With `until`, only signatures newer than it are read. Read-only accounts
+        (programs, sysvars) cannot receive a transfer and are left out, which
+        keeps the stored sets small.
+        """
         try:
-            # Get recent transactions for wallet_a
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSignaturesForAddress",
-                "params": [wallet_a, {"limit": 100}]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
-
+            self.rpc_calls += 1
+            options = {"limit": SIGNATURE_LIMIT}
+            if until:
+                options["until"] = until
+            response = await self.client.rpc(
+                self.rpc_url, "getSignaturesForAddress",
+                [wallet, options],
+                timeout=self.timeout
+            )
             if response.status_code != 200:
-                return False
-
-            data = response.json()
-            signatures = data.get("result", [])
+                return None
 
-            # Check each transaction for transfers to wallet_b
-            for sig_info in signatures[:20]:  # Limit checks
-                tx_details = self._get_full_transaction(sig_info["signature"])
+            signatures = response.json().get("result") or []
+            transactions = await asyncio.gather(*[
+                self._get_full_transaction(sig_info["signature"])
+                for sig_info in signatures[:TRANSACTIONS_PER_WALLET]
+            ])
 
-                if tx_details and self._involves_both_wallets(tx_details, wallet_a, wallet_b):
-                    return True
+            accounts = set()
+            for tx_details in transactions:
+                if tx_details:
+                    accounts.update(self._writable_accounts(tx_details))
+            accounts.discard(wallet)
 
-            return False
+            if not until:
+                self.wallets_fetched += 1
+            return accounts, (signatures[0]["signature"] if signatures else None)
 
-        except:
-            return False
+        except Exception:
+            return None
 
-    def _get_full_transaction(self, signature: str) -> Optional[Dict]:
+    async def _get_full_transaction(self, signature: str) -> Optional[Dict]:
         """Get full transaction details"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTransaction",
-                "params": [
-                    signature,
-                    {"encoding": "json", "maxSupportedTransactionVersion": 0}
-                ]
-            }
-
-            response = self.client.post(self.rpc_url, json=payload)
+            self.rpc_calls += 1
+            response = await self.client.rpc(
+                self.rpc_url, "getTransaction",
+                [signature, {"encoding": "json", "maxSupportedTransactionVersion": 0}],
+                timeout=self.timeout
+            )
 
             if response.status_code != 200:
                 return None
@@ -237,29 +443,32 @@ class WalletGraphAnalyzer:
         except:
             return None
 
-    def _involves_both_wallets(self, tx_details: Dict, wallet_a: str, wallet_b: str) -> bool:
-        """Check if transaction involves both wallets"""
+    def _writable_accounts(self, tx_details: Dict) -> List[str]:
+        """Writable account keys of a transaction (all keys if the header is missing)"""
         try:
-            transaction = tx_details.get("transaction", {})
-            message = transaction.get("message", {})
+            message = tx_details.get("transaction", {}).get("message", {})
             account_keys = message.get("accountKeys", [])
+            header = message.get("header")
+            if not header:
+                return account_keys
 
-            # Check if both wallets are in the transaction
-            return wallet_a in account_keys and wallet_b in account_keys
+            signers = header.get("numRequiredSignatures", 0)
+            writable_signers = signers - header.get("numReadonlySignedAccounts", 0)
+            writable_end = len(account_keys) - header.get("numReadonlyUnsignedAccounts", 0)
+            return account_keys[:writable_signers] + account_keys[signers:writable_end]
 
         except:
-            return False
+            return []
 
-    def _analyze_graph(self, graph: Dict[str, Set[str]], all_wallets: List[str]) -> WalletGraphAnalysis:
+    def _analyze_graph(self, graph: ConnectionGraph, all_wallets: List[str]) -> WalletGraphAnalysis:
         """Analyze graph characteristics"""
 
         if not graph:
             return self._default_analysis()
 
         # Count connections
-        total_connections = sum(len(connections) for connections in graph.values()) // 2
+        total_connections = sum(len(connections) for connections in graph.adjacency.values()) // 2
         connected_pairs = total_connections
-        unique_connected_wallets = len(graph)
 
         # Find largest connected component (network)
         network_size = self._find_largest_network(graph)
@@ -294,31 +503,9 @@ class WalletGraphAnalyzer:
             connection_types=connection_types
         )
 
-    def _find_largest_network(self, graph: Dict[str, Set[str]]) -> int:
-        """Find size of largest connected component using DFS"""
-        visited = set()
-        max_network_size = 0
-
-        def dfs(node: str) -> int:
-            """Depth-first search to find connected component size"""
-            if node in visited:
-                return 0
-
-            visited.add(node)
-            size = 1
-
-            for neighbor in graph.get(node, []):
-                size += dfs(neighbor)
-
-            return size
-
-        # Find all connected components
-        for wallet in graph:
-            if wallet not in visited:
-                network_size = dfs(wallet)
-                max_network_size = max(max_network_size, network_size)
-
-        return max_network_size
+    def _find_largest_network(self, graph: ConnectionGraph) -> int:
+        """Size of the largest connected component (union-find, built with the edges)"""
+        return graph.clusters.largest()
 
     def _default_analysis(self) -> WalletGraphAnalysis:
         """Return default analysis when detection fails"""
@@ -332,9 +519,33 @@ class WalletGraphAnalyzer:
             connection_types={}
         )
 
+    def get_stats(self) -> Dict:
+        return {
+            'wallets_fetched': self.wallets_fetched,
+            'wallets_refreshed': self.wallets_refreshed,
+            'rpc_calls': self.rpc_calls,
+            'store': self.store.get_stats()
+        }
+
     def close(self):
-        """Close HTTP client"""
-        self.client.close()
+        """Nothing to close: the HTTP client and the counterparty store are shared by the whole process"""
+
+
+# Global instance
+_counterparty_store: Optional[CounterpartyStore] = None
+_store_lock = threading.Lock()
+
+
+def get_counterparty_store() -> CounterpartyStore:
+    """Process-wide counterparty store (shared by every WalletGraphAnalyzer)"""
+    global _counterparty_store
+
+    if _counterparty_store is None:
+        with _store_lock:
+            if _counterparty_store is None:
+                _counterparty_store = CounterpartyStore()
+
+    return _counterparty_store
 
 
 # Test function
@@ -345,7 +556,7 @@ if __name__ == "__main__":
     test_token = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC for testing
 
     print(f"Analyzing wallet connections for: {test_token}")
-    analysis = analyzer.analyze_wallet_connections(test_token)
+    analysis = asyncio.run(analyzer.analyze_wallet_connections(test_token))
 
     print(f"\nWallet Graph Analysis:")
     print(f"  Connected pairs: {analysis.connected_wallet_pairs}")
@@ -354,5 +565,6 @@ if __name__ == "__main__":
     print(f"  Avg connections/wallet: {analysis.avg_connections_per_wallet:.2f}")
     print(f"  Insider network detected: {analysis.has_insider_network}")
     print(f"  Connection score: {analysis.connection_score:.1f}/100")
+    print(f"  Stats: {analyzer.get_stats()}")
 
     analyzer.close()
@@ -10,6 +10,8 @@ from datetime import datetime
 import threading
 import time
 
+from bot_data_journal import load_bot_data, write_state
+
 app = Flask(__name__)
 CORS(app)
 
@@ -17,40 +19,26 @@ CORS(app)
 DATA_FILE = 'bot_data.json'
 
 def read_bot_data():
-    """Lire les données du bot"""
-    if not os.path.exists(DATA_FILE):
-        return {
-            'tokens': [],
-            'completed': [],
-            'runners': [],
-            'flops': [],
-            'alerts': [],
-            'stats': {
-                'total_tokens': 0,
-                'total_runners': 0,
-                'total_flops': 0,
-                'win_rate': 0
-            }
-        }
-
+    """Lire les données du bot (état + journal des tokens complétés)"""
     try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_bot_data(DATA_FILE)
+    except FileNotFoundError:
+        pass
     except Exception as e:
         print(f"[ERROR] Lecture bot_data.json: {e}")
-        return {
-            'tokens': [],
-            'completed': [],
-            'runners': [],
-            'flops': [],
-            'alerts': [],
-            'stats': {
-                'total_tokens': 0,
-                'total_runners': 0,
-                'total_flops': 0,
-                'win_rate': 0
-            }
+    return {
+        'tokens': [],
+        'completed': [],
+        'runners': [],
+        'flops': [],
+        'alerts': [],
+        'stats': {
+            'total_tokens': 0,
+            'total_runners': 0,
+            'total_flops': 0,
+            'win_rate': 0
         }
+    }
 
 @app.route('/')
 def index():
@@ -127,8 +115,12 @@ def mark_migration():
     if updated:
         # Sauvegarder
         try:
-            with open(DATA_FILE, 'w') as f:
-                json.dump(bot_data, f, indent=2)
+            # Seul le petit état est réécrit, le journal des tokens reste intact
+            write_state(DATA_FILE, {
+                'tokens': bot_data.get('tokens', []),
+                'alerts': bot_data.get('alerts', []),
+                'stats': bot_data.get('stats', {})
+            })
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
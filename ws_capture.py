@@ -0,0 +1,494 @@
+"""
+WS CAPTURE - Enregistrement brut des messages WebSocket PumpPortal
+Aujourd'hui seuls les snapshots dérivés sont stockés (bot_data.json, trading_bot.db):
+impossible de recalculer une nouvelle feature sur les lancements passés
+Ici chaque message reçu est gardé tel quel avec son timestamp de réception:
+- chemin live: record() = time.time() + deque.append (aucune I/O, aucun parsing)
+- un thread écrivain vide la file toutes les FLUSH_INTERVAL secondes: un bloc
+  = une frame zstd indépendante (membre gzip sans zstandard)
+- enregistrements préfixés par leur longueur: <ts double, type u8, longueur u32> + payload
+- segments tournants (SEGMENT_SECONDS / SEGMENT_BYTES) + index par segment
+  (<segment>.idx.json): frames avec offsets et bornes de temps, frames par mint
+  -> lecture d'un mint ou d'une fenêtre sans décompresser tout le segment
+- un segment sans index (crash) reste lisible séquentiellement
+Activation: WS_CAPTURE_DIR=captures (un sous-répertoire par consommateur)
+Relecture:
+    python ws_capture.py captures/live_bot                   (résumé des segments)
+    python replay_backtester.py captures/live_bot            (replay dans les bots)
+    load_trades('captures/live_bot', start=..., end=...)     (DataFrame pour datasets)
+"""
+import atexit
+import glob
+import gzip
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CAPTURE_DIR = os.environ.get('WS_CAPTURE_DIR', '')  # Vide = capture désactivée
+FLUSH_INTERVAL = 1.0  # Secondes entre deux frames
+SEGMENT_SECONDS = 3600.0  # Rotation horaire
+SEGMENT_BYTES = 256 * 1024 * 1024  # ... ou à 256 MB non compressés
+MAX_PENDING = 200000  # Messages en attente max (au-delà: comptés comme perdus)
+ZSTD_LEVEL = 3
+
+KIND_MESSAGE = 0  # Payload = message brut (UTF-8)
+KIND_SOL_PRICE = 1  # Payload = prix SOL/USD (double)
+
+RECORD_HEADER = struct.Struct('<dBI')  # ts, type, longueur du payload
+SOL_PRICE = struct.Struct('<d')
+SEGMENT_PATTERN = '*.wsc.*'
+INDEX_SUFFIX = '.idx.json'
+
+_MINT_RE = re.compile(rb'"mint"\s*:\s*"([^"]+)"')
+
+
+class WsCaptureRecorder:
+    """
+    Enregistreur d'un flux WebSocket (un par consommateur: live_bot, ai_engine...)
+
+    Thread-safe côté producteur: record() peut être appelé depuis n'importe
+    quelle boucle ou thread
+    """
+
+    def __init__(self, source: str, directory: str = None, sol_price=None):
+        self.source = source
+        self.directory = os.path.join(directory or CAPTURE_DIR or 'captures', source)
+        self.extension = '.wsc.zst' if zstandard is not None else '.wsc.gz'
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard is not None else None
+        self._sol_price = sol_price
+        self._last_sol_price = None
+
+        self._pending = deque()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._atexit = False
+
+        # Segment courant (thread écrivain uniquement)
+        self._file = None
+        self._index = None
+        self._segment_start = 0.0
+
+        # Stats
+        self.messages = 0
+        self.dropped = 0
+        self.frames = 0
+        self.segments = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    def record(self, message, ts: float = None):
+        """Chemin live: horodate et met en file (aucune I/O)"""
+        if len(self._pending) >= MAX_PENDING:
+            self.dropped += 1
+            return
+        self._pending.append((time.time() if ts is None else ts, message))
+        if self._thread is None:
+            self.start()
+
+    def start(self):
+        """Démarre le thread écrivain (idempotent)"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'ws-capture-{self.source}', daemon=True)
+            self._thread.start()
+            print(f"[CAPTURE] Messages {self.source} enregistres dans {self.directory}")
+            if not self._atexit:
+                atexit.register(self.close)
+                self._atexit = True
+
+    def close(self):
+        """Vide la file, ferme le segment et écrit son index"""
+        self._stop.set()
+        self._wakeup.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=10)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(FLUSH_INTERVAL)
+            try:
+                self._flush()
+            except Exception as e:
+                print(f"[CAPTURE] Erreur ecriture {self.source}: {e}")
+        try:
+            self._flush()
+        except Exception as e:
+            print(f"[CAPTURE] Erreur ecriture {self.source}: {e}")
+        finally:
+            # Dernier flush raté: ce qui reste en file est perdu
+            while self._pending:
+                self._pending.popleft()
+                self.dropped += 1
+            self._close_segment()
+
+    # ------------------------------------------------------------------
+    # Écriture (thread écrivain)
+    # ------------------------------------------------------------------
+    def _flush(self):
+        if not self._pending:
+            return
+
+        now = time.time()
+        if self._file is not None and (now - self._segment_start >= SEGMENT_SECONDS
+                                       or self._index['raw_bytes'] >= SEGMENT_BYTES):
+            self._close_segment()
+        if self._file is None:
+            self._open_segment(now)
+
+        # Messages retirés de la file seulement pour ce bloc: remis en tête si l'écriture échoue
+        batch = [self._pending.popleft() for _ in range(len(self._pending))]
+        block = bytearray()
+        mints = set()
+        first_ts = last_ts = None
+        records = 0
+        written = 0
+
+        # Prix SOL horodaté avec le premier message du bloc (timestamps croissants)
+        last_sol_price = self._last_sol_price
+        price = self._sol_price() if self._sol_price else None
+        if price and price != last_sol_price:
+            first_ts = batch[0][0]
+            block += RECORD_HEADER.pack(first_ts, KIND_SOL_PRICE, SOL_PRICE.size) + SOL_PRICE.pack(price)
+            records += 1
+
+        for ts, message in batch:
+            try:
+                payload = message.encode() if isinstance(message, str) else bytes(message)
+            except (TypeError, ValueError):
+                self.dropped += 1  # Message non sérialisable: ne bloque pas la file
+                continue
+            block += RECORD_HEADER.pack(ts, KIND_MESSAGE, len(payload))
+            block += payload
+            match = _MINT_RE.search(payload)
+            if match:
+                mints.add(match.group(1).decode())
+            if first_ts is None:
+                first_ts = ts
+            last_ts = ts
+            records += 1
+            written += 1
+        if last_ts is None:
+            return
+
+        offset = self._file.tell()
+        try:
+            data = self._compressor.compress(bytes(block)) if self._compressor else gzip.compress(bytes(block))
+            self._file.write(data)
+            self._file.flush()
+        except Exception:
+            # Disque plein / erreur I/O: frame partielle coupée, messages remis dans la file
+            # (réessayés au prochain flush, MAX_PENDING borne la mémoire)
+            try:
+                self._file.seek(offset)
+                self._file.truncate()
+            except OSError:
+                pass
+            self._pending.extendleft(reversed(batch))
+            raise
+        self._last_sol_price = price if price else last_sol_price
+        self.messages += written
+
+        index = self._index
+        frame = len(index['frames'])
+        index['frames'].append([first_ts, last_ts, offset, len(data), records])
+        for mint in mints:
+            index['mints'].setdefault(mint, []).append(frame)
+        index['start_ts'] = index['start_ts'] or first_ts
+        index['end_ts'] = last_ts
+        index['records'] += records
+        index['raw_bytes'] += len(block)
+        index['compressed_bytes'] += len(data)
+
+        self.frames += 1
+        self.raw_bytes += len(block)
+        self.compressed_bytes += len(data)
+
+    def _open_segment(self, now: float):
+        os.makedirs(self.directory, exist_ok=True)
+        name = datetime.fromtimestamp(now).strftime('%Y%m%d-%H%M%S-%f')[:-3] + self.extension
+        path = os.path.join(self.directory, name)
+        self._file = open(path, 'wb')
+        self._segment_start = now
+        self._last_sol_price = None  # Chaque segment repart avec le prix SOL courant
+        self._index = {
+            'segment': name,
+            'source': self.source,
+            'start_ts': None,
+            'end_ts': None,
+            'records': 0,
+            'raw_bytes': 0,
+            'compressed_bytes': 0,
+            'frames': [],  # [first_ts, last_ts, offset, longueur, records]
+            'mints': {}  # {mint: [indices de frames]}
+        }
+        self.segments += 1
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        path = self._file.name
+        self._file.close()
+        self._file = None
+
+        # Écriture atomique de l'index
+        tmp_file = path + INDEX_SUFFIX + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_file, path + INDEX_SUFFIX)
+        self._index = None
+
+    def get_stats(self):
+        return {
+            'source': self.source,
+            'directory': self.directory,
+            'messages': self.messages,
+            'pending': len(self._pending),
+            'dropped': self.dropped,
+            'frames': self.frames,
+            'segments': self.segments,
+            'raw_bytes': self.raw_bytes,
+            'compressed_bytes': self.compressed_bytes,
+            'ratio': (self.raw_bytes / self.compressed_bytes) if self.compressed_bytes else 0
+        }
+
+
+# ============================================================================
+# LECTURE
+# ============================================================================
+def segment_files(path: str) -> List[str]:
+    """Segments d'une capture (fichier, répertoire d'une source ou glob), dans l'ordre chronologique"""
+    if os.path.isdir(path):
+        pattern = os.path.join(path, SEGMENT_PATTERN)
+    else:
+        pattern = path
+    return sorted(f for f in glob.glob(pattern) if not f.endswith(INDEX_SUFFIX))
+
+
+def read_index(segment: str) -> Optional[dict]:
+    """Index d'un segment fermé (None pour le segment en cours ou après un crash)"""
+    try:
+        with open(segment + INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _decompress(segment: str, data: bytes) -> bytes:
+    if segment.endswith('.zst'):
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _read_all(segment: str) -> bytes:
+    """Tout le segment, frame par frame (une frame tronquée par un crash est ignorée)"""
+    if segment.endswith('.zst'):
+        with open(segment, 'rb') as f:
+            reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+            chunks = []
+            try:
+                while True:
+                    chunk = reader.read(1 << 20)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+            except zstandard.ZstdError:
+                pass
+            return b''.join(chunks)
+    with gzip.open(segment, 'rb') as f:
+        chunks = []
+        try:
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except (EOFError, OSError):
+            pass
+        return b''.join(chunks)
+
+
+def _parse(block: bytes) -> Iterator[Tuple[float, int, bytes]]:
+    position = 0
+    end = len(block)
+    while position + RECORD_HEADER.size <= end:
+        ts, kind, length = RECORD_HEADER.unpack_from(block, position)
+        position += RECORD_HEADER.size
+        if position + length > end:
+            return
+        yield ts, kind, block[position:position + length]
+        position += length
+
+
+def iter_segment(segment: str, start: float = None, end: float = None,
+                 mint: str = None) -> Iterator[Tuple[float, int, bytes]]:
+    """
+    (ts, type, payload) d'un segment, filtrés par fenêtre [start, end] et/ou mint
+
+    Avec l'index, seules les frames concernées sont lues et décompressées
+    """
+    if segment.endswith('.zst') and zstandard is None:
+        raise ImportError(f"zstandard requis pour lire {segment} (pip install zstandard)")
+
+    index = read_index(segment)
+    if index is None:
+        blocks = [_read_all(segment)]
+    else:
+        frames = range(len(index['frames']))
+        if mint is not None:
+            frames = index['mints'].get(mint, [])
+        blocks = []
+        with open(segment, 'rb') as f:
+            for frame in frames:
+                first_ts, last_ts, offset, length, _ = index['frames'][frame]
+                if (start is not None and last_ts < start) or (end is not None and first_ts > end):
+                    continue
+                f.seek(offset)
+                blocks.append(_decompress(segment, f.read(length)))
+
+    mint_key = mint.encode() if mint is not None else None
+    for block in blocks:
+        for ts, kind, payload in _parse(block):
+            if (start is not None and ts < start) or (end is not None and ts > end):
+                continue
+            if mint_key is not None and kind == KIND_MESSAGE:
+                match = _MINT_RE.search(payload)
+                if match is None or match.group(1) != mint_key:
+                    continue
+            yield ts, kind, payload
+
+
+def iter_records(path: str, start: float = None, end: float = None, mint: str = None) -> Iterator[Tuple[float, dict]]:
+    """
+    (ts, record) de toute une capture, au format de replay_backtester.iter_capture:
+    {'msg': message brut} ou {'sol_price': prix}
+    """
+    for segment in segment_files(path):
+        index = read_index(segment)
+        if index is not None and index['end_ts'] is not None:
+            if (start is not None and index['end_ts'] < start) or (end is not None and index['start_ts'] > end):
+                continue
+        for ts, kind, payload in iter_segment(segment, start, end, mint):
+            if kind == KIND_SOL_PRICE:
+                yield ts, {'sol_price': SOL_PRICE.unpack(payload)[0]}
+            else:
+                yield ts, {'msg': payload.decode('utf-8', errors='replace')}
+
+
+TRADE_COLUMNS = ['ts', 'mint', 'txType', 'traderPublicKey', 'solAmount', 'tokenAmount', 'marketCapSol', 'sol_price']
+
+
+def load_trades(path: str, start: float = None, end: float = None, mints: List[str] = None):
+    """
+    Messages create/buy/sell d'une capture en DataFrame (une ligne par message)
+
+    Base pour recalculer des features sur des lancements passés (dataset_builder);
+    sol_price = dernier prix SOL enregistré avant le message
+    """
+    import pandas as pd
+
+    wanted = set(mints) if mints else None
+    rows = []
+    sol_price = None
+    # Pas de filtre mint par l'index: les prix SOL sont dans d'autres frames
+    for ts, record in iter_records(path, start, end):
+        if 'sol_price' in record:
+            sol_price = record['sol_price']
+            continue
+        try:
+            data = json.loads(record['msg'])
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(data, dict) or data.get('txType') not in ('create', 'buy', 'sell'):
+            continue
+        if wanted is not None and data.get('mint') not in wanted:
+            continue
+        rows.append((ts, data.get('mint'), data['txType'], data.get('traderPublicKey'),
+                     data.get('solAmount', 0), data.get('tokenAmount', 0), data.get('marketCapSol', 0), sol_price))
+    return pd.DataFrame(rows, columns=TRADE_COLUMNS)
+
+
+# ============================================================================
+# SINGLETONS
+# ============================================================================
+_recorders: Dict[str, WsCaptureRecorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def get_ws_capture(source: str, directory: str = None) -> Optional[WsCaptureRecorder]:
+    """Enregistreur de la source, ou None si la capture est désactivée (WS_CAPTURE_DIR vide)"""
+    directory = directory or CAPTURE_DIR
+    if not directory:
+        return None
+    with _recorders_lock:
+        recorder = _recorders.get(source)
+        if recorder is None:
+            from sol_price_fetcher import get_sol_price_usd
+            recorder = WsCaptureRecorder(source, directory, sol_price=get_sol_price_usd)
+            _recorders[source] = recorder
+        return recorder
+
+
+def print_summary(path: str):
+    segments = segment_files(path)
+    if not segments:
+        print(f"[ERROR] Aucun segment dans {path}")
+        return
+
+    print('=' * 80)
+    print(f"CAPTURE: {path}")
+    print('=' * 80)
+    total_records = 0
+    total_raw = 0
+    total_compressed = 0
+    for segment in segments:
+        index = read_index(segment)
+        size = os.path.getsize(segment)
+        if index is None:
+            records = sum(1 for _ in iter_segment(segment))
+            print(f"  {os.path.basename(segment)}: {records:,} messages (non indexe) | {size / 1e6:.1f} MB")
+            total_records += records
+            total_compressed += size
+            continue
+        span = (index['end_ts'] - index['start_ts']) if index['start_ts'] else 0
+        ratio = index['raw_bytes'] / index['compressed_bytes'] if index['compressed_bytes'] else 0
+        print(f"  {index['segment']}: {index['records']:,} messages | {len(index['mints']):,} mints | "
+              f"{span / 60:.0f} min | {size / 1e6:.1f} MB (x{ratio:.1f})")
+        total_records += index['records']
+        total_raw += index['raw_bytes']
+        total_compressed += index['compressed_bytes']
+    print(f"\n  Total: {len(segments)} segments, {total_records:,} messages, {total_compressed / 1e6:.1f} MB")
+    print('=' * 80)
+
+
+def main(argv: List[str]):
+    if not argv:
+        print(__doc__)
+        sys.exit(1)
+
+    if '--mint' in argv:
+        mint = argv[argv.index('--mint') + 1]
+        for ts, record in iter_records(argv[0], mint=mint):
+            print(f"{ts:.3f} {record.get('msg', record)}")
+        return
+    print_summary(argv[0])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])